@@ -7,6 +7,7 @@ VaR, CVaR, Monte Carlo, Portfolio optimization
 import logging
 from typing import Dict, Any, List
 from datetime import datetime
+import numpy as np
 
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
@@ -131,12 +132,19 @@ class ExpertRiskAgent(LineageMixin):
             expected_return = sum(returns) / len(returns) if returns else 0
             volatility = metrics['volatility'] or 0.20
 
+            # Resample the stock's own daily returns when there is enough real history
+            history_returns = self._daily_returns(prices)
+            model = 'bootstrap' if len(history_returns) >= 60 else 'gaussian'
+
             metrics['monte_carlo'] = self.calculator.monte_carlo_simulation(
                 current_price,
                 expected_return,
                 volatility,
                 days=252,  # 1 year
-                simulations=10000
+                simulations=10000,
+                include_bands=True,
+                model=model,
+                returns=history_returns if model == 'bootstrap' else None
             )
 
         # Calculate overall risk score
@@ -144,6 +152,15 @@ class ExpertRiskAgent(LineageMixin):
 
         return metrics
 
+    @staticmethod
+    def _daily_returns(prices: List[float]) -> List[float]:
+        """Daily simple returns from a close series (empty for flat placeholder prices)"""
+        closes = np.asarray(prices, dtype=np.float64)
+        closes = closes[np.isfinite(closes) & (closes > 0)]
+        if len(closes) < 2 or np.all(closes == closes[0]):
+            return []
+        return (closes[1:] / closes[:-1] - 1).tolist()
+
     def _calculate_volatility(self, returns: List[float]) -> float:
         """Calculate annualized volatility"""
         if not returns or len(returns) < 2:
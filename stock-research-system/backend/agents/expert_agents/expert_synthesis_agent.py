@@ -229,6 +229,68 @@ class ExpertSynthesisAgent(LineageMixin):
             logger.error(f"[{self.name}] Error in synthesis: {e}", exc_info=True)
             return self._fallback_synthesis(symbol, price)
 
+    def compare(
+        self,
+        syntheses: Dict[str, Dict[str, Any]],
+        analyses: Dict[str, Dict[str, Any]],
+        outcomes: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Rank per-symbol syntheses into a comparative recommendation
+
+        Args:
+            syntheses: {symbol: synthesize() result}
+            analyses: {symbol: analyses passed to synthesize()}
+            outcomes: Optional {symbol: {'recommendation', 'confidence'}} final calls
+                (after critique and enrichment), ranked instead of the synthesis' own
+
+        Returns:
+            {'ranking', 'preferred', 'summary'} with the ranking best first
+        """
+        ranking = []
+        for symbol, synthesis in syntheses.items():
+            outcome = (outcomes or {}).get(symbol, {})
+            action = outcome.get('recommendation', synthesis.get('action', 'HOLD'))
+            confidence = extract_numeric_value(outcome.get('confidence', synthesis.get('confidence')), 'confidence', 0.5)
+            entry = extract_price_value(synthesis.get('entry_price'), 'entry_price', default=None)
+            target = extract_price_value(synthesis.get('target_price'), 'target_price', default=None)
+            risk = analyses.get(symbol, {}).get('risk') or {}
+
+            ranking.append({
+                'symbol': symbol,
+                'action': action,
+                'confidence': round(confidence, 3),
+                # Conviction: direction of the call (-0.5..0.5) weighted by its confidence
+                'score': round((self._recommendation_to_score(action) - 0.5) * confidence, 4),
+                'upside_pct': round((target - entry) / entry * 100, 2) if entry and target else None,
+                'risk_reward_ratio': synthesis.get('risk_reward_ratio'),
+                'risk_level': risk.get('risk_level', 'MEDIUM'),
+                'consensus_score': synthesis.get('consensus_breakdown', {}).get('weighted_score')
+            })
+
+        # Ties go to the larger upside
+        ranking.sort(key=lambda r: (r['score'], r['upside_pct'] or 0.0), reverse=True)
+        for rank, row in enumerate(ranking, 1):
+            row['rank'] = rank
+
+        preferred = ranking[0]['symbol'] if ranking else None
+        summary = ""
+        if ranking:
+            best = ranking[0]
+            summary = (
+                f"{best['symbol']} ranks first of {len(ranking)} ({best['action']}, "
+                f"{best['confidence']:.0%} confidence). Ranking: "
+                + ", ".join(f"{r['rank']}. {r['symbol']} {r['action']} ({r['confidence']:.0%})" for r in ranking)
+            )
+
+        logger.info(f"[{self.name}] Comparison: {summary}")
+        return {
+            'ranking': ranking,
+            'preferred': preferred,
+            'summary': summary,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
     def _prepare_agent_recommendations(self, analyses: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Prepare agent recommendations for consensus engine
@@ -125,16 +125,21 @@ class ExpertTechnicalAgent(LineageMixin):
         highs = context.get('highs', [p * 1.02 for p in prices])
         lows = context.get('lows', [p * 0.98 for p in prices])
 
+        # Prefer the OHLCVSeries so indicators come from the shared cache
+        series = context.get('price_series')
+        if series is None or len(series) != len(prices):
+            series = prices
+
         indicators = {
-            'rsi': self.calculator.calculate_rsi(prices),
-            'macd': self.calculator.calculate_macd(prices),
-            'bollinger_bands': self.calculator.calculate_bollinger_bands(prices),
-            'golden_cross': self.calculator.detect_golden_cross(prices),
-            'support_resistance': self.calculator.calculate_support_resistance(prices),
-            'sma_50': self.calculator.calculate_sma(prices, 50)[-1] if len(prices) >= 50 else None,
-            'sma_200': self.calculator.calculate_sma(prices, 200)[-1] if len(prices) >= 200 else None,
-            'ema_12': self.calculator.calculate_ema(prices, 12)[-1] if len(prices) >= 12 else None,
-            'ema_26': self.calculator.calculate_ema(prices, 26)[-1] if len(prices) >= 26 else None,
+            'rsi': self.calculator.calculate_rsi(series),
+            'macd': self.calculator.calculate_macd(series),
+            'bollinger_bands': self.calculator.calculate_bollinger_bands(series),
+            'golden_cross': self.calculator.detect_golden_cross(series),
+            'support_resistance': self.calculator.calculate_support_resistance(series),
+            'sma_50': self.calculator.calculate_sma(series, 50)[-1] if len(prices) >= 50 else None,
+            'sma_200': self.calculator.calculate_sma(series, 200)[-1] if len(prices) >= 200 else None,
+            'ema_12': self.calculator.calculate_ema(series, 12)[-1] if len(prices) >= 12 else None,
+            'ema_26': self.calculator.calculate_ema(series, 26)[-1] if len(prices) >= 26 else None,
             'atr': self.calculator.calculate_atr(highs, lows, prices),
             'volume_analysis': self.calculator.analyze_volume(volumes, prices)
         }
@@ -29,6 +29,36 @@ class MacroOverlay(BaseModel):
     confidence: float = Field(description="Confidence 0-1", ge=0, le=1)
 
 
+def macro_impact(market_score: float, confidence: float, base_recommendation: str) -> float:
+    """
+    Calculate how macro context affects the stock
+
+    Returns:
+        float -1 to 1:
+        - Positive = macro helps the stock (tailwind)
+        - Negative = macro hurts the stock (headwind)
+        - 0 = macro neutral
+    """
+    # Map recommendations to scores
+    rec_scores = {'STRONG_SELL': -1, 'SELL': -0.5, 'HOLD': 0,
+                 'BUY': 0.5, 'STRONG_BUY': 1}
+    base_score = rec_scores.get(base_recommendation, 0)
+
+    # If both positive or both negative = reinforcing (positive impact)
+    # If opposing signs = conflicting (negative impact)
+    if base_score * market_score > 0:
+        # Same direction = macro helps
+        impact = abs(market_score) * confidence
+    elif base_score * market_score < 0:
+        # Opposite direction = macro hurts
+        impact = -abs(market_score) * confidence
+    else:
+        # Neutral
+        impact = 0.0
+
+    return round(impact, 3)
+
+
 class MacroContextAgent:
     """
     Analyzes macro market conditions and sector trends
@@ -292,36 +322,8 @@ Return as JSON:
 
     def _calculate_macro_impact(self, macro_analysis: MacroOverlay,
                                 base_recommendation: str) -> float:
-        """
-        Calculate how macro context affects the stock
-
-        Returns:
-            float -1 to 1:
-            - Positive = macro helps the stock (tailwind)
-            - Negative = macro hurts the stock (headwind)
-            - 0 = macro neutral
-        """
-        # Map recommendations to scores
-        rec_scores = {'STRONG_SELL': -1, 'SELL': -0.5, 'HOLD': 0,
-                     'BUY': 0.5, 'STRONG_BUY': 1}
-        base_score = rec_scores.get(base_recommendation, 0)
-
-        # Calculate macro alignment
-        macro_score = macro_analysis.market_score
-
-        # If both positive or both negative = reinforcing (positive impact)
-        # If opposing signs = conflicting (negative impact)
-        if base_score * macro_score > 0:
-            # Same direction = macro helps
-            impact = abs(macro_score) * macro_analysis.confidence
-        elif base_score * macro_score < 0:
-            # Opposite direction = macro hurts
-            impact = -abs(macro_score) * macro_analysis.confidence
-        else:
-            # Neutral
-            impact = 0.0
-
-        return round(impact, 3)
+        """How macro context affects the stock (see macro_impact)"""
+        return macro_impact(macro_analysis.market_score, macro_analysis.confidence, base_recommendation)
 
     def _empty_result(self, symbol: str) -> Dict[str, Any]:
         """Empty result when no macro data"""
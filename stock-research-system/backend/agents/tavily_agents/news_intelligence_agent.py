@@ -27,6 +27,29 @@ class NewsInsight(BaseModel):
     confidence: float = Field(description="Confidence in analysis 0-1", ge=0, le=1)
 
 
+def enrichment_impact(sentiment_score: float, confidence: float, base_recommendation: str) -> float:
+    """
+    Calculate how much news sentiment changes the base recommendation
+
+    Returns:
+        float 0-1: enrichment score
+        - 0.0 = news confirms base analysis (no change)
+        - 0.5 = news adds new information
+        - 1.0 = news contradicts base analysis (significant change)
+    """
+    # Map recommendations to scores
+    rec_scores = {'STRONG_SELL': -1, 'SELL': -0.5, 'HOLD': 0, 'BUY': 0.5, 'STRONG_BUY': 1}
+    base_score = rec_scores.get(base_recommendation, 0)
+
+    # Calculate divergence from the news sentiment
+    divergence = abs(base_score - sentiment_score)
+
+    # Higher divergence = more impact
+    enrichment = min(1.0, divergence * confidence)
+
+    return round(enrichment, 3)
+
+
 class TavilyNewsIntelligenceAgent:
     """
     Tavily-powered news intelligence agent
@@ -278,29 +301,8 @@ Return as JSON with this schema:
         )
 
     def _calculate_enrichment_impact(self, news_analysis: NewsInsight, base_recommendation: str) -> float:
-        """
-        Calculate how much this news changes the base recommendation
-
-        Returns:
-            float 0-1: enrichment score
-            - 0.0 = news confirms base analysis (no change)
-            - 0.5 = news adds new information
-            - 1.0 = news contradicts base analysis (significant change)
-        """
-        # Map recommendations to scores
-        rec_scores = {'STRONG_SELL': -1, 'SELL': -0.5, 'HOLD': 0, 'BUY': 0.5, 'STRONG_BUY': 1}
-        base_score = rec_scores.get(base_recommendation, 0)
-
-        # Compare with news sentiment
-        news_score = news_analysis.sentiment_score
-
-        # Calculate divergence
-        divergence = abs(base_score - news_score)
-
-        # Higher divergence = more impact
-        enrichment = min(1.0, divergence * news_analysis.confidence)
-
-        return round(enrichment, 3)
+        """How much this news changes the base recommendation (see enrichment_impact)"""
+        return enrichment_impact(news_analysis.sentiment_score, news_analysis.confidence, base_recommendation)
 
     def _empty_result(self, symbol: str) -> Dict[str, Any]:
         """Return empty result when no news found"""
@@ -11,14 +11,32 @@ This agent generates comprehensive trading charts with:
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import os
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime, timedelta
 import logging
 import numpy as np
-import yfinance as yf
+
+from services.market_data_store import get_market_data_store, OHLCVSeries, ANALYSIS_PERIOD
+from calculators import indicator_library
+from calculators.indicator_library import get_indicator_library, series_key, to_chart_list
+from calculators.downsampling import aggregate_ohlcv, bucket_ends, bucket_starts, lttb_indices, to_chart_dates
+from calculators.pattern_detector import PatternDetector
 
 logger = logging.getLogger(__name__)
 
+# Scalar summaries built with every analysis
+SUMMARY_SECTIONS = ('pattern_analysis', 'support_resistance', 'volume_profile', 'multi_timeframe', 'expert_insights')
+
+# Full per-bar series, built only when a client asks for them
+CHART_SECTIONS = ('price_charts', 'indicator_charts', 'technical_overlays', 'pattern_history')
+
+SECTION_CACHE_SIZE = 512
+
+# Points per chart series before candles are bucketed and lines thinned (0 disables)
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "1500"))
+
 
 class ChartAnalyticsAgent:
     """
@@ -32,12 +50,23 @@ class ChartAnalyticsAgent:
     - Volume profile analysis
     """
 
+    # Built sections per (symbol, interval, last bar, bar count, section), shared by
+    # every agent instance (the chart endpoint creates one per request)
+    _section_cache: 'OrderedDict[tuple, Any]' = OrderedDict()
+    section_stats = {'hits': 0, 'misses': 0}
+
     def __init__(self, **kwargs):
         self.name = "chart_analytics"
         self.description = "Generates professional trading charts with technical indicators and visual metrics"
+        self.pattern_detector = PatternDetector()
 
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute chart analytics generation."""
+        """
+        Execute chart analytics generation.
+
+        Only the lightweight summary is built here; chart series are served on
+        request by get_sections (state['chart_sections'] adds them eagerly).
+        """
         try:
             symbol = state.get('symbol') or state.get('symbols', [''])[0]
             if not symbol:
@@ -45,40 +74,7 @@ class ChartAnalyticsAgent:
 
             logger.info(f"[{self.name}] Starting chart analytics for {symbol}")
 
-            # Fetch historical data for charting
-            historical_data = await self._fetch_chart_data(symbol)
-
-            # Generate chart configurations
-            price_charts = self._generate_price_charts(symbol, historical_data)
-            indicator_charts = self._generate_indicator_charts(symbol, historical_data)
-            pattern_analysis = self._analyze_chart_patterns(symbol, historical_data)
-            support_resistance = self._calculate_support_resistance(historical_data)
-            volume_profile = self._analyze_volume_profile(historical_data)
-
-            # Multi-timeframe analysis
-            mtf_analysis = self._multi_timeframe_analysis(symbol)
-
-            result = {
-                'symbol': symbol,
-                'chart_data': {
-                    'price_charts': price_charts,
-                    'indicator_charts': indicator_charts,
-                    'technical_overlays': self._generate_technical_overlays(historical_data)
-                },
-                'pattern_analysis': pattern_analysis,
-                'support_resistance': support_resistance,
-                'volume_profile': volume_profile,
-                'multi_timeframe': mtf_analysis,
-                'expert_insights': self._generate_expert_insights(
-                    pattern_analysis, support_resistance, mtf_analysis
-                ),
-                'chart_metadata': {
-                    'data_points': len(historical_data['close']),
-                    'timeframe': 'daily',
-                    'period': '6 months',
-                    'last_updated': datetime.utcnow().isoformat()
-                }
-            }
+            result = await self.get_sections(symbol, list(SUMMARY_SECTIONS) + list(state.get('chart_sections', [])))
 
             logger.info(f"[{self.name}] Chart analytics complete for {symbol}")
             return result  # Return unwrapped data to avoid double nesting
@@ -87,25 +83,146 @@ class ChartAnalyticsAgent:
             logger.error(f"Error in ChartAnalyticsAgent: {e}", exc_info=True)
             return {'error': str(e)}
 
-    async def _fetch_chart_data(self, symbol: str, period: str = '6mo') -> Dict[str, List]:
-        """Fetch historical OHLCV data for charting."""
-        try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
-
-            return {
-                'dates': hist.index.strftime('%Y-%m-%d').tolist(),
-                'open': hist['Open'].tolist(),
-                'high': hist['High'].tolist(),
-                'low': hist['Low'].tolist(),
-                'close': hist['Close'].tolist(),
-                'volume': hist['Volume'].tolist()
+    async def get_sections(
+        self,
+        symbol: str,
+        sections: Sequence[str],
+        max_points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the requested payload sections, memoized per symbol and bar
+
+        Args:
+            symbol: Stock symbol
+            sections: Names from SUMMARY_SECTIONS and CHART_SECTIONS ('summary' selects every summary section)
+            max_points: Points per chart series (defaults to CHART_MAX_POINTS, 0 for full resolution)
+
+        Returns:
+            Summary sections at the top level, chart sections under 'chart_data', plus chart_metadata
+        """
+        requested = []
+        for section in sections:
+            requested.extend(SUMMARY_SECTIONS if section == 'summary' else [section])
+        unknown = [s for s in requested if s not in SUMMARY_SECTIONS + CHART_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown chart sections: {', '.join(unknown)}")
+
+        series = await self._fetch_chart_data(symbol)
+        if series.empty:
+            raise ValueError(f"No chart data available for {symbol}")
+
+        result: Dict[str, Any] = {'symbol': symbol}
+        if any(s in SUMMARY_SECTIONS for s in requested):
+            summary = await self._cached(series, 'summary', self._build_summary, symbol, series)
+            result.update({s: summary[s] for s in SUMMARY_SECTIONS if s in requested})
+
+        chart_sections = list(dict.fromkeys(s for s in requested if s in CHART_SECTIONS))
+        max_points = CHART_MAX_POINTS if max_points is None else max_points
+        if chart_sections:
+            result['chart_data'] = {
+                section: await self._cached(series, f'{section}:{max_points}', self._build_chart_section,
+                                            section, symbol, series, max_points)
+                for section in chart_sections
             }
+
+        result['chart_metadata'] = {
+            'data_points': len(series),
+            'timeframe': 'daily',
+            'period': '1 year',
+            'last_bar': str(np.datetime64(series.dates[-1], 'D')),
+            'chart_points': min(len(series), max_points) if max_points > 0 else len(series),
+            'available_sections': list(CHART_SECTIONS),
+            'sections_endpoint': f"/api/v1/charts/{symbol}?sections={','.join(CHART_SECTIONS)}",
+            'last_updated': datetime.utcnow().isoformat()
+        }
+        return result
+
+    async def _cached(self, series: OHLCVSeries, section: str, build, *args) -> Any:
+        """Section from the memo, or built off the event loop and stored"""
+        cache = ChartAnalyticsAgent._section_cache
+        key = (*series_key(series), section)
+        if key in cache:
+            cache.move_to_end(key)
+            ChartAnalyticsAgent.section_stats['hits'] += 1
+            return cache[key]
+
+        ChartAnalyticsAgent.section_stats['misses'] += 1
+        if asyncio.iscoroutinefunction(build):
+            value = await build(*args)
+        else:
+            value = await asyncio.to_thread(build, *args)
+
+        cache[key] = value
+        while len(cache) > SECTION_CACHE_SIZE:
+            cache.popitem(last=False)
+        return value
+
+    async def _build_summary(self, symbol: str, series: OHLCVSeries) -> Dict[str, Any]:
+        """Scalar chart summary (patterns, levels, volume, timeframe alignment)"""
+        historical_data = series.to_lists()
+        pattern_analysis = self._analyze_chart_patterns(symbol, historical_data)
+        support_resistance = self._calculate_support_resistance(historical_data)
+        volume_profile = self._analyze_volume_profile(historical_data, series)
+
+        # Multi-timeframe analysis
+        mtf_analysis = await self._multi_timeframe_analysis(symbol)
+
+        return {
+            'pattern_analysis': pattern_analysis,
+            'support_resistance': support_resistance,
+            'volume_profile': volume_profile,
+            'multi_timeframe': mtf_analysis,
+            'expert_insights': self._generate_expert_insights(
+                pattern_analysis, support_resistance, mtf_analysis
+            )
+        }
+
+    def _build_chart_section(self, section: str, symbol: str, series: OHLCVSeries, max_points: int) -> Dict[str, Any]:
+        """One chart section, with at most max_points points per series"""
+        if section == 'pattern_history':
+            return self._analyze_pattern_history(series)
+
+        # Candles are bucketed; indicators are computed at full resolution and
+        # sampled at bucket ends so every chart shares the candle dates
+        starts = bucket_starts(len(series), max_points) if max_points > 0 else np.arange(len(series))
+        historical_data = self._chart_lists(series, starts)
+        sample = bucket_ends(starts, len(series)) if len(starts) < len(series) else None
+
+        if section == 'price_charts':
+            return self._generate_price_charts(symbol, historical_data, self._line_points(series, max_points))
+        if section == 'indicator_charts':
+            return self._generate_indicator_charts(symbol, historical_data, series, sample)
+        return self._generate_technical_overlays(historical_data, series, sample)
+
+    @staticmethod
+    def _chart_lists(series: OHLCVSeries, starts: np.ndarray) -> Dict[str, List]:
+        """Plain-list bars for chart payloads, one per bucket"""
+        if len(starts) == len(series):
+            return series.to_lists()
+        candles = aggregate_ohlcv(starts, series.dates, series.open, series.high, series.low,
+                                  series.close, series.volume)
+        return {
+            'dates': to_chart_dates(candles['dates']),
+            **{field: candles[field].tolist() for field in ('open', 'high', 'low', 'close', 'volume')}
+        }
+
+    @staticmethod
+    def _line_points(series: OHLCVSeries, max_points: int) -> Dict[str, List]:
+        """Close prices thinned with LTTB (shape-preserving) for the line chart"""
+        if max_points <= 0 or len(series) <= max_points:
+            return {'dates': to_chart_dates(series.dates), 'close': series.close.tolist()}
+        keep = lttb_indices(series.dates.astype('datetime64[s]').astype(np.float64), series.close, max_points)
+        return {'dates': to_chart_dates(series.dates[keep]), 'close': series.close[keep].tolist()}
+
+    async def _fetch_chart_data(self, symbol: str, period: str = ANALYSIS_PERIOD) -> OHLCVSeries:
+        """Fetch historical OHLCV data for charting (the analysis window, so cached indicators are shared)."""
+        try:
+            return await get_market_data_store().get_history(symbol, period=period)
         except Exception as e:
             logger.error(f"[{self.name}] Failed to fetch chart data: {e}")
-            return {'dates': [], 'open': [], 'high': [], 'low': [], 'close': [], 'volume': []}
+            return OHLCVSeries.empty_series(symbol, '1d')
 
-    def _generate_price_charts(self, symbol: str, data: Dict) -> Dict[str, Any]:
+    def _generate_price_charts(self, symbol: str, data: Dict, line: Optional[Dict] = None) -> Dict[str, Any]:
         """Generate price chart configurations."""
         return {
             'candlestick': {
@@ -126,7 +243,7 @@ class ChartAnalyticsAgent:
             },
             'line': {
                 'type': 'line',
-                'data': {
+                'data': line or {
                     'dates': data['dates'],
                     'close': data['close']
                 },
@@ -153,30 +270,35 @@ class ChartAnalyticsAgent:
             }
         }
 
-    def _generate_indicator_charts(self, symbol: str, data: Dict) -> Dict[str, Any]:
-        """Generate technical indicator charts."""
-        close_prices = np.array(data['close'])
-        high_prices = np.array(data['high'])
-        low_prices = np.array(data['low'])
-        volumes = np.array(data['volume'])
+    def _generate_indicator_charts(self, symbol: str, data: Dict, series: OHLCVSeries,
+                                   sample: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Generate technical indicator charts (full-resolution values taken at `sample` bars)."""
+        close_prices = series.close
+        high_prices = series.high
+        low_prices = series.low
+        volumes = series.volume.astype(np.float64)
+        library = get_indicator_library()
+
+        def chart_values(values: np.ndarray) -> List:
+            return to_chart_list(values if sample is None else np.asarray(values)[sample])
 
         # RSI (14-period)
-        rsi = self._calculate_rsi(close_prices, period=14)
+        rsi = library.compute(series, 'rsi', period=14)
 
         # MACD
-        macd_line, signal_line, histogram = self._calculate_macd(close_prices)
+        macd_line, signal_line, histogram = library.compute(series, 'macd')
 
         # Bollinger Bands
-        bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(close_prices)
+        bb_upper, bb_middle, bb_lower = library.compute(series, 'bollinger_bands', period=20, std_dev=2.0)
 
         # ATR (14-period)
-        atr = self._calculate_atr(high_prices, low_prices, close_prices, period=14)
+        atr = library.compute(series, 'atr', period=14)
 
         # Moving Averages
-        sma_20 = self._calculate_sma(close_prices, 20)
-        sma_50 = self._calculate_sma(close_prices, 50)
-        ema_12 = self._calculate_ema(close_prices, 12)
-        ema_26 = self._calculate_ema(close_prices, 26)
+        sma_20 = library.compute(series, 'sma', period=20)
+        sma_50 = library.compute(series, 'sma', period=50)
+        ema_12 = library.compute(series, 'ema', period=12)
+        ema_26 = library.compute(series, 'ema', period=26)
 
         # ADX (14-period)
         adx = self._calculate_adx(high_prices, low_prices, close_prices, period=14)
@@ -194,12 +316,12 @@ class ChartAnalyticsAgent:
         cci = self._calculate_cci(high_prices, low_prices, close_prices, period=20)
 
         # OBV (On-Balance Volume)
-        obv = self._calculate_obv(close_prices, volumes)
+        obv = library.compute(series, 'obv')
 
         return {
             'rsi': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': rsi.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(rsi)},
                 'config': {
                     'title': 'RSI (14)',
                     'yaxis_title': 'RSI',
@@ -211,9 +333,9 @@ class ChartAnalyticsAgent:
                 'type': 'multi_line',
                 'data': {
                     'dates': data['dates'],
-                    'macd': macd_line.tolist(),
-                    'signal': signal_line.tolist(),
-                    'histogram': histogram.tolist()
+                    'macd': chart_values(macd_line),
+                    'signal': chart_values(signal_line),
+                    'histogram': chart_values(histogram)
                 },
                 'config': {
                     'title': 'MACD',
@@ -225,9 +347,9 @@ class ChartAnalyticsAgent:
                 'type': 'bands',
                 'data': {
                     'dates': data['dates'],
-                    'upper': bb_upper.tolist(),
-                    'middle': bb_middle.tolist(),
-                    'lower': bb_lower.tolist(),
+                    'upper': chart_values(bb_upper),
+                    'middle': chart_values(bb_middle),
+                    'lower': chart_values(bb_lower),
                     'price': data['close']
                 },
                 'config': {
@@ -250,10 +372,10 @@ class ChartAnalyticsAgent:
                 'data': {
                     'dates': data['dates'],
                     'price': data['close'],
-                    'sma_20': sma_20.tolist(),
-                    'sma_50': sma_50.tolist(),
-                    'ema_12': ema_12.tolist(),
-                    'ema_26': ema_26.tolist()
+                    'sma_20': chart_values(sma_20),
+                    'sma_50': chart_values(sma_50),
+                    'ema_12': chart_values(ema_12),
+                    'ema_26': chart_values(ema_26)
                 },
                 'config': {
                     'title': 'Moving Averages Overlay',
@@ -262,7 +384,7 @@ class ChartAnalyticsAgent:
             },
             'atr': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': atr.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(atr)},
                 'config': {
                     'title': 'Average True Range (14)',
                     'yaxis_title': 'ATR',
@@ -271,7 +393,7 @@ class ChartAnalyticsAgent:
             },
             'adx': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': adx.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(adx)},
                 'config': {
                     'title': 'ADX - Trend Strength (14)',
                     'yaxis_title': 'ADX',
@@ -287,8 +409,8 @@ class ChartAnalyticsAgent:
                 'type': 'multi_line',
                 'data': {
                     'dates': data['dates'],
-                    'k': stoch_k.tolist(),
-                    'd': stoch_d.tolist()
+                    'k': chart_values(stoch_k),
+                    'd': chart_values(stoch_d)
                 },
                 'config': {
                     'title': 'Stochastic Oscillator (14, 3, 3)',
@@ -303,7 +425,7 @@ class ChartAnalyticsAgent:
             },
             'williams_r': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': williams_r.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(williams_r)},
                 'config': {
                     'title': 'Williams %R (14)',
                     'yaxis_title': 'Williams %R',
@@ -317,7 +439,7 @@ class ChartAnalyticsAgent:
             },
             'mfi': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': mfi.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(mfi)},
                 'config': {
                     'title': 'Money Flow Index (14)',
                     'yaxis_title': 'MFI',
@@ -331,7 +453,7 @@ class ChartAnalyticsAgent:
             },
             'cci': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': cci.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(cci)},
                 'config': {
                     'title': 'Commodity Channel Index (20)',
                     'yaxis_title': 'CCI',
@@ -345,7 +467,7 @@ class ChartAnalyticsAgent:
             },
             'obv': {
                 'type': 'line',
-                'data': {'dates': data['dates'], 'values': obv.tolist()},
+                'data': {'dates': data['dates'], 'values': chart_values(obv)},
                 'config': {
                     'title': 'On-Balance Volume',
                     'yaxis_title': 'OBV',
@@ -354,17 +476,21 @@ class ChartAnalyticsAgent:
             }
         }
 
-    def _generate_technical_overlays(self, data: Dict) -> Dict[str, Any]:
-        """Generate technical overlays for main price chart."""
-        close_prices = np.array(data['close'])
+    def _generate_technical_overlays(self, data: Dict, series: OHLCVSeries,
+                                     sample: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Generate technical overlays for main price chart (aligned with the candle buckets)."""
+        library = get_indicator_library()
+
+        def chart_values(values: np.ndarray) -> List:
+            return to_chart_list(values if sample is None else np.asarray(values)[sample])
 
         return {
-            'sma_20': self._calculate_sma(close_prices, 20).tolist(),
-            'sma_50': self._calculate_sma(close_prices, 50).tolist(),
-            'sma_200': self._calculate_sma(close_prices, 200).tolist(),
-            'ema_12': self._calculate_ema(close_prices, 12).tolist(),
-            'ema_26': self._calculate_ema(close_prices, 26).tolist(),
-            'vwap': self._calculate_vwap(data).tolist()
+            'sma_20': chart_values(library.compute(series, 'sma', period=20)),
+            'sma_50': chart_values(library.compute(series, 'sma', period=50)),
+            'sma_200': chart_values(library.compute(series, 'sma', period=200)),
+            'ema_12': chart_values(library.compute(series, 'ema', period=12)),
+            'ema_26': chart_values(library.compute(series, 'ema', period=26)),
+            'vwap': chart_values(self._calculate_vwap({'close': series.close, 'volume': series.volume}))
         }
 
     def _analyze_chart_patterns(self, symbol: str, data: Dict) -> Dict[str, Any]:
@@ -401,6 +527,15 @@ class ChartAnalyticsAgent:
             'reversal_probability': self._calculate_reversal_probability(close_prices)
         }
 
+    def _analyze_pattern_history(self, series: OHLCVSeries) -> Dict[str, Any]:
+        """Every formation across the charted range, with how price followed through."""
+        history = self.pattern_detector.scan_patterns(series.high, series.low, series.close, series.dates)
+        return {
+            'occurrences': history['occurrences'],
+            'counts': history['counts'],
+            'statistics': self.pattern_detector.backtest_patterns(series.close, history['occurrences'])
+        }
+
     def _calculate_support_resistance(self, data: Dict) -> Dict[str, Any]:
         """Calculate support and resistance levels."""
         close_prices = np.array(data['close'])
@@ -448,7 +583,7 @@ class ChartAnalyticsAgent:
             'nearest_resistance': round(min([r for r in [resistance1, resistance2] if r > close_prices[-1]], default=resistance1), 2)
         }
 
-    def _analyze_volume_profile(self, data: Dict) -> Dict[str, Any]:
+    def _analyze_volume_profile(self, data: Dict, series: OHLCVSeries) -> Dict[str, Any]:
         """Analyze volume profile and distribution."""
         volumes = np.array(data['volume'])
         close_prices = np.array(data['close'])
@@ -460,7 +595,7 @@ class ChartAnalyticsAgent:
         vwap = np.sum(close_prices * volumes) / np.sum(volumes)
 
         # On-Balance Volume (OBV)
-        obv = self._calculate_obv(close_prices, volumes)
+        obv = get_indicator_library().compute(series, 'obv')
 
         return {
             'average_volume': int(avg_volume),
@@ -473,15 +608,16 @@ class ChartAnalyticsAgent:
             'volume_spikes': self._detect_volume_spikes(volumes)
         }
 
-    def _multi_timeframe_analysis(self, symbol: str) -> Dict[str, Any]:
+    async def _multi_timeframe_analysis(self, symbol: str) -> Dict[str, Any]:
         """Multi-timeframe trend analysis."""
         timeframes = {}
+        store = get_market_data_store()
 
         for period, label in [('1mo', 'weekly'), ('3mo', 'monthly'), ('1y', 'quarterly')]:
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period)
-                close_prices = hist['Close'].values
+                # Sub-periods are slices of the history already fetched for this symbol
+                series = await store.get_history(symbol, period=period)
+                close_prices = series.close
 
                 trend = self._detect_trend(close_prices)
                 strength = self._calculate_trend_strength(close_prices)
@@ -528,69 +664,7 @@ class ChartAnalyticsAgent:
 
         return insights
 
-    # Technical Indicator Calculations
-    def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> np.ndarray:
-        """Calculate Relative Strength Index."""
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        avg_gains = np.convolve(gains, np.ones(period)/period, mode='valid')
-        avg_losses = np.convolve(losses, np.ones(period)/period, mode='valid')
-
-        rs = avg_gains / (avg_losses + 1e-10)
-        rsi = 100 - (100 / (1 + rs))
-
-        return np.concatenate([np.full(period, 50), rsi])  # Pad with neutral 50
-
-    def _calculate_macd(self, prices: np.ndarray) -> tuple:
-        """Calculate MACD, Signal line, and Histogram."""
-        ema_12 = self._calculate_ema(prices, 12)
-        ema_26 = self._calculate_ema(prices, 26)
-
-        macd_line = ema_12 - ema_26
-        signal_line = self._calculate_ema(macd_line, 9)
-        histogram = macd_line - signal_line
-
-        return macd_line, signal_line, histogram
-
-    def _calculate_bollinger_bands(self, prices: np.ndarray, period: int = 20, std_dev: float = 2) -> tuple:
-        """Calculate Bollinger Bands."""
-        sma = self._calculate_sma(prices, period)
-        rolling_std = np.array([np.std(prices[max(0, i-period):i+1]) for i in range(len(prices))])
-
-        upper_band = sma + (rolling_std * std_dev)
-        lower_band = sma - (rolling_std * std_dev)
-
-        return upper_band, sma, lower_band
-
-    def _calculate_atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
-        """Calculate Average True Range."""
-        tr1 = high - low
-        tr2 = np.abs(high - np.roll(close, 1))
-        tr3 = np.abs(low - np.roll(close, 1))
-
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
-        tr[0] = tr1[0]  # First value
-
-        atr = np.convolve(tr, np.ones(period)/period, mode='same')
-        return atr
-
-    def _calculate_sma(self, prices: np.ndarray, period: int) -> np.ndarray:
-        """Calculate Simple Moving Average."""
-        return np.convolve(prices, np.ones(period)/period, mode='same')
-
-    def _calculate_ema(self, prices: np.ndarray, period: int) -> np.ndarray:
-        """Calculate Exponential Moving Average."""
-        alpha = 2 / (period + 1)
-        ema = np.zeros_like(prices)
-        ema[0] = prices[0]
-
-        for i in range(1, len(prices)):
-            ema[i] = alpha * prices[i] + (1 - alpha) * ema[i-1]
-
-        return ema
-
+    # Technical Indicator Calculations (RSI/MACD/SMA/EMA/Bollinger/ATR/OBV come from the indicator library)
     def _calculate_vwap(self, data: Dict) -> np.ndarray:
         """Calculate Volume Weighted Average Price."""
         close = np.array(data['close'])
@@ -601,21 +675,6 @@ class ChartAnalyticsAgent:
 
         return cumulative_pv / (cumulative_volume + 1e-10)
 
-    def _calculate_obv(self, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
-        """Calculate On-Balance Volume."""
-        obv = np.zeros_like(close)
-        obv[0] = volume[0]
-
-        for i in range(1, len(close)):
-            if close[i] > close[i-1]:
-                obv[i] = obv[i-1] + volume[i]
-            elif close[i] < close[i-1]:
-                obv[i] = obv[i-1] - volume[i]
-            else:
-                obv[i] = obv[i-1]
-
-        return obv
-
     def _detect_trend(self, prices: np.ndarray) -> str:
         """Detect current trend direction."""
         if len(prices) < 20:
@@ -754,7 +813,7 @@ class ChartAnalyticsAgent:
                 stoch_k[i] = 50
 
         # %D is SMA of %K
-        stoch_d = self._calculate_sma(stoch_k, d_period)
+        stoch_d = indicator_library.sma(stoch_k, d_period)
 
         return stoch_k, stoch_d
 
@@ -795,7 +854,7 @@ class ChartAnalyticsAgent:
     def _calculate_cci(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 20) -> np.ndarray:
         """Calculate Commodity Channel Index (CCI)."""
         typical_price = (high + low + close) / 3
-        sma_tp = self._calculate_sma(typical_price, period)
+        sma_tp = indicator_library.sma(typical_price, period)
 
         cci = np.zeros_like(close)
 
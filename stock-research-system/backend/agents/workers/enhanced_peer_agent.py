@@ -44,7 +44,7 @@ class EnhancedPeerAgent:
             logger.info(f"[{self.name}] Starting peer analysis for {symbol}")
 
             # Step 1: Get quantitative peer comparison
-            peer_data = self.benchmark_calc.get_peer_comparison(symbol)
+            peer_data = await self.benchmark_calc.get_peer_comparison(symbol)
 
             if 'error' in peer_data:
                 logger.error(f"[{self.name}] Benchmark calc error: {peer_data['error']}")
@@ -6,11 +6,12 @@ import asyncio
 from typing import Dict, Any, List, Optional
 import numpy as np
 import logging
-import yfinance as yf
 from datetime import datetime, timedelta
 import aiohttp
 import json
 
+from services.market_data_adapter import get_market_data_adapter
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,8 +30,10 @@ class EnhancedValuationAgent:
             logger.info(f"Starting enhanced valuation analysis for {symbol}")
 
             # Fetch financial data
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            ticker = await get_market_data_adapter().get_ticker_fields(
+                symbol, 'info', 'cashflow', 'financials'
+            )
+            info = ticker.info or {}
 
             # Get real analyst targets FIRST (most important)
             analyst_targets = await self._get_real_analyst_targets(ticker, info, symbol)
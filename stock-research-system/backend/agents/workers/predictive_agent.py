@@ -7,16 +7,15 @@ import asyncio
 from typing import Dict, Any, List, Optional
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
 import logging
 import warnings
 warnings.filterwarnings('ignore')
 
-from calculators.model_backtester import ModelBacktester
+from calculators.feature_matrix import FeatureMatrix, PRICE_MODEL_FEATURES
+from calculators.model_backtester import ModelBacktester, records_from_columns
 from services.drift_monitor import DriftMonitor
+from services.market_data_store import get_market_data_store
+from services.model_cache import get_model_cache
 
 logger = logging.getLogger(__name__)
 
@@ -43,18 +42,18 @@ class PredictiveAnalyticsAgent:
 
             logger.info(f"Starting predictive analytics for {symbol}")
 
-            # Fetch historical data
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="1y")
+            # Fetch historical data (shared with the other agents via the store)
+            series = await get_market_data_store().get_history(symbol, period="1y")
 
-            if hist.empty or len(hist) < 60:
+            if series.empty or len(series) < 60:
                 return {"error": "Insufficient historical data for predictions"}
 
             # Prepare data
-            df = pd.DataFrame(hist)
+            df = series.to_dataframe()
+            features = FeatureMatrix.from_series(series)
 
             # Run multiple prediction models
-            price_predictions = await self._predict_price_movement(df)
+            price_predictions = await self._predict_price_movement(df, symbol, features)
             volatility_forecast = await self._predict_volatility(df)
             trend_prediction = await self._predict_trend_reversal(df)
             momentum_forecast = await self._predict_momentum(df)
@@ -80,7 +79,7 @@ class PredictiveAnalyticsAgent:
             )
 
             # Backtest the model
-            backtest_results = await self._run_backtest(df, price_predictions)
+            backtest_results = await self._run_backtest(df, price_predictions, features)
 
             # Monitor for drift (track predictions vs actuals)
             drift_status = await self._check_model_drift(
@@ -109,51 +108,27 @@ class PredictiveAnalyticsAgent:
             logger.error(f"Predictive analytics failed: {e}")
             return {"error": str(e)}
 
-    async def _predict_price_movement(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Predict future price movements using multiple models"""
+    async def _predict_price_movement(self, df: pd.DataFrame, symbol: str,
+                                      features: FeatureMatrix) -> Dict[str, Any]:
+        """Predict future price movements using multiple models (fits cached per symbol and bar)"""
 
-        # Prepare features
-        df['Returns'] = df['Close'].pct_change()
-        df['MA_5'] = df['Close'].rolling(window=5).mean()
-        df['MA_20'] = df['Close'].rolling(window=20).mean()
-        df['Volume_MA'] = df['Volume'].rolling(window=5).mean()
-        df['High_Low'] = df['High'] - df['Low']
-        df['Price_Change'] = df['Close'] - df['Open']
+        # Rows past the longest warm-up (20-day average)
+        close = df['Close'].to_numpy(dtype=np.float64)
+        rows = features.valid_rows(PRICE_MODEL_FEATURES) & np.isfinite(close)
 
-        # Create lag features
-        for i in range(1, 6):
-            df[f'Close_Lag_{i}'] = df['Close'].shift(i)
-            df[f'Volume_Lag_{i}'] = df['Volume'].shift(i)
-
-        # Drop NaN values
-        df_clean = df.dropna()
-
-        if len(df_clean) < 30:
+        if rows.sum() < 30:
             return {"error": "Insufficient data for prediction"}
 
-        # Features and target
-        feature_cols = ['MA_5', 'MA_20', 'Volume_MA', 'High_Low', 'Price_Change'] + \
-                      [f'Close_Lag_{i}' for i in range(1, 6)] + \
-                      [f'Volume_Lag_{i}' for i in range(1, 6)]
-
-        X = df_clean[feature_cols].values
-        y = df_clean['Close'].values
+        X = features.select(PRICE_MODEL_FEATURES, rows)
+        y = close[rows]
 
         # Split data (80% train, 20% test)
         split_idx = int(len(X) * 0.8)
-        X_train, X_test = X[:split_idx], X[split_idx:]
-        y_train, y_test = y[:split_idx], y[split_idx:]
-
-        # Train models
-        # 1. Linear Regression
-        lr_model = LinearRegression()
-        lr_model.fit(X_train, y_train)
-        lr_score = lr_model.score(X_test, y_test)
 
-        # 2. Random Forest
-        rf_model = RandomForestRegressor(n_estimators=50, random_state=42, max_depth=10)
-        rf_model.fit(X_train, y_train)
-        rf_score = rf_model.score(X_test, y_test)
+        # Linear Regression + Random Forest, reused until a new bar arrives
+        models = await get_model_cache().get_models(symbol, features.dates[rows], X, y, split_idx)
+        lr_model, rf_model = models['lr'], models['rf']
+        lr_score, rf_score = models['lr_score'], models['rf_score']
 
         # Make predictions for next periods
         last_features = X[-1].reshape(1, -1)
@@ -198,6 +173,7 @@ class PredictiveAnalyticsAgent:
             "linear_regression": lr_score,
             "random_forest": rf_score
         }
+        predictions["model_cache"] = models['source']
 
         return predictions
 
@@ -622,13 +598,15 @@ class PredictiveAnalyticsAgent:
 
         return min(confidence, 0.95)
 
-    async def _run_backtest(self, df: pd.DataFrame, price_predictions: Dict) -> Dict[str, Any]:
+    async def _run_backtest(self, df: pd.DataFrame, price_predictions: Dict,
+                            features: FeatureMatrix) -> Dict[str, Any]:
         """
         Run comprehensive backtest on the prediction model
 
         Args:
             df: Historical price data
             price_predictions: Model predictions with scores
+            features: Point-in-time feature matrix for df's bars
 
         Returns:
             Backtest results with performance metrics
@@ -636,11 +614,6 @@ class PredictiveAnalyticsAgent:
         logger.info(f"[{self.name}] Running model backtest")
 
         try:
-            # Prepare historical predictions for backtesting
-            predictions = []
-            actual_prices = []
-            timestamps = []
-
             # Get model scores for accuracy calculation
             lr_score = price_predictions.get('model_scores', {}).get('linear_regression', 0.5)
             rf_score = price_predictions.get('model_scores', {}).get('random_forest', 0.5)
@@ -648,84 +621,54 @@ class PredictiveAnalyticsAgent:
             # Simulate predictions for historical data (out-of-sample)
             # Use last 100 days for backtesting
             backtest_length = min(100, len(df) - 20)
-
-            for i in range(len(df) - backtest_length, len(df) - 1):
-                current_price = float(df['Close'].iloc[i])
-                next_price = float(df['Close'].iloc[i + 1])
-                actual_return = (next_price - current_price) / current_price
-
-                # FIXED: Generate prediction WITHOUT using future data
-                # Use historical features only (lag features, moving averages)
-                # This simulates what the model would have predicted at time i
-
-                # Calculate historical indicators at time i
-                if i >= 20:  # Need enough history
-                    # Recent price momentum
-                    momentum_5 = (df['Close'].iloc[i] - df['Close'].iloc[i-5]) / df['Close'].iloc[i-5]
-                    momentum_10 = (df['Close'].iloc[i] - df['Close'].iloc[i-10]) / df['Close'].iloc[i-10]
-
-                    # Moving average signals
-                    ma_5 = df['Close'].iloc[i-5:i].mean()
-                    ma_20 = df['Close'].iloc[i-20:i].mean()
-                    ma_signal = (df['Close'].iloc[i] - ma_20) / ma_20
-
-                    # Volume signal
-                    vol_ratio = df['Volume'].iloc[i] / df['Volume'].iloc[i-20:i].mean() if df['Volume'].iloc[i-20:i].mean() > 0 else 1
-
-                    # Volatility signal
-                    recent_vol = df['Close'].iloc[i-10:i].pct_change().std()
-
-                    # Combine signals with realistic noise
-                    # Model accuracy determines how well these signals predict future
-                    base_signal = (momentum_5 * 0.3 + momentum_10 * 0.2 + ma_signal * 0.3 + (vol_ratio - 1) * 0.1)
-
-                    # Add realistic model uncertainty (models aren't perfect)
-                    model_accuracy = (lr_score + rf_score) / 2
-                    # Even with 90% R² score, predictions have significant error
-                    # Real-world: R² of 0.8 might only give 55-60% directional accuracy
-                    directional_accuracy = 0.5 + (model_accuracy * 0.15)  # Max ~65% accuracy even with R²=1.0
-
-                    # Predicted return with noise (models don't predict exact returns)
-                    noise = np.random.normal(0, recent_vol * 2)  # Prediction error
-                    predicted_return = base_signal * directional_accuracy + noise
-                else:
-                    # Not enough history, use random prediction
-                    predicted_return = np.random.normal(0, 0.01)
-
-                # Determine direction with conservative thresholds
-                if predicted_return > 0.015:  # Need stronger signal to trigger
-                    direction = 'up'
-                elif predicted_return < -0.015:
-                    direction = 'down'
-                else:
-                    direction = 'neutral'
-
-                # Calculate confidence (realistic - rarely very high)
-                # Even strong signals shouldn't have >80% confidence
-                confidence = min(abs(predicted_return) * 30 + 0.4, 0.75)
-
-                predictions.append({
-                    'direction': direction,
-                    'predicted_return': predicted_return,
-                    'confidence': confidence
-                })
-
-                actual_prices.append(current_price)
-                timestamps.append(df.index[i] if hasattr(df.index[i], 'to_pydatetime') else datetime.now())
+            bars = np.arange(len(df) - backtest_length, len(df) - 1)
+            close = df['Close'].to_numpy(dtype=np.float64)
+
+            # FIXED: Generate prediction WITHOUT using future data
+            # Every signal feature at bar i uses bars <= i only (lag features,
+            # averages of the 20 bars before i), so this simulates what the
+            # model would have predicted at time i
+            signals = {name: features.column(name)[bars].astype(np.float64) for name in
+                       ('Momentum_5', 'Momentum_10', 'MA_Signal', 'Volume_Ratio', 'Recent_Volatility')}
+            base_signal = (signals['Momentum_5'] * 0.3 + signals['Momentum_10'] * 0.2 +
+                           signals['MA_Signal'] * 0.3 + (signals['Volume_Ratio'] - 1) * 0.1)
+
+            # Add realistic model uncertainty (models aren't perfect)
+            model_accuracy = (lr_score + rf_score) / 2
+            # Even with 90% R² score, predictions have significant error
+            # Real-world: R² of 0.8 might only give 55-60% directional accuracy
+            directional_accuracy = 0.5 + (model_accuracy * 0.15)  # Max ~65% accuracy even with R²=1.0
+
+            # Predicted return with noise (models don't predict exact returns);
+            # bars without enough history get a random prediction
+            enough_history = bars >= 20
+            noise = np.random.normal(0, np.where(enough_history, signals['Recent_Volatility'] * 2, 0.01))
+            predicted_return = np.where(enough_history, base_signal * directional_accuracy, 0) + noise
+
+            # Determine direction with conservative thresholds (need stronger signal to trigger)
+            direction = np.where(predicted_return > 0.015, 1, np.where(predicted_return < -0.015, -1, 0))
+
+            # Calculate confidence (realistic - rarely very high)
+            # Even strong signals shouldn't have >80% confidence
+            confidence = np.minimum(np.abs(predicted_return) * 30 + 0.4, 0.75)
+
+            predictions = records_from_columns(
+                direction=direction,
+                confidence=confidence,
+                actual_return=close[bars + 1] / close[bars] - 1,
+                timestamps=df.index[bars],
+                predicted_return=predicted_return
+            )
 
             # Run backtest
             backtest_result = self.backtester.backtest_predictions(
                 predictions=predictions,
-                actual_prices=actual_prices,
-                timestamps=timestamps,
                 initial_capital=100000
             )
 
             # Run out-of-sample test (70/30 split)
             oos_results = self.backtester.out_of_sample_test(
                 predictions=predictions,
-                actual_prices=actual_prices,
-                timestamps=timestamps,
                 train_ratio=0.7
             )
 
@@ -7,9 +7,10 @@ import asyncio
 from typing import Dict, Any, List, Optional
 import numpy as np
 import logging
-import yfinance as yf
 from datetime import datetime, timedelta
 
+from services.market_data_adapter import get_market_data_adapter
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,11 +28,10 @@ class ValuationAgent:
             logger.info(f"Starting valuation analysis for {symbol}")
 
             # Fetch financial data
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            financials = ticker.financials
-            balance_sheet = ticker.balance_sheet
-            cash_flow = ticker.cashflow
+            ticker = await get_market_data_adapter().get_ticker_fields(
+                symbol, 'info', 'financials', 'balance_sheet', 'cashflow', 'recommendations'
+            )
+            info = ticker.info or {}
 
             # Calculate various valuation metrics
             dcf_valuation = await self._calculate_dcf(ticker, info)
@@ -261,6 +261,7 @@ class ValuationAgent:
             recommendations = ticker.recommendations
             rec_counts = {}
             consensus = "Hold"  # Default
+            buy_count = hold_count = sell_count = 0
 
             if recommendations is not None and not recommendations.empty:
                 try:
@@ -288,17 +289,10 @@ class ValuationAgent:
                 except Exception as e:
                     logger.warning(f"Could not parse recommendations: {e}")
                     buy_count = hold_count = sell_count = 0
-            else:
-                buy_count = hold_count = sell_count = 0
 
-                total = buy_count + hold_count + sell_count
-                if total > 0:
-                    consensus = "Buy" if buy_count > (hold_count + sell_count) else "Hold" if hold_count > sell_count else "Sell"
-                else:
-                    consensus = "Hold"
-            else:
-                consensus = "Hold"
-                rec_counts = {}
+            total = buy_count + hold_count + sell_count
+            if total > 0:
+                consensus = "Buy" if buy_count > (hold_count + sell_count) else "Hold" if hold_count > sell_count else "Sell"
 
             # Get price targets from info
             target_high = info.get('targetHighPrice', 0)
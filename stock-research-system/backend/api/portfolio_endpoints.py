@@ -5,9 +5,10 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pydantic import BaseModel, Field
 import logging
-import yfinance as yf
 
 from services.mongodb_connection import mongodb_connection
+from services.batch_quote_service import get_batch_quote_service
+from services.portfolio_optimization_service import get_portfolio_optimization_service
 
 logger = logging.getLogger(__name__)
 
@@ -147,9 +148,12 @@ async def get_user_portfolio(user_email: str, update_prices: bool = True):
         total_value = 0
         total_cost = 0
 
-        for h in portfolio.get('holdings', []):
-            # Get both current and previous close
-            current_price, previous_close = await get_current_and_previous_price(h['symbol'])
+        # Fetch current and previous close for all holdings in one batch
+        holdings = portfolio.get('holdings', [])
+        prices = await get_portfolio_prices([h['symbol'] for h in holdings])
+
+        for h in holdings:
+            current_price, previous_close = prices.get(h['symbol'].upper(), (None, None))
 
             if current_price:
                 holding_metrics = await calculate_holding_metrics(h, current_price, previous_close)
@@ -284,37 +288,91 @@ async def get_portfolio_metrics(user_email: str):
         raise HTTPException(status_code=500, detail=f"Failed to fetch metrics: {str(e)}")
 
 
+@router.get("/{user_email}/optimize")
+async def optimize_portfolio(
+    user_email: str,
+    method: str = "max_sharpe",
+    target_return: Optional[float] = None,
+    long_only: bool = True,
+    frontier_points: int = 25
+):
+    """
+    Optimize allocation across the user's holdings.
+
+    Args:
+        user_email: User's email address
+        method: max_sharpe, min_variance, target_return or risk_parity
+        target_return: Annual return for target_return (e.g. 0.12 for 12%)
+        long_only: Disallow short positions
+        frontier_points: Efficient frontier points to include (0 to skip)
+
+    Returns:
+        Optimized allocation, current vs optimized statistics and the efficient frontier
+    """
+    try:
+        db = mongodb_connection.get_database()
+        portfolio = await db['portfolios'].find_one(
+            {"user_email": user_email},
+            {"holdings": 1, "_id": 0}
+        )
+
+        if not portfolio:
+            raise HTTPException(status_code=404, detail=f"Portfolio not found for user {user_email}")
+
+        holdings = portfolio.get("holdings", [])
+        current_weights: Dict[str, float] = {}
+        for h in holdings:
+            value = h.get("current_value") or h.get("shares", 0) * h.get("purchase_price", 0)
+            current_weights[h["symbol"].upper()] = current_weights.get(h["symbol"].upper(), 0) + value
+
+        result = await get_portfolio_optimization_service().optimize(
+            list(current_weights),
+            method=method,
+            target_return=target_return,
+            long_only=long_only,
+            frontier_points=max(0, min(frontier_points, 200)),
+            current_weights=current_weights
+        )
+
+        return {"status": "success", "data": result}
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error optimizing portfolio for {user_email}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to optimize portfolio: {str(e)}")
+
+
+# Helper function to get current and previous close for many symbols
+async def get_portfolio_prices(symbols: List[str]) -> Dict[str, tuple]:
+    """Get (current, previous close) per symbol from one batched download"""
+    try:
+        batch = await get_batch_quote_service().get_quotes(symbols)
+        if batch['missing']:
+            logger.warning(f"No prices for {batch['missing']}")
+        return {
+            symbol: (quote['price'], quote['previousClose'])
+            for symbol, quote in batch['quotes'].items()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get batch prices for {symbols}: {e}")
+        return {}
+
+
 # Helper function to get current stock price
 async def get_current_price(symbol: str) -> Optional[float]:
     """Get current stock price from Yahoo Finance"""
-    try:
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period="1d")
-        if not data.empty:
-            return float(data['Close'].iloc[-1])
-        return None
-    except Exception as e:
-        logger.error(f"Failed to get price for {symbol}: {e}")
-        return None
+    current, _ = await get_current_and_previous_price(symbol)
+    return current
 
 
 # Helper function to get current and previous close prices
 async def get_current_and_previous_price(symbol: str) -> tuple[Optional[float], Optional[float]]:
     """Get current price and previous close from Yahoo Finance"""
-    try:
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period="2d")  # Get last 2 days
-        if len(data) >= 2:
-            current = float(data['Close'].iloc[-1])
-            previous = float(data['Close'].iloc[-2])
-            return current, previous
-        elif len(data) == 1:
-            current = float(data['Close'].iloc[-1])
-            return current, current  # No previous data
-        return None, None
-    except Exception as e:
-        logger.error(f"Failed to get prices for {symbol}: {e}")
-        return None, None
+    prices = await get_portfolio_prices([symbol])
+    return prices.get(symbol.upper(), (None, None))
 
 
 # Helper function to calculate holding metrics
@@ -461,8 +519,11 @@ async def add_holding(user_email: str, holding: HoldingCreate):
         total_value = 0
         total_cost = 0
 
-        for h in updated_portfolio.get('holdings', []):
-            price = await get_current_price(h['symbol'])
+        holdings = updated_portfolio.get('holdings', [])
+        prices = await get_portfolio_prices([h['symbol'] for h in holdings])
+
+        for h in holdings:
+            price, _ = prices.get(h['symbol'].upper(), (None, None))
             if price:
                 holding_metrics = await calculate_holding_metrics(h, price)
                 holdings_with_metrics.append(holding_metrics)
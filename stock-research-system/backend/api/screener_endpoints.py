@@ -0,0 +1,107 @@
+"""
+API Endpoints for Batch Pattern Screening
+Screens a watchlist for chart patterns in one request, ranked or streamed
+"""
+
+import json
+import logging
+from typing import Dict, Any, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request, status
+from sse_starlette.sse import EventSourceResponse
+
+from services.pattern_screener_service import get_pattern_screener
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/screener", tags=["screener"])
+
+MAX_SYMBOLS = 1000
+
+
+def _parse_symbols(symbols: str) -> List[str]:
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No symbols provided")
+    if len(symbol_list) > MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_SYMBOLS} symbols per screen"
+        )
+    return symbol_list
+
+
+def _parse_patterns(patterns: Optional[str]) -> Optional[List[str]]:
+    return [p.strip() for p in patterns.split(",") if p.strip()] if patterns else None
+
+
+@router.get("/patterns")
+async def screen_patterns(
+    symbols: str,
+    period: str = "6mo",
+    interval: str = "1d",
+    patterns: Optional[str] = None,
+    min_confidence: float = 0.0,
+    top_n: Optional[int] = 100
+) -> Dict[str, Any]:
+    """
+    Screen a watchlist for chart patterns
+
+    Args:
+        symbols: Comma-separated ticker symbols
+        period: History period to screen
+        interval: Bar interval
+        patterns: Comma-separated pattern names to keep (e.g. "Double Bottom,Cup and Handle")
+        min_confidence: Minimum pattern confidence
+        top_n: Number of ranked matches to return
+
+    Returns:
+        Matches ranked by confidence, with screened and missing symbols
+    """
+    symbol_list = _parse_symbols(symbols)
+    try:
+        return await get_pattern_screener().screen(
+            symbol_list, top_n=top_n, period=period, interval=interval,
+            patterns=_parse_patterns(patterns), min_confidence=min_confidence
+        )
+    except Exception as e:
+        logger.error(f"[Screener] Pattern screen failed for {len(symbol_list)} symbols: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/patterns/stream")
+async def stream_pattern_screen(
+    request: Request,
+    symbols: str,
+    period: str = "6mo",
+    interval: str = "1d",
+    patterns: Optional[str] = None,
+    min_confidence: float = 0.0
+):
+    """
+    Stream pattern matches as each chunk of the watchlist is screened (SSE)
+
+    Events:
+        - match: One pattern match
+        - progress: Symbols screened so far
+        - complete: All matches ranked by confidence
+        - error: Error notification
+    """
+    symbol_list = _parse_symbols(symbols)
+
+    async def event_generator():
+        try:
+            async for event in get_pattern_screener().stream(
+                symbol_list, period=period, interval=interval,
+                patterns=_parse_patterns(patterns), min_confidence=min_confidence
+            ):
+                if await request.is_disconnected():
+                    logger.info(f"[Screener] Client disconnected from {len(symbol_list)}-symbol screen")
+                    break
+                name = event.pop('event')
+                yield {"event": name, "data": json.dumps(event)}
+        except Exception as e:
+            logger.error(f"[Screener] Error in pattern screen stream: {e}", exc_info=True)
+            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+
+    return EventSourceResponse(event_generator())
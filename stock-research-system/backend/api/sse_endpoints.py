@@ -40,6 +40,8 @@ class SSEProgressTracker:
         try:
             last_update_time = None
             completed = False
+            completion_sent = False
+            late_sent = 0
 
             while not completed:
                 # Fetch latest progress from MongoDB
@@ -106,19 +108,43 @@ class SSEProgressTracker:
                     # Send final result
                     result = await self.database['analysis_results'].find_one({"analysis_id": analysis_id})
 
-                    yield {
-                        "event": "complete" if status == 'completed' else "error",
-                        "data": json.dumps({
-                            "analysis_id": analysis_id,
-                            "status": status,
-                            "recommendation": result.get('recommendations', {}).get('action') if result else None,
-                            "confidence": result.get('recommendations', {}).get('confidence') if result else None,
-                            "timestamp": datetime.utcnow().isoformat()
-                        })
-                    }
+                    if not completion_sent:
+                        yield {
+                            "event": "complete" if status == 'completed' else "error",
+                            "data": json.dumps({
+                                "analysis_id": analysis_id,
+                                "status": status,
+                                "recommendation": result.get('recommendations', {}).get('action') if result else None,
+                                "confidence": result.get('recommendations', {}).get('confidence') if result else None,
+                                "pending_agents": result.get('pending_agents', []) if result else [],
+                                "timestamp": datetime.utcnow().isoformat()
+                            })
+                        }
+                        completion_sent = True
 
-                    completed = True
-                    break
+                    # Results of agents that missed their soft deadline, merged after completion
+                    late_results = analysis.get('late_results', [])
+                    for late in late_results[late_sent:]:
+                        yield {
+                            "event": "agent_late_result",
+                            "data": json.dumps({
+                                "analysis_id": analysis_id,
+                                **late,
+                                "result": self._late_result(result, late)
+                            }, default=str)
+                        }
+                    late_sent = len(late_results)
+
+                    # Keep streaming until every late agent has been merged, at
+                    # most until the largest hard deadline among them
+                    pending = analysis.get('pending_late_agents')
+                    late_deadline = analysis.get('late_deadline')
+                    expired = late_deadline is None or datetime.utcnow() > late_deadline
+                    if pending and expired:
+                        logger.warning(f"[SSEProgressTracker] {analysis_id}: stopped waiting for late {pending}")
+                    if not pending or expired:
+                        completed = True
+                        break
 
                 # Poll every 500ms
                 await asyncio.sleep(0.5)
@@ -133,6 +159,17 @@ class SSEProgressTracker:
                 })
             }
 
+    @staticmethod
+    def _late_result(result: dict, late: dict):
+        """Merged result of a late agent from the saved analysis result"""
+        if not result or late.get('status') != 'completed':
+            return None
+        symbol_result = result.get('symbol_results', {}).get(late.get('symbol'), result)
+        if late.get('agent') == 'intelligence':
+            # Late intelligence re-runs the enrichment of the recommendation
+            return {**symbol_result.get('recommendations', {}), 'enrichment_status': symbol_result.get('enrichment_status')}
+        return symbol_result.get('agent_results', {}).get(late.get('agent'))
+
 
 # Global SSE tracker instance
 sse_tracker = None
@@ -162,6 +199,8 @@ async def stream_analysis_progress(analysis_id: str, request: Request):
         - progress: Progress percentage and status updates
         - agent_complete: Individual agent completion notifications
         - complete: Final analysis completion
+        - agent_late_result: Result of an agent that missed its soft deadline,
+          merged after completion (the stream stays open until all are merged)
         - error: Error notifications
     """
     database = await get_database()
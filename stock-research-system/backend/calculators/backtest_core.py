@@ -0,0 +1,368 @@
+"""
+Backtest Core
+Vectorized signal generation, positions and equity curves
+
+Signals are crossover masks over shifted arrays instead of row-by-row
+comparisons. Inputs may be 1-D (one symbol) or 2-D (dates x symbols, time
+along axis 0), so the same code serves single backtests, parameter sweeps and
+universe runs. Trade simulation only visits the bars where the position
+actually changes; everything per-bar is a cumulative operation.
+"""
+
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculators.indicator_library import sma, rsi
+
+TRADING_DAYS = 252
+BUY = 1
+SELL = -1
+
+# Parameters of the default crossover strategy
+DEFAULT_STRATEGY = {
+    'fast_period': 20,
+    'slow_period': 50,
+    'rsi_period': 14,
+    'rsi_buy_max': 70,
+    'rsi_sell': 80,
+    'min_confidence': 0.0
+}
+
+
+def crossover_signals(fast: np.ndarray, slow: np.ndarray, rsi: np.ndarray,
+                      rsi_buy_max: Any = 70, rsi_sell: Any = 80, min_confidence: Any = 0.0) -> np.ndarray:
+    """
+    Moving-average crossover signals with an RSI filter
+
+    - BUY when fast crosses above slow, RSI < rsi_buy_max and the buy
+      confidence (rsi_buy_max - RSI) / rsi_buy_max is at least min_confidence
+    - SELL when fast crosses below slow or RSI > rsi_sell
+
+    Rules are checked in that order on each bar; warm-up bars (NaN) never
+    signal and the first bar is always 0. For 2-D inputs the thresholds may
+    be per-column arrays, which evaluates a whole parameter grid at once.
+
+    Returns:
+        int8 array shaped like the inputs with 1 (BUY), -1 (SELL) or 0
+    """
+    fast = np.asarray(fast, dtype=np.float64)
+    slow = np.asarray(slow, dtype=np.float64)
+    rsi = np.asarray(rsi, dtype=np.float64)
+
+    prev_fast, prev_slow = fast[:-1], slow[:-1]
+    cur_fast, cur_slow, cur_rsi = fast[1:], slow[1:], rsi[1:]
+
+    rsi_buy_max = np.asarray(rsi_buy_max, dtype=np.float64)
+    confidence = (rsi_buy_max - cur_rsi) / rsi_buy_max
+    golden = (cur_fast > cur_slow) & (prev_fast <= prev_slow) & (cur_rsi < rsi_buy_max) & \
+        (confidence >= min_confidence)
+    death = (cur_fast < cur_slow) & (prev_fast >= prev_slow)
+    overbought = cur_rsi > rsi_sell
+
+    signals = np.zeros(fast.shape, dtype=np.int8)
+    signals[1:] = np.select([golden, death | overbought], [BUY, SELL], 0)
+    return signals
+
+
+def _last_signal_index(signals: np.ndarray) -> np.ndarray:
+    """Index of the most recent non-zero signal at or before each bar (-1 if none)"""
+    rows = np.arange(len(signals)).reshape((-1,) + (1,) * (signals.ndim - 1))
+    idx = np.where(signals != 0, rows, -1)
+    return np.maximum.accumulate(idx, axis=0)
+
+
+def positions_from_signals(signals: np.ndarray) -> np.ndarray:
+    """
+    Long-only position held after each bar's close (1 in the market, 0 flat)
+
+    The position follows the last non-zero signal: BUY opens, SELL closes.
+    """
+    last = _last_signal_index(signals)
+    held = np.take_along_axis(signals, np.maximum(last, 0), axis=0) if signals.ndim > 1 \
+        else signals[np.maximum(last, 0)]
+    return ((last >= 0) & (held == BUY)).astype(np.int8)
+
+
+def signal_events(signals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bars where a 1-D long-only position changes
+
+    Repeated signals in the same direction and a leading SELL do nothing,
+    so the result alternates BUY, SELL, BUY, ...
+
+    Returns:
+        (bar indices, signal values)
+    """
+    idx = np.flatnonzero(signals)
+    values = signals[idx]
+    keep = np.ones(len(idx), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    idx, values = idx[keep], values[keep]
+    if len(values) and values[0] == SELL:
+        idx, values = idx[1:], values[1:]
+    return idx, values
+
+
+def simulate_trades(prices: np.ndarray, signals: np.ndarray, initial_capital: float,
+                    dates: Optional[Sequence[Any]] = None) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    All-in, whole-share long-only trading on a 1-D signal array
+
+    BUY spends all cash on whole shares at the close; SELL liquidates. Any
+    open position is closed on the last bar. Without dates, trades are dated
+    by integer bar index.
+
+    Returns:
+        (trade records, per-bar equity curve)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    dates = dates if dates is not None else np.arange(n)
+    raw_buys = np.flatnonzero(signals == BUY)
+    event_idx, event_values = signal_events(signals)
+
+    trades: List[Dict[str, Any]] = []
+    cash_at = np.full(n, np.nan)
+    shares_at = np.full(n, np.nan)
+    cash_at[0], shares_at[0] = initial_capital, 0
+    cash = float(initial_capital)
+
+    # One iteration per position change, not per bar
+    buys = event_idx[event_values == BUY]
+    sells = event_idx[event_values == SELL]
+    for k, buy in enumerate(buys):
+        sell = sells[k] if k < len(sells) else None
+
+        # A BUY without enough cash for one share is retried on later BUY bars
+        window = raw_buys[(raw_buys >= buy) & (raw_buys < (sell if sell is not None else n))]
+        affordable = window[prices[window] <= cash]
+        if len(affordable) == 0:
+            continue
+        buy = int(affordable[0])
+
+        price = float(prices[buy])
+        shares = int(cash / price)
+        position_price = price
+        cash -= shares * price
+        cash_at[buy], shares_at[buy] = cash, shares
+        trades.append({
+            'date': dates[buy],
+            'action': 'BUY',
+            'price': price,
+            'shares': shares,
+            'cash': cash,
+            'portfolio_value': cash + shares * price
+        })
+
+        final = sell is None
+        exit_bar = n - 1 if final else int(sell)
+        price = float(prices[exit_bar])
+        cash += shares * price
+        profit = (price - position_price) * shares
+        trades.append({
+            'date': dates[exit_bar],
+            'action': 'SELL (final)' if final else 'SELL',
+            'price': price,
+            'shares': shares,
+            'profit': profit,
+            'profit_pct': (price - position_price) / position_price * 100,
+            'cash': cash,
+            'portfolio_value': cash
+        })
+        if not final:
+            cash_at[exit_bar], shares_at[exit_bar] = cash, 0
+
+    equity = _ffill(cash_at) + _ffill(shares_at) * prices
+    return trades, equity
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaN along axis 0 (first row must be set)"""
+    rows = np.arange(len(values)).reshape((-1,) + (1,) * (values.ndim - 1))
+    idx = np.maximum.accumulate(np.where(np.isnan(values), 0, rows), axis=0)
+    return np.take_along_axis(values, idx, axis=0) if values.ndim > 1 else values[idx]
+
+
+def max_drawdown(values: np.ndarray) -> float:
+    """Maximum drawdown percentage of a value curve"""
+    v = np.asarray(values, dtype=np.float64)
+    if len(v) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(v)
+    return float(np.max((peak - v) / peak) * 100)
+
+
+def _span_years(first: Any, last: Any) -> float:
+    """Years between two trade dates; integer bar indices count as trading days"""
+    if isinstance(first, (int, np.integer)):
+        return (int(last) - int(first)) / TRADING_DAYS
+    days = int((np.datetime64(last, 'D') - np.datetime64(first, 'D')).astype(int))
+    return days / 365.25
+
+
+def trade_metrics(trades: List[Dict[str, Any]], initial_capital: float) -> Dict[str, Any]:
+    """Performance metrics of a trade list (BacktestResult fields)"""
+    completed_trades = [t for t in trades if 'profit' in t]
+    if not completed_trades:
+        return {
+            'total_return': 0, 'annual_return': 0, 'sharpe_ratio': 0,
+            'max_drawdown': 0, 'win_rate': 0, 'total_trades': 0,
+            'profitable_trades': 0, 'avg_profit': 0, 'avg_loss': 0, 'profit_factor': 0
+        }
+
+    # Total and annualized return
+    final_value = trades[-1]['portfolio_value']
+    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    years = _span_years(trades[0]['date'], trades[-1]['date'])
+    annual_return = ((final_value / initial_capital) ** (1 / max(years, 0.1)) - 1) * 100
+
+    profit = np.array([t['profit'] for t in completed_trades])
+    profits, losses = profit[profit > 0], -profit[profit < 0]
+    win_rate = len(profits) / len(profit)
+
+    # Profit factor
+    total_loss = losses.sum() if len(losses) else 0.01  # Avoid division by zero
+    profit_factor = profits.sum() / total_loss
+
+    # Sharpe ratio (simplified, per trade)
+    returns = np.array([t['profit_pct'] for t in completed_trades])
+    sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if len(returns) > 1 and returns.std() > 0 else 0
+
+    return {
+        'total_return': round(float(total_return), 2),
+        'annual_return': round(float(annual_return), 2),
+        'sharpe_ratio': round(float(sharpe_ratio), 2),
+        'max_drawdown': round(max_drawdown([t['portfolio_value'] for t in trades]), 2),
+        'win_rate': round(win_rate, 3),
+        'total_trades': len(completed_trades),
+        'profitable_trades': len(profits),
+        'avg_profit': round(float(profits.mean()), 2) if len(profits) else 0,
+        'avg_loss': round(float(losses.mean()), 2) if len(losses) else 0,
+        'profit_factor': round(float(profit_factor), 2)
+    }
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    All parameter combinations of a grid, filled with DEFAULT_STRATEGY values
+
+    Combinations whose fast SMA is not shorter than the slow one are dropped.
+    """
+    unknown = set(grid) - set(DEFAULT_STRATEGY)
+    if unknown:
+        raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+
+    keys = list(grid)
+    combos = []
+    for values in product(*(grid[k] for k in keys)):
+        params = {**DEFAULT_STRATEGY, **dict(zip(keys, values))}
+        if params['fast_period'] < params['slow_period']:
+            combos.append(params)
+    return combos
+
+
+def grid_signals(sma_panel: Dict[int, np.ndarray], rsi_panel: Dict[int, np.ndarray],
+                 combos: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Signals for many parameter sets in one batched pass
+
+    Args:
+        sma_panel: SMA series per window, computed once
+        rsi_panel: RSI series per period, computed once
+        combos: Strategy parameter sets (see expand_grid)
+
+    Returns:
+        int8 (bars, combos) signal matrix
+    """
+    fast = np.column_stack([sma_panel[c['fast_period']] for c in combos])
+    slow = np.column_stack([sma_panel[c['slow_period']] for c in combos])
+    rsi = np.column_stack([rsi_panel[c['rsi_period']] for c in combos])
+    thresholds = {k: np.array([c[k] for c in combos], dtype=np.float64)
+                  for k in ('rsi_buy_max', 'rsi_sell', 'min_confidence')}
+    return crossover_signals(fast, slow, rsi, **thresholds)
+
+
+def evaluate_signal_columns(prices: np.ndarray, signals: np.ndarray, initial_capital: float,
+                            dates: np.ndarray) -> List[Dict[str, Any]]:
+    """Trade metrics for each signal column (top-level so process pools can run it)"""
+    return [
+        trade_metrics(simulate_trades(prices, signals[:, j], initial_capital, dates)[0], initial_capital)
+        for j in range(signals.shape[1])
+    ]
+
+
+def universe_backtest(close: np.ndarray, params: Optional[Dict[str, Any]] = None,
+                      initial_capital: float = 100000) -> Dict[str, Any]:
+    """
+    Run the crossover strategy on every column of a (dates x symbols) close matrix
+
+    Each symbol trades its own fully invested sleeve, modelled with
+    fractional shares so the whole universe is one pass of cumulative array
+    operations. Leading NaN (symbols listed after the start) stay in cash.
+
+    Returns:
+        Per-symbol metric arrays plus the equal-weight portfolio equity curve
+    """
+    params = {**DEFAULT_STRATEGY, **(params or {})}
+    close = np.asarray(close, dtype=np.float64)
+    bars, n_symbols = close.shape
+    first_valid = np.where(np.isnan(close).all(axis=0), bars, np.argmax(~np.isnan(close), axis=0))
+
+    # Indicators per listing cohort so every column's warm-up starts at its first bar
+    fast = np.full(close.shape, np.nan)
+    slow = np.full(close.shape, np.nan)
+    rsi_values = np.full(close.shape, np.nan)
+    for start in np.unique(first_valid[first_valid < bars]):
+        cols = np.flatnonzero(first_valid == start)
+        block = close[start:, cols]
+        fast[start:, cols] = sma(block, params['fast_period'])
+        slow[start:, cols] = sma(block, params['slow_period'])
+        rsi_values[start:, cols] = rsi(block, params['rsi_period'])
+
+    signals = crossover_signals(fast, slow, rsi_values, params['rsi_buy_max'],
+                                params['rsi_sell'], params['min_confidence'])
+    positions = positions_from_signals(signals)
+
+    # Position taken at a bar's close earns the next bar's return
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.nan_to_num(close[1:] / close[:-1] - 1)
+    strategy_returns = np.vstack((np.zeros((1, n_symbols)), positions[:-1] * daily))
+    equity = initial_capital * np.cumprod(1 + strategy_returns, axis=0)
+
+    # Round trips: entries where the position opens, exits where it closes (or the last bar)
+    change = np.diff(positions, axis=0, prepend=0, append=0).astype(np.int8)
+    entry_col, entry_row = np.nonzero(change.T == 1)
+    exit_col, exit_row = np.nonzero(change.T == -1)
+    exit_row = np.minimum(exit_row, bars - 1)
+    trade_returns = close[exit_row, exit_col] / close[entry_row, entry_col] - 1
+
+    trades = np.bincount(entry_col, minlength=n_symbols)
+    wins = np.bincount(entry_col, weights=trade_returns > 0, minlength=n_symbols)
+    peak = np.maximum.accumulate(equity, axis=0)
+
+    years = np.maximum((bars - 1 - np.minimum(first_valid, bars - 1)) / TRADING_DAYS, 0.1)
+    total = equity[-1] / initial_capital
+    volatility = strategy_returns.std(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, strategy_returns.mean(axis=0) / volatility * np.sqrt(TRADING_DAYS), 0.0)
+        win_rate = np.where(trades > 0, wins / trades, 0.0)
+        last_price = close[-1]
+        listed_price = close[np.minimum(first_valid, bars - 1), np.arange(n_symbols)]
+        buy_and_hold = np.nan_to_num(last_price / listed_price - 1)
+
+    return {
+        'signals': signals,
+        'positions': positions,
+        'equity': equity,
+        'portfolio_equity': equity.mean(axis=1),
+        'total_return': (total - 1) * 100,
+        'annual_return': (total ** (1 / years) - 1) * 100,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': ((peak - equity) / peak).max(axis=0) * 100,
+        'trades': trades,
+        'win_rate': win_rate,
+        'buy_and_hold_return': buy_and_hold * 100,
+        'exposure': positions.mean(axis=0)
+    }
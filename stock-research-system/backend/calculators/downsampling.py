@@ -0,0 +1,148 @@
+"""
+Chart Downsampling
+Bounded-size chart series from OHLCV arrays of any length: candles aggregated in
+equal-count buckets, lines thinned with Largest-Triangle-Three-Buckets
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def bucket_starts(n: int, target: int) -> np.ndarray:
+    """
+    First bar index of each of at most `target` equal-count buckets
+
+    Args:
+        n: Number of bars
+        target: Maximum number of buckets
+
+    Returns:
+        Increasing start indices (every bar when n <= target)
+    """
+    if target <= 0 or n <= target:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n, target + 1).astype(np.int64)[:-1])
+
+
+def bucket_ends(starts: np.ndarray, n: int) -> np.ndarray:
+    """Last bar index of each bucket"""
+    return np.append(starts[1:], n) - 1
+
+
+def aggregate_ohlcv(
+    starts: np.ndarray,
+    dates: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate bars into one candle per bucket
+
+    Args:
+        starts: Bucket start indices from bucket_starts
+        dates, open_, high, low, close, volume: Bar arrays in time order
+
+    Returns:
+        {'dates', 'open', 'high', 'low', 'close'[, 'volume']} with one row per bucket
+    """
+    ends = bucket_ends(starts, len(close))
+    candles = {
+        'dates': np.asarray(dates)[ends],
+        'open': np.asarray(open_, dtype=np.float64)[starts],
+        # fmax/fmin skip missing values inside a bucket
+        'high': np.fmax.reduceat(np.asarray(high, dtype=np.float64), starts),
+        'low': np.fmin.reduceat(np.asarray(low, dtype=np.float64), starts),
+        'close': np.asarray(close, dtype=np.float64)[ends]
+    }
+    if volume is not None:
+        candles['volume'] = np.add.reduceat(np.asarray(volume), starts)
+    return candles
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, target: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket. Missing values are skipped.
+
+    Args:
+        x: Point positions (e.g. timestamps as floats), increasing
+        y: Values
+        target: Number of points to keep (>= 3)
+
+    Returns:
+        Increasing indices into x / y
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(y))
+    n = len(finite)
+    if target < 3 or n <= target:
+        return finite
+
+    xs, ys = x[finite], y[finite]
+    # Interior points split into target - 2 buckets; edges[i]:edges[i + 1] is bucket i
+    edges = (np.arange(target - 1) * ((n - 2) / (target - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    keep = np.empty(target, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(target - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = xs[hi:edges[i + 2]].mean()
+            next_y = ys[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = xs[-1], ys[-1]
+
+        area = np.abs((xs[a] - next_x) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (next_y - ys[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return finite[keep]
+
+
+def to_chart_dates(dates: np.ndarray, intraday: bool = False) -> List[str]:
+    """Date labels for chart payloads"""
+    return np.datetime_as_string(np.asarray(dates, dtype='datetime64[m]' if intraday else 'datetime64[D]')).tolist()
+
+
+def downsample_candle_records(records: Sequence[Dict[str, Any]], max_points: int,
+                              time_key: str = 'timestamp') -> List[Dict[str, Any]]:
+    """
+    Aggregate a list of candle dicts ({timestamp, open, high, low, close, volume})
+    to at most max_points candles
+
+    Args:
+        records: Candles in time order
+        max_points: Maximum number of candles to return
+        time_key: Field holding the candle label
+
+    Returns:
+        Aggregated candles (the input list itself when already small enough)
+    """
+    if max_points <= 0 or len(records) <= max_points:
+        return list(records)
+
+    fields = ('open', 'high', 'low', 'close', 'volume')
+    columns = {f: np.array([r.get(f, np.nan) for r in records], dtype=np.float64) for f in fields}
+    labels = np.array([r.get(time_key) for r in records], dtype=object)
+
+    starts = bucket_starts(len(records), max_points)
+    candles = aggregate_ohlcv(starts, labels, columns['open'], columns['high'], columns['low'],
+                              columns['close'], np.nan_to_num(columns['volume']))
+    return [
+        {
+            time_key: label,
+            'open': float(o), 'high': float(h), 'low': float(l), 'close': float(c), 'volume': int(v)
+        }
+        for label, o, h, l, c, v in zip(candles['dates'], candles['open'], candles['high'],
+                                        candles['low'], candles['close'], candles['volume'])
+    ]
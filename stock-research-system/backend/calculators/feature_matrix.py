@@ -0,0 +1,134 @@
+"""
+Feature Matrix
+Lag, rolling and volatility features computed once per history as one float32 array
+
+The predictive agent's model training, next-bar inference and in-agent
+backtest all read from the same (bars, features) matrix instead of adding
+DataFrame columns with repeated shift/rolling calls or re-slicing windows
+bar by bar. Every feature at bar i uses bars <= i only; warm-up rows are NaN.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculators.indicator_library import rolling_std, sma
+
+LAGS = 5
+
+# Inputs of the linear / random forest price models
+PRICE_MODEL_FEATURES = (
+    ['MA_5', 'MA_20', 'Volume_MA', 'High_Low', 'Price_Change']
+    + [f'Close_Lag_{i}' for i in range(1, LAGS + 1)]
+    + [f'Volume_Lag_{i}' for i in range(1, LAGS + 1)]
+)
+
+# Point-in-time signals of the in-agent backtest
+SIGNAL_FEATURES = ['Momentum_5', 'Momentum_10', 'MA_Signal', 'Volume_Ratio', 'Recent_Volatility']
+
+FEATURE_COLUMNS = PRICE_MODEL_FEATURES + SIGNAL_FEATURES
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """values[i - periods] at i (NaN before the start)"""
+    shifted = np.full(len(values), np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """Contiguous float32 feature matrix with column metadata"""
+    values: np.ndarray  # (bars, features) float32, C-contiguous
+    columns: Tuple[str, ...]
+    dates: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def column(self, name: str) -> np.ndarray:
+        """One feature as a (strided) view"""
+        return self.values[:, self.columns.index(name)]
+
+    def select(self, names: Sequence[str], rows: Any = slice(None)) -> np.ndarray:
+        """Contiguous float32 sub-matrix of the named columns"""
+        positions = [self.columns.index(name) for name in names]
+        start = positions[0]
+        if positions == list(range(start, start + len(positions))):
+            return np.ascontiguousarray(self.values[rows, start:start + len(positions)])
+        return np.ascontiguousarray(self.values[rows][:, positions])
+
+    def valid_rows(self, names: Sequence[str]) -> np.ndarray:
+        """Rows where every named feature is finite (past warm-up)"""
+        return np.isfinite(self.select(names)).all(axis=1)
+
+    @classmethod
+    def from_series(cls, series: Any) -> 'FeatureMatrix':
+        """Build from an OHLCVSeries (or anything with the same array attributes)"""
+        return build_feature_matrix(series.open, series.high, series.low, series.close,
+                                    series.volume, series.dates)
+
+
+def build_feature_matrix(
+    open_: Sequence[float],
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    volume: Sequence[float],
+    dates: Optional[np.ndarray] = None
+) -> FeatureMatrix:
+    """
+    Compute every price-model and signal feature in one pass
+
+    Args:
+        open_, high, low, close, volume: Bar arrays in time order
+        dates: Bar timestamps carried along for keys and reporting
+
+    Returns:
+        FeatureMatrix with FEATURE_COLUMNS
+    """
+    o = np.asarray(open_, dtype=np.float64)
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    v = np.asarray(volume, dtype=np.float64)
+    n = len(c)
+
+    features: Dict[str, np.ndarray] = {
+        'MA_5': sma(c, 5),
+        'MA_20': sma(c, 20),
+        'Volume_MA': sma(v, 5),
+        'High_Low': h - l,
+        'Price_Change': c - o
+    }
+    for i in range(1, LAGS + 1):
+        features[f'Close_Lag_{i}'] = _shift(c, i)
+    for i in range(1, LAGS + 1):
+        features[f'Volume_Lag_{i}'] = _shift(v, i)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features['Momentum_5'] = c / _shift(c, 5) - 1
+        features['Momentum_10'] = c / _shift(c, 10) - 1
+
+        # Averages of the 20 bars before i (bar i itself excluded)
+        prior_ma = _shift(features['MA_20'], 1)
+        features['MA_Signal'] = (c - prior_ma) / prior_ma
+        prior_volume = _shift(sma(v, 20), 1)
+        features['Volume_Ratio'] = np.where(prior_volume > 0, v / prior_volume,
+                                            np.where(np.isnan(prior_volume), np.nan, 1.0))
+
+        # Sample std of the 9 daily returns inside bars i-10 .. i-1
+        returns = c[1:] / c[:-1] - 1
+    window = 9
+    std = rolling_std(returns, window) * np.sqrt(window / (window - 1))
+    volatility = np.full(n, np.nan)
+    # Window over returns[k:k + 9] ends at bar k + 9 and feeds bar k + 10
+    volatility[window + 1:] = std[:n - window - 1]
+    features['Recent_Volatility'] = volatility
+
+    values = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float32)
+    for j, name in enumerate(FEATURE_COLUMNS):
+        values[:, j] = features[name]
+    return FeatureMatrix(values=values, columns=tuple(FEATURE_COLUMNS), dates=dates)
@@ -0,0 +1,296 @@
+"""
+Indicator Library
+Single implementation of the common technical indicators with a shared cache
+
+TechnicalCalculator, ChartAnalyticsAgent, DataAggregatorService and
+BacktestingEngine all read RSI, MACD, SMA, EMA, Bollinger Bands, ATR and OBV
+from here. Full-length series are aligned with the input bars (NaN during
+warm-up). When computed from an OHLCVSeries the result is cached under
+(symbol, interval, last bar timestamp, bar count, indicator, params), so each
+indicator is computed once per analysis no matter how many agents ask for it.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+# Vectorized kernels (valid region only)
+
+def rolling_mean(values: ArrayLike, period: int) -> np.ndarray:
+    """Rolling mean of every full window (length n - period + 1, along axis 0)"""
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < period:
+        return np.empty((0,) + x.shape[1:])
+    csum = np.concatenate((np.zeros((1,) + x.shape[1:]), np.cumsum(x, axis=0)))
+    return (csum[period:] - csum[:-period]) / period
+
+
+def rolling_std(values: ArrayLike, period: int) -> np.ndarray:
+    """Rolling population standard deviation of every full window"""
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < period:
+        return np.empty(0)
+    # Shift by the series mean so the sum-of-squares difference keeps its precision
+    shifted = x - x.mean()
+    mean = rolling_mean(shifted, period)
+    mean_sq = rolling_mean(shifted * shifted, period)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def smoothed_series(values: ArrayLike, period: int, alpha: float) -> np.ndarray:
+    """
+    Exponential smoothing seeded with the SMA of the first `period` values
+
+    y[0] = mean(x[:period]); y[i] = alpha * x[period + i - 1] + (1 - alpha) * y[i - 1]
+    alpha = 2 / (period + 1) gives the EMA, alpha = 1 / period gives Wilder smoothing.
+    2-D input (dates x symbols) is smoothed column-wise along axis 0.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < period:
+        return np.empty((0,) + x.shape[1:])
+    seed = np.asarray(x[:period].mean(axis=0))[None]
+    rest = x[period:]
+    if len(rest) == 0:
+        return seed
+    smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], rest, axis=0, zi=(1.0 - alpha) * seed)
+    return np.concatenate((seed, smoothed))
+
+
+def ema_series(values: ArrayLike, period: int) -> np.ndarray:
+    """Exponential Moving Average (valid region)"""
+    return smoothed_series(values, period, 2 / (period + 1))
+
+
+def wilder_series(values: ArrayLike, period: int) -> np.ndarray:
+    """Wilder's smoothed average used by RSI/ATR (valid region)"""
+    return smoothed_series(values, period, 1 / period)
+
+
+def true_range(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike) -> np.ndarray:
+    """True range for bars 1..n-1"""
+    h = np.asarray(highs, dtype=np.float64)
+    l = np.asarray(lows, dtype=np.float64)
+    c = np.asarray(closes, dtype=np.float64)
+    prev_close = c[:-1]
+    return np.maximum.reduce([
+        h[1:] - l[1:],
+        np.abs(h[1:] - prev_close),
+        np.abs(l[1:] - prev_close)
+    ])
+
+
+def rolling_extrema(values: ArrayLike, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling (min, max) of every full window via strided views"""
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < window:
+        return np.empty(0), np.empty(0)
+    windows = sliding_window_view(x, window)
+    return windows.min(axis=1), windows.max(axis=1)
+
+
+def _pad(values: np.ndarray, n: int) -> np.ndarray:
+    """Left-pad a valid-region array with NaN to length n (along axis 0)"""
+    if len(values) >= n:
+        return values[len(values) - n:]
+    return np.concatenate((np.full((n - len(values),) + values.shape[1:], np.nan), values))
+
+
+# Full-length indicator series aligned with the input bars. sma, ema and rsi
+# also accept a 2-D (dates x symbols) matrix and work column-wise.
+
+def sma(close: ArrayLike, period: int = 20) -> np.ndarray:
+    """Simple Moving Average"""
+    return _pad(rolling_mean(close, period), len(close))
+
+
+def ema(close: ArrayLike, period: int = 12) -> np.ndarray:
+    """Exponential Moving Average seeded with the SMA of the first period"""
+    return _pad(ema_series(close, period), len(close))
+
+
+def rsi(close: ArrayLike, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing"""
+    changes = np.diff(np.asarray(close, dtype=np.float64), axis=0)
+    avg_gain = wilder_series(np.where(changes > 0, changes, 0.0), period)
+    avg_loss = wilder_series(np.where(changes < 0, -changes, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    return _pad(values, len(close))
+
+
+def macd(close: ArrayLike, fast_period: int = 12, slow_period: int = 26,
+         signal_period: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    n = len(close)
+    ema_fast = ema_series(close, fast_period)
+    ema_slow = ema_series(close, slow_period)
+    line = ema_fast[len(ema_fast) - len(ema_slow):] - ema_slow
+    signal = ema_series(line, signal_period)
+    histogram = line[len(line) - len(signal):] - signal
+    return _pad(line, n), _pad(signal, n), _pad(histogram, n)
+
+
+def bollinger_bands(close: ArrayLike, period: int = 20,
+                    std_dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle and lower Bollinger Bands"""
+    n = len(close)
+    middle = rolling_mean(close, period)
+    band = rolling_std(close, period) * std_dev
+    return _pad(middle + band, n), _pad(middle, n), _pad(middle - band, n)
+
+
+def atr(high: ArrayLike, low: ArrayLike, close: ArrayLike, period: int = 14) -> np.ndarray:
+    """Average True Range with Wilder smoothing"""
+    return _pad(wilder_series(true_range(high, low, close), period), len(close))
+
+
+def obv(close: ArrayLike, volume: ArrayLike) -> np.ndarray:
+    """On-Balance Volume, starting from the first bar's volume"""
+    c = np.asarray(close, dtype=np.float64)
+    v = np.asarray(volume, dtype=np.float64)
+    if len(c) == 0:
+        return np.empty(0)
+    signed = np.sign(np.diff(c)) * v[1:]
+    return np.concatenate(([v[0]], v[0] + np.cumsum(signed)))
+
+
+def to_chart_list(values: np.ndarray, decimals: int = 4) -> List:
+    """JSON-safe list for chart payloads (warm-up NaN becomes None)"""
+    rounded = np.round(np.asarray(values, dtype=np.float64), decimals)
+    return [None if np.isnan(v) else v for v in rounded.tolist()]
+
+
+# Indicator name -> (function, OHLCV fields it reads)
+INDICATORS = {
+    'sma': (sma, ('close',)),
+    'ema': (ema, ('close',)),
+    'rsi': (rsi, ('close',)),
+    'macd': (macd, ('close',)),
+    'bollinger_bands': (bollinger_bands, ('close',)),
+    'atr': (atr, ('high', 'low', 'close')),
+    'obv': (obv, ('close', 'volume'))
+}
+
+
+def is_ohlcv_series(obj: Any) -> bool:
+    """True for MarketDataStore series (duck-typed to keep calculators dependency-free)"""
+    return hasattr(obj, 'dates') and hasattr(obj, 'close') and hasattr(obj, 'symbol')
+
+
+def series_key(series: Any) -> tuple:
+    """
+    Identity of an OHLCVSeries' contents for caching derived values
+
+    Dates and length alone miss an intraday refetch (same bars, new last
+    close) and a split/dividend re-adjustment (earlier bars rescaled), so the
+    last bar's OHLCV and the first close are part of the key.
+    """
+    if not len(series):
+        return series.symbol, series.interval, None, 0
+    last_bar = tuple(float(getattr(series, f)[-1]) for f in ('open', 'high', 'low', 'close', 'volume'))
+    return series.symbol, series.interval, series.dates[-1], len(series), last_bar, float(series.close[0])
+
+
+class IndicatorLibrary:
+    """
+    Cached indicator computation over OHLCV series
+
+    Features:
+    - One entry per (symbol, interval, last bar, bar count, indicator, params)
+    - LRU eviction beyond max_entries
+    - Read-only results so callers can share them safely
+    - Thread-safe (chart sections and backtests compute from worker threads)
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._cache: 'OrderedDict[tuple, Any]' = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    def compute(self, series: Any, indicator: str, **params) -> Union[np.ndarray, Tuple[np.ndarray, ...]]:
+        """
+        Get an indicator for an OHLCVSeries, computing it at most once
+
+        Args:
+            series: OHLCVSeries from the MarketDataStore
+            indicator: One of INDICATORS
+            **params: Indicator parameters (e.g. period=14)
+
+        Returns:
+            Full-length array (or tuple of arrays) aligned with series.dates
+        """
+        if indicator not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{indicator}'")
+
+        func, fields = INDICATORS[indicator]
+        key = self.cache_key(series, indicator, params)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return cached
+            self.stats['misses'] += 1
+
+        # Computed outside the lock; a concurrent miss on the same key just
+        # computes the same read-only result twice
+        result = func(*(getattr(series, f) for f in fields), **params)
+        result = tuple(self._freeze(r) for r in result) if isinstance(result, tuple) else self._freeze(result)
+
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        return result
+
+    @staticmethod
+    def cache_key(series: Any, indicator: str, params: Dict[str, Any]) -> tuple:
+        """Identity of an indicator computed over a series"""
+        return (*series_key(series), indicator, tuple(sorted(params.items())))
+
+    def clear(self) -> None:
+        """Drop all cached indicators"""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        with self._lock:
+            stats, entries = dict(self.stats), len(self._cache)
+        total = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'entries': entries,
+            'hit_rate': round(stats['hits'] / total, 3) if total else 0.0
+        }
+
+    @staticmethod
+    def _freeze(values: np.ndarray) -> np.ndarray:
+        values.setflags(write=False)
+        return values
+
+
+# Global indicator library
+indicator_library = None
+
+
+def get_indicator_library() -> IndicatorLibrary:
+    """Get or create the shared indicator library"""
+    global indicator_library
+    if indicator_library is None:
+        indicator_library = IndicatorLibrary()
+    return indicator_library
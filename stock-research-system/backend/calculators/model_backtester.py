@@ -4,13 +4,214 @@ Out-of-sample testing, walk-forward analysis, and performance metrics
 """
 
 import numpy as np
-from typing import Dict, Any, List, Tuple, Optional
+import pandas as pd
+from typing import Dict, Any, List, Tuple, Optional, Sequence, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
+import os
+
+from utils.process_pool import new_process_pool
 
 logger = logging.getLogger(__name__)
 
+TRADING_DAYS = 252
+TRANSACTION_COST = 0.001  # 0.1% per trade
+SLIPPAGE = 0.0005  # 0.05% slippage on market orders
+SHORT_BORROW_DAILY = 0.00012  # ~3% annualized borrow fee
+NEUTRAL_BAND = 0.01  # |return| under 1% counts as a correct neutral call
+
+# One row per prediction: 42 bytes instead of a dict per row.
+# direction is 1 (up), -1 (down) or 0 (neutral); actual_return is NaN until realized.
+PREDICTION_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[s]'),
+    ('direction', 'i1'),
+    ('predicted_return', 'f8'),
+    ('confidence', 'f8'),
+    ('actual_return', 'f8'),
+    ('correct', '?'),
+    ('trade_return', 'f8'),
+])
+
+DIRECTION_CODES = {'up': 1, 'down': -1, 'neutral': 0}
+DIRECTION_NAMES = {1: 'up', -1: 'down', 0: 'neutral'}
+
+PredictionInput = Union[List[Dict], np.ndarray]
+
+
+def _to_datetime64(values: Sequence) -> np.ndarray:
+    """Timestamps (datetime, pandas or numpy, None allowed) as naive datetime64[s] wall-clock times"""
+    index = pd.DatetimeIndex(pd.to_datetime(list(values)))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy(dtype='datetime64[s]')
+
+
+def records_from_columns(
+    direction: Sequence,
+    confidence: Sequence[float],
+    actual_return: Optional[Sequence[float]] = None,
+    timestamps: Optional[Sequence] = None,
+    predicted_return: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Build a PREDICTION_DTYPE array from column sequences
+
+    Args:
+        direction: 'up'/'down'/'neutral' strings or 1/-1/0 codes
+        confidence: Position size per prediction (0-1)
+        actual_return: Realized next-period return per prediction (NaN if pending)
+        timestamps: Prediction times (None entries allowed)
+        predicted_return: Model return forecast per prediction
+
+    Returns:
+        Structured array with correct/trade_return still unscored
+    """
+    n = len(confidence)
+    records = np.zeros(n, dtype=PREDICTION_DTYPE)
+    direction = list(direction)
+    if direction and isinstance(direction[0], str):
+        direction = [DIRECTION_CODES.get(d, 0) for d in direction]
+    records['direction'] = direction
+    records['confidence'] = confidence
+    records['actual_return'] = np.nan if actual_return is None else actual_return
+    if predicted_return is not None:
+        records['predicted_return'] = predicted_return
+    records['timestamp'] = np.datetime64('NaT') if timestamps is None else _to_datetime64(timestamps)
+    return records
+
+
+def prediction_records(
+    predictions: PredictionInput,
+    actual_prices: Optional[Sequence[float]] = None,
+    timestamps: Optional[Sequence] = None
+) -> np.ndarray:
+    """
+    Convert dict-per-row predictions to a PREDICTION_DTYPE array
+
+    With prices, prediction i is realized by the move from price i to price i + 1
+    (rows without a next price are dropped). Without prices, rows keep any
+    'actual_return', 'correct' and 'trade_return' keys they already carry, so
+    scored result rows convert back losslessly.
+
+    Args:
+        predictions: Dicts with direction (or predicted_direction), confidence, ...
+        actual_prices: Price at each prediction
+        timestamps: Datetime for each prediction (falls back to a 'timestamp' key)
+
+    Returns:
+        Structured prediction array
+    """
+    if isinstance(predictions, np.ndarray):
+        return predictions
+
+    n = len(predictions)
+    if actual_prices is not None:
+        prices = np.asarray(actual_prices, dtype=np.float64)
+        n = max(min(n, len(prices) - 1), 0)
+        actual = prices[1:n + 1] / prices[:n] - 1
+    else:
+        actual = [p.get('actual_return', np.nan) for p in predictions]
+
+    rows = predictions[:n]
+    timestamps = timestamps if timestamps is not None else []
+    records = records_from_columns(
+        direction=[p.get('direction', p.get('predicted_direction', 'neutral')) for p in rows],
+        confidence=[p.get('confidence', 0.5) for p in rows],
+        actual_return=actual,
+        timestamps=[timestamps[i] if i < len(timestamps) else p.get('timestamp') for i, p in enumerate(rows)],
+        predicted_return=[p.get('predicted_return', 0) for p in rows]
+    )
+    if actual_prices is None:
+        records['correct'] = [p.get('correct', False) for p in rows]
+        records['trade_return'] = [p.get('trade_return', 0) for p in rows]
+    return records
+
+
+def score_predictions(
+    records: np.ndarray,
+    transaction_cost: float = TRANSACTION_COST,
+    slippage: float = SLIPPAGE
+) -> np.ndarray:
+    """
+    Directional hits and cost-adjusted trade returns for realized predictions
+
+    Positions are sized by confidence, pay entry and exit costs plus slippage,
+    and shorts pay a daily borrow fee. Pending rows (NaN actual_return) are dropped.
+
+    Returns:
+        Copy of the realized rows with correct and trade_return filled
+    """
+    scored = records[~np.isnan(records['actual_return'])].copy()
+    direction = scored['direction'].astype(np.float64)
+    actual = scored['actual_return']
+    size = scored['confidence']
+    up, down = direction > 0, direction < 0
+
+    scored['correct'] = (up & (actual > 0)) | (down & (actual < 0)) | ((direction == 0) & (np.abs(actual) < NEUTRAL_BAND))
+
+    total_costs = transaction_cost * 2 + slippage
+    trade = actual * size * direction - total_costs * size * (direction != 0)
+    scored['trade_return'] = trade - SHORT_BORROW_DAILY * size * down
+    return scored
+
+
+def window_metrics(
+    trade_returns: np.ndarray,
+    correct: np.ndarray,
+    starts: np.ndarray,
+    length: int,
+    periods_per_year: int = TRADING_DAYS
+) -> Dict[str, np.ndarray]:
+    """
+    Performance metrics for many equal-length windows at once
+
+    Args:
+        trade_returns: Per-prediction trade returns
+        correct: Per-prediction directional hits
+        starts: First row of each window
+        length: Rows per window
+
+    Returns:
+        Dict of per-window arrays: accuracy, win_rate, avg_return, sum_return,
+        total_return (compounded), sharpe, sortino, max_drawdown (negative fraction)
+    """
+    index = np.asarray(starts, dtype=np.int64)[:, None] + np.arange(length)
+    r = trade_returns[index]
+    hits = correct[index]
+
+    mean = r.mean(axis=1)
+    std = r.std(axis=1)
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0) * np.sqrt(periods_per_year)
+
+    # Downside deviation over losing periods only (1 when there are none)
+    losing = r < 0
+    n_losing = losing.sum(axis=1)
+    safe_n = np.maximum(n_losing, 1)
+    losing_mean = np.where(losing, r, 0).sum(axis=1) / safe_n
+    downside = np.sqrt(np.where(losing, (r - losing_mean[:, None]) ** 2, 0).sum(axis=1) / safe_n)
+    downside = np.where(n_losing > 0, downside, 1.0)
+    sortino = np.divide(mean, downside, out=np.zeros_like(mean), where=downside > 0) * np.sqrt(periods_per_year)
+
+    growth = np.cumprod(1 + r, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    drawdown = np.minimum((growth / peaks - 1).min(axis=1), 0.0)
+
+    return {
+        'accuracy': hits.mean(axis=1),
+        'win_rate': (r > 0).mean(axis=1),
+        'avg_return': mean,
+        'sum_return': r.sum(axis=1),
+        'total_return': growth[:, -1] - 1,
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'max_drawdown': drawdown
+    }
+
+
+def _timestamp_or_none(value: np.datetime64) -> Optional[datetime]:
+    return None if np.isnat(value) else value.astype(datetime)
+
 
 @dataclass
 class BacktestResult:
@@ -24,7 +225,7 @@ class BacktestResult:
     win_rate: float
     avg_return: float
     total_return: float
-    predictions: List[Dict]
+    predictions: PredictionInput
     performance_by_period: Dict[str, Any]
     validation_passed: bool = True
     validation_errors: List[str] = None
@@ -43,6 +244,10 @@ class WalkForwardResult:
     test_accuracy: float
     predictions: int
     returns: float
+    sharpe_ratio: float = 0.0
+    sortino_ratio: float = 0.0
+    max_drawdown: float = 0.0
+    win_rate: float = 0.0
 
 
 class ModelBacktester:
@@ -56,127 +261,61 @@ class ModelBacktester:
     - Win rate and return analysis
     """
 
-    def __init__(self):
+    def __init__(self, process_pool_threshold: int = 100000, window_block_size: int = 5000):
         self.name = "ModelBacktester"
-        self.transaction_cost = 0.001  # 0.1% per trade
-        self.slippage = 0.0005  # 0.05% slippage on market orders
+        self.transaction_cost = TRANSACTION_COST
+        self.slippage = SLIPPAGE
+        # Walk-forward runs with more windows than this are spread across processes;
+        # below it, pool start-up and array transfer outweigh the vectorized serial pass
+        self.process_pool_threshold = process_pool_threshold
+        self.window_block_size = window_block_size
 
     def backtest_predictions(
         self,
-        predictions: List[Dict],
-        actual_prices: List[float],
-        timestamps: List[datetime],
+        predictions: PredictionInput,
+        actual_prices: Optional[List[float]] = None,
+        timestamps: Optional[List[datetime]] = None,
         initial_capital: float = 100000
     ) -> BacktestResult:
         """
         Backtest model predictions against actual outcomes
 
         Args:
-            predictions: List of {prediction, confidence, timestamp}
+            predictions: List of {direction, predicted_return, confidence}, or a
+                PREDICTION_DTYPE array with actual_return filled (prices then unused)
             actual_prices: Actual price movements
             timestamps: Datetime for each prediction
             initial_capital: Starting portfolio value
 
         Returns:
-            BacktestResult with comprehensive metrics
+            BacktestResult with comprehensive metrics. `predictions` holds the scored
+            rows as dicts for dict input, or as a PREDICTION_DTYPE array for array input.
         """
         logger.info(f"[{self.name}] Starting backtest with {len(predictions)} predictions")
 
-        if not predictions or not actual_prices:
+        as_records = isinstance(predictions, np.ndarray)
+        if len(predictions) == 0 or (not as_records and not actual_prices):
             return self._empty_result()
 
-        # Align predictions with actual outcomes
-        results = []
-        portfolio_values = [initial_capital]
-        returns = []
-
-        for i, pred in enumerate(predictions):
-            if i >= len(actual_prices) - 1:
-                break
-
-            predicted_direction = pred.get('direction', 'neutral')
-            predicted_return = pred.get('predicted_return', 0)
-            confidence = pred.get('confidence', 0.5)
-
-            # Actual return (next day)
-            current_price = actual_prices[i]
-            next_price = actual_prices[i + 1]
-            actual_return = (next_price - current_price) / current_price
-
-            # Determine if prediction was correct
-            correct = False
-            if predicted_direction == 'up' and actual_return > 0:
-                correct = True
-            elif predicted_direction == 'down' and actual_return < 0:
-                correct = True
-            elif predicted_direction == 'neutral' and abs(actual_return) < 0.01:
-                correct = True
-
-            # Calculate portfolio impact (size position by confidence)
-            position_size = confidence  # Use confidence as position sizing
-            trade_return = 0
-
-            if predicted_direction != 'neutral':
-                # Apply actual return to position
-                gross_return = actual_return * position_size
-
-                # Reverse if predicted down
-                if predicted_direction == 'down':
-                    gross_return = -gross_return
-
-                # Apply transaction costs and slippage
-                # Transaction costs apply on entry and exit (2x)
-                total_costs = (self.transaction_cost * 2) + self.slippage
-                trade_return = gross_return - total_costs * position_size
-
-                # Additional costs for shorting (borrow fees ~3% annualized = 0.012% daily)
-                if predicted_direction == 'down':
-                    short_cost = 0.00012 * position_size  # Daily borrow cost
-                    trade_return -= short_cost
-
-            portfolio_value = portfolio_values[-1] * (1 + trade_return)
-            portfolio_values.append(portfolio_value)
-            returns.append(trade_return)
-
-            results.append({
-                'timestamp': timestamps[i] if i < len(timestamps) else None,
-                'predicted_direction': predicted_direction,
-                'actual_return': actual_return,
-                'correct': correct,
-                'confidence': confidence,
-                'trade_return': trade_return,
-                'portfolio_value': portfolio_value
-            })
-
-        # Calculate metrics
-        correct_count = sum(1 for r in results if r['correct'])
-        accuracy = correct_count / len(results) if results else 0
-
-        # Returns-based metrics
-        returns_array = np.array(returns)
-        avg_return = np.mean(returns_array) if len(returns_array) > 0 else 0
-        std_return = np.std(returns_array) if len(returns_array) > 0 else 1
-
-        # Sharpe Ratio (annualized)
-        sharpe_ratio = (avg_return / std_return) * np.sqrt(252) if std_return > 0 else 0
-
-        # Sortino Ratio (downside deviation)
-        downside_returns = returns_array[returns_array < 0]
-        downside_std = np.std(downside_returns) if len(downside_returns) > 0 else 1
-        sortino_ratio = (avg_return / downside_std) * np.sqrt(252) if downside_std > 0 else 0
-
-        # Maximum Drawdown
-        portfolio_array = np.array(portfolio_values)
-        running_max = np.maximum.accumulate(portfolio_array)
-        drawdown = (portfolio_array - running_max) / running_max
-        max_drawdown = np.min(drawdown) if len(drawdown) > 0 else 0
-
-        # Win Rate
-        winning_trades = sum(1 for r in returns if r > 0)
-        win_rate = winning_trades / len(returns) if returns else 0
+        records = score_predictions(
+            prediction_records(predictions, actual_prices, timestamps),
+            self.transaction_cost, self.slippage
+        )
+        if len(records) == 0:
+            return self._empty_result()
 
-        # Total Return
-        total_return = (portfolio_values[-1] - initial_capital) / initial_capital if portfolio_values else 0
+        metrics = {k: float(v[0]) for k, v in window_metrics(
+            records['trade_return'], records['correct'], np.zeros(1), len(records)
+        ).items()}
+        correct_count = int(records['correct'].sum())
+        accuracy = metrics['accuracy']
+        sharpe_ratio = metrics['sharpe']
+        sortino_ratio = metrics['sortino']
+        max_drawdown = metrics['max_drawdown']
+        win_rate = metrics['win_rate']
+        avg_return = metrics['avg_return']
+        total_return = metrics['total_return']
+        periods = len(records) + 1  # Portfolio values including the starting capital
 
         # VALIDATION: Check for impossible metric combinations
         validation_failed = False
@@ -203,8 +342,8 @@ class ModelBacktester:
             logger.warning(f"[{self.name}] Validation failed: High accuracy ({accuracy*100:.1f}%) with very low win rate ({win_rate*100:.1f}%)")
 
         # Rule 4: Max drawdown should never be exactly 0 (always some volatility)
-        if max_drawdown == 0.0 and len(portfolio_values) > 10:
-            validation_errors.append(f"IMPOSSIBLE: Max drawdown exactly 0% over {len(portfolio_values)} periods")
+        if max_drawdown == 0.0 and periods > 10:
+            validation_errors.append(f"IMPOSSIBLE: Max drawdown exactly 0% over {periods} periods")
             validation_failed = True
             logger.warning(f"[{self.name}] Validation FAILED: Max drawdown is exactly 0%")
 
@@ -223,13 +362,13 @@ class ModelBacktester:
 
         # Rule 7: Total return should be reasonable for the period
         # If more than 100% return with less than 100 trades, likely unrealistic
-        if total_return > 1.0 and len(results) < 100:
-            validation_errors.append(f"SUSPICIOUS: {total_return*100:.1f}% return in {len(results)} trades")
+        if total_return > 1.0 and len(records) < 100:
+            validation_errors.append(f"SUSPICIOUS: {total_return*100:.1f}% return in {len(records)} trades")
             validation_failed = True
-            logger.warning(f"[{self.name}] Validation FAILED: Return {total_return*100:.1f}% too high for {len(results)} trades")
+            logger.warning(f"[{self.name}] Validation FAILED: Return {total_return*100:.1f}% too high for {len(records)} trades")
 
         # Performance by period
-        performance_by_period = self._calculate_period_performance(results, timestamps)
+        performance_by_period = self._calculate_period_performance(records)
 
         if validation_failed:
             logger.error(f"[{self.name}] ⚠️  BACKTEST VALIDATION FAILED ⚠️")
@@ -240,7 +379,7 @@ class ModelBacktester:
             logger.info(f"[{self.name}] Backtest complete: {accuracy*100:.1f}% accuracy, {sharpe_ratio:.2f} Sharpe")
 
         return BacktestResult(
-            total_predictions=len(results),
+            total_predictions=len(records),
             correct_predictions=correct_count,
             accuracy=accuracy,
             sharpe_ratio=sharpe_ratio,
@@ -249,7 +388,7 @@ class ModelBacktester:
             win_rate=win_rate,
             avg_return=avg_return,
             total_return=total_return,
-            predictions=results,
+            predictions=records if as_records else self._result_rows(records, initial_capital),
             performance_by_period=performance_by_period,
             validation_passed=not validation_failed,
             validation_errors=validation_errors
@@ -257,19 +396,25 @@ class ModelBacktester:
 
     def walk_forward_analysis(
         self,
-        data: List[Dict],
+        data: PredictionInput,
         window_size: int = 60,
         test_size: int = 20,
-        step_size: int = 20
+        step_size: int = 20,
+        workers: Optional[int] = None
     ) -> List[WalkForwardResult]:
         """
         Walk-forward analysis with rolling windows
 
+        All windows are evaluated together on the scored arrays; runs with more
+        than `process_pool_threshold` windows are split into blocks across a
+        process pool.
+
         Args:
-            data: Historical data with prices and predictions
+            data: Scored predictions (BacktestResult.predictions rows or array)
             window_size: Training window size (days)
             test_size: Test window size (days)
             step_size: Step size between windows
+            workers: Process count for very long histories (defaults to CPU count)
 
         Returns:
             List of WalkForwardResult for each window
@@ -280,55 +425,76 @@ class ModelBacktester:
             logger.warning(f"[{self.name}] Insufficient data for walk-forward analysis")
             return []
 
-        results = []
-
-        for start_idx in range(0, len(data) - window_size - test_size, step_size):
-            # Define windows
-            train_end = start_idx + window_size
-            test_end = train_end + test_size
-
-            train_data = data[start_idx:train_end]
-            test_data = data[train_end:test_end]
-
-            # Calculate accuracy on training set
-            train_correct = sum(1 for d in train_data if d.get('correct', False))
-            train_accuracy = train_correct / len(train_data) if train_data else 0
-
-            # Calculate accuracy on test set
-            test_correct = sum(1 for d in test_data if d.get('correct', False))
-            test_accuracy = test_correct / len(test_data) if test_data else 0
-
-            # Calculate returns on test set
-            test_returns = sum(d.get('trade_return', 0) for d in test_data)
-
-            results.append(WalkForwardResult(
-                window_start=train_data[0].get('timestamp') if train_data else datetime.now(),
-                window_end=test_data[-1].get('timestamp') if test_data else datetime.now(),
-                train_accuracy=train_accuracy,
-                test_accuracy=test_accuracy,
-                predictions=len(test_data),
-                returns=test_returns
-            ))
+        records = prediction_records(data)
+        starts = np.arange(0, len(records) - window_size - test_size, step_size)
+        test_starts = starts + window_size
+
+        # Train accuracy from a running count of hits
+        hits = np.concatenate([[0], np.cumsum(records['correct'])])
+        train_accuracy = (hits[test_starts] - hits[starts]) / window_size
+        test = self._window_metrics(records, test_starts, test_size, workers)
+
+        window_start = records['timestamp'][starts]
+        window_end = records['timestamp'][test_starts + test_size - 1]
+        results = [
+            WalkForwardResult(
+                window_start=_timestamp_or_none(window_start[i]),
+                window_end=_timestamp_or_none(window_end[i]),
+                train_accuracy=float(train_accuracy[i]),
+                test_accuracy=float(test['accuracy'][i]),
+                predictions=test_size,
+                returns=float(test['sum_return'][i]),
+                sharpe_ratio=float(test['sharpe'][i]),
+                sortino_ratio=float(test['sortino'][i]),
+                max_drawdown=float(test['max_drawdown'][i]),
+                win_rate=float(test['win_rate'][i])
+            )
+            for i in range(len(starts))
+        ]
 
         # Log summary
         if results:
-            avg_test_accuracy = np.mean([r.test_accuracy for r in results])
+            avg_test_accuracy = float(test['accuracy'].mean())
             logger.info(f"[{self.name}] Walk-forward complete: {len(results)} windows, {avg_test_accuracy*100:.1f}% avg test accuracy")
 
         return results
 
+    def _window_metrics(
+        self,
+        records: np.ndarray,
+        starts: np.ndarray,
+        length: int,
+        workers: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Per-window metrics in-process, or block-wise on a process pool for many windows"""
+        trade_returns, correct = records['trade_return'], records['correct']
+        workers = workers or os.cpu_count() or 1
+        if len(starts) <= self.process_pool_threshold or workers < 2:
+            return window_metrics(trade_returns, correct, starts, length)
+
+        blocks = [starts[i:i + self.window_block_size] for i in range(0, len(starts), self.window_block_size)]
+        with new_process_pool(workers) as pool:
+            # Ship each worker only the rows its block covers, with starts rebased onto them
+            futures = [
+                pool.submit(window_metrics, trade_returns[block[0]:block[-1] + length],
+                            correct[block[0]:block[-1] + length], block - block[0], length)
+                for block in blocks
+            ]
+            parts = [future.result() for future in futures]
+        return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
     def out_of_sample_test(
         self,
-        predictions: List[Dict],
-        actual_prices: List[float],
-        timestamps: List[datetime],
+        predictions: PredictionInput,
+        actual_prices: Optional[List[float]] = None,
+        timestamps: Optional[List[datetime]] = None,
         train_ratio: float = 0.7
     ) -> Dict[str, BacktestResult]:
         """
         Out-of-sample testing with train/test split
 
         Args:
-            predictions: Model predictions
+            predictions: Model predictions (dicts or PREDICTION_DTYPE array)
             actual_prices: Actual outcomes
             timestamps: Timestamps
             train_ratio: Ratio of data for training (0.7 = 70% train, 30% test)
@@ -338,26 +504,13 @@ class ModelBacktester:
         """
         logger.info(f"[{self.name}] Out-of-sample test with {train_ratio*100:.0f}% train split")
 
-        split_idx = int(len(predictions) * train_ratio)
-
-        # Train set
-        train_predictions = predictions[:split_idx]
-        train_prices = actual_prices[:split_idx]
-        train_timestamps = timestamps[:split_idx]
-
-        # Test set
-        test_predictions = predictions[split_idx:]
-        test_prices = actual_prices[split_idx:]
-        test_timestamps = timestamps[split_idx:]
+        # Realize outcomes once, then split rows (the boundary prediction keeps its outcome)
+        records = prediction_records(predictions, actual_prices, timestamps)
+        split_idx = int(len(records) * train_ratio)
 
         # Backtest both
-        train_result = self.backtest_predictions(
-            train_predictions, train_prices, train_timestamps
-        )
-
-        test_result = self.backtest_predictions(
-            test_predictions, test_prices, test_timestamps
-        )
+        train_result = self.backtest_predictions(records[:split_idx])
+        test_result = self.backtest_predictions(records[split_idx:])
 
         logger.info(
             f"[{self.name}] Train accuracy: {train_result.accuracy*100:.1f}%, "
@@ -377,95 +530,86 @@ class ModelBacktester:
 
     def calculate_prediction_confidence_calibration(
         self,
-        predictions: List[Dict]
+        predictions: PredictionInput
     ) -> Dict[str, Any]:
         """
         Analyze if confidence scores are well-calibrated
         (e.g., 70% confidence predictions should be correct 70% of the time)
 
         Args:
-            predictions: List of predictions with confidence and correctness
+            predictions: Predictions with confidence and correctness
 
         Returns:
             Calibration analysis
         """
-        confidence_buckets = {
-            '0-20%': [],
-            '20-40%': [],
-            '40-60%': [],
-            '60-80%': [],
-            '80-100%': []
-        }
-
-        for pred in predictions:
-            confidence = pred.get('confidence', 0.5)
-            correct = pred.get('correct', False)
-
-            if confidence < 0.2:
-                confidence_buckets['0-20%'].append(correct)
-            elif confidence < 0.4:
-                confidence_buckets['20-40%'].append(correct)
-            elif confidence < 0.6:
-                confidence_buckets['40-60%'].append(correct)
-            elif confidence < 0.8:
-                confidence_buckets['60-80%'].append(correct)
-            else:
-                confidence_buckets['80-100%'].append(correct)
+        records = prediction_records(predictions)
+        buckets = ['0-20%', '20-40%', '40-60%', '60-80%', '80-100%']
+        bucket_index = np.digitize(records['confidence'], [0.2, 0.4, 0.6, 0.8])
+        counts = np.bincount(bucket_index, minlength=len(buckets))
+        hits = np.bincount(bucket_index, weights=records['correct'], minlength=len(buckets))
 
         calibration = {}
-        for bucket, results in confidence_buckets.items():
-            if results:
-                actual_accuracy = sum(results) / len(results)
+        for i, bucket in enumerate(buckets):
+            if counts[i]:
                 calibration[bucket] = {
-                    'predictions': len(results),
-                    'actual_accuracy': actual_accuracy,
+                    'predictions': int(counts[i]),
+                    'actual_accuracy': float(hits[i] / counts[i]),
                     'expected_accuracy': self._bucket_midpoint(bucket)
                 }
 
         return calibration
 
-    def _calculate_period_performance(
-        self,
-        results: List[Dict],
-        timestamps: List[datetime]
-    ) -> Dict[str, Any]:
-        """Calculate performance by time period (daily, weekly, monthly)"""
-
-        if not results or not timestamps:
+    def _calculate_period_performance(self, records: np.ndarray) -> Dict[str, Any]:
+        """Calculate performance by calendar month"""
+        dated = records[~np.isnat(records['timestamp'])]
+        if len(dated) == 0:
             return {}
 
-        # Group by month
-        monthly_performance = {}
-        for i, result in enumerate(results):
-            if i >= len(timestamps):
-                continue
-
-            month_key = timestamps[i].strftime('%Y-%m')
-            if month_key not in monthly_performance:
-                monthly_performance[month_key] = {
-                    'correct': 0,
-                    'total': 0,
-                    'returns': []
-                }
-
-            monthly_performance[month_key]['total'] += 1
-            if result['correct']:
-                monthly_performance[month_key]['correct'] += 1
-            monthly_performance[month_key]['returns'].append(result['trade_return'])
+        months, month_index = np.unique(dated['timestamp'].astype('datetime64[M]'), return_inverse=True)
+        totals = np.bincount(month_index)
+        correct = np.bincount(month_index, weights=dated['correct'])
+        sums = np.bincount(month_index, weights=dated['trade_return'])
 
-        # Calculate monthly stats
-        for month in monthly_performance:
-            data = monthly_performance[month]
-            data['accuracy'] = data['correct'] / data['total'] if data['total'] > 0 else 0
-            data['avg_return'] = np.mean(data['returns']) if data['returns'] else 0
-            data['total_return'] = sum(data['returns'])
+        monthly_performance = {}
+        for i, month in enumerate(months):
+            returns = dated['trade_return'][month_index == i].tolist()
+            monthly_performance[str(month)] = {
+                'correct': int(correct[i]),
+                'total': int(totals[i]),
+                'returns': returns,
+                'accuracy': correct[i] / totals[i],
+                'avg_return': sums[i] / totals[i],
+                'total_return': sums[i]
+            }
 
         return {
             'monthly': monthly_performance,
-            'best_month': max(monthly_performance.items(), key=lambda x: x[1]['accuracy'])[0] if monthly_performance else None,
-            'worst_month': min(monthly_performance.items(), key=lambda x: x[1]['accuracy'])[0] if monthly_performance else None
+            'best_month': max(monthly_performance.items(), key=lambda x: x[1]['accuracy'])[0],
+            'worst_month': min(monthly_performance.items(), key=lambda x: x[1]['accuracy'])[0]
         }
 
+    @staticmethod
+    def _result_rows(records: np.ndarray, initial_capital: float) -> List[Dict]:
+        """Scored records as per-prediction dicts with the running portfolio value"""
+        portfolio = (initial_capital * np.cumprod(1 + records['trade_return'])).tolist()
+        timestamps = [_timestamp_or_none(t) for t in records['timestamp']]
+        return [
+            {
+                'timestamp': timestamp,
+                'predicted_direction': DIRECTION_NAMES[direction],
+                'actual_return': actual,
+                'correct': correct,
+                'confidence': confidence,
+                'trade_return': trade_return,
+                'portfolio_value': value
+            }
+            for timestamp, direction, actual, correct, confidence, trade_return, value in zip(
+                timestamps, records['direction'].tolist(), records['actual_return'].tolist(),
+                records['correct'].tolist(), records['confidence'].tolist(),
+                records['trade_return'].tolist(), portfolio
+            )
+        ]
+
     def _bucket_midpoint(self, bucket: str) -> float:
         """Get midpoint of confidence bucket"""
         midpoints = {
@@ -0,0 +1,328 @@
+"""
+Monte Carlo Engine
+Vectorized price simulation with pluggable daily return models
+
+Paths are generated as NumPy matrices instead of per-step Python loops.
+Return models:
+- GaussianReturns: geometric Brownian motion (terminal values in one draw)
+- BootstrapReturns: daily returns resampled from an actual returns array
+- GarchReturns: GARCH(1,1) volatility clustering
+
+Path simulations and percentile bands are generated in float32 day blocks so
+memory stays bounded by `max_chunk_elements` regardless of the number of
+paths. Percentiles use the nearest-rank convention (sorted[int(q * n)]); long
+horizons compute band percentiles on a day grid and interpolate between them.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Sequence, Iterator, Tuple
+import math
+
+import numpy as np
+from scipy.signal import lfilter
+
+TRADING_DAYS = 252
+
+
+def standard_normals(rng: np.random.Generator, shape: Tuple[int, int],
+                     antithetic: bool = True, dtype=np.float64) -> np.ndarray:
+    """Standard normals of shape (rows, simulations), mirrored across paths when antithetic"""
+    rows, simulations = shape
+    if not antithetic:
+        return rng.standard_normal(shape, dtype=dtype)
+    out = np.empty(shape, dtype=dtype)
+    mirrored = simulations // 2
+    drawn = rng.standard_normal((rows, simulations - mirrored), dtype=dtype)
+    out[:, :drawn.shape[1]] = drawn
+    np.negative(drawn[:, :mirrored], out=out[:, drawn.shape[1]:])
+    return out
+
+
+class ReturnGenerator(ABC):
+    """
+    Daily log-return model
+
+    `block` returns a float32 (days, simulations) matrix of daily log returns
+    and the per-path state to carry into the next block (see `start`).
+    """
+
+    name = 'base'
+
+    def start(self, simulations: int) -> Any:
+        """Initial per-path state (None for stateless models)"""
+        return None
+
+    @abstractmethod
+    def block(self, rng: np.random.Generator, days: int, simulations: int,
+              state: Any, antithetic: bool) -> Tuple[np.ndarray, Any]:
+        """Daily log returns for the next `days` days and the state after them"""
+
+    def describe(self) -> Dict[str, Any]:
+        return {'model': self.name}
+
+
+class GaussianReturns(ReturnGenerator):
+    """Geometric Brownian motion with annualized drift and volatility"""
+
+    name = 'gaussian'
+
+    def __init__(self, expected_return: float, volatility: float):
+        self.expected_return = expected_return
+        self.volatility = volatility
+
+    def block(self, rng, days, simulations, state, antithetic):
+        dt = 1 / TRADING_DAYS
+        log_returns = standard_normals(rng, (days, simulations), antithetic, np.float32)
+        log_returns *= np.float32(self.volatility * math.sqrt(dt))
+        log_returns += np.float32((self.expected_return - 0.5 * self.volatility ** 2) * dt)
+        return log_returns, state
+
+    def terminal(self, rng: np.random.Generator, days: int, simulations: int,
+                 antithetic: bool) -> np.ndarray:
+        """Terminal log returns in one draw per path (exact for GBM)"""
+        t = days / TRADING_DAYS
+        z = standard_normals(rng, (1, simulations), antithetic)[0]
+        return (self.expected_return - 0.5 * self.volatility ** 2) * t + self.volatility * math.sqrt(t) * z
+
+    def describe(self):
+        return {'model': self.name, 'expected_return': self.expected_return, 'volatility': self.volatility}
+
+
+class BootstrapReturns(ReturnGenerator):
+    """
+    Historical bootstrap: each simulated day draws one actual daily return
+
+    Keeps the fat tails and skew of the real distribution. Antithetic
+    mirroring is not applied since it would symmetrize the sample.
+    """
+
+    name = 'bootstrap'
+
+    def __init__(self, returns: Sequence[float]):
+        simple = np.asarray(returns, dtype=np.float64)
+        simple = simple[np.isfinite(simple) & (simple > -1)]
+        if len(simple) < 2:
+            raise ValueError("Bootstrap needs at least 2 historical returns")
+        self.log_returns = np.log1p(simple).astype(np.float32)
+
+    def block(self, rng, days, simulations, state, antithetic):
+        idx = rng.integers(0, len(self.log_returns), size=(days, simulations), dtype=np.int32)
+        return self.log_returns[idx], state
+
+    def describe(self):
+        return {'model': self.name, 'history_days': len(self.log_returns)}
+
+
+class GarchReturns(ReturnGenerator):
+    """
+    GARCH(1,1): var[t] = omega + alpha * eps[t-1]^2 + beta * var[t-1]
+
+    The recurrence is sequential in time but each step is one vector
+    operation across all paths. `from_returns` targets the sample variance
+    and starts from the conditional variance filtered through history.
+    """
+
+    name = 'garch'
+
+    def __init__(self, mu: float, omega: float, alpha: float, beta: float, initial_variance: float):
+        if alpha < 0 or beta < 0 or alpha + beta >= 1:
+            raise ValueError("GARCH(1,1) requires alpha, beta >= 0 and alpha + beta < 1")
+        self.mu = mu
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        self.initial_variance = initial_variance
+
+    @classmethod
+    def from_returns(cls, returns: Sequence[float], alpha: float = 0.08,
+                     beta: float = 0.90) -> 'GarchReturns':
+        """
+        Variance-targeted GARCH(1,1) from daily simple returns
+
+        Args:
+            returns: Historical daily returns
+            alpha: Reaction to the latest shock
+            beta: Persistence of the conditional variance
+        """
+        log_returns = np.log1p(np.asarray(returns, dtype=np.float64))
+        log_returns = log_returns[np.isfinite(log_returns)]
+        if len(log_returns) < 2:
+            raise ValueError("GARCH needs at least 2 historical returns")
+
+        mu = float(log_returns.mean())
+        eps_sq = (log_returns - mu) ** 2
+        variance = float(eps_sq.mean())
+        omega = variance * (1 - alpha - beta)
+
+        # Conditional variance after the last observed day, started at the long-run level
+        filtered, _ = lfilter([alpha], [1.0, -beta], eps_sq, zi=[beta * (variance - omega / (1 - beta))])
+        initial_variance = omega / (1 - beta) + filtered[-1]
+        return cls(mu, omega, alpha, beta, float(initial_variance))
+
+    def start(self, simulations):
+        return np.full(simulations, self.initial_variance, dtype=np.float32)
+
+    def block(self, rng, days, simulations, state, antithetic):
+        variance = state
+        log_returns = standard_normals(rng, (days, simulations), antithetic, np.float32)
+        omega, alpha, beta = np.float32(self.omega), np.float32(self.alpha), np.float32(self.beta)
+
+        for t in range(days):
+            eps = log_returns[t]
+            eps *= np.sqrt(variance)
+            variance = omega + alpha * eps * eps + beta * variance
+        log_returns += np.float32(self.mu)
+        return log_returns, variance
+
+    def describe(self):
+        return {
+            'model': self.name,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'long_run_volatility': round(math.sqrt(self.omega / (1 - self.alpha - self.beta) * TRADING_DAYS), 4),
+            'current_volatility': round(math.sqrt(self.initial_variance * TRADING_DAYS), 4)
+        }
+
+
+class MonteCarloEngine:
+    """
+    Vectorized price path simulator
+
+    Features:
+    - Pluggable return models (Gaussian, historical bootstrap, GARCH(1,1))
+    - Seeded RNG (numpy Generator) for reproducible runs
+    - Antithetic variates for variance reduction
+    - Terminal-only, full path matrix or per-day percentile bands
+    - Day-block chunking to cap memory
+    """
+
+    def __init__(self, seed: Optional[int] = None, antithetic: bool = True,
+                 max_chunk_elements: int = 4_000_000):
+        self.seed = seed
+        self.antithetic = antithetic
+        self.max_chunk_elements = max_chunk_elements
+
+    def simulate_terminal(self, current_price: float, generator: ReturnGenerator,
+                          days: int = TRADING_DAYS, simulations: int = 10000) -> np.ndarray:
+        """
+        Terminal prices after `days` trading days
+
+        Args:
+            current_price: Starting price
+            generator: Daily return model
+            days: Horizon in trading days
+            simulations: Number of paths
+
+        Returns:
+            Array of `simulations` terminal prices (the current price when days <= 0)
+        """
+        if days <= 0:
+            return np.full(simulations, float(current_price))
+
+        rng = np.random.default_rng(self.seed)
+        if isinstance(generator, GaussianReturns):
+            return current_price * np.exp(generator.terminal(rng, days, simulations, self.antithetic))
+
+        for _, log_prices in self._log_price_blocks(generator, days, simulations, rng):
+            level = log_prices[-1]
+        return current_price * np.exp(level.astype(np.float64))
+
+    def simulate_paths(self, current_price: float, generator: ReturnGenerator,
+                       days: int = TRADING_DAYS, simulations: int = 10000) -> np.ndarray:
+        """
+        Full path matrix of shape (simulations, days + 1), column 0 is the current price
+
+        A horizon of days <= 0 returns just the current-price column.
+
+        Raises:
+            ValueError: If the matrix would exceed max_chunk_elements; use
+                `percentile_bands` for large runs instead.
+        """
+        days = max(days, 0)
+        if simulations * (days + 1) > self.max_chunk_elements:
+            raise ValueError(
+                f"{simulations}x{days + 1} paths exceed max_chunk_elements={self.max_chunk_elements}"
+            )
+
+        paths = np.empty((simulations, days + 1))
+        paths[:, 0] = current_price
+        for start, log_prices in self._log_price_blocks(generator, days, simulations):
+            paths[:, start + 1:start + 1 + len(log_prices)] = current_price * np.exp(log_prices.T)
+        return paths
+
+    def percentile_bands(self, current_price: float, generator: ReturnGenerator,
+                         days: int = TRADING_DAYS, simulations: int = 10000,
+                         percentiles: Sequence[float] = (5, 50, 95),
+                         band_points: Optional[int] = 64) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        Per-day price percentiles without materializing the path matrix
+
+        Percentiles are computed exactly on `band_points` evenly spaced days
+        (always including the last) and interpolated in log price between them;
+        the per-day partition dominates the cost for large runs. None computes
+        every day exactly.
+
+        Returns:
+            ({'p5': array(days), 'p50': ..., 'p95': ...}, terminal prices);
+            empty bands and the current price as terminal when days <= 0
+        """
+        if days <= 0:
+            return {f"p{p:g}": np.empty(0) for p in percentiles}, np.full(simulations, float(current_price))
+
+        if band_points is None or band_points >= days:
+            grid = np.arange(days)
+        else:
+            grid = np.unique(np.linspace(0, days - 1, max(band_points, 2)).round().astype(np.int64))
+        at_grid = np.empty((len(percentiles), len(grid)))
+        terminal = None
+
+        for start, log_prices in self._log_price_blocks(generator, days, simulations):
+            terminal = current_price * np.exp(log_prices[-1].astype(np.float64))
+            rows = np.flatnonzero((grid >= start) & (grid < start + len(log_prices)))
+            if len(rows):
+                at_grid[:, rows] = nearest_rank_percentiles(log_prices[grid[rows] - start], percentiles, axis=1)
+
+        all_days = np.arange(days)
+        bands = {
+            f"p{p:g}": current_price * np.exp(np.interp(all_days, grid, values))
+            for p, values in zip(percentiles, at_grid)
+        }
+        return bands, terminal
+
+    def _log_price_blocks(self, generator: ReturnGenerator, days: int, simulations: int,
+                          rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield (first day index, cumulative log returns of shape (block_days, simulations))
+
+        Days are generated in blocks sized to max_chunk_elements and carried
+        forward, so each block only holds block_days x simulations values.
+        """
+        rng = rng or np.random.default_rng(self.seed)
+        block_days = max(1, min(days, self.max_chunk_elements // max(simulations, 1)))
+        level = np.zeros(simulations, dtype=np.float32)
+        state = generator.start(simulations)
+
+        for start in range(0, days, block_days):
+            n = min(block_days, days - start)
+            # In place: daily log returns -> cumulative log prices. Adding row
+            # by row keeps every pass contiguous (cumsum over axis 0 strides)
+            log_prices, state = generator.block(rng, n, simulations, state, self.antithetic)
+            log_prices[0] += level
+            for t in range(1, n):
+                np.add(log_prices[t - 1], log_prices[t], out=log_prices[t])
+            level = log_prices[-1].copy()
+            yield start, log_prices
+
+
+def nearest_rank_percentiles(values: np.ndarray, percentiles: Sequence[float], axis: int = -1) -> np.ndarray:
+    """
+    Percentiles as sorted[int(q * n)] along an axis, via one partial sort
+
+    Cheaper than np.percentile (no interpolation, single partition); used
+    for both the bands and the simulation summary. The input is partitioned
+    in place.
+    """
+    n = values.shape[axis]
+    kth = [min(int(p / 100 * n), n - 1) for p in percentiles]
+    values.partition(kth, axis=axis)
+    return np.moveaxis(np.take(values, kth, axis=axis), axis, 0)
@@ -5,12 +5,107 @@ CRITICAL for professional traders
 """
 
 import logging
+import time
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 
+from calculators.indicator_library import rolling_mean, rolling_extrema
+
 logger = logging.getLogger(__name__)
 
+# Bars inspected by each detector (the trailing window in detect_patterns,
+# the maximum formation length when scanning a full history)
+HEAD_SHOULDERS_WINDOW = 20
+DOUBLE_TOP_WINDOW = 15
+TRIANGLE_WINDOW = 20
+CHANNEL_WINDOW = 30
+CUP_WINDOW = 40
+WEDGE_WINDOW = 25
+SUPPORT_RESISTANCE_WINDOW = 30
+
+
+def find_extrema(values: np.ndarray, left: int, right: Optional[int] = None, kind: str = 'peak') -> np.ndarray:
+    """
+    Indices of strict local extrema over the whole series in one vectorized pass
+
+    Bar i is a peak (trough) when it is above (below) each of the `left` bars
+    before it and the `right` bars after it.
+
+    Args:
+        values: Price series
+        left: Bars compared before i
+        right: Bars compared after i (defaults to left)
+        kind: 'peak' or 'trough'
+
+    Returns:
+        Sorted bar indices
+    """
+    right = left if right is None else right
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < left + right + 1:
+        return np.empty(0, dtype=np.int64)
+    windows = sliding_window_view(x, left + right + 1)
+    center = windows[:, left:left + 1]
+    neighbors = np.delete(windows, left, axis=1)
+    mask = (center > neighbors).all(axis=1) if kind == 'peak' else (center < neighbors).all(axis=1)
+    return np.flatnonzero(mask) + left
+
+
+def rolling_linear_fit(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Least-squares line over every full window (same fit as np.polyfit(x, y, 1))
+
+    Returns:
+        (slope, intercept) per window, entry j for bars j .. j + window - 1,
+        with x running 0 .. window - 1 inside the window
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < window:
+        return np.empty(0), np.empty(0)
+    centered = np.arange(window) - (window - 1) / 2
+    windows = sliding_window_view(x, window)
+    slope = windows @ centered / (centered @ centered)
+    intercept = windows.mean(axis=1) - slope * (window - 1) / 2
+    return slope, intercept
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """(first, last) positions of each run of True values"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), (edges[1::2] - 1).tolist()))
+
+
+def _in_window(indices: np.ndarray, n: int, window: int, margin_left: int, margin_right: int) -> np.ndarray:
+    """Extrema a trailing-window scan would see (at least the margins away from the window edges)"""
+    start = max(n - window, 0)
+    return indices[(indices >= start + margin_left) & (indices < n - margin_right)]
+
+
+@dataclass
+class SeriesExtrema:
+    """Local highs and lows of one series, shared by every detector"""
+    peaks: np.ndarray  # Highs above 2 bars on each side
+    troughs: np.ndarray  # Lows below 2 bars on each side
+    swing_peaks: np.ndarray  # Highs above 1 bar on each side
+    swing_troughs: np.ndarray
+    resistance: np.ndarray  # Highs above 2 bars before and 1 after
+    support: np.ndarray
+
+    @classmethod
+    def compute(cls, highs: np.ndarray, lows: np.ndarray) -> 'SeriesExtrema':
+        return cls(
+            peaks=find_extrema(highs, 2),
+            troughs=find_extrema(lows, 2, kind='trough'),
+            swing_peaks=find_extrema(highs, 1),
+            swing_troughs=find_extrema(lows, 1, kind='trough'),
+            resistance=find_extrema(highs, 2, 1),
+            support=find_extrema(lows, 2, 1, kind='trough')
+        )
+
 
 class PatternDetector:
     """
@@ -25,6 +120,10 @@ class PatternDetector:
     - Channels (ascending, descending, horizontal)
     - Cup and Handle (bullish continuation)
     - Wedges (rising, falling)
+
+    Extrema and trendline fits are computed once per series and shared by the
+    detectors. detect_patterns reports what is forming in the trailing window;
+    scan_patterns reports every occurrence across the full history.
     """
 
     def __init__(self):
@@ -49,22 +148,12 @@ class PatternDetector:
             closes = np.array([c['close'] for c in ohlc_data])
             highs = np.array([c['high'] for c in ohlc_data])
             lows = np.array([c['low'] for c in ohlc_data])
-            volumes = np.array([c.get('volume', 0) for c in ohlc_data])
-
-            patterns = []
-
-            # Reversal patterns
-            patterns.extend(self._detect_head_and_shoulders(highs, lows, closes))
-            patterns.extend(self._detect_double_top_bottom(highs, lows, closes))
+            extrema = SeriesExtrema.compute(highs, lows)
 
-            # Continuation patterns
-            patterns.extend(self._detect_triangles(highs, lows, closes))
-            patterns.extend(self._detect_channels(highs, lows, closes))
-            patterns.extend(self._detect_cup_and_handle(closes, highs, lows))
-            patterns.extend(self._detect_wedges(highs, lows, closes))
+            patterns = self._run_detectors(highs, lows, closes, extrema, scan=False)
 
             # Support/Resistance levels
-            support_resistance = self._detect_support_resistance(highs, lows, closes)
+            support_resistance = self._detect_support_resistance(highs, lows, closes, extrema)
 
             return {
                 'patterns_detected': len(patterns),
@@ -80,338 +169,486 @@ class PatternDetector:
             logger.error(f"[{self.name}] Pattern detection failed: {e}")
             return {'error': str(e)}
 
-    def _detect_head_and_shoulders(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
-        """Detect Head and Shoulders pattern (bearish reversal)"""
+    def current_patterns(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
+        """
+        Patterns forming in the trailing window, from bar arrays
+
+        Same detections as detect_patterns without the candle dicts, summary
+        and support/resistance (used by the batch screener).
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        closes = np.asarray(closes, dtype=np.float64)
+        if len(closes) < 20:
+            return []
+        return self._run_detectors(highs, lows, closes, SeriesExtrema.compute(highs, lows), scan=False)
+
+    def scan_patterns(
+        self,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        dates: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Find every pattern occurrence across the full history
+
+        Args:
+            highs, lows, closes: Bar arrays in time order
+            dates: Optional bar timestamps (adds start_date/end_date)
+
+        Returns:
+            Occurrences (with start_index/end_index) ordered by where they end,
+            plus counts per pattern
+        """
+        started = time.time()
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        closes = np.asarray(closes, dtype=np.float64)
+
+        extrema = SeriesExtrema.compute(highs, lows)
+        occurrences = self._run_detectors(highs, lows, closes, extrema, scan=True)
+        occurrences.sort(key=lambda o: (o['end_index'], o['start_index']))
+
+        if dates is not None:
+            labels = np.datetime_as_string(np.asarray(dates, dtype='datetime64[D]'))
+            for occurrence in occurrences:
+                occurrence['start_date'] = str(labels[occurrence['start_index']])
+                occurrence['end_date'] = str(labels[occurrence['end_index']])
+
+        counts: Dict[str, int] = {}
+        for occurrence in occurrences:
+            counts[occurrence['pattern']] = counts.get(occurrence['pattern'], 0) + 1
+
+        return {
+            'bars': len(closes),
+            'occurrences': occurrences,
+            'counts': counts,
+            'elapsed_ms': round((time.time() - started) * 1000, 2)
+        }
+
+    def backtest_patterns(self, closes: np.ndarray, occurrences: List[Dict], horizon: int = 20) -> Dict[str, Any]:
+        """
+        Forward returns after each scanned occurrence, aggregated per pattern
+
+        Args:
+            closes: Close prices the occurrences were scanned on
+            occurrences: scan_patterns occurrences
+            horizon: Bars after the pattern end to measure
+
+        Returns:
+            Per pattern: occurrences measured, average forward return (%) and the
+            share that moved in the pattern's direction
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        ends = np.array([o['end_index'] for o in occurrences], dtype=np.int64)
+        measurable = ends + horizon < len(closes)
+        if not measurable.any():
+            return {}
+
+        ends = ends[measurable]
+        forward = closes[ends + horizon] / closes[ends] - 1
+        names = np.array([o['pattern'] for o in occurrences])[measurable]
+        direction = np.array([
+            1 if 'bullish' in o['type'] else -1 if 'bearish' in o['type'] else 0
+            for o in occurrences
+        ])[measurable]
+
+        stats = {}
+        for name in np.unique(names):
+            rows = names == name
+            directional = direction[rows] != 0
+            stats[str(name)] = {
+                'occurrences': int(rows.sum()),
+                'avg_forward_return': round(float(forward[rows].mean()) * 100, 2),
+                'hit_rate': (round(float((np.sign(forward[rows]) == direction[rows])[directional].mean()), 3)
+                             if directional.any() else None)
+            }
+        return stats
+
+    def _run_detectors(self, highs, lows, closes, extrema: SeriesExtrema, scan: bool) -> List[Dict]:
+        patterns = []
+
+        # Reversal patterns
+        patterns.extend(self._detect_head_and_shoulders(highs, lows, closes, extrema, scan))
+        patterns.extend(self._detect_double_top_bottom(highs, lows, closes, extrema, scan))
+
+        # Continuation patterns
+        patterns.extend(self._detect_triangles(highs, lows, closes, scan))
+        patterns.extend(self._detect_channels(highs, lows, closes, scan))
+        patterns.extend(self._detect_cup_and_handle(closes, highs, lows, scan))
+        patterns.extend(self._detect_wedges(highs, lows, closes, scan))
+        return patterns
+
+    @staticmethod
+    def _breakout(closes: np.ndarray, after: int, level: float, below: bool, limit: int) -> Optional[int]:
+        """First bar after `after` (within `limit` bars) closing beyond level"""
+        ahead = closes[after + 1:after + 1 + limit]
+        crossed = np.flatnonzero(ahead < level if below else ahead > level)
+        return int(after + 1 + crossed[0]) if len(crossed) else None
+
+    @staticmethod
+    def _consecutive(indices: np.ndarray, count: int, max_span: int, n: int, window: int,
+                     margin: int, scan: bool) -> np.ndarray:
+        """
+        Starting positions (into indices) of the extrema groups to test
+
+        Scanning: every run of `count` consecutive extrema spanning at most
+        `max_span` bars. Trailing window: the first `count` extrema inside it.
+        """
+        if scan:
+            if len(indices) < count:
+                return np.empty(0, dtype=np.int64)
+            spans = indices[count - 1:] - indices[:len(indices) - count + 1]
+            return np.flatnonzero(spans <= max_span)
+
+        visible = _in_window(indices, n, window, margin, margin)
+        if len(visible) < count:
+            return np.empty(0, dtype=np.int64)
+        return np.searchsorted(indices, visible[:1])
+
+    def _detect_head_and_shoulders(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                                   extrema: SeriesExtrema, scan: bool = False) -> List[Dict]:
+        """Detect Head and Shoulders pattern (bearish reversal) and its inverse (bullish)"""
 
         patterns = []
-        window = 20  # Look at recent 20 candles
+        window = HEAD_SHOULDERS_WINDOW  # Recent 20 candles, or formations up to 20 bars long
+        n = len(highs)
 
-        if len(highs) < window:
+        if n < window:
             return patterns
 
-        recent_highs = highs[-window:]
-        recent_lows = lows[-window:]
-
-        # Find peaks (local maxima)
-        peaks = []
-        for i in range(2, len(recent_highs) - 2):
-            if (recent_highs[i] > recent_highs[i-1] and
-                recent_highs[i] > recent_highs[i-2] and
-                recent_highs[i] > recent_highs[i+1] and
-                recent_highs[i] > recent_highs[i+2]):
-                peaks.append((i, recent_highs[i]))
-
-        # Need 3 peaks for head and shoulders
-        if len(peaks) >= 3:
-            # Check if middle peak (head) is higher than shoulders
-            left_shoulder = peaks[0]
-            head = peaks[1]
-            right_shoulder = peaks[2]
-
-            if (head[1] > left_shoulder[1] and
-                head[1] > right_shoulder[1] and
-                abs(left_shoulder[1] - right_shoulder[1]) / left_shoulder[1] < 0.05):  # Shoulders similar height
-
-                # Calculate neckline
-                neckline = (recent_lows[left_shoulder[0]] + recent_lows[right_shoulder[0]]) / 2
-
-                patterns.append({
-                    'pattern': 'Head and Shoulders',
-                    'type': 'bearish_reversal',
-                    'confidence': 0.75,
-                    'neckline': float(neckline),
-                    'target': float(neckline - (head[1] - neckline)),  # Measured move
-                    'invalidation': float(head[1]),
-                    'description': 'Bearish reversal pattern - expect breakdown below neckline',
-                    'formation_complete': float(closes[-1]) < neckline
-                })
-
-        # Inverse Head and Shoulders (bullish)
-        troughs = []
-        for i in range(2, len(recent_lows) - 2):
-            if (recent_lows[i] < recent_lows[i-1] and
-                recent_lows[i] < recent_lows[i-2] and
-                recent_lows[i] < recent_lows[i+1] and
-                recent_lows[i] < recent_lows[i+2]):
-                troughs.append((i, recent_lows[i]))
-
-        if len(troughs) >= 3:
-            left_shoulder = troughs[0]
-            head = troughs[1]
-            right_shoulder = troughs[2]
-
-            if (head[1] < left_shoulder[1] and
-                head[1] < right_shoulder[1] and
-                abs(left_shoulder[1] - right_shoulder[1]) / left_shoulder[1] < 0.05):
-
-                neckline = (recent_highs[left_shoulder[0]] + recent_highs[right_shoulder[0]]) / 2
-
-                patterns.append({
-                    'pattern': 'Inverse Head and Shoulders',
-                    'type': 'bullish_reversal',
-                    'confidence': 0.75,
-                    'neckline': float(neckline),
-                    'target': float(neckline + (neckline - head[1])),
-                    'invalidation': float(head[1]),
-                    'description': 'Bullish reversal pattern - expect breakout above neckline',
-                    'formation_complete': float(closes[-1]) > neckline
-                })
+        for kind, points, levels, opposite in (('top', extrema.peaks, highs, lows),
+                                               ('bottom', extrema.troughs, lows, highs)):
+            # Need 3 extrema: left shoulder, head, right shoulder
+            starts = self._consecutive(points, 3, window - 5, n, window, 2, scan)
+            if len(starts) == 0:
+                continue
+            left, head, right = points[starts], points[starts + 1], points[starts + 2]
+            left_level, head_level, right_level = levels[left], levels[head], levels[right]
+
+            # Head beyond both shoulders, shoulders similar height
+            if kind == 'top':
+                valid = (head_level > left_level) & (head_level > right_level)
+            else:
+                valid = (head_level < left_level) & (head_level < right_level)
+            valid &= np.abs(left_level - right_level) / left_level < 0.05
+
+            for j in np.flatnonzero(valid):
+                # Neckline from the opposite extremes under/over the shoulders
+                neckline = float((opposite[left[j]] + opposite[right[j]]) / 2)
+                head_value = float(head_level[j])
+                if kind == 'top':
+                    pattern = {
+                        'pattern': 'Head and Shoulders',
+                        'type': 'bearish_reversal',
+                        'confidence': 0.75,
+                        'neckline': neckline,
+                        'target': float(neckline - (head_value - neckline)),  # Measured move
+                        'invalidation': head_value,
+                        'description': 'Bearish reversal pattern - expect breakdown below neckline'
+                    }
+                else:
+                    pattern = {
+                        'pattern': 'Inverse Head and Shoulders',
+                        'type': 'bullish_reversal',
+                        'confidence': 0.75,
+                        'neckline': neckline,
+                        'target': float(neckline + (neckline - head_value)),
+                        'invalidation': head_value,
+                        'description': 'Bullish reversal pattern - expect breakout above neckline'
+                    }
+                patterns.append(self._finish(pattern, closes, int(left[j]) - 2, int(right[j]) + 2,
+                                             neckline, below=(kind == 'top'), scan=scan, window=window))
 
         return patterns
 
-    def _detect_double_top_bottom(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
+    def _detect_double_top_bottom(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                                  extrema: SeriesExtrema, scan: bool = False) -> List[Dict]:
         """Detect Double Top/Bottom patterns"""
 
         patterns = []
-        window = 15
+        window = DOUBLE_TOP_WINDOW
+        n = len(highs)
 
-        if len(highs) < window:
+        if n < window:
             return patterns
 
-        recent_highs = highs[-window:]
-        recent_lows = lows[-window:]
-
-        # Double Top (bearish)
-        peaks = []
-        for i in range(1, len(recent_highs) - 1):
-            if recent_highs[i] > recent_highs[i-1] and recent_highs[i] > recent_highs[i+1]:
-                peaks.append((i, recent_highs[i]))
-
-        if len(peaks) >= 2:
-            last_two_peaks = peaks[-2:]
-            if abs(last_two_peaks[0][1] - last_two_peaks[1][1]) / last_two_peaks[0][1] < 0.03:  # Within 3%
-                # Found double top
-                support = float(np.min(recent_lows[last_two_peaks[0][0]:last_two_peaks[1][0]]))
-                peak_level = float(last_two_peaks[1][1])
-
-                patterns.append({
-                    'pattern': 'Double Top',
-                    'type': 'bearish_reversal',
-                    'confidence': 0.70,
-                    'resistance': peak_level,
-                    'support': support,
-                    'target': float(support - (peak_level - support)),
-                    'invalidation': peak_level,
-                    'description': 'Bearish reversal - breakdown below support confirms pattern',
-                    'formation_complete': float(closes[-1]) < support
-                })
-
-        # Double Bottom (bullish)
-        troughs = []
-        for i in range(1, len(recent_lows) - 1):
-            if recent_lows[i] < recent_lows[i-1] and recent_lows[i] < recent_lows[i+1]:
-                troughs.append((i, recent_lows[i]))
-
-        if len(troughs) >= 2:
-            last_two_troughs = troughs[-2:]
-            if abs(last_two_troughs[0][1] - last_two_troughs[1][1]) / last_two_troughs[0][1] < 0.03:
-                resistance = float(np.max(recent_highs[last_two_troughs[0][0]:last_two_troughs[1][0]]))
-                trough_level = float(last_two_troughs[1][1])
-
-                patterns.append({
-                    'pattern': 'Double Bottom',
-                    'type': 'bullish_reversal',
-                    'confidence': 0.70,
-                    'support': trough_level,
-                    'resistance': resistance,
-                    'target': float(resistance + (resistance - trough_level)),
-                    'invalidation': trough_level,
-                    'description': 'Bullish reversal - breakout above resistance confirms pattern',
-                    'formation_complete': float(closes[-1]) > resistance
-                })
+        for kind, points, levels in (('top', extrema.swing_peaks, highs), ('bottom', extrema.swing_troughs, lows)):
+            if scan:
+                starts = self._consecutive(points, 2, window - 3, n, window, 1, scan=True)
+            else:
+                # The last two swing points inside the window
+                visible = _in_window(points, n, window, 1, 1)
+                starts = np.searchsorted(points, visible[-2:-1]) if len(visible) >= 2 else np.empty(0, dtype=np.int64)
+            if len(starts) == 0:
+                continue
+            first, second = points[starts], points[starts + 1]
+            similar = np.abs(levels[first] - levels[second]) / levels[first] < 0.03  # Within 3%
+
+            for j in np.flatnonzero(similar):
+                a, b = int(first[j]), int(second[j])
+                if kind == 'top':
+                    support = float(np.min(lows[a:b]))
+                    peak_level = float(highs[b])
+                    pattern = {
+                        'pattern': 'Double Top',
+                        'type': 'bearish_reversal',
+                        'confidence': 0.70,
+                        'resistance': peak_level,
+                        'support': support,
+                        'target': float(support - (peak_level - support)),
+                        'invalidation': peak_level,
+                        'description': 'Bearish reversal - breakdown below support confirms pattern'
+                    }
+                    level, below = support, True
+                else:
+                    resistance = float(np.max(highs[a:b]))
+                    trough_level = float(lows[b])
+                    pattern = {
+                        'pattern': 'Double Bottom',
+                        'type': 'bullish_reversal',
+                        'confidence': 0.70,
+                        'support': trough_level,
+                        'resistance': resistance,
+                        'target': float(resistance + (resistance - trough_level)),
+                        'invalidation': trough_level,
+                        'description': 'Bullish reversal - breakout above resistance confirms pattern'
+                    }
+                    level, below = resistance, False
+                patterns.append(self._finish(pattern, closes, a - 1, b + 1, level, below, scan, window))
 
         return patterns
 
-    def _detect_triangles(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
+    def _finish(self, pattern: Dict, closes: np.ndarray, start: int, end: int,
+                level: float, below: bool, scan: bool, window: int) -> Dict:
+        """
+        Add span and completion to an extrema-based pattern
+
+        Trailing window: complete when the latest close is beyond the level.
+        Scanning: complete when a close breaks the level within one window after
+        the formation (recorded as breakout_index).
+        """
+        n = len(closes)
+        pattern['start_index'] = max(start, 0)
+        pattern['end_index'] = min(end, n - 1)
+        if scan:
+            breakout = self._breakout(closes, pattern['end_index'], level, below, window)
+            pattern['breakout_index'] = breakout
+            pattern['formation_complete'] = breakout is not None
+        else:
+            pattern['formation_complete'] = bool(closes[-1] < level if below else closes[-1] > level)
+        return pattern
+
+    @staticmethod
+    def _window_runs(mask: np.ndarray, scan: bool) -> List[Tuple[int, int]]:
+        """
+        (first, last) window positions to report
+
+        Scanning: each run of consecutive matching windows is one occurrence.
+        Trailing window: the last window only.
+        """
+        if scan:
+            return _runs(mask)
+        return [(len(mask) - 1, len(mask) - 1)] if len(mask) and mask[-1] else []
+
+    def _detect_triangles(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                          scan: bool = False) -> List[Dict]:
         """Detect triangle patterns (ascending, descending, symmetrical)"""
 
         patterns = []
-        window = 20
+        window = TRIANGLE_WINDOW
 
         if len(highs) < window:
             return patterns
 
-        recent_highs = highs[-window:]
-        recent_lows = lows[-window:]
-
-        # Fit trendlines
-        x = np.arange(len(recent_highs))
-
-        # Upper trendline (resistance)
-        upper_slope, upper_intercept = np.polyfit(x, recent_highs, 1)
-
-        # Lower trendline (support)
-        lower_slope, lower_intercept = np.polyfit(x, recent_lows, 1)
+        # Fit trendlines: resistance over highs, support over lows
+        upper_slope, upper_intercept = rolling_linear_fit(highs, window)
+        lower_slope, lower_intercept = rolling_linear_fit(lows, window)
 
         # Ascending Triangle: flat resistance, rising support
-        if abs(upper_slope) < 0.1 and lower_slope > 0.1:
-            apex = float(recent_highs[-1])
+        ascending = (np.abs(upper_slope) < 0.1) & (lower_slope > 0.1)
+        for start, j in self._window_runs(ascending, scan):
+            end = j + window - 1
+            apex = float(highs[end])
             patterns.append({
                 'pattern': 'Ascending Triangle',
                 'type': 'bullish_continuation',
                 'confidence': 0.65,
                 'resistance': apex,
-                'support': float(lower_intercept + lower_slope * len(x)),
-                'target': float(apex + (apex - recent_lows[0])),
+                'support': float(lower_intercept[j] + lower_slope[j] * window),
+                'target': float(apex + (apex - lows[j])),
                 'description': 'Bullish continuation - breakout above resistance expected',
-                'formation_complete': float(closes[-1]) > apex
+                'formation_complete': float(closes[end]) > apex if scan else float(closes[-1]) > apex,
+                'start_index': start,
+                'end_index': end
             })
 
         # Descending Triangle: falling resistance, flat support
-        if upper_slope < -0.1 and abs(lower_slope) < 0.1:
-            apex = float(recent_lows[-1])
+        descending = (upper_slope < -0.1) & (np.abs(lower_slope) < 0.1)
+        for start, j in self._window_runs(descending, scan):
+            end = j + window - 1
+            apex = float(lows[end])
             patterns.append({
                 'pattern': 'Descending Triangle',
                 'type': 'bearish_continuation',
                 'confidence': 0.65,
-                'resistance': float(upper_intercept + upper_slope * len(x)),
+                'resistance': float(upper_intercept[j] + upper_slope[j] * window),
                 'support': apex,
-                'target': float(apex - (recent_highs[0] - apex)),
+                'target': float(apex - (highs[j] - apex)),
                 'description': 'Bearish continuation - breakdown below support expected',
-                'formation_complete': float(closes[-1]) < apex
+                'formation_complete': float(closes[end]) < apex if scan else float(closes[-1]) < apex,
+                'start_index': start,
+                'end_index': end
             })
 
         return patterns
 
-    def _detect_channels(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
+    def _detect_channels(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                         scan: bool = False) -> List[Dict]:
         """Detect price channels"""
 
         patterns = []
-        window = 30
+        window = CHANNEL_WINDOW
 
         if len(highs) < window:
             return patterns
 
-        recent_highs = highs[-window:]
-        recent_lows = lows[-window:]
-        recent_closes = closes[-window:]
-
-        x = np.arange(len(recent_highs))
-
         # Fit parallel trendlines
-        upper_slope, upper_intercept = np.polyfit(x, recent_highs, 1)
-        lower_slope, lower_intercept = np.polyfit(x, recent_lows, 1)
+        upper_slope, upper_intercept = rolling_linear_fit(highs, window)
+        lower_slope, lower_intercept = rolling_linear_fit(lows, window)
 
         # Check if slopes are similar (parallel channel)
-        if abs(upper_slope - lower_slope) < 0.05:
-            channel_type = 'ascending' if upper_slope > 0.1 else 'descending' if upper_slope < -0.1 else 'horizontal'
+        parallel = np.abs(upper_slope - lower_slope) < 0.05
+        channel_type = np.where(upper_slope > 0.1, 'ascending', np.where(upper_slope < -0.1, 'descending', 'horizontal'))
+
+        # A change of direction starts a new channel
+        runs = [(start, j, kind) for kind in ('ascending', 'descending', 'horizontal')
+                for start, j in self._window_runs(parallel & (channel_type == kind), scan)]
 
-            upper_line = float(upper_intercept + upper_slope * (len(x) - 1))
-            lower_line = float(lower_intercept + lower_slope * (len(x) - 1))
+        for start, j, kind in sorted(runs):
+            end = j + window - 1
+            upper_line = float(upper_intercept[j] + upper_slope[j] * (window - 1))
+            lower_line = float(lower_intercept[j] + lower_slope[j] * (window - 1))
 
             patterns.append({
-                'pattern': f'{channel_type.capitalize()} Channel',
+                'pattern': f'{kind.capitalize()} Channel',
                 'type': 'continuation',
                 'confidence': 0.60,
                 'upper_bound': upper_line,
                 'lower_bound': lower_line,
-                'description': f'{channel_type.capitalize()} channel - trade within bounds',
-                'trading_strategy': f'Buy near {lower_line:.2f}, sell near {upper_line:.2f}'
+                'description': f'{kind.capitalize()} channel - trade within bounds',
+                'trading_strategy': f'Buy near {lower_line:.2f}, sell near {upper_line:.2f}',
+                'start_index': start,
+                'end_index': end
             })
 
         return patterns
 
-    def _detect_cup_and_handle(self, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray) -> List[Dict]:
+    def _detect_cup_and_handle(self, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                               scan: bool = False) -> List[Dict]:
         """Detect Cup and Handle pattern (bullish)"""
 
         patterns = []
-        window = 40
+        window = CUP_WINDOW
 
         if len(closes) < window:
             return patterns
 
-        recent = closes[-window:]
-
-        # Find cup (U-shape)
-        # Look for: high -> low -> high pattern
-        first_third = recent[:window//3]
-        middle_third = recent[window//3:2*window//3]
-        last_third = recent[2*window//3:]
-
-        if (np.mean(first_third) > np.mean(middle_third) and
-            np.mean(last_third) > np.mean(middle_third) and
-            np.min(middle_third) < np.min(first_third) * 0.90):  # At least 10% dip
-
-            # Check for handle (small pullback in last third)
-            if np.max(last_third) > np.mean(last_third) * 1.02:
-                rim = float(np.max(first_third))
-                handle_low = float(np.min(last_third[-5:]))
-
-                patterns.append({
-                    'pattern': 'Cup and Handle',
-                    'type': 'bullish_continuation',
-                    'confidence': 0.70,
-                    'rim': rim,
-                    'handle_low': handle_low,
-                    'target': float(rim + (rim - np.min(middle_third))),
-                    'description': 'Bullish continuation - breakout above rim expected',
-                    'formation_complete': float(closes[-1]) > rim
-                })
+        # Cup (U-shape) over thirds of each window: high -> low -> high
+        third, two_thirds = window // 3, 2 * window // 3
+        count = len(closes) - window + 1
+        mean_a, mean_b = rolling_mean(closes, third), rolling_mean(closes, two_thirds - third)
+        mean_c = rolling_mean(closes, window - two_thirds)
+        min_a, max_a = rolling_extrema(closes, third)
+        min_b, _ = rolling_extrema(closes, two_thirds - third)
+        _, max_c = rolling_extrema(closes, window - two_thirds)
+
+        first = slice(0, count)
+        middle = slice(third, third + count)
+        last = slice(two_thirds, two_thirds + count)
+
+        cup = ((mean_a[first] > mean_b[middle]) &
+               (mean_c[last] > mean_b[middle]) &
+               (min_b[middle] < min_a[first] * 0.90))  # At least 10% dip
+        # Handle: small pullback in the last third
+        found = cup & (max_c[last] > mean_c[last] * 1.02)
+
+        for start, j in self._window_runs(found, scan):
+            end = j + window - 1
+            rim = float(max_a[j])
+            handle_low = float(np.min(closes[end - 4:end + 1]))
+
+            patterns.append({
+                'pattern': 'Cup and Handle',
+                'type': 'bullish_continuation',
+                'confidence': 0.70,
+                'rim': rim,
+                'handle_low': handle_low,
+                'target': float(rim + (rim - min_b[third + j])),
+                'description': 'Bullish continuation - breakout above rim expected',
+                'formation_complete': float(closes[end]) > rim if scan else float(closes[-1]) > rim,
+                'start_index': start,
+                'end_index': end
+            })
 
         return patterns
 
-    def _detect_wedges(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
+    def _detect_wedges(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                       scan: bool = False) -> List[Dict]:
         """Detect wedge patterns (rising, falling)"""
 
         patterns = []
-        window = 25
+        window = WEDGE_WINDOW
 
         if len(highs) < window:
             return patterns
 
-        recent_highs = highs[-window:]
-        recent_lows = lows[-window:]
-
-        x = np.arange(len(recent_highs))
-
-        upper_slope, _ = np.polyfit(x, recent_highs, 1)
-        lower_slope, _ = np.polyfit(x, recent_lows, 1)
+        upper_slope, _ = rolling_linear_fit(highs, window)
+        lower_slope, _ = rolling_linear_fit(lows, window)
 
         # Rising Wedge: both slopes positive, converging (bearish)
-        if upper_slope > 0 and lower_slope > 0 and lower_slope > upper_slope:
+        rising = (upper_slope > 0) & (lower_slope > 0) & (lower_slope > upper_slope)
+        for start, j in self._window_runs(rising, scan):
+            end = j + window - 1
             patterns.append({
                 'pattern': 'Rising Wedge',
                 'type': 'bearish_reversal',
                 'confidence': 0.65,
                 'description': 'Bearish reversal - breakdown expected despite uptrend',
-                'target': float(recent_lows[0])
+                'target': float(lows[j]),
+                'start_index': start,
+                'end_index': end
             })
 
         # Falling Wedge: both slopes negative, converging (bullish)
-        if upper_slope < 0 and lower_slope < 0 and upper_slope < lower_slope:
+        falling = (upper_slope < 0) & (lower_slope < 0) & (upper_slope < lower_slope)
+        for start, j in self._window_runs(falling, scan):
+            end = j + window - 1
             patterns.append({
                 'pattern': 'Falling Wedge',
                 'type': 'bullish_reversal',
                 'confidence': 0.65,
                 'description': 'Bullish reversal - breakout expected despite downtrend',
-                'target': float(recent_highs[0])
+                'target': float(highs[j]),
+                'start_index': start,
+                'end_index': end
             })
 
         return patterns
 
-    def _detect_support_resistance(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> Dict[str, Any]:
+    def _detect_support_resistance(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                                   extrema: Optional[SeriesExtrema] = None) -> Dict[str, Any]:
         """Detect key support and resistance levels"""
 
-        window = 30
-        recent_highs = highs[-window:]
-        recent_lows = lows[-window:]
+        window = SUPPORT_RESISTANCE_WINDOW
         current_price = float(closes[-1])
+        extrema = extrema or SeriesExtrema.compute(highs, lows)
+        n = len(highs)
 
-        # Find resistance levels (local maxima)
-        resistance_levels = []
-        for i in range(2, len(recent_highs) - 2):
-            if (recent_highs[i] > recent_highs[i-1] and
-                recent_highs[i] > recent_highs[i-2] and
-                recent_highs[i] > recent_highs[i+1]):
-                resistance_levels.append(float(recent_highs[i]))
-
-        # Find support levels (local minima)
-        support_levels = []
-        for i in range(2, len(recent_lows) - 2):
-            if (recent_lows[i] < recent_lows[i-1] and
-                recent_lows[i] < recent_lows[i-2] and
-                recent_lows[i] < recent_lows[i+1]):
-                support_levels.append(float(recent_lows[i]))
+        # Resistance / support levels: local maxima / minima in the recent window
+        resistance_levels = highs[_in_window(extrema.resistance, n, window, 2, 2)].tolist()
+        support_levels = lows[_in_window(extrema.support, n, window, 2, 2)].tolist()
 
         # Cluster nearby levels
         resistance_levels = self._cluster_levels(resistance_levels, current_price)
@@ -4,11 +4,13 @@ Compares company metrics against competitors and sector averages
 CRITICAL for institutional investors to assess relative valuation
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-import yfinance as yf
 from datetime import datetime
 
+from services.market_data_adapter import get_market_data_adapter
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +39,7 @@ class PeerBenchmarkCalculator:
             # Add more as needed
         }
 
-    def get_peer_comparison(
+    async def get_peer_comparison(
         self,
         symbol: str,
         peer_symbols: Optional[List[str]] = None
@@ -63,16 +65,22 @@ class PeerBenchmarkCalculator:
             }
 
         try:
-            # Fetch data for all symbols
-            stock_data = self._fetch_stock_metrics(symbol)
+            # Fetch data for all symbols concurrently, off the event loop
+            fetched = await asyncio.gather(
+                *[self._fetch_stock_metrics(s) for s in [symbol] + list(peers)],
+                return_exceptions=True
+            )
+            if isinstance(fetched[0], Exception):
+                raise fetched[0]
+
+            stock_data = fetched[0]
             peer_data = {}
 
-            for peer in peers:
-                try:
-                    peer_data[peer] = self._fetch_stock_metrics(peer)
-                except Exception as e:
-                    logger.warning(f"Failed to fetch {peer}: {e}")
+            for peer, metrics in zip(peers, fetched[1:]):
+                if isinstance(metrics, Exception):
+                    logger.warning(f"Failed to fetch {peer}: {metrics}")
                     continue
+                peer_data[peer] = metrics
 
             # Calculate comparisons
             valuation_comparison = self._compare_valuation(stock_data, peer_data)
@@ -121,11 +129,10 @@ class PeerBenchmarkCalculator:
                 'symbol': symbol
             }
 
-    def _fetch_stock_metrics(self, symbol: str) -> Dict[str, Any]:
+    async def _fetch_stock_metrics(self, symbol: str) -> Dict[str, Any]:
         """Fetch key metrics for a stock"""
 
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = await get_market_data_adapter().get_info(symbol)
 
         metrics = {
             'symbol': symbol,
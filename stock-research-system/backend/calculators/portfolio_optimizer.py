@@ -0,0 +1,319 @@
+"""
+Portfolio Optimizer
+Covariance-aware mean-variance and risk-parity allocation
+
+Covariance comes from a (days, assets) return matrix with Ledoit-Wolf
+shrinkage towards a scaled identity, which keeps the matrix well conditioned
+when there are about as many holdings as trading days. The efficient
+frontier is solved for all points in one batch:
+- long-only: accelerated projected gradient over a grid of risk aversions,
+  every frontier portfolio updated by the same matrix product
+- long/short: closed-form two-fund solution for all target returns at once
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+def sample_covariance(returns: np.ndarray) -> np.ndarray:
+    """Maximum-likelihood covariance of a (days, assets) return matrix"""
+    x = np.asarray(returns, dtype=np.float64)
+    x = x - x.mean(axis=0)
+    return x.T @ x / len(x)
+
+
+def ledoit_wolf_covariance(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf shrunk covariance of a (days, assets) return matrix
+
+    Shrinks the sample covariance towards mu * I (mu = average variance)
+    with the closed-form optimal intensity from Ledoit & Wolf (2004).
+
+    Returns:
+        (covariance, shrinkage intensity in [0, 1])
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    days, assets = x.shape
+    x = x - x.mean(axis=0)
+
+    cov = x.T @ x / days
+    mu = np.trace(cov) / assets
+
+    x2 = x * x
+    beta = (np.sum(x2.T @ x2) / days - np.sum(cov * cov)) / (assets * days)
+    delta = (np.sum(cov * cov) - 2 * mu * np.trace(cov) + assets * mu * mu) / assets
+    beta = min(beta, delta)
+    shrinkage = 0.0 if delta == 0 else float(beta / delta)
+
+    shrunk = (1 - shrinkage) * cov
+    shrunk.flat[::assets + 1] += shrinkage * mu
+    return shrunk, shrinkage
+
+
+def project_to_simplex(weights: np.ndarray) -> np.ndarray:
+    """Euclidean projection of each row onto {w >= 0, sum(w) = 1}"""
+    v = np.atleast_2d(weights)
+    u = -np.sort(-v, axis=1)
+    cssv = np.cumsum(u, axis=1) - 1
+    ind = np.arange(1, v.shape[1] + 1)
+    rho = np.count_nonzero(u - cssv / ind > 0, axis=1)
+    theta = cssv[np.arange(len(v)), rho - 1] / rho
+    return np.maximum(v - theta[:, None], 0.0)
+
+
+class PortfolioOptimizer:
+    """
+    Mean-variance and risk-parity optimizer over a full covariance matrix
+
+    Features:
+    - Batched efficient frontier (long-only or long/short)
+    - Minimum variance, maximum Sharpe and target-return portfolios
+    - Equal-risk-contribution weights
+    - Vectorized portfolio statistics for many weight vectors at once
+    """
+
+    def __init__(self, expected_returns: Sequence[float], covariance: np.ndarray,
+                 risk_free_rate: float = 0.02, max_iterations: int = 2000, tolerance: float = 1e-9):
+        self.mu = np.asarray(expected_returns, dtype=np.float64)
+        self.cov = np.asarray(covariance, dtype=np.float64)
+        if self.cov.shape != (len(self.mu), len(self.mu)):
+            raise ValueError(f"Covariance shape {self.cov.shape} does not match {len(self.mu)} assets")
+        self.risk_free_rate = risk_free_rate
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+    @classmethod
+    def from_returns(cls, returns: np.ndarray, shrink: bool = True,
+                     periods_per_year: int = TRADING_DAYS, **kwargs) -> 'PortfolioOptimizer':
+        """
+        Build from a (days, assets) matrix of daily returns, annualizing both moments
+
+        Args:
+            returns: Daily returns, one column per asset
+            shrink: Apply Ledoit-Wolf shrinkage to the covariance
+            periods_per_year: Annualization factor
+        """
+        x = np.asarray(returns, dtype=np.float64)
+        cov, shrinkage = ledoit_wolf_covariance(x) if shrink else (sample_covariance(x), 0.0)
+        optimizer = cls(x.mean(axis=0) * periods_per_year, cov * periods_per_year, **kwargs)
+        optimizer.shrinkage = shrinkage
+        return optimizer
+
+    @property
+    def n_assets(self) -> int:
+        return len(self.mu)
+
+    def portfolio_stats(self, weights: np.ndarray) -> Dict[str, np.ndarray]:
+        """Return, volatility and Sharpe ratio for one weight vector or a (k, assets) batch"""
+        w = np.atleast_2d(weights)
+        ret = w @ self.mu
+        vol = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', w, self.cov, w), 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(vol > 0, (ret - self.risk_free_rate) / vol, 0.0)
+        return {'return': ret, 'volatility': vol, 'sharpe': sharpe}
+
+    def efficient_frontier(self, n_points: int = 50, long_only: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Efficient frontier portfolios ordered by expected return
+
+        Returns:
+            {'weights': (points, assets), 'return', 'volatility', 'sharpe'}
+        """
+        if long_only:
+            weights = self._long_only_frontier(n_points)
+        else:
+            weights = self._unconstrained_frontier(n_points)
+
+        stats = self.portfolio_stats(weights)
+        order = np.argsort(stats['return'], kind='stable')
+        return {'weights': weights[order], **{k: v[order] for k, v in stats.items()}}
+
+    def min_variance(self, long_only: bool = True) -> np.ndarray:
+        """Global minimum-variance weights"""
+        if not long_only:
+            inv_ones = np.linalg.solve(self.cov, np.ones(self.n_assets))
+            return inv_ones / inv_ones.sum()
+        return self._solve_simplex_qp(np.zeros(self.n_assets), np.array([1.0]))[0]
+
+    def max_sharpe(self, n_points: int = 50, long_only: bool = True) -> np.ndarray:
+        """Maximum Sharpe ratio (tangency) weights"""
+        if not long_only:
+            excess = np.linalg.solve(self.cov, self.mu - self.risk_free_rate)
+            if excess.sum() > 0:
+                return excess / excess.sum()
+        frontier = self.efficient_frontier(n_points, long_only)
+        return frontier['weights'][int(np.argmax(frontier['sharpe']))]
+
+    def target_return(self, target: float, n_points: int = 50, long_only: bool = True) -> np.ndarray:
+        """
+        Lowest-volatility weights reaching a target annual return
+
+        Long/short solves the target in closed form. Long-only narrows the
+        risk aversion whose simplex solution returns exactly the target,
+        solving `n_points` risk aversions per round; targets below the
+        minimum-variance return give the minimum-variance portfolio and
+        targets above the best asset give that asset.
+        """
+        if not long_only:
+            return self._unconstrained_weights(np.array([target]))[0]
+
+        floor = self.min_variance()
+        if floor @ self.mu >= target:
+            return floor
+        best = int(np.argmax(self.mu))
+        if self.mu[best] <= target:
+            top = np.zeros(self.n_assets)
+            top[best] = 1.0
+            return top
+
+        # Return falls as risk aversion rises: narrow the lambdas bracketing the target
+        spread = float(np.ptp(self.mu)) or 1.0
+        scale = spread / float(np.mean(np.diag(self.cov)))
+        low, high = np.log(scale * 1e-3), np.log(scale * 1e4)
+        bracket = None
+        for _ in range(20):
+            lambdas = np.exp(np.linspace(low, high, max(n_points, 3)))
+            weights = self._solve_simplex_qp(self.mu, lambdas)
+            returns = weights @ self.mu
+            reaching = np.count_nonzero(returns >= target)
+            if reaching == 0:
+                low, high = low - (high - low), low
+                continue
+            if reaching == len(lambdas):
+                low, high = high, high + (high - low)
+                continue
+            i = reaching - 1
+            bracket = weights[i], weights[i + 1]
+            # Same holdings at both ends: the path between them is a straight line
+            if returns[i] - returns[i + 1] <= 1e-9 * max(1.0, abs(target)) or \
+                    np.array_equal(weights[i] > 0, weights[i + 1] > 0):
+                break
+            low, high = np.log(lambdas[i]), np.log(lambdas[i + 1])
+
+        if bracket is None:
+            return floor
+        # The solution path is piecewise linear in the return, with kinks only where
+        # holdings enter or leave, so the blend hitting the target is optimal
+        above, below = bracket
+        gap = (above - below) @ self.mu
+        share = (target - below @ self.mu) / gap if gap > 0 else 1.0
+        return share * above + (1 - share) * below
+
+    def risk_parity(self, max_iterations: int = 100) -> np.ndarray:
+        """
+        Equal risk contribution weights (long-only)
+
+        Newton's method on 0.5 * y'Cy - mean(log y), whose minimizer
+        normalized to sum 1 gives every asset the same share of portfolio
+        variance. Riskless assets (zero variance, e.g. cash) contribute no
+        risk and get weight 0; the rest share the risk budget.
+        """
+        variances = np.diag(self.cov)
+        risky = variances > 0
+        if not risky.all():
+            weights = np.zeros(self.n_assets)
+            if risky.any():
+                subset = PortfolioOptimizer(self.mu[risky], self.cov[np.ix_(risky, risky)], self.risk_free_rate)
+                weights[risky] = subset.risk_parity(max_iterations)
+            else:
+                weights[:] = 1.0 / self.n_assets
+            return weights
+
+        n = self.n_assets
+        budget = np.full(n, 1.0 / n)
+        y = 1 / np.sqrt(variances)
+        y /= np.sqrt(y @ self.cov @ y)
+
+        for _ in range(max_iterations):
+            gradient = self.cov @ y - budget / y
+            hessian = self.cov + np.diag(budget / (y * y))
+            step = np.linalg.solve(hessian, gradient)
+
+            # Damp the step so every weight stays strictly positive
+            shrink = step > 0
+            scale = min(1.0, 0.95 * float(np.min(y[shrink] / step[shrink]))) if shrink.any() else 1.0
+            y = y - scale * step
+            if np.max(np.abs(gradient)) < 1e-12:
+                break
+
+        return y / y.sum()
+
+    def risk_contributions(self, weights: np.ndarray) -> np.ndarray:
+        """Fraction of portfolio variance contributed by each asset"""
+        w = np.asarray(weights, dtype=np.float64)
+        marginal = self.cov @ w
+        total = w @ marginal
+        return w * marginal / total if total > 0 else np.zeros_like(w)
+
+    def _long_only_frontier(self, n_points: int) -> np.ndarray:
+        """Solve max mu'w - 0.5 * lambda * w'Cw over the simplex for a grid of lambdas"""
+        spread = float(np.ptp(self.mu)) or 1.0
+        scale = spread / float(np.mean(np.diag(self.cov)))
+        lambdas = scale * np.logspace(-1, 2.5, max(n_points - 1, 1))[::-1]
+
+        # The lambda -> 0 end is the single highest-return asset
+        top = np.zeros((1, self.n_assets))
+        top[0, int(np.argmax(self.mu))] = 1.0
+        return np.vstack((self._solve_simplex_qp(self.mu, lambdas), top))
+
+    def _unconstrained_frontier(self, n_points: int) -> np.ndarray:
+        inv_ones = np.linalg.solve(self.cov, np.ones(self.n_assets))
+        low = float(self.mu @ inv_ones / inv_ones.sum())
+        targets = np.linspace(low, max(low, float(self.mu.max())), n_points)
+        return self._unconstrained_weights(targets)
+
+    def _unconstrained_weights(self, targets: np.ndarray) -> np.ndarray:
+        """Closed-form minimum-variance weights for each target return (shorts allowed)"""
+        inv = np.linalg.solve(self.cov, np.column_stack((self.mu, np.ones(self.n_assets))))
+        a = self.mu @ inv[:, 0]
+        b = self.mu @ inv[:, 1]
+        c = inv[:, 1].sum()
+        d = a * c - b * b
+        if abs(d) < 1e-18:
+            # All expected returns equal: every target maps to the minimum-variance portfolio
+            return np.tile(inv[:, 1] / c, (len(targets), 1))
+        return np.outer((c * targets - b) / d, inv[:, 0]) + np.outer((a - b * targets) / d, inv[:, 1])
+
+    def _solve_simplex_qp(self, linear: np.ndarray, lambdas: np.ndarray) -> np.ndarray:
+        """
+        Batched FISTA for min 0.5 * lambda_k * w'Cw - linear'w over the simplex
+
+        One row per lambda; all rows advance together with a single
+        (k, n) @ (n, n) product per iteration.
+        """
+        n = self.n_assets
+        lipschitz = lambdas * float(np.linalg.eigvalsh(self.cov)[-1])
+        step = (1 / np.maximum(lipschitz, 1e-18))[:, None]
+
+        weights = np.full((len(lambdas), n), 1.0 / n)
+        momentum = weights.copy()
+        t = 1.0
+        for _ in range(self.max_iterations):
+            gradient = lambdas[:, None] * (momentum @ self.cov) - linear
+            updated = project_to_simplex(momentum - step * gradient)
+            t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+            momentum = updated + ((t - 1) / t_next) * (updated - weights)
+            converged = np.max(np.abs(updated - weights)) < self.tolerance
+            weights, t = updated, t_next
+            if converged:
+                break
+        return weights
+
+
+def allocation_table(symbols: List[str], weights: np.ndarray, expected_returns: np.ndarray,
+                     risk_contributions: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Percent allocations sorted by weight, in RiskCalculator's output format"""
+    rows = []
+    for i in np.argsort(-weights, kind='stable'):
+        row = {
+            'symbol': symbols[i],
+            'weight': round(float(weights[i]) * 100, 2),
+            'expected_contribution': round(float(expected_returns[i] * weights[i]) * 100, 2)
+        }
+        if risk_contributions is not None:
+            row['risk_contribution'] = round(float(risk_contributions[i]) * 100, 2)
+        rows.append(row)
+    return rows
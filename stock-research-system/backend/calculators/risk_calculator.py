@@ -6,10 +6,15 @@ Jim Simons & Ray Dalio methodologies
 
 from typing import List, Dict, Tuple, Optional
 import numpy as np
-import random
 from datetime import datetime
 import math
 
+from calculators.portfolio_optimizer import PortfolioOptimizer, ledoit_wolf_covariance
+from calculators.monte_carlo import (
+    MonteCarloEngine, ReturnGenerator, GaussianReturns, BootstrapReturns, GarchReturns,
+    nearest_rank_percentiles
+)
+
 
 class RiskCalculator:
     """Calculate risk metrics and portfolio optimization"""
@@ -181,50 +186,98 @@ class RiskCalculator:
                                expected_return: float,
                                volatility: float,
                                days: int = 252,
-                               simulations: int = 10000) -> Dict:
+                               simulations: int = 10000,
+                               seed: Optional[int] = None,
+                               antithetic: bool = True,
+                               include_bands: bool = False,
+                               model: str = 'gaussian',
+                               returns: Optional[List[float]] = None) -> Dict:
         """
         Monte Carlo simulation for price projections
-        """
-        results = []
 
-        for _ in range(simulations):
-            prices = [current_price]
-            for _ in range(days):
-                random_return = random.gauss(expected_return / 252, volatility / math.sqrt(252))
-                new_price = prices[-1] * (1 + random_return)
-                prices.append(new_price)
+        Vectorized simulation over a pluggable daily return model. Terminal
+        prices need one draw per path for the Gaussian model; per-day
+        percentile bands are generated in memory-capped day blocks when
+        include_bands is set.
 
-            results.append(prices[-1])
+        Args:
+            model: 'gaussian' (GBM from expected_return/volatility),
+                'bootstrap' or 'garch' (both fitted on `returns`)
+            returns: Historical daily returns for the bootstrap/garch models
+        """
+        generator = self._return_generator(model, expected_return, volatility, returns)
+        engine = MonteCarloEngine(seed=seed, antithetic=antithetic)
 
-        # Calculate statistics
-        results.sort()
-        percentile_5 = results[int(0.05 * len(results))]
-        percentile_50 = results[int(0.50 * len(results))]
-        percentile_95 = results[int(0.95 * len(results))]
+        if include_bands:
+            bands, results = engine.percentile_bands(current_price, generator, days, simulations)
+        else:
+            results = engine.simulate_terminal(current_price, generator, days, simulations)
 
-        return {
+        # Calculate statistics (nearest-rank, like the bands, so the last band point matches)
+        percentile_5, percentile_50, percentile_95 = nearest_rank_percentiles(np.array(results), [5, 50, 95])
+
+        simulation = {
             'current_price': current_price,
-            'expected_price': round(percentile_50, 2),
-            'pessimistic': round(percentile_5, 2),
-            'optimistic': round(percentile_95, 2),
-            'expected_return': round((percentile_50 - current_price) / current_price * 100, 2),
-            'downside_risk': round((percentile_5 - current_price) / current_price * 100, 2),
-            'upside_potential': round((percentile_95 - current_price) / current_price * 100, 2),
+            'expected_price': round(float(percentile_50), 2),
+            'pessimistic': round(float(percentile_5), 2),
+            'optimistic': round(float(percentile_95), 2),
+            'expected_return': round(float((percentile_50 - current_price) / current_price * 100), 2),
+            'downside_risk': round(float((percentile_5 - current_price) / current_price * 100), 2),
+            'upside_potential': round(float((percentile_95 - current_price) / current_price * 100), 2),
+            'probability_positive': round(float(np.mean(results > current_price)), 3),
             'simulations': simulations,
-            'days_ahead': days
+            'days_ahead': days,
+            'model': generator.describe()
         }
 
+        if include_bands:
+            # Chart-ready: one point per trading day ahead
+            simulation['bands'] = {
+                'days': list(range(1, days + 1)),
+                **{key: np.round(values, 2).tolist() for key, values in bands.items()}
+            }
+
+        return simulation
+
+    @staticmethod
+    def _return_generator(model: str, expected_return: float, volatility: float,
+                          returns: Optional[List[float]]) -> ReturnGenerator:
+        """Build the daily return model for a simulation"""
+        if model == 'gaussian':
+            return GaussianReturns(expected_return, volatility)
+        if model not in ('bootstrap', 'garch'):
+            raise ValueError(f"Unknown Monte Carlo model '{model}'")
+        if returns is None:
+            raise ValueError(f"Monte Carlo model '{model}' needs historical returns")
+        if model == 'bootstrap':
+            return BootstrapReturns(returns)
+        return GarchReturns.from_returns(returns)
+
     def portfolio_optimization(self,
                               assets: List[Dict],
-                              target_return: Optional[float] = None) -> Dict:
+                              target_return: Optional[float] = None,
+                              method: Optional[str] = None,
+                              covariance: Optional[List[List[float]]] = None,
+                              long_only: bool = True,
+                              frontier_points: int = 0) -> Dict:
         """
         Modern Portfolio Theory - Efficient Frontier
-        Optimize asset allocation for risk/return
+        Optimize asset allocation for risk/return over the full covariance matrix
 
         assets = [
             {'symbol': 'AAPL', 'expected_return': 0.15, 'volatility': 0.25, 'weight': 0.3},
             ...
         ]
+
+        Args:
+            target_return: Annual return to reach at minimum volatility
+            method: 'equal_weight' (default without a target), 'target_return',
+                'min_variance', 'max_sharpe' or 'risk_parity'
+            covariance: Annualized covariance matrix. If omitted it is estimated
+                with Ledoit-Wolf shrinkage from each asset's daily 'returns'
+                history when present, otherwise assets are taken as uncorrelated.
+            long_only: Disallow short positions
+            frontier_points: Include this many efficient frontier points
         """
         if not assets:
             return {'error': 'No assets provided'}
@@ -233,37 +286,59 @@ class RiskCalculator:
         returns = [a['expected_return'] for a in assets]
         volatilities = [a['volatility'] for a in assets]
         symbols = [a['symbol'] for a in assets]
-
-        # Simple equal-weight if no target
-        if target_return is None:
-            weights = [1 / len(assets) for _ in assets]
+        method = method or ('target_return' if target_return is not None else 'equal_weight')
+
+        optimizer = PortfolioOptimizer(returns, self._covariance_matrix(assets, covariance))
+
+        if method == 'equal_weight':
+            weights = np.full(len(assets), 1 / len(assets))
+        elif method == 'target_return':
+            if target_return is None:
+                return {'error': 'target_return is required for the target_return method'}
+            weights = self._optimize_weights(optimizer, target_return, long_only)
+        elif method == 'min_variance':
+            weights = optimizer.min_variance(long_only)
+        elif method == 'max_sharpe':
+            weights = optimizer.max_sharpe(long_only=long_only)
+        elif method == 'risk_parity':
+            weights = optimizer.risk_parity()
         else:
-            # Optimize for target return
-            weights = self._optimize_weights(returns, volatilities, target_return)
+            return {'error': f"Unknown optimization method '{method}'"}
 
         # Calculate portfolio metrics
-        portfolio_return = sum(r * w for r, w in zip(returns, weights))
-        portfolio_volatility = self._portfolio_volatility(weights, volatilities)
+        portfolio_return = float(weights @ optimizer.mu)
+        portfolio_volatility = self._portfolio_volatility(weights, volatilities, optimizer.cov)
 
         sharpe = (portfolio_return - 0.02) / portfolio_volatility if portfolio_volatility > 0 else 0
 
         allocations = [
             {
                 'symbol': symbols[i],
-                'weight': round(weights[i] * 100, 2),
-                'expected_contribution': round(returns[i] * weights[i] * 100, 2)
+                'weight': round(float(weights[i]) * 100, 2),
+                'expected_contribution': round(returns[i] * float(weights[i]) * 100, 2)
             }
             for i in range(len(assets))
         ]
 
-        return {
+        result = {
+            'method': method,
             'allocations': allocations,
             'expected_return': round(portfolio_return * 100, 2),
             'expected_volatility': round(portfolio_volatility * 100, 2),
             'sharpe_ratio': round(sharpe, 2),
-            'diversification_score': self._diversification_score(weights)
+            'diversification_score': self._diversification_score(weights.tolist())
         }
 
+        if frontier_points:
+            frontier = optimizer.efficient_frontier(frontier_points, long_only)
+            result['efficient_frontier'] = [
+                {'expected_return': round(float(r) * 100, 2), 'volatility': round(float(v) * 100, 2),
+                 'sharpe_ratio': round(float(sr), 2)}
+                for r, v, sr in zip(frontier['return'], frontier['volatility'], frontier['sharpe'])
+            ]
+
+        return result
+
     def correlation_analysis(self,
                             returns_a: List[float],
                             returns_b: List[float]) -> Dict:
@@ -316,25 +391,33 @@ class RiskCalculator:
         return math.sqrt(variance)
 
     def _optimize_weights(self,
-                         returns: List[float],
-                         volatilities: List[float],
-                         target_return: float) -> List[float]:
-        """Simple optimization for target return"""
-        # Simplified: weight by return/risk ratio
-        ratios = [r / v if v > 0 else 0 for r, v in zip(returns, volatilities)]
-        total_ratio = sum(ratios)
-
-        if total_ratio == 0:
-            return [1 / len(returns) for _ in returns]
-
-        weights = [r / total_ratio for r in ratios]
-
-        return weights
-
-    def _portfolio_volatility(self, weights: List[float], volatilities: List[float]) -> float:
-        """Calculate portfolio volatility (simplified)"""
-        # Simplified: weighted average (ignoring correlations for now)
-        return sum(w * v for w, v in zip(weights, volatilities))
+                         optimizer: PortfolioOptimizer,
+                         target_return: float,
+                         long_only: bool = True) -> np.ndarray:
+        """Minimum-volatility weights reaching the target return"""
+        return optimizer.target_return(target_return, long_only=long_only)
+
+    def _portfolio_volatility(self, weights: List[float], volatilities: List[float],
+                              covariance: Optional[np.ndarray] = None) -> float:
+        """Calculate portfolio volatility sqrt(w'Cw)"""
+        w = np.asarray(weights, dtype=np.float64)
+        if covariance is None:
+            covariance = np.diag(np.asarray(volatilities, dtype=np.float64) ** 2)
+        return float(np.sqrt(max(w @ covariance @ w, 0.0)))
+
+    def _covariance_matrix(self, assets: List[Dict],
+                           covariance: Optional[List[List[float]]] = None) -> np.ndarray:
+        """Annualized covariance: given, estimated from return histories, or diagonal"""
+        if covariance is not None:
+            return np.asarray(covariance, dtype=np.float64)
+
+        histories = [a.get('returns') for a in assets]
+        lengths = {len(h) for h in histories if h is not None}
+        if all(h is not None for h in histories) and len(lengths) == 1 and lengths.pop() > 2:
+            cov, _ = ledoit_wolf_covariance(np.column_stack(histories))
+            return cov * 252
+
+        return np.diag(np.asarray([a['volatility'] for a in assets], dtype=np.float64) ** 2)
 
     def _diversification_score(self, weights: List[float]) -> float:
         """Calculate diversification score (1-10)"""
@@ -346,7 +429,8 @@ class RiskCalculator:
 
         return round(score, 2)
 
-    def risk_parity_allocation(self, assets: List[Dict]) -> Dict:
+    def risk_parity_allocation(self, assets: List[Dict],
+                               covariance: Optional[List[List[float]]] = None) -> Dict:
         """
         Ray Dalio's Risk Parity Strategy
         Equal risk contribution from each asset
@@ -354,18 +438,18 @@ class RiskCalculator:
         volatilities = [a['volatility'] for a in assets]
         symbols = [a['symbol'] for a in assets]
 
-        # Weight inversely proportional to volatility
-        inv_vols = [1 / v if v > 0 else 0 for v in volatilities]
-        total = sum(inv_vols)
-
-        weights = [iv / total if total > 0 else 1 / len(assets) for iv in inv_vols]
+        # Equal risk contribution over the full covariance (inverse volatility when uncorrelated)
+        optimizer = PortfolioOptimizer([a.get('expected_return', 0.0) for a in assets],
+                                       self._covariance_matrix(assets, covariance))
+        weights = optimizer.risk_parity().tolist()
+        contributions = optimizer.risk_contributions(np.asarray(weights))
 
         allocations = [
             {
                 'symbol': symbols[i],
                 'weight': round(weights[i] * 100, 2),
                 'volatility': round(volatilities[i] * 100, 2),
-                'risk_contribution': round(weights[i] * volatilities[i] * 100, 2)
+                'risk_contribution': round(float(contributions[i]) * 100, 2)
             }
             for i in range(len(assets))
         ]
@@ -0,0 +1,237 @@
+"""
+Streaming Indicator State
+Incremental RSI, MACD, EMA, ATR, OBV and Bollinger Bands for live updates
+
+The state is seeded once from history with the vectorized kernels of the
+indicator library and afterwards folds in one bar at a time with O(1) work,
+so live ticks never rebuild the full indicator arrays. Values match
+TechnicalCalculator on the same bars.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Deque
+import math
+
+import numpy as np
+
+from calculators.indicator_library import ArrayLike, ema_series, wilder_series, true_range
+
+
+@dataclass
+class _EMAState:
+    """Running exponential average"""
+    period: int
+    value: float
+    alpha: float = 0.0
+
+    def __post_init__(self):
+        self.alpha = 2 / (self.period + 1)
+
+    def step(self, x: float) -> float:
+        return (x - self.value) * self.alpha + self.value
+
+
+@dataclass
+class StreamingIndicators:
+    """
+    O(1) indicator state for one symbol
+
+    Use `from_history` to seed, `update` for each completed bar and
+    `snapshot(price=...)` to read values with an in-progress tick folded in
+    without committing it.
+    """
+
+    symbol: str
+    last_close: float
+    ema_fast: _EMAState
+    ema_slow: _EMAState
+    macd_signal: _EMAState
+    rsi_period: int
+    avg_gain: float
+    avg_loss: float
+    atr_period: int
+    atr: float
+    obv: float
+    bb_period: int
+    bb_std: float
+    window: Deque[float] = field(default_factory=deque)
+    window_sum: float = 0.0
+    window_sumsq: float = 0.0
+    bars: int = 0
+    last_timestamp: Optional[np.datetime64] = None
+
+    # Fewest bars that seed every indicator
+    @staticmethod
+    def min_bars(slow_period: int = 26, signal_period: int = 9,
+                 rsi_period: int = 14, atr_period: int = 14, bb_period: int = 20) -> int:
+        return max(slow_period + signal_period - 1, rsi_period + 1, atr_period + 1, bb_period)
+
+    @classmethod
+    def from_history(cls, symbol: str, highs: ArrayLike, lows: ArrayLike,
+                     closes: ArrayLike, volumes: ArrayLike,
+                     fast_period: int = 12, slow_period: int = 26, signal_period: int = 9,
+                     rsi_period: int = 14, atr_period: int = 14,
+                     bb_period: int = 20, bb_std: float = 2.0,
+                     last_timestamp: Optional[np.datetime64] = None) -> 'StreamingIndicators':
+        """
+        Seed state from completed bars with the vectorized kernels
+
+        Raises:
+            ValueError: If there are fewer bars than `min_bars()`
+        """
+        c = np.asarray(closes, dtype=np.float64)
+        v = np.asarray(volumes, dtype=np.float64)
+        needed = cls.min_bars(slow_period, signal_period, rsi_period, atr_period, bb_period)
+        if len(c) < needed:
+            raise ValueError(f"{symbol}: need {needed} bars to seed indicators, got {len(c)}")
+
+        ema_fast = ema_series(c, fast_period)
+        ema_slow = ema_series(c, slow_period)
+        macd_line = ema_fast[len(ema_fast) - len(ema_slow):] - ema_slow
+        signal_line = ema_series(macd_line, signal_period)
+
+        changes = np.diff(c)
+        avg_gain = wilder_series(np.where(changes > 0, changes, 0.0), rsi_period)[-1]
+        avg_loss = wilder_series(np.where(changes < 0, -changes, 0.0), rsi_period)[-1]
+        atr = wilder_series(true_range(highs, lows, c), atr_period)[-1]
+
+        # OBV starts from the first bar's volume (ChartAnalyticsAgent convention)
+        obv = v[0] + np.sum(np.sign(changes) * v[1:])
+
+        window = c[-bb_period:]
+        return cls(
+            symbol=symbol,
+            last_close=float(c[-1]),
+            ema_fast=_EMAState(fast_period, float(ema_fast[-1])),
+            ema_slow=_EMAState(slow_period, float(ema_slow[-1])),
+            macd_signal=_EMAState(signal_period, float(signal_line[-1])),
+            rsi_period=rsi_period,
+            avg_gain=float(avg_gain),
+            avg_loss=float(avg_loss),
+            atr_period=atr_period,
+            atr=float(atr),
+            obv=float(obv),
+            bb_period=bb_period,
+            bb_std=bb_std,
+            window=deque(window.tolist(), maxlen=bb_period),
+            window_sum=float(window.sum()),
+            window_sumsq=float(np.dot(window, window)),
+            bars=len(c),
+            last_timestamp=last_timestamp
+        )
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None,
+               volume: float = 0.0, timestamp: Optional[np.datetime64] = None) -> Dict[str, float]:
+        """Fold in one completed bar and return the new values"""
+        values = self._step(close, high, low, volume)
+        (self.ema_fast.value, self.ema_slow.value, self.macd_signal.value,
+         self.avg_gain, self.avg_loss, self.atr, self.obv) = values['_state']
+
+        self.window.append(close)
+        self.window_sum = values['window_sum']
+        self.window_sumsq = values['window_sumsq']
+        self.last_close = close
+        self.bars += 1
+        if self.bars % self.bb_period == 0:
+            # Resync running sums so add/subtract rounding cannot accumulate
+            self.window_sum = math.fsum(self.window)
+            self.window_sumsq = math.fsum(x * x for x in self.window)
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+        return self._format(values)
+
+    def snapshot(self, price: Optional[float] = None, high: Optional[float] = None,
+                 low: Optional[float] = None, volume: float = 0.0) -> Dict[str, float]:
+        """
+        Current indicator values
+
+        Args:
+            price: Live price of the in-progress bar. Folded in provisionally
+                (state is not modified); omit to read the committed values.
+            high/low/volume: In-progress bar extremes and volume, if known
+        """
+        if price is None:
+            return self._format(self._committed())
+        return self._format(self._step(price, high, low, volume))
+
+    def _step(self, close: float, high: Optional[float], low: Optional[float],
+              volume: float) -> Dict[str, float]:
+        """Values after one more bar, without mutating state"""
+        high = close if high is None else high
+        low = close if low is None else low
+        change = close - self.last_close
+
+        ema_fast = self.ema_fast.step(close)
+        ema_slow = self.ema_slow.step(close)
+        macd = ema_fast - ema_slow
+        signal = self.macd_signal.step(macd)
+
+        n = self.rsi_period
+        avg_gain = (self.avg_gain * (n - 1) + max(change, 0.0)) / n
+        avg_loss = (self.avg_loss * (n - 1) + max(-change, 0.0)) / n
+
+        tr = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+        atr = (self.atr * (self.atr_period - 1) + tr) / self.atr_period
+
+        obv = self.obv + (volume if change > 0 else -volume if change < 0 else 0.0)
+
+        oldest = self.window[0]
+        window_sum = self.window_sum + close - oldest
+        window_sumsq = self.window_sumsq + close * close - oldest * oldest
+
+        return {
+            'price': close,
+            'ema_fast': ema_fast,
+            'ema_slow': ema_slow,
+            'macd': macd,
+            'signal': signal,
+            'avg_gain': avg_gain,
+            'avg_loss': avg_loss,
+            'atr': atr,
+            'obv': obv,
+            'window_sum': window_sum,
+            'window_sumsq': window_sumsq,
+            '_state': (ema_fast, ema_slow, signal, avg_gain, avg_loss, atr, obv)
+        }
+
+    def _committed(self) -> Dict[str, float]:
+        return {
+            'price': self.last_close,
+            'ema_fast': self.ema_fast.value,
+            'ema_slow': self.ema_slow.value,
+            'macd': self.ema_fast.value - self.ema_slow.value,
+            'signal': self.macd_signal.value,
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'atr': self.atr,
+            'obv': self.obv,
+            'window_sum': self.window_sum,
+            'window_sumsq': self.window_sumsq
+        }
+
+    def _format(self, values: Dict[str, float]) -> Dict[str, float]:
+        avg_loss = values['avg_loss']
+        rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + values['avg_gain'] / avg_loss)
+
+        mean = values['window_sum'] / self.bb_period
+        variance = max(values['window_sumsq'] / self.bb_period - mean * mean, 0.0)
+        band = math.sqrt(variance) * self.bb_std
+
+        return {
+            'symbol': self.symbol,
+            'price': round(values['price'], 2),
+            'rsi': round(rsi, 2),
+            'ema_fast': round(values['ema_fast'], 2),
+            'ema_slow': round(values['ema_slow'], 2),
+            'macd': round(values['macd'], 2),
+            'macd_signal': round(values['signal'], 2),
+            'macd_histogram': round(values['macd'] - values['signal'], 2),
+            'atr': round(values['atr'], 2),
+            'obv': float(values['obv']),
+            'bollinger_upper': round(mean + band, 2),
+            'bollinger_middle': round(mean, 2),
+            'bollinger_lower': round(mean - band, 2),
+            'bars': self.bars
+        }
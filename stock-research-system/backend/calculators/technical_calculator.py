@@ -2,67 +2,57 @@
 Technical Analysis Calculator
 Pure mathematical implementations of all technical indicators
 No external API dependencies - all calculations done locally
+
+Indicator math lives in calculators.indicator_library, shared with the chart,
+aggregator and backtesting paths. Methods accept lists, arrays or an
+OHLCVSeries; series results come from the shared indicator cache.
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Any
 import numpy as np
 from datetime import datetime, timedelta
 
+from calculators.indicator_library import (
+    ArrayLike, INDICATORS, get_indicator_library, is_ohlcv_series, rolling_extrema, true_range
+)
+
 
 class TechnicalCalculator:
     """Calculate technical indicators using pure mathematics"""
 
-    def calculate_sma(self, prices: List[float], period: int) -> List[float]:
-        """Simple Moving Average"""
-        if len(prices) < period:
-            return []
+    def _indicator(self, prices: Any, indicator: str, **params):
+        """Indicator series from the shared library (cached for OHLCVSeries input)"""
+        if is_ohlcv_series(prices):
+            return get_indicator_library().compute(prices, indicator, **params)
+        func, _ = INDICATORS[indicator]
+        return func(prices, **params)
 
-        sma = []
-        for i in range(period - 1, len(prices)):
-            window = prices[i - period + 1:i + 1]
-            sma.append(sum(window) / period)
+    @staticmethod
+    def _closes(prices: Any) -> np.ndarray:
+        return prices.close if is_ohlcv_series(prices) else np.asarray(prices, dtype=np.float64)
 
-        return sma
+    @staticmethod
+    def _last(values: np.ndarray) -> float:
+        """Last value of an aligned series, 0 while still warming up"""
+        value = float(values[-1]) if len(values) else 0.0
+        return 0.0 if np.isnan(value) else value
 
-    def calculate_ema(self, prices: List[float], period: int) -> List[float]:
-        """Exponential Moving Average"""
-        if len(prices) < period:
-            return []
-
-        multiplier = 2 / (period + 1)
-        ema = [sum(prices[:period]) / period]  # Start with SMA
-
-        for price in prices[period:]:
-            ema_value = (price - ema[-1]) * multiplier + ema[-1]
-            ema.append(ema_value)
+    def calculate_sma(self, prices: ArrayLike, period: int) -> List[float]:
+        """Simple Moving Average"""
+        values = self._indicator(prices, 'sma', period=period)
+        return values[period - 1:].tolist()
 
-        return ema
+    def calculate_ema(self, prices: ArrayLike, period: int) -> List[float]:
+        """Exponential Moving Average"""
+        values = self._indicator(prices, 'ema', period=period)
+        return values[period - 1:].tolist()
 
-    def calculate_rsi(self, prices: List[float], period: int = 14) -> Dict:
+    def calculate_rsi(self, prices: ArrayLike, period: int = 14) -> Dict:
         """Relative Strength Index"""
         if len(prices) < period + 1:
             return {'value': None, 'signal': 'neutral', 'interpretation': 'Insufficient data'}
 
-        # Calculate price changes
-        changes = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-
-        gains = [change if change > 0 else 0 for change in changes]
-        losses = [-change if change < 0 else 0 for change in changes]
-
-        # Calculate average gains and losses
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-
-        # Calculate RSI for the period
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-        if avg_loss == 0:
-            rsi_value = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi_value = 100 - (100 / (1 + rs))
+        rsi_value = float(self._indicator(prices, 'rsi', period=period)[-1])
 
         # Determine signal
         if rsi_value > 70:
@@ -82,7 +72,7 @@ class TechnicalCalculator:
             'date': datetime.now().isoformat()
         }
 
-    def calculate_macd(self, prices: List[float],
+    def calculate_macd(self, prices: ArrayLike,
                        fast_period: int = 12,
                        slow_period: int = 26,
                        signal_period: int = 9) -> Dict:
@@ -95,29 +85,14 @@ class TechnicalCalculator:
                 'trend': 'neutral'
             }
 
-        # Calculate EMAs
-        ema_fast = self.calculate_ema(prices, fast_period)
-        ema_slow = self.calculate_ema(prices, slow_period)
-
-        # Align arrays
-        offset = len(ema_fast) - len(ema_slow)
-        if offset > 0:
-            ema_fast = ema_fast[offset:]
-
-        # Calculate MACD line
-        macd_line = [ema_fast[i] - ema_slow[i] for i in range(len(ema_slow))]
+        macd_line, signal_line, histogram = self._indicator(
+            prices, 'macd', fast_period=fast_period, slow_period=slow_period, signal_period=signal_period
+        )
 
-        # Calculate signal line
-        signal_line = self.calculate_ema(macd_line, signal_period)
-
-        # Calculate histogram
-        offset = len(macd_line) - len(signal_line)
-        histogram = [macd_line[i + offset] - signal_line[i] for i in range(len(signal_line))]
-
-        # Determine trend
-        current_macd = macd_line[-1] if macd_line else 0
-        current_signal = signal_line[-1] if signal_line else 0
-        current_hist = histogram[-1] if histogram else 0
+        # Determine trend (signal line is still warming up on short histories)
+        current_macd = self._last(macd_line)
+        current_signal = self._last(signal_line)
+        current_hist = self._last(histogram)
 
         if current_macd > current_signal and current_hist > 0:
             trend = 'bullish'
@@ -133,31 +108,19 @@ class TechnicalCalculator:
             'trend': trend
         }
 
-    def calculate_bollinger_bands(self, prices: List[float],
+    def calculate_bollinger_bands(self, prices: ArrayLike,
                                   period: int = 20,
                                   std_dev: float = 2.0) -> Dict:
         """Bollinger Bands"""
         if len(prices) < period:
             return {'upper': None, 'middle': None, 'lower': None}
 
-        sma = self.calculate_sma(prices, period)
-
-        # Calculate standard deviation
-        std_devs = []
-        for i in range(period - 1, len(prices)):
-            window = prices[i - period + 1:i + 1]
-            mean = sum(window) / period
-            variance = sum((x - mean) ** 2 for x in window) / period
-            std_devs.append(variance ** 0.5)
+        upper_band, sma, lower_band = self._indicator(prices, 'bollinger_bands', period=period, std_dev=std_dev)
 
-        # Calculate bands
-        upper_band = [sma[i] + (std_devs[i] * std_dev) for i in range(len(sma))]
-        lower_band = [sma[i] - (std_devs[i] * std_dev) for i in range(len(sma))]
-
-        current_price = prices[-1]
-        current_upper = upper_band[-1]
-        current_middle = sma[-1]
-        current_lower = lower_band[-1]
+        current_price = float(self._closes(prices)[-1])
+        current_upper = float(upper_band[-1])
+        current_middle = float(sma[-1])
+        current_lower = float(lower_band[-1])
 
         # Position analysis
         if current_price > current_upper:
@@ -179,22 +142,14 @@ class TechnicalCalculator:
             'signal': signal
         }
 
-    def detect_golden_cross(self, prices: List[float]) -> Dict:
+    def detect_golden_cross(self, prices: ArrayLike) -> Dict:
         """Detect Golden Cross (SMA50 crosses above SMA200)"""
-        if len(prices) < 200:
+        # A cross needs two SMA200 values, i.e. at least 201 bars
+        if len(prices) < 201:
             return {'detected': False, 'signal': None}
 
-        sma_50 = self.calculate_sma(prices, 50)
-        sma_200 = self.calculate_sma(prices, 200)
-
-        # Align arrays
-        offset = len(sma_50) - len(sma_200)
-        if offset > 0:
-            sma_50 = sma_50[offset:]
-
-        # Check for cross
-        if len(sma_50) < 2 or len(sma_200) < 2:
-            return {'detected': False, 'signal': None}
+        sma_50 = self._indicator(prices, 'sma', period=50)[-2:].tolist()
+        sma_200 = self._indicator(prices, 'sma', period=200)[-2:].tolist()
 
         current_50 = sma_50[-1]
         previous_50 = sma_50[-2]
@@ -229,24 +184,21 @@ class TechnicalCalculator:
                 'sma_200': round(current_200, 2)
             }
 
-    def calculate_support_resistance(self, prices: List[float],
+    def calculate_support_resistance(self, prices: ArrayLike,
                                      window: int = 20) -> Dict:
         """Calculate support and resistance levels"""
         if len(prices) < window:
             return {'support': [], 'resistance': []}
 
         # Find local minima (support) and maxima (resistance)
-        support_levels = []
-        resistance_levels = []
-
-        for i in range(window, len(prices) - window):
-            # Check if local minimum
-            if prices[i] == min(prices[i-window:i+window+1]):
-                support_levels.append(prices[i])
-
-            # Check if local maximum
-            if prices[i] == max(prices[i-window:i+window+1]):
-                resistance_levels.append(prices[i])
+        x = self._closes(prices)
+        if len(x) < 2 * window + 1:
+            support_levels, resistance_levels = [], []
+        else:
+            window_min, window_max = rolling_extrema(x, 2 * window + 1)
+            centers = x[window:len(x) - window]
+            support_levels = centers[centers == window_min].tolist()
+            resistance_levels = centers[centers == window_max].tolist()
 
         # Cluster nearby levels
         support_levels = self._cluster_levels(support_levels)
@@ -281,27 +233,21 @@ class TechnicalCalculator:
 
         return clustered
 
-    def calculate_atr(self, highs: List[float], lows: List[float],
-                     closes: List[float], period: int = 14) -> float:
+    def calculate_atr(self, highs: ArrayLike, lows: ArrayLike,
+                     closes: ArrayLike, period: int = 14) -> float:
         """Average True Range - volatility indicator"""
         if len(highs) < period or len(lows) < period or len(closes) < period:
             return None
 
-        true_ranges = []
-        for i in range(1, len(highs)):
-            high_low = highs[i] - lows[i]
-            high_close = abs(highs[i] - closes[i-1])
-            low_close = abs(lows[i] - closes[i-1])
-            true_ranges.append(max(high_low, high_close, low_close))
+        if len(closes) <= period:
+            # Seed is averaged over the full period even when one bar short
+            return round(float(true_range(highs, lows, closes).sum() / period), 2)
 
-        # Calculate ATR
-        atr = sum(true_ranges[:period]) / period
-        for i in range(period, len(true_ranges)):
-            atr = (atr * (period - 1) + true_ranges[i]) / period
+        atr = INDICATORS['atr'][0](highs, lows, closes, period=period)[-1]
 
-        return round(atr, 2)
+        return round(float(atr), 2)
 
-    def analyze_volume(self, volumes: List[float], prices: List[float]) -> Dict:
+    def analyze_volume(self, volumes: ArrayLike, prices: ArrayLike) -> Dict:
         """Volume analysis"""
         if len(volumes) < 20 or len(prices) < 20:
             return {'trend': 'neutral', 'signal': 'insufficient_data'}
@@ -2,10 +2,11 @@
 
 import os
 import asyncio
+import functools
 import uuid
 import json
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, status
@@ -28,8 +29,16 @@ from api.portfolio_endpoints import router as portfolio_router
 from api.optimization_endpoints import router as optimization_router
 from api.sse_endpoints import router as sse_router
 from api.bigquery_endpoints import router as bigquery_router
+from api.screener_endpoints import router as screener_router
 from services.export_service import export_service
+from services.market_data_adapter import get_market_data_adapter
+from services.batch_quote_service import get_batch_quote_service
+from services.indicator_stream_service import get_indicator_stream_service
+from services.pattern_screener_service import get_pattern_screener
+from services.model_cache import get_model_cache
 from services.bigquery_integration import get_bigquery_integration
+from services.analysis_coalescer import get_analysis_coalescer
+from services.analysis_job_queue import get_analysis_job_queue, QueueFullError
 
 # Import AI enhancement components
 from ai import initialize_ai_system, AISystem, TaskType
@@ -106,6 +115,7 @@ class AnalysisStatus(BaseModel):
     current_phase: Optional[str]
     elapsed_time: Optional[float]
     estimated_remaining: Optional[float]
+    queue_position: Optional[int] = None
 
 
 class AnalysisResult(BaseModel):
@@ -243,10 +253,19 @@ async def lifespan(app: FastAPI):
     tavily_service = TavilyMarketService(api_key=TAVILY_API_KEY)
     logger.info("Tavily service initialized for real-time market data")
 
+    # Track event-loop blocking so synchronous calls on the loop show up in metrics
+    market_data_adapter = get_market_data_adapter()
+    market_data_adapter.start_loop_monitor()
+
     yield
 
     # Shutdown
     logger.info("Shutting down Stock Research System API...")
+    await get_analysis_job_queue().shutdown()
+    await market_data_adapter.stop_loop_monitor()
+    market_data_adapter.shutdown()
+    get_pattern_screener().shutdown()
+    get_model_cache().shutdown()
     mongodb_connection.close_connections()
 
 
@@ -297,6 +316,7 @@ app.include_router(portfolio_router)
 app.include_router(optimization_router)
 app.include_router(sse_router)  # Server-Sent Events for real-time progress
 app.include_router(bigquery_router)  # BigQuery data lake endpoints
+app.include_router(screener_router)  # Batch pattern screener
 
 # Include analyses endpoints
 from api.analyses_endpoints import router as analyses_router
@@ -436,6 +456,32 @@ async def get_rate_limit_status():
         }
 
 
+@app.get("/api/v1/system/market-data")
+async def get_market_data_metrics():
+    """Get market data adapter metrics, including how long the event loop was blocked."""
+    from services.market_data_store import get_market_data_store
+    from calculators.indicator_library import get_indicator_library
+
+    return {
+        "status": "ok",
+        "timestamp": datetime.utcnow().isoformat(),
+        "adapter": get_market_data_adapter().get_metrics(),
+        "history_store": get_market_data_store().get_stats(),
+        "indicator_streams": get_indicator_stream_service().get_stats(),
+        "indicator_cache": get_indicator_library().get_stats()
+    }
+
+
+@app.get("/api/v1/system/analysis-queue")
+async def get_analysis_queue_status():
+    """Get analysis job queue statistics (waiting and running workflows)."""
+    return {
+        "status": "ok",
+        "timestamp": datetime.utcnow().isoformat(),
+        "queue": get_analysis_job_queue().get_stats()
+    }
+
+
 @app.post("/api/v1/analyze", response_model=AnalysisResponse)
 async def start_analysis(request: AnalysisRequest):
     """Start a new stock analysis.
@@ -443,12 +489,32 @@ async def start_analysis(request: AnalysisRequest):
     Args:
         request: Analysis request with query and configuration
 
+    Identical requests (same symbols, depth and market-data freshness bucket,
+    within the reuse window) share one run: the response points to the
+    in-flight or recently completed analysis.
+    New analyses wait in the bounded analysis job queue (429 with Retry-After
+    when it is full).
+
     Returns:
         Analysis response with ID and status
     """
     try:
+        coalescer = get_analysis_coalescer()
+        job_queue = get_analysis_job_queue()
+        symbols = request.symbols if request.symbols else extract_symbols_from_query(request.query)
+        key = coalescer.analysis_key(symbols, analysis_depth(request))
+
+        existing = coalescer.find(key) if key else None
+        if existing:
+            return await attach_to_analysis(existing, request)
+
+        if job_queue.is_full():
+            return queue_full_response(job_queue.retry_after())
+
         # Generate unique analysis ID
         analysis_id = str(uuid.uuid4())
+        if key:
+            coalescer.claim(key, analysis_id)
 
         # Save request to database
         analysis_doc = {
@@ -468,17 +534,41 @@ async def start_analysis(request: AnalysisRequest):
             }
         }
 
-        await database.analyses.insert_one(analysis_doc)
+        try:
+            await database.analyses.insert_one(analysis_doc)
+        except Exception:
+            if key:
+                coalescer.release(key)
+            raise
+
+        # Queue analysis for the worker pool
+        try:
+            done = job_queue.submit(
+                analysis_id,
+                functools.partial(run_analysis, analysis_id, request),
+                priority=request.priority,
+                user_id=request.user_id
+            )
+        except QueueFullError as e:
+            # Filled up while the document was inserted
+            if key:
+                coalescer.release(key)
+            await database.analyses.delete_one({"id": analysis_id})
+            return queue_full_response(e.retry_after)
 
-        # Start analysis in background
-        asyncio.create_task(run_analysis(analysis_id, request))
+        if key:
+            coalescer.run(key, analysis_id, done)
+
+        position = job_queue.position(analysis_id) or 0
+        starts_now = position <= job_queue.max_workers - job_queue.running_count()
+        wait = 0.0 if starts_now else job_queue.estimated_wait(position)
 
         return AnalysisResponse(
             analysis_id=analysis_id,
             status="pending",
-            message="Analysis started successfully",
-            estimated_completion=datetime.utcnow().isoformat(),
-            queue_position=1
+            message="Analysis started successfully" if starts_now else f"Analysis queued at position {position}",
+            estimated_completion=(datetime.utcnow() + timedelta(seconds=wait + job_queue.average_duration())).isoformat(),
+            queue_position=position
         )
 
     except Exception as e:
@@ -489,6 +579,64 @@ async def start_analysis(request: AnalysisRequest):
         )
 
 
+def queue_full_response(retry_after: int) -> JSONResponse:
+    """429 response for a full analysis queue"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "error": "analysis_queue_full",
+            "message": "Too many analyses in progress, please retry later",
+            "retry_after": retry_after
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def analysis_depth(request: AnalysisRequest) -> str:
+    """Analysis depth of a request, part of its coalescing key"""
+    included = [
+        name for name, enabled in (
+            ("fundamentals", request.include_fundamentals),
+            ("technical", request.include_technical),
+            ("sentiment", request.include_sentiment)
+        ) if enabled
+    ]
+    depth = "full" if len(included) == 3 else "+".join(included) or "minimal"
+    return f"{depth}_r{request.max_revisions}"
+
+
+async def attach_to_analysis(existing: Dict[str, Any], request: AnalysisRequest) -> AnalysisResponse:
+    """Answer a request with an identical in-flight or recent analysis
+
+    The request is recorded on the shared analysis document; its progress
+    (WebSocket and SSE) and result are those of the shared analysis ID.
+    """
+    analysis_id = existing["analysis_id"]
+    await database.analyses.update_one(
+        {"id": analysis_id},
+        {"$push": {"coalesced_requests": {
+            "query": request.query,
+            "user_id": request.user_id,
+            "requested_at": datetime.utcnow()
+        }}}
+    )
+
+    if existing["status"] == "in_flight":
+        logger.info(f"Request attached to in-flight analysis {analysis_id}")
+        message = "Identical analysis already running, attached to it"
+    else:
+        logger.info(f"Request served by analysis {analysis_id} ({existing['age_seconds']}s old)")
+        message = f"Served recent analysis completed {existing['age_seconds']:.0f}s ago"
+
+    return AnalysisResponse(
+        analysis_id=analysis_id,
+        status="processing" if existing["status"] == "in_flight" else "completed",
+        message=message,
+        estimated_completion=datetime.utcnow().isoformat(),
+        queue_position=None
+    )
+
+
 @app.get("/api/v1/analyze/{analysis_id}/status", response_model=AnalysisStatus)
 async def get_analysis_status(analysis_id: str):
     """Get the status of an analysis.
@@ -529,13 +677,21 @@ async def get_analysis_status(analysis_id: str):
                 "pending_agents": []
             }
 
+        # Waiting for a worker: report the queue position and expected wait
+        job_queue = get_analysis_job_queue()
+        queue_position = job_queue.position(analysis_id)
+        estimated_remaining = None
+        if queue_position:
+            estimated_remaining = job_queue.estimated_wait(queue_position) + job_queue.average_duration()
+
         return AnalysisStatus(
             analysis_id=analysis_id,
             status=analysis["status"],
             progress=progress,
-            current_phase=analysis.get("current_phase"),
+            current_phase="queued" if queue_position else analysis.get("current_phase"),
             elapsed_time=None,
-            estimated_remaining=None
+            estimated_remaining=estimated_remaining,
+            queue_position=queue_position
         )
 
     except HTTPException:
@@ -1500,25 +1656,27 @@ async def get_batch_stock_prices(symbols: str):
                 detail="No symbols provided"
             )
 
-        # Fetch all prices concurrently
-        results = {}
-        async def fetch_price(symbol: str):
-            try:
-                return symbol, await tavily_service.get_stock_price(symbol)
-            except Exception as e:
-                logger.error(f"Error fetching price for {symbol}: {e}")
-                return symbol, None
-
-        # Use asyncio.gather for concurrent fetching
-        import asyncio
-        price_tasks = [fetch_price(symbol) for symbol in symbol_list]
-        price_results = await asyncio.gather(*price_tasks)
-
-        for symbol, data in price_results:
-            if data:
-                results[symbol] = data
+        # One batched download for every uncached symbol, bounded by a latency budget
+        quote_service = get_batch_quote_service()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + quote_service.budget_seconds
+        batch = await quote_service.get_quotes(symbol_list)
+        # Batch quotes carry no market cap; it comes from cached full quotes, else None
+        prices = tavily_service.cache_stock_prices(batch['quotes'])
+
+        # Fold the live prices into the streaming indicators (seeding gets what is left of the budget)
+        indicators = await get_indicator_stream_service().get_many_indicators(
+            {symbol: (quote['price'], quote['volume']) for symbol, quote in prices.items()},
+            timeout=max(deadline - loop.time(), 0)
+        )
 
-        return {"prices": results, "symbols": symbol_list}
+        return {
+            "prices": prices,
+            "indicators": indicators,
+            "symbols": symbol_list,
+            "missing": batch['missing'],
+            "partial": batch['partial']
+        }
 
     except HTTPException:
         raise
@@ -1603,8 +1761,6 @@ async def get_top_stocks_analytics():
         }
     """
     try:
-        import yfinance as yf
-
         # S&P 500 top traded stocks
         sp500_symbols = [
             'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK-B',
@@ -1615,11 +1771,17 @@ async def get_top_stocks_analytics():
 
         stocks_data = []
 
-        # Fetch data for all symbols
-        for symbol in sp500_symbols:
+        # Fetch data for all symbols concurrently on the market data pool
+        adapter = get_market_data_adapter()
+        infos = await asyncio.gather(
+            *[adapter.get_info(symbol) for symbol in sp500_symbols],
+            return_exceptions=True
+        )
+
+        for symbol, info in zip(sp500_symbols, infos):
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+                if isinstance(info, Exception):
+                    raise info
 
                 current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
                 previous_close = info.get('previousClose', current_price)
@@ -1679,57 +1841,35 @@ async def get_tavily_metrics():
 
 
 @app.get("/api/v1/charts/{symbol}")
-async def get_chart_analytics(symbol: str):
-    """Get comprehensive chart analytics for expert traders.
+async def get_chart_analytics(symbol: str, sections: Optional[str] = None, max_points: Optional[int] = None):
+    """Get chart analytics for expert traders.
 
     Args:
         symbol: Stock ticker symbol
+        sections: Comma-separated sections to build. "summary" (patterns, levels,
+            volume profile, multi-timeframe, insights) plus any of price_charts,
+            indicator_charts, technical_overlays, pattern_history. Defaults to all.
+        max_points: Points per chart series; longer ranges are bucketed into
+            candles and thinned with LTTB (0 for full resolution)
 
     Returns:
-        Complete chart data with technical indicators, patterns, and insights
+        Requested sections; chart series under chart_data. Sections are memoized
+        per symbol and bar, so repeated requests only pay for serialization.
     """
-    try:
-        from agents.workers.chart_analytics_agent import ChartAnalyticsAgent
+    from agents.workers.chart_analytics_agent import ChartAnalyticsAgent, CHART_SECTIONS, SUMMARY_SECTIONS
 
-        # Initialize chart agent
-        llm = ChatOpenAI(
-            model="gpt-4",
-            api_key=OPENAI_API_KEY,
-            temperature=0.2
+    requested = [s.strip() for s in sections.split(",") if s.strip()] if sections else ['summary', *CHART_SECTIONS]
+    unknown = [s for s in requested if s not in ('summary', *SUMMARY_SECTIONS, *CHART_SECTIONS)]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown chart sections: {', '.join(unknown)}"
         )
-        chart_agent = ChartAnalyticsAgent(name="ChartAnalyticsAgent", llm=llm, database=database)
-
-        # Execute chart analysis
-        state = {"symbol": symbol.upper()}
-        result = await chart_agent.execute(state)
-
-        # Extract chart analytics data (agent returns nested structure)
-        analytics = result.get("chart_analytics", {})
-        if not analytics:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Chart analytics generation failed"
-            )
-
-        chart_data = analytics.get("chart_data", {})
-        pattern_analysis = analytics.get("pattern_analysis", {})
-        support_resistance = analytics.get("support_resistance", {})
-        volume_profile = analytics.get("volume_profile", {})
-        multi_timeframe = analytics.get("multi_timeframe", {})
-        expert_insights = analytics.get("expert_insights", {})
-
-        return {
-            "symbol": symbol.upper(),
-            "timestamp": datetime.utcnow().isoformat(),
-            "chart_data": chart_data,
-            "pattern_analysis": pattern_analysis,
-            "support_resistance": support_resistance,
-            "volume_profile": volume_profile,
-            "multi_timeframe": multi_timeframe,
-            "expert_insights": expert_insights,
-            "status": "success"
-        }
 
+    try:
+        analytics = await ChartAnalyticsAgent().get_sections(symbol.upper(), requested, max_points=max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting chart analytics for {symbol}: {e}")
         raise HTTPException(
@@ -1737,6 +1877,12 @@ async def get_chart_analytics(symbol: str):
             detail=f"Chart analytics failed: {str(e)}"
         )
 
+    return {
+        **analytics,
+        "timestamp": datetime.utcnow().isoformat(),
+        "status": "success"
+    }
+
 
 @app.get("/api/v1/signals/active")
 async def get_active_signals():
@@ -2046,12 +2192,15 @@ def extract_symbols_from_query(query: str) -> List[str]:
 
 
 # Background tasks
-async def run_analysis(analysis_id: str, request: AnalysisRequest):
+async def run_analysis(analysis_id: str, request: AnalysisRequest) -> bool:
     """Run analysis in background.
 
     Args:
         analysis_id: Unique analysis identifier
         request: Original analysis request
+
+    Returns:
+        True if the analysis completed (its result can be reused)
     """
     try:
         logger.info(f"Starting analysis {analysis_id}")
@@ -2102,18 +2251,14 @@ async def run_analysis(analysis_id: str, request: AnalysisRequest):
                 detail=f"Analysis workflow failed: {str(workflow_error)}"
             )
 
-        # Save result (use upsert to prevent duplicate key errors)
-        # Convert dataclasses to dicts for MongoDB serialization
+        # The workflow has already saved the result and may be merging late agent
+        # results into it, so it is not written again here (that would revert them)
+        # Convert dataclasses to dicts for the data lake
         serializable_result = convert_to_serializable(result)
         result_doc = {
             "analysis_id": analysis_id,
             **serializable_result
         }
-        await database.analysis_results.update_one(
-            {"analysis_id": analysis_id},
-            {"$set": result_doc},
-            upsert=True
-        )
 
         # Store in BigQuery data lake for long-term analytics
         try:
@@ -2148,6 +2293,7 @@ async def run_analysis(analysis_id: str, request: AnalysisRequest):
         )
 
         logger.info(f"Analysis {analysis_id} completed successfully")
+        return True
 
     except Exception as e:
         logger.error(f"Analysis {analysis_id} failed: {e}")
@@ -2173,6 +2319,7 @@ async def run_analysis(analysis_id: str, request: AnalysisRequest):
             },
             analysis_id
         )
+        return False
 
 
 if __name__ == "__main__":
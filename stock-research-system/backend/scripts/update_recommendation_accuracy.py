@@ -19,6 +19,7 @@ from typing import Dict, List
 import yfinance as yf
 from dotenv import load_dotenv
 
+from calculators.model_backtester import ModelBacktester, records_from_columns
 from services.bigquery_data_lake import get_bigquery_data_lake
 from services.bigquery_integration import get_bigquery_integration
 
@@ -86,6 +87,67 @@ async def fetch_price_returns(symbol: str, start_date: datetime, end_date: datet
         return {}
 
 
+def action_direction(action: str) -> str:
+    """Map a recommendation action (BUY, STRONG_SELL, HOLD...) to a predicted direction"""
+    action = (action or '').upper()
+    if 'BUY' in action:
+        return 'up'
+    if 'SELL' in action:
+        return 'down'
+    return 'neutral'
+
+
+async def evaluate_recommendation_history(data_lake, project_id: str, days: int = 365):
+    """
+    Re-evaluate every realized recommendation in one array pass
+
+    Rows are loaded as columns into a structured prediction array, then scored
+    with the model backtester (overall, out-of-sample and walk-forward).
+
+    Args:
+        data_lake: BigQuery data lake with a client
+        project_id: BigQuery project
+        days: History to evaluate
+    """
+    query = f"""
+    SELECT timestamp, action, confidence, actual_return_1d
+    FROM `{project_id}.stock_research.recommendations`
+    WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
+      AND actual_return_1d IS NOT NULL
+    ORDER BY timestamp
+    """
+
+    try:
+        rows = list(data_lake.client.query(query).result())
+        if not rows:
+            logger.info("No realized recommendations to evaluate")
+            return
+
+        records = records_from_columns(
+            direction=[action_direction(r.action) for r in rows],
+            confidence=[r.confidence if r.confidence is not None else 0.5 for r in rows],
+            actual_return=[r.actual_return_1d / 100 for r in rows],
+            timestamps=[r.timestamp for r in rows]
+        )
+
+        backtester = ModelBacktester()
+        result = backtester.backtest_predictions(records)
+        oos = backtester.out_of_sample_test(records)
+        walk_forward = backtester.walk_forward_analysis(result.predictions)
+        report = backtester.generate_backtest_report(result, walk_forward)
+
+        logger.info(f"=== Recommendation History ({len(records)} realized, last {days} days) ===")
+        for key, value in report['summary'].items():
+            logger.info(f"{key}: {value}")
+        logger.info(f"Grade: {report['performance_grade']}, "
+                    f"out-of-sample gap: {oos['overfitting_gap'] * 100:.1f}%")
+        if 'walk_forward' in report:
+            logger.info(f"Walk-forward: {report['walk_forward']}")
+
+    except Exception as e:
+        logger.error(f"Failed to evaluate recommendation history: {e}")
+
+
 async def update_recommendations(days_back: int = 30):
     """
     Update recommendation accuracy for the last N days
@@ -186,6 +248,8 @@ async def update_recommendations(days_back: int = 30):
         for action, stats in accuracy_stats.items():
             logger.info(f"{action}: {stats['accuracy']*100:.1f}% accuracy ({stats['count']} recommendations)")
 
+        await evaluate_recommendation_history(data_lake, project_id)
+
     except Exception as e:
         logger.error(f"Failed to update recommendations: {e}")
 
@@ -5,12 +5,41 @@ Uses MCP AlphaVantage tools for data retrieval
 """
 
 import logging
+import os
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import asyncio
 
+import pandas as pd
+
+from calculators.downsampling import downsample_candle_records
+from services.market_data_store import OHLCVSeries, period_rank, slice_period
+from services.ohlcv_disk_cache import get_ohlcv_disk_cache, StoredHistory
+
 logger = logging.getLogger(__name__)
 
+# Disk cache namespace: AlphaVantage bars are unadjusted, so they never share
+# files with the market data store's split/dividend-adjusted yfinance history
+DISK_CACHE_SOURCE = 'alphavantage'
+
+# AlphaVantage interval -> interval of the on-disk history
+STORE_INTERVALS = {
+    '1min': '1m',
+    '5min': '5m',
+    '15min': '15m',
+    '30min': '30m',
+    '60min': '60m',
+    'daily': '1d',
+    'weekly': '1wk',
+    'monthly': '1mo'
+}
+
+INTRADAY = ['1min', '5min', '15min', '30min', '60min']
+
+# Bars in a 'compact' response
+COMPACT_POINTS = 100
+
 
 class AlphaVantageChartService:
     """
@@ -35,11 +64,18 @@ class AlphaVantageChartService:
             '1M': 'monthly'
         }
 
+        # The free tier allows 25 calls a day: stored history younger than this is served without a call
+        self.refresh_seconds = float(os.getenv("ALPHAVANTAGE_REFRESH_SECONDS", "3600"))
+        # After a refresh that fails or returns nothing, stored history is served this long before retrying
+        self.retry_seconds = float(os.getenv("ALPHAVANTAGE_RETRY_SECONDS", "900"))
+        self.disk_cache = get_ohlcv_disk_cache()
+
     async def get_historical_data(
         self,
         symbol: str,
         timeframe: str = '1D',
-        outputsize: str = 'compact'
+        outputsize: str = 'compact',
+        max_points: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Fetch historical OHLCV data for given symbol and timeframe
@@ -48,6 +84,7 @@ class AlphaVantageChartService:
             symbol: Stock ticker (e.g., 'AAPL')
             timeframe: '1min', '5min', '15min', '30min', '1h', '1D', '1W', '1M'
             outputsize: 'compact' (100 points) or 'full' (20+ years for daily)
+            max_points: Aggregate consecutive candles so at most this many are returned
 
         Returns:
             {
@@ -68,30 +105,148 @@ class AlphaVantageChartService:
         """
         try:
             interval = self.timeframe_map.get(timeframe, '1D')
+            if interval not in STORE_INTERVALS:
+                raise ValueError(f"Unsupported timeframe: {timeframe}")
 
-            # Intraday data (1min - 60min)
-            if interval in ['1min', '5min', '15min', '30min', '60min']:
-                return await self._get_intraday_data(symbol, interval, outputsize)
-
-            # Daily data
-            elif interval == 'daily':
-                return await self._get_daily_data(symbol, outputsize)
-
-            # Weekly data
-            elif interval == 'weekly':
-                return await self._get_weekly_data(symbol)
-
-            # Monthly data
-            elif interval == 'monthly':
-                return await self._get_monthly_data(symbol)
-
+            # Stored history first, when it spans the requested outputsize
+            period = self._store_period(interval, outputsize)
+            stored = await asyncio.to_thread(self.disk_cache.read, symbol, STORE_INTERVALS[interval],
+                                             DISK_CACHE_SOURCE)
+            if stored is not None and period_rank(stored.period) < period_rank(period):
+                stored = None
+            now = time.time()
+            if stored is not None and (now - stored.fetched_at <= self.refresh_seconds or now < stored.retry_after):
+                result = self._stored_result(symbol, interval, outputsize, stored.series)
+            elif stored is not None:
+                result = await self._refresh_stored(symbol, interval, outputsize, stored)
             else:
-                raise ValueError(f"Unsupported timeframe: {timeframe}")
+                result = await self._fetch_history(symbol, interval, outputsize)
+                if result.get('data') and self.disk_cache.enabled:
+                    await asyncio.to_thread(self._store_records, symbol, interval, period, result['data'])
+
+            if max_points and len(result.get('data', [])) > max_points:
+                result['metadata']['original_points'] = len(result['data'])
+                result['data'] = downsample_candle_records(result['data'], max_points)
+                result['metadata']['downsampled'] = True
+            return result
 
         except Exception as e:
             logger.error(f"[{self.name}] Error fetching historical data for {symbol}: {e}")
             return self._error_result(f"Failed to fetch historical data: {str(e)}")
 
+    async def _fetch_history(self, symbol: str, interval: str, outputsize: str) -> Dict[str, Any]:
+        """Call the AlphaVantage time series API for the interval"""
+        # Intraday data (1min - 60min)
+        if interval in INTRADAY:
+            return await self._get_intraday_data(symbol, interval, outputsize)
+
+        # Daily data
+        elif interval == 'daily':
+            return await self._get_daily_data(symbol, outputsize)
+
+        # Weekly data
+        elif interval == 'weekly':
+            return await self._get_weekly_data(symbol)
+
+        # Monthly data
+        return await self._get_monthly_data(symbol)
+
+    def _stored_result(self, symbol: str, interval: str, outputsize: str, series: OHLCVSeries) -> Dict[str, Any]:
+        """Historical data response built from stored bars"""
+        if outputsize == 'compact':
+            series = series.tail(COMPACT_POINTS)
+        timestamps = pd.DatetimeIndex(series.dates).strftime(
+            '%Y-%m-%dT%H:%M:%S' if interval in INTRADAY else '%Y-%m-%d'
+        ).tolist()
+
+        return {
+            'symbol': symbol,
+            'timeframe': interval,
+            'outputsize': outputsize,
+            'data': [
+                {'timestamp': ts, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+                for ts, o, h, l, c, v in zip(timestamps, series.open.tolist(), series.high.tolist(),
+                                             series.low.tolist(), series.close.tolist(), series.volume.tolist())
+            ],
+            'metadata': {
+                'source': 'disk_cache',
+                'last_refreshed': datetime.now().isoformat()
+            }
+        }
+
+    async def _refresh_stored(
+        self,
+        symbol: str,
+        interval: str,
+        outputsize: str,
+        stored: StoredHistory
+    ) -> Dict[str, Any]:
+        """
+        Bring stale stored history up to date with a compact delta
+
+        A refresh that fails or returns nothing serves the stored range and
+        defers the next attempt by retry_seconds, so each request does not
+        spend another call of the daily budget.
+        """
+        delta = await self._fetch_history(symbol, interval, 'compact')
+        records = delta.get('data') or []
+        if not records:
+            return await self._defer_refresh(symbol, interval, outputsize, stored)
+
+        if pd.Timestamp(min(r['timestamp'] for r in records)) > pd.Timestamp(stored.series.dates[-1]):
+            # The compact window no longer reaches the stored bars; a delta would leave a gap
+            result = await self._fetch_history(symbol, interval, outputsize)
+            if not result.get('data'):
+                return await self._defer_refresh(symbol, interval, outputsize, stored)
+            if self.disk_cache.enabled:
+                await asyncio.to_thread(self._store_records, symbol, interval, stored.period, result['data'])
+            return result
+
+        if self.disk_cache.enabled:
+            # Only the bars after the stored ones are new; append instead of rewriting
+            stored = await asyncio.to_thread(self.disk_cache.append, stored, self._records_series(symbol, interval, records),
+                                             self._trim_to(stored.period))
+        return self._stored_result(symbol, interval, outputsize, stored.series)
+
+    async def _defer_refresh(
+        self,
+        symbol: str,
+        interval: str,
+        outputsize: str,
+        stored: StoredHistory
+    ) -> Dict[str, Any]:
+        """Serve stored history after a refresh brought nothing, retrying after retry_seconds"""
+        logger.warning(f"[{self.name}] Refresh of {symbol} {interval} returned no bars, "
+                       f"serving stored history for {self.retry_seconds:.0f}s")
+        stored = await asyncio.to_thread(self.disk_cache.defer, stored, self.retry_seconds)
+        return self._stored_result(symbol, interval, outputsize, stored.series)
+
+    @staticmethod
+    def _store_period(interval: str, outputsize: str) -> str:
+        """Range an outputsize covers, in market data store periods (compact counts as partial)"""
+        if interval in INTRADAY:
+            return '1mo' if outputsize == 'full' else '1d'
+        return 'max' if outputsize == 'full' or interval != 'daily' else '1d'
+
+    @staticmethod
+    def _trim_to(period: str):
+        """Trim keeping appended history within the range its stored period covers"""
+        if period == '1d':
+            # Compact history: only the latest compact response is ever served
+            return lambda series: series.tail(COMPACT_POINTS)
+        return lambda series: slice_period(series, period)
+
+    def _records_series(self, symbol: str, interval: str, records: List[Dict[str, Any]]) -> OHLCVSeries:
+        """Convert API candles to an OHLCV series"""
+        frame = pd.DataFrame(records)
+        frame.index = pd.to_datetime(frame.pop('timestamp'))
+        frame = frame.sort_index().rename(columns=str.capitalize)
+        return OHLCVSeries.from_dataframe(symbol.upper(), STORE_INTERVALS[interval], frame)
+
+    def _store_records(self, symbol: str, interval: str, period: str, records: List[Dict[str, Any]]):
+        """Write API candles as the AlphaVantage on-disk history"""
+        self.disk_cache.write(self._records_series(symbol, interval, records), period, DISK_CACHE_SOURCE)
+
     async def _get_intraday_data(
         self,
         symbol: str,
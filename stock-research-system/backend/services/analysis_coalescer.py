@@ -0,0 +1,139 @@
+"""
+Analysis Coalescer
+Singleflight layer in front of the analysis workflow
+
+Identical analysis requests - same normalized symbols, analysis depth and
+market-data freshness bucket - share one workflow run: a request arriving
+while an identical analysis is running attaches to it (and to its progress
+stream), and one arriving within the reuse window after it completed is
+served its result. The freshness bucket follows the market data store TTL, so
+a request made after the history it would read has been refreshed starts a
+new run instead of reusing one built on the older bars. State is per process,
+like the other in-memory caches.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Set
+
+from services.cache_service import CacheService
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCoalescer:
+    """
+    Deduplicates concurrent and recent identical analyses
+
+    Features:
+    - In-flight and completed runs keyed on (symbols, depth, freshness bucket)
+    - Completed runs reusable for reuse_minutes after they completed, within
+      the freshness bucket their request was made in
+    - Failed runs are not reused, expired results are evicted
+    """
+
+    def __init__(self, reuse_minutes: int = 5, freshness_seconds: int = 300):
+        self.reuse_minutes = reuse_minutes
+        self.freshness_seconds = freshness_seconds
+        self.results = CacheService(ttl_minutes=reuse_minutes)
+        self.in_flight: Dict[str, str] = {}  # key -> leading analysis ID
+        self._tasks: Set[asyncio.Task] = set()
+
+    def analysis_key(self, symbols: List[str], depth: str = "full") -> Optional[str]:
+        """
+        Key of an analysis request
+
+        Args:
+            symbols: Requested symbols (order kept: the first one leads comparisons)
+            depth: Analysis depth, e.g. "full" or the included analysis types
+
+        Returns:
+            Cache key with the current freshness bucket, or None when there
+            are no symbols to key on
+        """
+        normalized = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        if not normalized:
+            return None
+        bucket = int(time.time() // self.freshness_seconds) if self.freshness_seconds > 0 else 0
+        return f"{self.results.get_cache_key(','.join(normalized), depth)}_{bucket}"
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        In-flight or recent analysis for a key
+
+        Returns:
+            {'analysis_id', 'status': 'in_flight' | 'completed', 'age_seconds'} or None
+        """
+        if key in self.in_flight:
+            return {'analysis_id': self.in_flight[key], 'status': 'in_flight', 'age_seconds': None}
+
+        cached = self.results.get(key)
+        if cached:
+            age = time.time() - cached['completed_at']
+            if age <= self.reuse_minutes * 60:
+                return {'analysis_id': cached['analysis_id'], 'status': 'completed', 'age_seconds': round(age, 1)}
+        return None
+
+    def claim(self, key: str, analysis_id: str) -> None:
+        """Register analysis_id as the run for key (before any await, so later requests attach to it)"""
+        self.in_flight[key] = analysis_id
+
+    def release(self, key: str) -> None:
+        """Drop a claim whose run could not be started"""
+        self.in_flight.pop(key, None)
+
+    def run(self, key: str, analysis_id: str, analysis: Awaitable[bool]) -> asyncio.Task:
+        """
+        Run a claimed analysis in the background
+
+        Args:
+            key: Claimed key
+            analysis_id: Analysis ID that claimed the key
+            analysis: Awaitable running the analysis, True when it completed
+
+        Returns:
+            Background task
+        """
+        task = asyncio.create_task(self._run(key, analysis_id, analysis))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, key: str, analysis_id: str, analysis: Awaitable[bool]) -> bool:
+        try:
+            completed = await analysis
+        except asyncio.CancelledError:
+            # A cancelled run (e.g. its queue shutting down) is not reusable
+            if asyncio.current_task().cancelling():
+                raise
+            logger.info(f"[AnalysisCoalescer] Analysis {analysis_id} was cancelled")
+            completed = False
+        except Exception as e:
+            logger.warning(f"[AnalysisCoalescer] Analysis {analysis_id} failed: {e}")
+            completed = False
+        finally:
+            if self.in_flight.get(key) == analysis_id:
+                del self.in_flight[key]
+
+        if completed and self.reuse_minutes > 0:
+            self.results.set(key, {'analysis_id': analysis_id, 'completed_at': time.time()})
+        self.results.evict_expired()
+        return completed
+
+
+# Global analysis coalescer
+analysis_coalescer = None
+
+
+def get_analysis_coalescer() -> AnalysisCoalescer:
+    """Get or create the per-process analysis coalescer"""
+    global analysis_coalescer
+    if analysis_coalescer is None:
+        from services.market_data_store import get_market_data_store
+        analysis_coalescer = AnalysisCoalescer(
+            reuse_minutes=int(os.getenv("ANALYSIS_REUSE_WINDOW_MINUTES", "5")),
+            freshness_seconds=get_market_data_store().ttl_seconds
+        )
+    return analysis_coalescer
@@ -0,0 +1,209 @@
+"""
+Analysis Job Queue
+Bounded, prioritized queue of analysis workflow runs served by a fixed worker pool
+
+Each analysis workflow competes for LLM, Tavily and yfinance rate limits,
+memory and the event loop, so only max_workers run at once. Further requests
+wait in a bounded queue ordered by priority class (interactive before
+background re-analysis, FIFO within a class); when it is full, submissions are
+rejected with a Retry-After estimate. Jobs use the PollingService job model.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.polling_service import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Request priority -> class (lower runs first). "low" is background re-analysis
+PRIORITY_CLASSES = {'high': 0, 'normal': 1, 'low': 2}
+
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue cannot take another job"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AnalysisJobQueue:
+    """
+    Worker pool for analysis jobs
+
+    Features:
+    - Bounded queue (max_queued waiting jobs)
+    - max_workers concurrent workflow runs
+    - Priority classes, FIFO within a class
+    - Queue positions and Retry-After estimates from recent run durations
+    """
+
+    def __init__(self, max_workers: int = 4, max_queued: int = 50, default_duration: float = 60.0):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.default_duration = default_duration  # Assumed run time before any run finished
+
+        self.jobs: Dict[str, Job] = {}  # Queued and running jobs
+        self._waiting: List[Tuple[int, int, str]] = []  # Heap of (priority class, sequence, job ID)
+        self._runs: Dict[str, Tuple[Callable[[], Awaitable[Any]], asyncio.Future]] = {}
+        self._sequence = itertools.count()
+        self._ready = asyncio.Semaphore(0)  # Counts waiting jobs
+        self._workers: List[asyncio.Task] = []
+        self._durations = deque(maxlen=20)  # Recent run durations (seconds)
+
+    def submit(
+        self,
+        job_id: str,
+        run: Callable[[], Awaitable[Any]],
+        priority: str = 'normal',
+        user_id: Optional[str] = None,
+        metadata: Dict[str, Any] = None
+    ) -> asyncio.Future:
+        """
+        Queue a job
+
+        Args:
+            job_id: Job identifier (the analysis ID)
+            run: Coroutine function running the job
+            priority: Request priority: high, normal or low (background)
+            user_id: Requesting user
+            metadata: Optional job metadata
+
+        Returns:
+            Future resolving to run's result once a worker has run the job
+
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting
+        """
+        if self.is_full():
+            raise QueueFullError(self.retry_after())
+
+        self._ensure_workers()
+        priority_class = PRIORITY_CLASSES.get(priority, PRIORITY_CLASSES['normal'])
+        self.jobs[job_id] = Job(
+            job_id=job_id,
+            user_id=user_id or 'anonymous',
+            task_type='analysis',
+            payload={},
+            metadata={**(metadata or {}), 'priority': priority}
+        )
+        done = asyncio.get_running_loop().create_future()
+        self._runs[job_id] = (run, done)
+        heapq.heappush(self._waiting, (priority_class, next(self._sequence), job_id))
+        self._ready.release()
+
+        logger.info(f"[AnalysisJobQueue] Queued {job_id} ({priority}), position {self.position(job_id)} "
+                    f"of {len(self._waiting)}, {self.running_count()}/{self.max_workers} running")
+        return done
+
+    def is_full(self) -> bool:
+        """True when no further job can be queued"""
+        return len(self._waiting) >= self.max_queued
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position among waiting jobs, None if the job is not waiting"""
+        for index, (_, _, waiting_id) in enumerate(sorted(self._waiting), start=1):
+            if waiting_id == job_id:
+                return index
+        return None
+
+    def running_count(self) -> int:
+        """Jobs currently run by a worker"""
+        return sum(1 for job in self.jobs.values() if job.status == JobStatus.PROCESSING)
+
+    def average_duration(self) -> float:
+        """Average duration of recent runs (seconds)"""
+        return sum(self._durations) / len(self._durations) if self._durations else self.default_duration
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the job at a queue position is likely to start"""
+        return self.average_duration() * math.ceil(position / self.max_workers)
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait: until one of the workers likely frees a queue slot"""
+        return max(1, math.ceil(self.average_duration() / self.max_workers))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue statistics"""
+        return {
+            'queued': len(self._waiting),
+            'running': self.running_count(),
+            'max_workers': self.max_workers,
+            'max_queued': self.max_queued,
+            'recent_avg_duration': round(self.average_duration(), 2) if self._durations else None
+        }
+
+    async def shutdown(self):
+        """Stop the workers and cancel waiting jobs"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for run, done in self._runs.values():
+            done.cancel()
+        self._runs.clear()
+        self._waiting.clear()
+        self.jobs.clear()
+        self._ready = asyncio.Semaphore(0)
+
+    def _ensure_workers(self):
+        """Start the worker pool on first use (needs a running event loop)"""
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.max_workers:
+            self._workers.append(asyncio.create_task(self._worker(len(self._workers))))
+
+    async def _worker(self, index: int):
+        """Run waiting jobs one at a time, highest priority class first"""
+        while True:
+            await self._ready.acquire()
+            _, _, job_id = heapq.heappop(self._waiting)
+
+            job = self.jobs[job_id]
+            run, done = self._runs.pop(job_id)
+            job.status = JobStatus.PROCESSING
+            job.started_at = datetime.utcnow()
+            started = time.perf_counter()
+            logger.info(f"[AnalysisJobQueue] Worker {index} running {job_id} "
+                        f"(waited {(job.started_at - job.created_at).total_seconds():.1f}s)")
+
+            try:
+                result = await run()
+                job.status = JobStatus.COMPLETED
+                if not done.done():
+                    done.set_result(result)
+            except asyncio.CancelledError:
+                if not done.done():
+                    done.cancel()
+                raise
+            except Exception as e:
+                job.status, job.error = JobStatus.FAILED, str(e)
+                logger.error(f"[AnalysisJobQueue] Job {job_id} failed: {e}", exc_info=True)
+                if not done.done():
+                    done.set_exception(e)
+            finally:
+                self._durations.append(time.perf_counter() - started)
+                self.jobs.pop(job_id, None)
+
+
+# Global analysis job queue
+analysis_job_queue = None
+
+
+def get_analysis_job_queue() -> AnalysisJobQueue:
+    """Get or create the per-process analysis job queue"""
+    global analysis_job_queue
+    if analysis_job_queue is None:
+        analysis_job_queue = AnalysisJobQueue(
+            max_workers=int(os.getenv("ANALYSIS_WORKERS", "4")),
+            max_queued=int(os.getenv("ANALYSIS_QUEUE_SIZE", "50"))
+        )
+    return analysis_job_queue
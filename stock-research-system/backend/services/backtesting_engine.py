@@ -3,13 +3,22 @@ Backtesting Engine (Phase 4)
 Test AI recommendations against historical data to validate strategy effectiveness
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-import yfinance as yf
+
+from services.market_data_store import get_market_data_store
+from utils.process_pool import new_process_pool
+from calculators.indicator_library import get_indicator_library, sma, rsi
+from calculators.backtest_core import (
+    DEFAULT_STRATEGY, crossover_signals, positions_from_signals, simulate_trades, trade_metrics,
+    expand_grid, grid_signals, evaluate_signal_columns, universe_backtest, max_drawdown as curve_max_drawdown
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +44,10 @@ class BacktestingEngine:
     Validates recommendation accuracy and risk-adjusted returns
     """
 
-    def __init__(self):
+    def __init__(self, process_pool_threshold: int = 2000, sweep_block_size: int = 500):
         self.results_cache = {}
+        self.process_pool_threshold = process_pool_threshold
+        self.sweep_block_size = sweep_block_size
 
     async def backtest_strategy(
         self,
@@ -83,16 +94,18 @@ class BacktestingEngine:
     ) -> Optional[pd.DataFrame]:
         """Download historical price data"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(start=start_date, end=end_date)
+            series = await get_market_data_store().get_range(symbol, start_date, end_date)
 
-            if data.empty:
+            if series.empty:
                 return None
 
-            # Add technical indicators
-            data['SMA_20'] = data['Close'].rolling(window=20).mean()
-            data['SMA_50'] = data['Close'].rolling(window=50).mean()
-            data['RSI'] = self._calculate_rsi(data['Close'])
+            data = series.to_dataframe()
+
+            # Add technical indicators (shared, cached per series)
+            library = get_indicator_library()
+            data['SMA_20'] = library.compute(series, 'sma', period=20)
+            data['SMA_50'] = library.compute(series, 'sma', period=50)
+            data['RSI'] = library.compute(series, 'rsi', period=14)
             data['Volatility'] = data['Close'].pct_change().rolling(window=20).std()
 
             return data
@@ -112,30 +125,29 @@ class BacktestingEngine:
         Default strategy:
         - BUY when SMA_20 crosses above SMA_50 and RSI < 70
         - SELL when SMA_20 crosses below SMA_50 or RSI > 80
-        """
-        signals = pd.DataFrame(index=data.index)
-        signals['signal'] = 0
-
-        confidence_threshold = params.get('confidence_threshold', 0.7)
 
-        for i in range(1, len(data)):
-            # Golden Cross (BUY signal)
-            if (data['SMA_20'].iloc[i] > data['SMA_50'].iloc[i] and
-                data['SMA_20'].iloc[i-1] <= data['SMA_50'].iloc[i-1] and
-                data['RSI'].iloc[i] < 70):
-                signals['signal'].iloc[i] = 1  # BUY
+        Windows and thresholds can be overridden with DEFAULT_STRATEGY keys.
+        """
+        params = {**DEFAULT_STRATEGY, **params}
+        close = data['Close'].to_numpy()
 
-            # Death Cross (SELL signal)
-            elif (data['SMA_20'].iloc[i] < data['SMA_50'].iloc[i] and
-                  data['SMA_20'].iloc[i-1] >= data['SMA_50'].iloc[i-1]):
-                signals['signal'].iloc[i] = -1  # SELL
+        # Reuse the precomputed indicator columns for the default windows
+        fast, slow = (
+            data[f"SMA_{w}"].to_numpy() if f"SMA_{w}" in data else sma(close, w)
+            for w in (params['fast_period'], params['slow_period'])
+        )
+        rsi_values = data['RSI'].to_numpy() if params['rsi_period'] == 14 else rsi(close, params['rsi_period'])
 
-            # Overbought (SELL signal)
-            elif data['RSI'].iloc[i] > 80:
-                signals['signal'].iloc[i] = -1  # SELL
+        # Crossover masks over shifted arrays (rules checked in the order above)
+        signal = crossover_signals(
+            fast, slow, rsi_values,
+            params['rsi_buy_max'], params['rsi_sell'], params['min_confidence']
+        )
 
+        signals = pd.DataFrame(index=data.index)
+        signals['signal'] = signal
         signals['price'] = data['Close']
-        signals['position'] = signals['signal'].replace(to_replace=0, method='ffill')
+        signals['position'] = positions_from_signals(signal)
 
         return signals
 
@@ -145,67 +157,11 @@ class BacktestingEngine:
         signals: pd.DataFrame,
         initial_capital: float
     ) -> List[Dict[str, Any]]:
-        """Execute trades based on signals"""
-        trades = []
-        cash = initial_capital
-        position = 0
-        position_price = 0
-
-        for i in range(len(signals)):
-            signal = signals['signal'].iloc[i]
-            price = signals['price'].iloc[i]
-
-            if signal == 1 and position == 0:  # BUY
-                shares = int(cash / price)
-                if shares > 0:
-                    position = shares
-                    position_price = price
-                    cash -= shares * price
-
-                    trades.append({
-                        'date': signals.index[i],
-                        'action': 'BUY',
-                        'price': price,
-                        'shares': shares,
-                        'cash': cash,
-                        'portfolio_value': cash + (position * price)
-                    })
-
-            elif signal == -1 and position > 0:  # SELL
-                cash += position * price
-                profit = (price - position_price) * position
-                profit_pct = ((price - position_price) / position_price) * 100
-
-                trades.append({
-                    'date': signals.index[i],
-                    'action': 'SELL',
-                    'price': price,
-                    'shares': position,
-                    'profit': profit,
-                    'profit_pct': profit_pct,
-                    'cash': cash,
-                    'portfolio_value': cash
-                })
-
-                position = 0
-                position_price = 0
-
-        # Close any open position at end
-        if position > 0:
-            final_price = signals['price'].iloc[-1]
-            cash += position * final_price
-            profit = (final_price - position_price) * position
-
-            trades.append({
-                'date': signals.index[-1],
-                'action': 'SELL (final)',
-                'price': final_price,
-                'shares': position,
-                'profit': profit,
-                'cash': cash,
-                'portfolio_value': cash
-            })
-
+        """Execute trades based on signals (all-in, whole shares, long only)"""
+        trades, equity = simulate_trades(
+            signals['price'].to_numpy(), signals['signal'].to_numpy(), initial_capital, signals.index
+        )
+        signals['equity'] = equity
         return trades
 
     async def _calculate_metrics(
@@ -214,117 +170,246 @@ class BacktestingEngine:
         initial_capital: float
     ) -> BacktestResult:
         """Calculate performance metrics"""
-        if not trades:
-            return BacktestResult(
-                total_return=0, annual_return=0, sharpe_ratio=0,
-                max_drawdown=0, win_rate=0, total_trades=0,
-                profitable_trades=0, avg_profit=0, avg_loss=0, profit_factor=0
-            )
-
-        # Extract trades with profit/loss
-        completed_trades = [t for t in trades if 'profit' in t]
-
-        if not completed_trades:
-            return BacktestResult(
-                total_return=0, annual_return=0, sharpe_ratio=0,
-                max_drawdown=0, win_rate=0, total_trades=0,
-                profitable_trades=0, avg_profit=0, avg_loss=0, profit_factor=0
-            )
-
-        # Total return
-        final_value = trades[-1]['portfolio_value']
-        total_return = ((final_value - initial_capital) / initial_capital) * 100
-
-        # Annualized return
-        days = (trades[-1]['date'] - trades[0]['date']).days
-        years = days / 365.25
-        annual_return = ((final_value / initial_capital) ** (1 / max(years, 0.1)) - 1) * 100
-
-        # Win rate
-        profitable_trades = [t for t in completed_trades if t['profit'] > 0]
-        win_rate = len(profitable_trades) / len(completed_trades) if completed_trades else 0
-
-        # Average profit/loss
-        profits = [t['profit'] for t in profitable_trades]
-        losses = [abs(t['profit']) for t in completed_trades if t['profit'] < 0]
-
-        avg_profit = np.mean(profits) if profits else 0
-        avg_loss = np.mean(losses) if losses else 0
-
-        # Profit factor
-        total_profit = sum(profits) if profits else 0
-        total_loss = sum(losses) if losses else 0.01  # Avoid division by zero
-        profit_factor = total_profit / total_loss
-
-        # Sharpe ratio (simplified)
-        returns = [t['profit_pct'] for t in completed_trades]
-        sharpe_ratio = (np.mean(returns) / np.std(returns)) * np.sqrt(252) if len(returns) > 1 else 0
-
-        # Max drawdown
-        portfolio_values = [t['portfolio_value'] for t in trades]
-        max_drawdown = self._calculate_max_drawdown(portfolio_values)
-
-        return BacktestResult(
-            total_return=round(total_return, 2),
-            annual_return=round(annual_return, 2),
-            sharpe_ratio=round(sharpe_ratio, 2),
-            max_drawdown=round(max_drawdown, 2),
-            win_rate=round(win_rate, 3),
-            total_trades=len(completed_trades),
-            profitable_trades=len(profitable_trades),
-            avg_profit=round(avg_profit, 2),
-            avg_loss=round(avg_loss, 2),
-            profit_factor=round(profit_factor, 2)
-        )
-
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate Relative Strength Index"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
+        return BacktestResult(**trade_metrics(trades, initial_capital))
 
     def _calculate_max_drawdown(self, portfolio_values: List[float]) -> float:
         """Calculate maximum drawdown percentage"""
-        peak = portfolio_values[0]
-        max_dd = 0
-
-        for value in portfolio_values:
-            if value > peak:
-                peak = value
-            dd = ((peak - value) / peak) * 100
-            if dd > max_dd:
-                max_dd = dd
-
-        return max_dd
+        return curve_max_drawdown(portfolio_values)
 
     async def compare_strategies(
         self,
         symbol: str,
         strategies: List[Dict[str, Any]],
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        initial_capital: float = 100000
     ) -> Dict[str, BacktestResult]:
-        """Compare multiple strategies"""
+        """Compare multiple strategies on one download of the history"""
+        data = await self._get_historical_data(symbol, start_date, end_date)
+        if data is None or data.empty:
+            logger.error(f"[Backtest] No data available for {symbol}")
+            return {strategy.get('name', 'Unnamed'): None for strategy in strategies}
+
         results = {}
 
         for strategy in strategies:
             name = strategy.get('name', 'Unnamed')
             params = strategy.get('params', {})
 
-            result = await self.backtest_strategy(
-                symbol, start_date, end_date,
-                strategy_params=params
-            )
-
-            results[name] = result
+            signals = await self._generate_signals(data, params)
+            trades = await self._execute_backtest_trades(data, signals, initial_capital)
+            results[name] = await self._calculate_metrics(trades, initial_capital)
 
         return results
 
+    async def backtest_universe(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        initial_capital: float = 100000,
+        strategy_params: Dict[str, Any] = None,
+        top_n: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Backtest one strategy across a universe of symbols in a single pass
+
+        Closes are aligned into one dates x symbols matrix and the signal and
+        equity logic runs column-wise (fractional shares per symbol sleeve).
+
+        Args:
+            symbols: Universe tickers (hundreds are fine)
+            start_date: Backtest start date
+            end_date: Backtest end date
+            initial_capital: Capital per symbol sleeve
+            strategy_params: DEFAULT_STRATEGY overrides
+            top_n: Number of per-symbol rows to return, best first (None for all)
+
+        Returns:
+            Aggregate equal-weight metrics and per-symbol metrics
+        """
+        start = time.time()
+        dates, used, close, missing = await self._get_universe_closes(symbols, start_date, end_date)
+        if not used:
+            logger.error("[Backtest] No data available for any universe symbol")
+            return None
+
+        run = await asyncio.to_thread(universe_backtest, close, strategy_params, initial_capital)
+
+        per_symbol = [
+            {
+                'symbol': symbol,
+                'total_return': round(float(run['total_return'][j]), 2),
+                'annual_return': round(float(run['annual_return'][j]), 2),
+                'sharpe_ratio': round(float(run['sharpe_ratio'][j]), 2),
+                'max_drawdown': round(float(run['max_drawdown'][j]), 2),
+                'total_trades': int(run['trades'][j]),
+                'win_rate': round(float(run['win_rate'][j]), 3),
+                'buy_and_hold_return': round(float(run['buy_and_hold_return'][j]), 2),
+                'exposure': round(float(run['exposure'][j]), 3)
+            }
+            for j, symbol in enumerate(used)
+        ]
+        per_symbol.sort(key=lambda row: row['total_return'], reverse=True)
+
+        portfolio = run['portfolio_equity']
+        daily = np.diff(portfolio) / portfolio[:-1]
+        years = max((len(portfolio) - 1) / 252, 0.1)
+        total = portfolio[-1] / portfolio[0]
+        returns = run['total_return']
+
+        elapsed_ms = round((time.time() - start) * 1000, 1)
+        logger.info(f"[Backtest] Universe backtest over {len(used)} symbols x {len(dates)} bars in {elapsed_ms}ms")
+
+        return {
+            'symbols': len(used),
+            'missing': missing,
+            'bars': len(dates),
+            'start': str(dates[0])[:10],
+            'end': str(dates[-1])[:10],
+            'aggregate': {
+                'total_return': round(float((total - 1) * 100), 2),
+                'annual_return': round(float((total ** (1 / years) - 1) * 100), 2),
+                'sharpe_ratio': round(float(daily.mean() / daily.std() * np.sqrt(252)) if daily.std() > 0 else 0.0, 2),
+                'max_drawdown': round(curve_max_drawdown(portfolio), 2),
+                'median_symbol_return': round(float(np.median(returns)), 2),
+                'profitable_symbols': round(float(np.mean(returns > 0)), 3),
+                'beat_buy_and_hold': round(float(np.mean(returns > run['buy_and_hold_return'])), 3),
+                'total_trades': int(run['trades'].sum()),
+                'win_rate': round(float(run['win_rate'][run['trades'] > 0].mean()) if run['trades'].any() else 0.0, 3)
+            },
+            'per_symbol': per_symbol[:top_n] if top_n else per_symbol,
+            'elapsed_ms': elapsed_ms
+        }
+
+    async def _get_universe_closes(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Tuple[np.ndarray, List[str], np.ndarray, List[str]]:
+        """
+        Aligned close matrix for a universe
+
+        Returns:
+            (dates, symbols with data, dates x symbols closes, symbols without data)
+        """
+        store = get_market_data_store()
+        histories = await store.get_many(symbols, period=store.period_covering(start_date))
+
+        columns = {}
+        for symbol, series in histories.items():
+            series = series.since(start_date, end_date)
+            if not series.empty:
+                columns[symbol] = pd.Series(series.close, index=series.dates)
+
+        missing = [s for s in histories if s not in columns]
+        if not columns:
+            return np.array([], dtype='datetime64[ns]'), [], np.empty((0, 0)), missing
+
+        # Union of trading days; gaps after a symbol's first bar carry its last close
+        frame = pd.DataFrame(columns).sort_index().ffill()
+        return frame.index.to_numpy(), list(frame.columns), frame.to_numpy(dtype=np.float64), missing
+
+    async def parameter_sweep(
+        self,
+        symbol: str,
+        grid: Dict[str, List[Any]],
+        start_date: datetime,
+        end_date: datetime,
+        initial_capital: float = 100000,
+        rank_by: str = 'sharpe_ratio',
+        top_n: Optional[int] = 20,
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a grid of strategy parameters and rank the results
+
+        History is loaded once, every SMA window and RSI period in the grid is
+        computed once into a shared indicator panel, and signals for all
+        combinations are generated as one batched matrix. Grids larger than
+        `process_pool_threshold` are evaluated across a process pool.
+
+        Args:
+            symbol: Stock symbol
+            grid: Lists of values per DEFAULT_STRATEGY key, e.g.
+                {'fast_period': [10, 20], 'slow_period': [50, 100], 'rsi_sell': [75, 80]}
+            start_date: Backtest start date
+            end_date: Backtest end date
+            initial_capital: Starting capital
+            rank_by: BacktestResult field to sort by (descending)
+            top_n: Number of ranked rows to return (None for all)
+            workers: Process count for large grids (defaults to CPU count)
+
+        Returns:
+            Ranked table of parameter sets with their metrics
+        """
+        start = time.time()
+        if rank_by not in BacktestResult.__dataclass_fields__:
+            raise ValueError(f"Cannot rank by '{rank_by}'")
+
+        combos = expand_grid(grid)
+        if not combos:
+            raise ValueError("Parameter grid has no valid combinations (fast_period must be < slow_period)")
+
+        data = await self._get_historical_data(symbol, start_date, end_date)
+        if data is None or data.empty:
+            logger.error(f"[Backtest] No data available for {symbol}")
+            return None
+
+        close = data['Close'].to_numpy()
+        sma_panel = {w: sma(close, w) for w in {c[k] for c in combos for k in ('fast_period', 'slow_period')}}
+        rsi_panel = {p: rsi(close, p) for p in {c['rsi_period'] for c in combos}}
+        dates = data.index.to_numpy()
+
+        metrics = await asyncio.to_thread(
+            self._evaluate_grid, close, dates, sma_panel, rsi_panel, combos, initial_capital, workers
+        )
+
+        table = [{'params': c, **m} for c, m in zip(combos, metrics)]
+        table.sort(key=lambda row: row[rank_by], reverse=True)
+        for rank, row in enumerate(table, 1):
+            row['rank'] = rank
+
+        elapsed_ms = round((time.time() - start) * 1000, 1)
+        logger.info(f"[Backtest] Swept {len(combos)} parameter sets for {symbol} in {elapsed_ms}ms")
+
+        return {
+            'symbol': symbol,
+            'combinations': len(combos),
+            'bars': len(data),
+            'rank_by': rank_by,
+            'results': table[:top_n] if top_n else table,
+            'best': table[0],
+            'parallel': len(combos) > self.process_pool_threshold,
+            'elapsed_ms': elapsed_ms
+        }
+
+    def _evaluate_grid(
+        self,
+        close: np.ndarray,
+        dates: np.ndarray,
+        sma_panel: Dict[int, np.ndarray],
+        rsi_panel: Dict[int, np.ndarray],
+        combos: List[Dict[str, Any]],
+        initial_capital: float,
+        workers: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Batched signals per block of combinations, simulated in-process or on a process pool"""
+        blocks = [combos[i:i + self.sweep_block_size] for i in range(0, len(combos), self.sweep_block_size)]
+        signal_blocks = (grid_signals(sma_panel, rsi_panel, block) for block in blocks)
+
+        if len(combos) <= self.process_pool_threshold:
+            return [m for signals in signal_blocks
+                    for m in evaluate_signal_columns(close, signals, initial_capital, dates)]
+
+        with new_process_pool(workers) as pool:
+            futures = [
+                pool.submit(evaluate_signal_columns, close, signals, initial_capital, dates)
+                for signals in signal_blocks
+            ]
+            return [m for future in futures for m in future.result()]
+
 
 # Global backtesting engine
 backtesting_engine = None
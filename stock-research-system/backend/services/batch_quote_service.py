@@ -0,0 +1,218 @@
+"""
+Batch Quote Service
+Quotes for many symbols from one yfinance download per chunk, cached per symbol
+and bounded by a latency budget
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from services.market_data_adapter import get_market_data_adapter
+
+logger = logging.getLogger(__name__)
+
+
+class BatchQuoteService:
+    """
+    Batched multi-symbol quotes
+
+    Features:
+    - One download per chunk of symbols instead of one per symbol
+    - Per-symbol cache entries filled from every batch
+    - Latency budget: slow chunks are reported as missing instead of delaying the response
+    """
+
+    def __init__(
+        self,
+        cache_ttl: int = 60,
+        chunk_size: int = 100,
+        budget_seconds: Optional[float] = None
+    ):
+        self.cache_ttl = cache_ttl
+        self.chunk_size = chunk_size
+        self.budget_seconds = budget_seconds or float(os.getenv("BATCH_QUOTE_BUDGET", "5"))
+        self._cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
+    async def get_quotes(self, symbols: List[str], budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get quotes for a list of symbols
+
+        Args:
+            symbols: Stock ticker symbols
+            budget_seconds: Maximum time to wait for downloads
+
+        Returns:
+            {
+                'quotes': {symbol: quote},
+                'missing': [symbols without a quote],
+                'partial': True if any symbol is missing,
+                'cached': number of symbols served from cache,
+                'elapsed_ms': 123.4
+            }
+        """
+        start = time.perf_counter()
+        budget = budget_seconds or self.budget_seconds
+
+        requested = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        quotes = {}
+        to_fetch = []
+
+        for symbol in requested:
+            cached = self.get_cached_quote(symbol)
+            if cached:
+                quotes[symbol] = cached
+            else:
+                to_fetch.append(symbol)
+
+        cached_count = len(quotes)
+
+        if to_fetch:
+            chunks = [to_fetch[i:i + self.chunk_size] for i in range(0, len(to_fetch), self.chunk_size)]
+            tasks = [asyncio.ensure_future(self._fetch_chunk(chunk, budget)) for chunk in chunks]
+            done, pending = await asyncio.wait(tasks, timeout=budget)
+
+            for task in pending:
+                task.cancel()
+
+            for task in done:
+                if task.exception():
+                    logger.warning(f"[BatchQuotes] Chunk download failed: {task.exception()}")
+                    continue
+                quotes.update(task.result())
+
+            if pending:
+                logger.warning(f"[BatchQuotes] {len(pending)} chunk(s) exceeded {budget}s budget")
+
+        missing = [s for s in requested if s not in quotes]
+
+        return {
+            'quotes': quotes,
+            'missing': missing,
+            'partial': bool(missing),
+            'cached': cached_count,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)
+        }
+
+    async def get_quote(self, symbol: str, budget_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Quote for a single symbol through the same cached batch path"""
+        result = await self.get_quotes([symbol], budget_seconds)
+        return result['quotes'].get(symbol.strip().upper())
+
+    def get_cached_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached quote, if any"""
+        entry = self._cache.get(symbol.upper())
+        if entry and time.time() < entry[1]:
+            return entry[0]
+        return None
+
+    async def _fetch_chunk(self, symbols: List[str], timeout: float) -> Dict[str, Dict[str, Any]]:
+        """Download one chunk and cache the resulting quotes"""
+        frame = await get_market_data_adapter().run(self._download, symbols, timeout=timeout)
+        quotes = self.split_download(frame, symbols)
+
+        expiry = time.time() + self.cache_ttl
+        for symbol, quote in quotes.items():
+            self._cache[symbol] = (quote, expiry)
+
+        logger.info(f"[BatchQuotes] Fetched {len(quotes)}/{len(symbols)} quotes in one download")
+        return quotes
+
+    @staticmethod
+    def _download(symbols: List[str]) -> pd.DataFrame:
+        """Blocking multi-symbol download (runs on the market data pool)"""
+        return yf.download(
+            symbols,
+            period='5d',
+            interval='1d',
+            group_by='ticker',
+            auto_adjust=False,
+            threads=True,
+            progress=False
+        )
+
+    @staticmethod
+    def split_download(frame: pd.DataFrame, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Split a multi-symbol download into per-symbol quotes
+
+        Works on the date x symbol matrices directly: the last and previous
+        valid close for every symbol are located with one vectorized pass.
+        """
+        if frame is None or frame.empty:
+            return {}
+
+        fields = ['Open', 'High', 'Low', 'Close', 'Volume']
+        if isinstance(frame.columns, pd.MultiIndex):
+            # group_by='ticker' yields (symbol, field); older versions may yield (field, symbol)
+            field_level = 1 if 'Close' in frame.columns.get_level_values(1) else 0
+            matrices = {
+                f: frame.xs(f, axis=1, level=field_level).reindex(columns=symbols)
+                for f in fields
+            }
+        else:
+            matrices = {f: frame[[f]].set_axis(symbols[:1], axis=1) for f in fields}
+
+        close = matrices['Close'].to_numpy(dtype=np.float64)
+        n_rows = close.shape[0]
+        valid = ~np.isnan(close)
+        has_data = valid.any(axis=0)
+
+        # Row index of the last and second-to-last valid close per column
+        last_idx = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+        valid_before = valid & (np.arange(n_rows)[:, None] < last_idx[None, :])
+        has_prev = valid_before.any(axis=0)
+        prev_idx = n_rows - 1 - np.argmax(valid_before[::-1], axis=0)
+
+        cols = np.arange(close.shape[1])
+        last_close = close[last_idx, cols]
+        prev_close = np.where(has_prev, close[prev_idx, cols], last_close)
+        change = last_close - prev_close
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = np.where(prev_close != 0, change / prev_close * 100, 0.0)
+
+        day_high = matrices['High'].to_numpy(dtype=np.float64)[last_idx, cols]
+        day_low = matrices['Low'].to_numpy(dtype=np.float64)[last_idx, cols]
+        day_open = matrices['Open'].to_numpy(dtype=np.float64)[last_idx, cols]
+        volume = np.nan_to_num(matrices['Volume'].to_numpy(dtype=np.float64)[last_idx, cols])
+
+        timestamp = datetime.utcnow().isoformat()
+        quotes = {}
+        for i, symbol in enumerate(symbols):
+            if not has_data[i]:
+                continue
+            quotes[symbol] = {
+                'symbol': symbol,
+                'price': round(float(last_close[i]), 2),
+                'previousClose': round(float(prev_close[i]), 2),
+                'change': round(float(change[i]), 2),
+                'changePercent': round(float(change_pct[i]), 2),
+                'open': round(float(day_open[i]), 2),
+                'dayHigh': round(float(day_high[i]), 2),
+                'dayLow': round(float(day_low[i]), 2),
+                'volume': float(volume[i]),
+                'timestamp': timestamp,
+                'source': 'yahoo_finance',
+                'data_quality': 'real-time'
+            }
+
+        return quotes
+
+
+# Global batch quote service
+batch_quote_service = None
+
+
+def get_batch_quote_service() -> BatchQuoteService:
+    """Get or create the shared batch quote service"""
+    global batch_quote_service
+    if batch_quote_service is None:
+        batch_quote_service = BatchQuoteService()
+    return batch_quote_service
@@ -48,6 +48,14 @@ class CacheService:
         self.cache.clear()
         logger.info("Cache cleared")
 
+    def evict_expired(self) -> int:
+        """Remove expired entries that were never read again, returns how many"""
+        cutoff = time.time() - self.ttl_minutes * 60
+        expired = [key for key, cached in self.cache.items() if cached.get('timestamp', 0) < cutoff]
+        for key in expired:
+            del self.cache[key]
+        return len(expired)
+
     def get_cache_key(self, symbol: str, analysis_type: str = "full") -> str:
         """Generate cache key for symbol and analysis type"""
         return f"{symbol.upper()}_{analysis_type}_{datetime.now().strftime('%Y%m%d')}"
@@ -6,13 +6,16 @@ Fetches and validates data from multiple sources for accurate analysis
 import asyncio
 from typing import Dict, Any, List, Optional
 import logging
-import numpy as np
 from datetime import datetime, timedelta
 import yfinance as yf
 from tavily import TavilyClient
 import os
 from dotenv import load_dotenv
 
+from services.market_data_adapter import get_market_data_adapter
+from services.market_data_store import get_market_data_store, ANALYSIS_PERIOD
+from calculators.indicator_library import get_indicator_library
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -102,8 +105,8 @@ class DataAggregatorService:
         Fetch data from Yahoo Finance
         """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            adapter = get_market_data_adapter()
+            info = await adapter.get_info(symbol)
 
             # Get key metrics
             data = {
@@ -136,7 +139,7 @@ class DataAggregatorService:
 
             # Get recommendation trends
             try:
-                recommendations = ticker.recommendations
+                recommendations = await adapter.run(lambda: yf.Ticker(symbol).recommendations)
                 if recommendations is not None and not recommendations.empty:
                     recent = recommendations.tail(1)
                     data['analyst_recommendation'] = recent.iloc[0].to_dict() if not recent.empty else {}
@@ -193,26 +196,26 @@ class DataAggregatorService:
         try:
             # For now, calculate technical indicators
             # In production, this would scrape TradingView
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="3mo")
+            series = await get_market_data_store().get_history(symbol, period=ANALYSIS_PERIOD)
 
-            if hist.empty:
+            if series.empty:
                 return {'source': 'tradingview', 'error': 'No historical data'}
 
-            # Calculate technical indicators
-            close_prices = hist['Close']
+            # Calculate technical indicators (shared, cached per series)
+            library = get_indicator_library()
 
             # RSI
-            rsi = self._calculate_rsi(close_prices)
+            rsi = float(library.compute(series, 'rsi', period=14)[-1])
 
             # MACD
-            macd, signal = self._calculate_macd(close_prices)
+            macd_line, signal_line, _ = library.compute(series, 'macd')
+            macd, signal = float(macd_line[-1]), float(signal_line[-1])
 
             # Moving averages
-            sma_20 = close_prices.rolling(window=20).mean().iloc[-1]
-            sma_50 = close_prices.rolling(window=50).mean().iloc[-1] if len(close_prices) >= 50 else None
+            sma_20 = float(library.compute(series, 'sma', period=20)[-1])
+            sma_50 = float(library.compute(series, 'sma', period=50)[-1]) if len(series) >= 50 else None
 
-            current_price = close_prices.iloc[-1]
+            current_price = float(series.close[-1])
 
             # Technical rating
             rating_score = 0
@@ -382,24 +385,6 @@ class DataAggregatorService:
 
         return confidence
 
-    def _calculate_rsi(self, prices, period=14):
-        """Calculate RSI indicator"""
-        deltas = np.diff(prices)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
-        rs = up / down if down != 0 else 100
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-
-    def _calculate_macd(self, prices, fast=12, slow=26, signal=9):
-        """Calculate MACD indicator"""
-        exp1 = prices.ewm(span=fast, adjust=False).mean()
-        exp2 = prices.ewm(span=slow, adjust=False).mean()
-        macd = exp1 - exp2
-        signal_line = macd.ewm(span=signal, adjust=False).mean()
-        return macd.iloc[-1], signal_line.iloc[-1]
-
     def _parse_marketbeat_results(self, results: Dict) -> Dict[str, Any]:
         """Parse MarketBeat search results"""
         parsed = {}
@@ -9,6 +9,7 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import yfinance as yf
+import pandas as pd
 import httpx
 from decimal import Decimal, InvalidOperation
 
@@ -24,6 +25,9 @@ except ImportError:
             return await func(*func_args)
     rate_limiter = DummyRateLimiter()
 
+from services.market_data_adapter import get_market_data_adapter
+from services.market_data_store import get_market_data_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,8 +63,7 @@ class FinancialDataService:
             }
         """
         async def _fetch_quote():
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = await get_market_data_adapter().get_info(symbol)
 
             # Get current price
             current_price = info.get('currentPrice') or info.get('regularMarketPrice')
@@ -175,8 +178,9 @@ class FinancialDataService:
             }
         """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            adapter = get_market_data_adapter()
+            info = await adapter.get_info(symbol)
+            earnings_date = await adapter.run(self._get_next_earnings_date, symbol)
 
             # Get earnings per share
             eps = self._get_valid_eps(info)
@@ -204,7 +208,7 @@ class FinancialDataService:
                 'current_ratio': self._validate_ratio(info.get('currentRatio'), 'current'),
                 'quick_ratio': self._validate_ratio(info.get('quickRatio'), 'quick'),
                 'free_cash_flow': info.get('freeCashflow', 0),
-                'earnings_date': self._get_next_earnings_date(ticker),
+                'earnings_date': earnings_date,
                 'dividend_yield': self._validate_percentage(info.get('dividendYield')),
                 'beta': self._validate_ratio(info.get('beta'), 'beta', min_val=-5, max_val=10),
                 'data_quality': self._calculate_fundamental_quality(info, eps, pe_ratio),
@@ -263,23 +267,23 @@ class FinancialDataService:
             ]
         """
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period, interval=interval)
+            series = await get_market_data_store().get_history(symbol, period=period, interval=interval)
 
-            if hist.empty:
+            if series.empty:
                 logger.warning(f"No historical data for {symbol}")
                 return []
 
             # Convert to list of dictionaries
             historical_data = []
-            for index, row in hist.iterrows():
+            for ts, o, h, l, c, v in zip(series.dates, series.open, series.high,
+                                         series.low, series.close, series.volume):
                 data_point = {
-                    'timestamp': index.isoformat() + 'Z',
-                    'open': round(float(row['Open']), 2),
-                    'high': round(float(row['High']), 2),
-                    'low': round(float(row['Low']), 2),
-                    'close': round(float(row['Close']), 2),
-                    'volume': int(row['Volume'])
+                    'timestamp': pd.Timestamp(ts).isoformat() + 'Z',
+                    'open': round(float(o), 2),
+                    'high': round(float(h), 2),
+                    'low': round(float(l), 2),
+                    'close': round(float(c), 2),
+                    'volume': int(v)
                 }
                 historical_data.append(data_point)
 
@@ -377,10 +381,10 @@ class FinancialDataService:
         quality = (sum(key_metrics) / len(key_metrics)) * 100
         return int(quality)
 
-    def _get_next_earnings_date(self, ticker) -> Optional[str]:
-        """Get next earnings date"""
+    def _get_next_earnings_date(self, symbol: str) -> Optional[str]:
+        """Get next earnings date (blocking, run through the market data adapter)"""
         try:
-            calendar = ticker.calendar
+            calendar = yf.Ticker(symbol).calendar
             if calendar is not None and 'Earnings Date' in calendar:
                 earnings_date = calendar['Earnings Date'][0]
                 return earnings_date.strftime('%Y-%m-%d')
@@ -0,0 +1,182 @@
+"""
+Indicator Stream Service
+Keeps one incremental indicator state per symbol for live price updates.
+
+State is seeded once from the shared MarketDataStore. Later calls fold in only
+the bars that completed since the last sync, and live ticks are applied
+provisionally in O(1) instead of recomputing from the full year of history.
+States are kept in an LRU bounded by max_entries, and a state is reseeded when
+the last bar it folded in no longer matches the store (e.g. after a split
+re-adjustment).
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from calculators.indicator_library import series_key
+from calculators.streaming_indicators import StreamingIndicators
+from services.market_data_store import get_market_data_store
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorStreamService:
+    """
+    Per-symbol streaming indicators
+
+    Features:
+    - Seeding from 1y daily history (one vectorized pass)
+    - Incremental catch-up with newly completed bars
+    - O(1) tick previews that do not modify state
+    - LRU eviction beyond max_entries symbols
+    """
+
+    def __init__(self, period: str = '1y', interval: str = '1d', max_entries: int = 512):
+        self.period = period
+        self.interval = interval
+        self.max_entries = max_entries
+        # symbol -> (series_key of the last bar folded in, state)
+        self._states: 'OrderedDict[str, Tuple[tuple, StreamingIndicators]]' = OrderedDict()
+        self.stats = {'seeded': 0, 'reseeded': 0, 'bars_folded': 0, 'ticks': 0, 'evictions': 0}
+
+    async def sync(self, symbol: str) -> Optional[StreamingIndicators]:
+        """
+        Bring a symbol's state up to date with completed bars
+
+        The most recent bar of the history is still forming during the
+        session, so it is never committed; ticks cover it instead.
+
+        Returns:
+            The indicator state, or None if there is not enough history
+        """
+        symbol = symbol.upper()
+        series = await get_market_data_store().get_history(symbol, self.period, self.interval)
+        completed = series.slice(0, len(series) - 1) if len(series) else series
+
+        key, state = self._states.get(symbol, (None, None))
+        start = 0
+        if state is not None and state.last_timestamp is None:
+            state = None
+        if state is not None:
+            start = int(np.searchsorted(completed.dates, state.last_timestamp, side='right'))
+            if series_key(completed.slice(max(start - 1, 0), start)) != key:
+                # The last bar folded in was restated (e.g. split re-adjustment) or dropped
+                logger.debug(f"[IndicatorStream] History of {symbol} changed, reseeding")
+                self.stats['reseeded'] += 1
+                state = None
+
+        if state is None:
+            if len(completed) < StreamingIndicators.min_bars():
+                logger.debug(f"[IndicatorStream] Not enough history to seed {symbol}")
+                self._states.pop(symbol, None)
+                return None
+            state = StreamingIndicators.from_history(
+                symbol, completed.high, completed.low, completed.close, completed.volume,
+                last_timestamp=completed.dates[-1]
+            )
+            self.stats['seeded'] += 1
+        else:
+            # Fold in only bars completed since the last sync
+            for i in range(start, len(completed)):
+                state.update(
+                    float(completed.close[i]), float(completed.high[i]), float(completed.low[i]),
+                    float(completed.volume[i]), timestamp=completed.dates[i]
+                )
+            self.stats['bars_folded'] += len(completed) - start
+
+        self._states[symbol] = (series_key(completed.tail(1)), state)
+        self._states.move_to_end(symbol)
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+            self.stats['evictions'] += 1
+        return state
+
+    async def get_indicators(self, symbol: str, price: Optional[float] = None,
+                             volume: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Indicator values for a symbol, optionally with a live tick folded in
+
+        Args:
+            symbol: Stock symbol
+            price: Latest traded price of the in-progress bar
+            volume: Volume traded so far in the in-progress bar
+
+        Returns:
+            Indicator snapshot or None if the symbol cannot be seeded
+        """
+        try:
+            state = await self.sync(symbol)
+        except Exception as e:
+            logger.warning(f"[IndicatorStream] Could not sync {symbol}: {e}")
+            return None
+
+        if state is None:
+            return None
+        if price is not None:
+            self.stats['ticks'] += 1
+        return state.snapshot(price=price, volume=volume)
+
+    async def get_many_indicators(self, ticks: Dict[str, Tuple[float, float]],
+                                  timeout: Optional[float] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Indicator values for several symbols with their live ticks folded in
+
+        Histories of unseeded symbols are fetched with one batched download.
+        When it does not finish within timeout, the download continues in the
+        background (seeding later calls) and those symbols get None.
+
+        Args:
+            ticks: {symbol: (price, volume)} of the in-progress bars
+            timeout: Seconds to wait for the history download, None for no limit
+
+        Returns:
+            {symbol: indicator snapshot or None}
+        """
+        symbols = [s.upper() for s in ticks]
+        prefetch = asyncio.ensure_future(get_market_data_store().get_many(symbols, self.period, self.interval))
+        try:
+            await asyncio.wait_for(asyncio.shield(prefetch), timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"[IndicatorStream] History for {symbols} not ready within {timeout}s")
+            return {symbol: None for symbol in ticks}
+        except Exception as e:
+            logger.warning(f"[IndicatorStream] Could not fetch history for {symbols}: {e}")
+            return {symbol: None for symbol in ticks}
+
+        snapshots = await asyncio.gather(*(
+            self.get_indicators(symbol, price=price, volume=volume)
+            for symbol, (price, volume) in ticks.items()
+        ))
+        return dict(zip(ticks, snapshots))
+
+    def get_state(self, symbol: str) -> Optional[StreamingIndicators]:
+        """Cached state for a symbol without syncing"""
+        entry = self._states.get(symbol.upper())
+        return entry[1] if entry else None
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        """Drop state for a symbol, or everything"""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol.upper(), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Streaming statistics"""
+        return {**self.stats, 'symbols': len(self._states)}
+
+
+# Global indicator stream service
+indicator_stream_service = None
+
+
+def get_indicator_stream_service() -> IndicatorStreamService:
+    """Get or create the shared indicator stream service"""
+    global indicator_stream_service
+    if indicator_stream_service is None:
+        indicator_stream_service = IndicatorStreamService()
+    return indicator_stream_service
@@ -1,10 +1,14 @@
 """Service to fetch live stock prices using yfinance"""
 
-import yfinance as yf
+import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from services.market_data_adapter import get_market_data_adapter
+from services.batch_quote_service import get_batch_quote_service
+from services.indicator_stream_service import get_indicator_stream_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,7 +16,7 @@ class LivePriceService:
     """Service for fetching real-time stock prices"""
 
     @staticmethod
-    def get_live_price(symbol: str) -> Optional[Dict]:
+    async def get_live_price(symbol: str) -> Optional[Dict]:
         """
         Fetch live price for a single stock symbol.
 
@@ -23,11 +27,13 @@ class LivePriceService:
             Dict with price data or None if failed
         """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            adapter = get_market_data_adapter()
 
-            # Get latest data
-            hist = ticker.history(period="1d")
+            # Get quote info and latest bar concurrently, off the event loop
+            info, hist = await asyncio.gather(
+                adapter.get_info(symbol),
+                adapter.get_history(symbol, period="1d")
+            )
             if hist.empty:
                 logger.warning(f"No price data available for {symbol}")
                 return None
@@ -37,6 +43,11 @@ class LivePriceService:
             day_change = current_price - prev_close
             day_change_percent = (day_change / prev_close * 100) if prev_close else 0
 
+            # Fold the live price into the symbol's incremental indicator state
+            indicators = await get_indicator_stream_service().get_indicators(
+                symbol, price=float(current_price), volume=float(hist['Volume'].iloc[-1])
+            )
+
             return {
                 "symbol": symbol,
                 "current_price": round(float(current_price), 2),
@@ -46,7 +57,8 @@ class LivePriceService:
                 "timestamp": datetime.utcnow().isoformat(),
                 "market_cap": info.get('marketCap'),
                 "volume": info.get('volume'),
-                "name": info.get('longName', symbol)
+                "name": info.get('longName', symbol),
+                "indicators": indicators
             }
 
         except Exception as e:
@@ -54,25 +66,48 @@ class LivePriceService:
             return None
 
     @staticmethod
-    def get_multiple_prices(symbols: List[str]) -> Dict[str, Dict]:
+    async def get_multiple_prices(symbols: List[str]) -> Dict[str, Dict]:
         """
         Fetch live prices for multiple stocks.
 
+        Batched quotes carry no market cap or company name; use get_live_price
+        for a single symbol's full quote.
+
         Args:
             symbols: List of stock ticker symbols
 
         Returns:
             Dict mapping symbols to their price data
         """
+        # One batched download for all symbols instead of a call per symbol
+        quote_service = get_batch_quote_service()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + quote_service.budget_seconds
+        result = await quote_service.get_quotes(symbols)
+        if result['missing']:
+            logger.warning(f"No batch quote for {result['missing']}")
+
+        # Fold each live price into the symbol's incremental indicator state (seeding gets what is left of the budget)
+        indicators = await get_indicator_stream_service().get_many_indicators(
+            {symbol: (quote['price'], quote['volume']) for symbol, quote in result['quotes'].items()},
+            timeout=max(deadline - loop.time(), 0)
+        )
+
         prices = {}
-        for symbol in symbols:
-            price_data = LivePriceService.get_live_price(symbol)
-            if price_data:
-                prices[symbol] = price_data
+        for symbol, quote in result['quotes'].items():
+            prices[symbol] = {
+                "symbol": symbol,
+                "current_price": quote['price'],
+                "previous_close": quote['previousClose'],
+                "day_change": quote['change'],
+                "day_change_percent": quote['changePercent'],
+                "timestamp": quote['timestamp'],
+                "volume": quote['volume'],
+                "indicators": indicators.get(symbol)
+            }
 
         return prices
 
-
     @staticmethod
     async def update_portfolio_prices(db, user_email: str) -> bool:
         """
@@ -98,7 +133,7 @@ class LivePriceService:
             symbols = [h['symbol'] for h in portfolio['holdings']]
 
             # Fetch live prices
-            live_prices = LivePriceService.get_multiple_prices(symbols)
+            live_prices = await LivePriceService.get_multiple_prices(symbols)
 
             # Update holdings with live prices
             updated_holdings = []
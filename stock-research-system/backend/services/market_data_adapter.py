@@ -0,0 +1,222 @@
+"""
+Market Data Adapter
+Runs blocking yfinance calls on a bounded thread pool so they never stall the event loop.
+
+A synchronous `ticker.info` or `history()` call inside an `async def` freezes
+the whole FastAPI loop (and every WebSocket/SSE stream) for hundreds of
+milliseconds. Every market-data call goes through this adapter instead, with a
+per-call timeout. The adapter also runs a small event-loop lag probe so that
+any remaining blocking code shows up in the metrics.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, Optional
+
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataTimeoutError(TimeoutError):
+    """Raised when a market-data call exceeds its timeout"""
+
+
+class MarketDataAdapter:
+    """
+    Async facade over yfinance
+
+    Features:
+    - Bounded worker pool (MARKET_DATA_MAX_WORKERS, default 8)
+    - Per-call timeouts (MARKET_DATA_TIMEOUT, default 15s)
+    - Call statistics (latency, timeouts, errors)
+    - Event-loop lag probe reporting how long the loop was blocked
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        default_timeout: Optional[float] = None,
+        probe_interval: float = 0.25,
+        stall_threshold: float = 0.1
+    ):
+        self.max_workers = max_workers or int(os.getenv("MARKET_DATA_MAX_WORKERS", "8"))
+        self.default_timeout = default_timeout or float(os.getenv("MARKET_DATA_TIMEOUT", "15"))
+        self.probe_interval = probe_interval
+        self.stall_threshold = stall_threshold
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="market-data"
+        )
+        self._probe_task: Optional[asyncio.Task] = None
+
+        self.call_stats = {
+            'calls': 0,
+            'in_flight': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'total_latency': 0.0,
+            'max_latency': 0.0
+        }
+        self.loop_stats = {
+            'samples': 0,
+            'stalls': 0,
+            'blocked_seconds': 0.0,
+            'max_lag': 0.0,
+            'last_lag': 0.0
+        }
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking callable on the worker pool
+
+        Args:
+            func: Blocking function to execute
+            *args: Positional arguments for func
+            timeout: Seconds to wait (includes time queued for a worker)
+            **kwargs: Keyword arguments for func
+
+        Raises:
+            MarketDataTimeoutError: If the call does not finish in time. The
+                worker thread is not interrupted; its result is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.default_timeout
+
+        self.call_stats['calls'] += 1
+        self.call_stats['in_flight'] += 1
+        start = time.perf_counter()
+
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, partial(func, *args, **kwargs)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            self.call_stats['timeouts'] += 1
+            name = getattr(func, '__name__', repr(func))
+            logger.warning(f"[MarketDataAdapter] {name} timed out after {timeout}s")
+            raise MarketDataTimeoutError(f"{name} timed out after {timeout}s")
+        except Exception:
+            self.call_stats['errors'] += 1
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            self.call_stats['in_flight'] -= 1
+            self.call_stats['total_latency'] += latency
+            self.call_stats['max_latency'] = max(self.call_stats['max_latency'], latency)
+
+    async def get_info(self, symbol: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Non-blocking `yf.Ticker(symbol).info`"""
+        return await self.run(self._fetch_info, symbol, timeout=timeout)
+
+    async def get_history(self, symbol: str, timeout: Optional[float] = None, **kwargs) -> pd.DataFrame:
+        """Non-blocking `yf.Ticker(symbol).history(**kwargs)`"""
+        return await self.run(self._fetch_history, symbol, timeout=timeout, **kwargs)
+
+    async def get_ticker_fields(self, symbol: str, *fields: str, timeout: Optional[float] = None) -> SimpleNamespace:
+        """
+        Non-blocking read of several `yf.Ticker(symbol)` attributes
+
+        Each attribute (e.g. 'cashflow', 'financials', 'recommendations') is a
+        lazy network lookup, so they are all loaded on one worker. Attributes
+        the installed yfinance does not provide come back as None.
+        """
+        return await self.run(self._fetch_fields, symbol, fields, timeout=timeout)
+
+    def start_loop_monitor(self) -> None:
+        """Start the event-loop lag probe on the running loop"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+            logger.info("[MarketDataAdapter] Event-loop lag monitor started")
+
+    async def stop_loop_monitor(self) -> None:
+        """Stop the event-loop lag probe"""
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+        self._probe_task = None
+
+    def shutdown(self) -> None:
+        """Release worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Call and event-loop blocking metrics"""
+        calls = self.call_stats['calls']
+        return {
+            'pool': {
+                'max_workers': self.max_workers,
+                'default_timeout': self.default_timeout
+            },
+            'calls': {
+                'total': calls,
+                'in_flight': self.call_stats['in_flight'],
+                'timeouts': self.call_stats['timeouts'],
+                'errors': self.call_stats['errors'],
+                'avg_latency_ms': round(self.call_stats['total_latency'] / calls * 1000, 1) if calls else 0.0,
+                'max_latency_ms': round(self.call_stats['max_latency'] * 1000, 1)
+            },
+            'event_loop': {
+                'monitoring': self._probe_task is not None and not self._probe_task.done(),
+                'samples': self.loop_stats['samples'],
+                'stalls': self.loop_stats['stalls'],
+                'stall_threshold_ms': round(self.stall_threshold * 1000, 1),
+                'blocked_seconds': round(self.loop_stats['blocked_seconds'], 3),
+                'max_lag_ms': round(self.loop_stats['max_lag'] * 1000, 1),
+                'last_lag_ms': round(self.loop_stats['last_lag'] * 1000, 1)
+            }
+        }
+
+    async def _probe_loop(self) -> None:
+        """Measure how late the loop wakes up from a fixed sleep"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.probe_interval)
+            lag = max(0.0, loop.time() - start - self.probe_interval)
+            self._record_lag(lag)
+
+    def _record_lag(self, lag: float) -> None:
+        self.loop_stats['samples'] += 1
+        self.loop_stats['last_lag'] = lag
+        self.loop_stats['max_lag'] = max(self.loop_stats['max_lag'], lag)
+        if lag >= self.stall_threshold:
+            self.loop_stats['stalls'] += 1
+            self.loop_stats['blocked_seconds'] += lag
+            logger.debug(f"[MarketDataAdapter] Event loop blocked for {lag * 1000:.0f}ms")
+
+    @staticmethod
+    def _fetch_info(symbol: str) -> Dict[str, Any]:
+        return yf.Ticker(symbol).info or {}
+
+    @staticmethod
+    def _fetch_history(symbol: str, **kwargs) -> pd.DataFrame:
+        return yf.Ticker(symbol).history(**kwargs)
+
+    @staticmethod
+    def _fetch_fields(symbol: str, fields) -> SimpleNamespace:
+        ticker = yf.Ticker(symbol)
+        return SimpleNamespace(**{field: getattr(ticker, field, None) for field in fields})
+
+
+# Global market data adapter
+market_data_adapter = None
+
+
+def get_market_data_adapter() -> MarketDataAdapter:
+    """Get or create the shared market data adapter"""
+    global market_data_adapter
+    if market_data_adapter is None:
+        market_data_adapter = MarketDataAdapter()
+    return market_data_adapter
@@ -0,0 +1,616 @@
+"""
+Market Data Store
+Per-process OHLCV history cache shared by every agent and service; shorter
+periods are zero-copy slices of the widest history fetched per (symbol, interval)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from services.market_data_adapter import get_market_data_adapter
+
+logger = logging.getLogger(__name__)
+
+
+# Periods understood by yfinance, ordered from narrowest to widest
+PERIOD_LADDER = ['1d', '5d', '1mo', '3mo', '6mo', 'ytd', '1y', '2y', '5y', '10y', 'max']
+
+# Calendar length of each month/year based period
+PERIOD_MONTHS = {'1mo': 1, '3mo': 3, '6mo': 6, '1y': 12, '2y': 24, '5y': 60, '10y': 120}
+
+# Range fetched on a cache miss, per interval. Wide enough to cover every
+# period the agents ask for (1y of daily bars plus room for a 200-day SMA).
+DEFAULT_FETCH_PERIOD = {
+    '1m': '5d',
+    '2m': '1mo',
+    '5m': '1mo',
+    '15m': '1mo',
+    '30m': '1mo',
+    '60m': '3mo',
+    '90m': '3mo',
+    '1h': '3mo',
+    '1d': '2y',
+    '5d': '5y',
+    '1wk': '5y',
+    '1mo': 'max',
+    '3mo': 'max'
+}
+
+INTRADAY_INTERVALS = {'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'}
+
+# Daily history window shared by the analysis agents. Cached indicators are
+# keyed on the series they were computed over, so agents only share them
+# when they load the same window.
+ANALYSIS_PERIOD = '1y'
+
+
+def period_rank(period: str) -> int:
+    """Position of a period on the ladder (unknown periods count as widest)"""
+    try:
+        return PERIOD_LADDER.index(period)
+    except ValueError:
+        return len(PERIOD_LADDER) - 1
+
+
+def _widest(*periods: str) -> str:
+    """Return the widest of the given periods"""
+    return max(periods, key=period_rank)
+
+
+def _to_naive(ts: Any) -> pd.Timestamp:
+    """Convert a datetime-like to a tz-naive Timestamp"""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts
+
+
+@dataclass(frozen=True)
+class OHLCVSeries:
+    """
+    Columnar OHLCV history for one symbol and interval
+
+    All arrays share the same length and are read-only views into the
+    store's buffers, so slicing never copies price data.
+    """
+    symbol: str
+    interval: str
+    dates: np.ndarray  # datetime64[ns], tz-naive exchange time
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.close) == 0
+
+    def slice(self, start: int, stop: Optional[int] = None) -> 'OHLCVSeries':
+        """Zero-copy slice by bar index"""
+        s = np.s_[start:stop]
+        return OHLCVSeries(
+            symbol=self.symbol,
+            interval=self.interval,
+            dates=self.dates[s],
+            open=self.open[s],
+            high=self.high[s],
+            low=self.low[s],
+            close=self.close[s],
+            volume=self.volume[s]
+        )
+
+    def tail(self, n: int) -> 'OHLCVSeries':
+        """Last n bars"""
+        return self.slice(max(0, len(self) - n))
+
+    def since(self, start: Any, end: Any = None) -> 'OHLCVSeries':
+        """Bars with start <= date < end (end is exclusive, like yfinance)"""
+        lo = np.searchsorted(self.dates, np.datetime64(_to_naive(start)), side='left')
+        hi = len(self) if end is None else np.searchsorted(self.dates, np.datetime64(_to_naive(end)), side='left')
+        return self.slice(int(lo), int(hi))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Copy into a yfinance-style DataFrame (Open/High/Low/Close/Volume)"""
+        return pd.DataFrame(
+            {
+                'Open': self.open,
+                'High': self.high,
+                'Low': self.low,
+                'Close': self.close,
+                'Volume': self.volume
+            },
+            index=pd.DatetimeIndex(self.dates, name='Date'),
+            copy=True
+        )
+
+    def to_lists(self, date_format: str = '%Y-%m-%d') -> Dict[str, List]:
+        """Plain-list representation used by chart payloads"""
+        return {
+            'dates': pd.DatetimeIndex(self.dates).strftime(date_format).tolist(),
+            'open': self.open.tolist(),
+            'high': self.high.tolist(),
+            'low': self.low.tolist(),
+            'close': self.close.tolist(),
+            'volume': self.volume.tolist()
+        }
+
+    @classmethod
+    def from_dataframe(cls, symbol: str, interval: str, hist: pd.DataFrame) -> 'OHLCVSeries':
+        """Build a read-only series from a yfinance history DataFrame"""
+        index = hist.index
+        if getattr(index, 'tz', None) is not None:
+            index = index.tz_localize(None)
+
+        columns = {
+            'dates': index.values.astype('datetime64[ns]'),
+            'open': hist['Open'].to_numpy(dtype=np.float64),
+            'high': hist['High'].to_numpy(dtype=np.float64),
+            'low': hist['Low'].to_numpy(dtype=np.float64),
+            'close': hist['Close'].to_numpy(dtype=np.float64),
+            'volume': hist['Volume'].fillna(0).to_numpy(dtype=np.int64)
+        }
+        for arr in columns.values():
+            arr.setflags(write=False)
+
+        return cls(symbol=symbol, interval=interval, **columns)
+
+    @classmethod
+    def empty_series(cls, symbol: str, interval: str) -> 'OHLCVSeries':
+        """Series with no bars"""
+        return cls(
+            symbol=symbol,
+            interval=interval,
+            dates=np.array([], dtype='datetime64[ns]'),
+            open=np.array([], dtype=np.float64),
+            high=np.array([], dtype=np.float64),
+            low=np.array([], dtype=np.float64),
+            close=np.array([], dtype=np.float64),
+            volume=np.array([], dtype=np.int64)
+        )
+
+
+def slice_period(series: OHLCVSeries, period: str) -> OHLCVSeries:
+    """Zero-copy view of the trailing period of a series"""
+    if series.empty or period == 'max':
+        return series
+
+    if period.endswith('d'):
+        days = int(period[:-1])
+        if series.interval in INTRADAY_INTERVALS:
+            cutoff = _to_naive(series.dates[-1]).normalize() - pd.Timedelta(days=days - 1)
+            return series.since(cutoff)
+        return series.tail(days)
+
+    last = _to_naive(series.dates[-1])
+    if period == 'ytd':
+        cutoff = pd.Timestamp(year=last.year, month=1, day=1)
+    elif period in PERIOD_MONTHS:
+        cutoff = last - pd.DateOffset(months=PERIOD_MONTHS[period])
+    else:
+        return series
+
+    return series.since(cutoff)
+
+
+@dataclass
+class _StoreEntry:
+    """Cached full-range history for one (symbol, interval)"""
+    series: OHLCVSeries
+    period: str
+    fetched_at: float
+
+
+class MarketDataStore:
+    """
+    Shared OHLCV history store
+
+    Features:
+    - One download per (symbol, interval), widest range first
+    - Sub-periods (1mo, 3mo, 6mo, 1y, ...) served as zero-copy slices
+    - In-flight request coalescing: concurrent callers share one download
+    - TTL eviction and a bound on the number of cached symbols
+    - Optional disk cache: restarts read stored history and fetch only new bars
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 512, disk_cache: Any = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache if disk_cache is not None and disk_cache.enabled else None
+
+        self._entries: Dict[Tuple[str, str], _StoreEntry] = {}
+        self._inflight: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'fetches': 0,
+            'evictions': 0,
+            'errors': 0,
+            'disk_hits': 0,
+            'delta_fetches': 0
+        }
+
+    async def get_history(self, symbol: str, period: str = '1y', interval: str = '1d') -> OHLCVSeries:
+        """
+        Get OHLCV history for a symbol
+
+        Args:
+            symbol: Stock symbol
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, ytd, 1y, 2y, 5y, 10y, max)
+            interval: Bar interval (1m ... 1h, 1d, 1wk, 1mo)
+
+        Returns:
+            OHLCVSeries view covering the requested period (may be empty)
+        """
+        series = await self._ensure(symbol, interval, period)
+        return slice_period(series, period)
+
+    async def get_many(
+        self,
+        symbols: List[str],
+        period: str = '1y',
+        interval: str = '1d',
+        chunk_size: int = 100,
+        timeout: Optional[float] = 60
+    ) -> Dict[str, OHLCVSeries]:
+        """
+        Get OHLCV history for many symbols
+
+        Cached symbols are served as slices; the rest are fetched with one
+        multi-symbol yfinance download per chunk instead of one request per
+        symbol, and cached like single-symbol fetches.
+
+        Returns:
+            {symbol: OHLCVSeries} for every symbol (empty series if unavailable)
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        result: Dict[str, OHLCVSeries] = {}
+        missing = []
+
+        for symbol in symbols:
+            entry = self._entries.get((symbol, interval))
+            if entry and self._is_fresh(entry) and period_rank(entry.period) >= period_rank(period):
+                self.stats['hits'] += 1
+                result[symbol] = entry.series
+            else:
+                missing.append(symbol)
+
+        if missing:
+            self.stats['misses'] += len(missing)
+            fetch_period = _widest(period, DEFAULT_FETCH_PERIOD.get(interval, '1y'))
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            downloads = await asyncio.gather(
+                *(get_market_data_adapter().run(self._load_many, chunk, interval, fetch_period, timeout=timeout)
+                  for chunk in chunks),
+                return_exceptions=True
+            )
+
+            self.evict_expired()
+            for chunk, downloaded in zip(chunks, downloads):
+                if isinstance(downloaded, Exception):
+                    self.stats['errors'] += 1
+                    logger.error(f"[MarketDataStore] Batch history fetch failed for {len(chunk)} symbols: {downloaded}")
+                    downloaded = {}
+                for symbol in chunk:
+                    series = downloaded.get(symbol) or OHLCVSeries.empty_series(symbol, interval)
+                    if not series.empty:
+                        self._entries[(symbol, interval)] = _StoreEntry(
+                            series=series, period=fetch_period, fetched_at=time.time()
+                        )
+                    result[symbol] = series
+
+        return {symbol: slice_period(result[symbol], period) for symbol in symbols}
+
+    async def get_range(
+        self,
+        symbol: str,
+        start: datetime,
+        end: Optional[datetime] = None,
+        interval: str = '1d'
+    ) -> OHLCVSeries:
+        """
+        Get OHLCV history between two dates (end exclusive)
+
+        Args:
+            symbol: Stock symbol
+            start: First date to include
+            end: Date to stop before (defaults to latest bar)
+            interval: Bar interval
+        """
+        series = await self._ensure(symbol, interval, self.period_covering(start))
+        return series.since(start, end)
+
+    @staticmethod
+    def period_covering(start: datetime) -> str:
+        """Smallest yfinance period whose history reaches back from today to the given start date ('max' if none does)"""
+        days_back = (pd.Timestamp.now() - _to_naive(start)).days
+        for period, months in PERIOD_MONTHS.items():
+            if days_back <= months * 30:
+                return period
+        return 'max'
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop cached history for a symbol, or everything"""
+        if symbol is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == symbol.upper()]:
+            del self._entries[key]
+
+    def evict_expired(self) -> int:
+        """Remove entries older than the TTL, returning how many were evicted"""
+        now = time.time()
+        expired = [k for k, e in self._entries.items() if now - e.fetched_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+        # Enforce the entry bound, dropping the oldest fetches first
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k].fetched_at)[:overflow]
+            for key in oldest:
+                del self._entries[key]
+            expired.extend(oldest)
+
+        self.stats['evictions'] += len(expired)
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hit_rate': round(self.stats['hits'] / total, 3) if total else 0.0,
+            'disk_cache': self.disk_cache.get_stats() if self.disk_cache else None
+        }
+
+    async def _ensure(self, symbol: str, interval: str, period: str) -> OHLCVSeries:
+        """Return the full cached series, fetching or joining a fetch if needed"""
+        key = (symbol.upper(), interval)
+
+        entry = self._entries.get(key)
+        if entry and self._is_fresh(entry) and period_rank(entry.period) >= period_rank(period):
+            self.stats['hits'] += 1
+            return entry.series
+
+        inflight = self._inflight.get(key)
+        if inflight and period_rank(inflight[0]) >= period_rank(period):
+            self.stats['coalesced'] += 1
+            try:
+                return await asyncio.shield(inflight[1])
+            except asyncio.CancelledError:
+                if not inflight[1].cancelled():
+                    raise
+                # The leading caller was cancelled mid-fetch; take the fetch over
+                return await self._ensure(symbol, interval, period)
+
+        self.stats['misses'] += 1
+        fetch_period = _widest(period, DEFAULT_FETCH_PERIOD.get(interval, '1y'))
+        if entry:
+            fetch_period = _widest(fetch_period, entry.period)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fetch_period, future)
+
+        try:
+            series = await get_market_data_adapter().run(self._load, key[0], interval, fetch_period)
+            self.evict_expired()
+            if not series.empty:
+                self._entries[key] = _StoreEntry(series=series, period=fetch_period, fetched_at=time.time())
+            future.set_result(series)
+            return series
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"[MarketDataStore] Failed to fetch {key[0]} ({interval}, {fetch_period}): {e}")
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            # A cancelled leader must still release followers waiting on the shared future
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+
+    def _load(self, symbol: str, interval: str, period: str) -> OHLCVSeries:
+        """
+        Blocking history load: stored history refreshed with the bars since its
+        last timestamp, or a full download when nothing covering the period is stored
+        """
+        disk = self.disk_cache
+        stored = disk.read(symbol, interval) if disk else None
+        if stored is None or period_rank(stored.period) < period_rank(period):
+            series = self._download(symbol, interval, period)
+            if disk and not series.empty:
+                disk.write(series, period)
+            return series
+
+        if time.time() - stored.fetched_at <= self.ttl_seconds:
+            self.stats['disk_hits'] += 1
+            return stored.series
+
+        try:
+            delta = self._download_since(symbol, interval, self._refresh_start(stored.series))
+        except Exception as e:
+            logger.warning(f"[MarketDataStore] Refresh of stored {symbol} {interval} history failed, serving stored bars: {e}")
+            return stored.series
+        self.stats['delta_fetches'] += 1
+
+        gap = not self._reaches(stored.series, delta)
+        if gap or self._readjusted(stored.series, delta):
+            if gap:
+                logger.info(f"[MarketDataStore] {symbol} {interval} refresh does not reach the stored bars, refetching history")
+            else:
+                logger.info(f"[MarketDataStore] {symbol} prices were re-adjusted (split/dividend), refetching history")
+            series = self._download(symbol, interval, stored.period)
+            if not series.empty:
+                disk.write(series, stored.period)
+                return series
+            return stored.series
+        return self._append(stored, delta)
+
+    def _load_many(self, symbols: List[str], interval: str, period: str) -> Dict[str, OHLCVSeries]:
+        """Blocking multi-symbol load: stored histories plus one delta download and one full download"""
+        disk = self.disk_cache
+        if disk is None:
+            return self._download_many(symbols, interval, period)
+
+        result, full, stale = {}, [], []
+        for symbol in symbols:
+            stored = disk.read(symbol, interval)
+            if stored is None or period_rank(stored.period) < period_rank(period):
+                full.append(symbol)
+            elif time.time() - stored.fetched_at <= self.ttl_seconds:
+                self.stats['disk_hits'] += 1
+                result[symbol] = stored.series
+            else:
+                stale.append(stored)
+
+        if stale:
+            # One download from the oldest last bar; overlapping bars are replaced on append
+            start = min(self._refresh_start(stored.series) for stored in stale)
+            try:
+                deltas = self._download_many(
+                    [stored.series.symbol for stored in stale], interval, period, start=start
+                )
+                self.stats['delta_fetches'] += 1
+            except Exception as e:
+                logger.warning(f"[MarketDataStore] Refresh of {len(stale)} stored histories failed, serving stored bars: {e}")
+                deltas = None
+            for stored in stale:
+                symbol = stored.series.symbol
+                if deltas is None:
+                    result[symbol] = stored.series
+                else:
+                    delta = deltas.get(symbol) or OHLCVSeries.empty_series(symbol, interval)
+                    if not self._reaches(stored.series, delta) or self._readjusted(stored.series, delta):
+                        full.append(symbol)
+                    else:
+                        result[symbol] = self._append(stored, delta)
+
+        if full:
+            downloaded = self._download_many(full, interval, period)
+            for symbol, series in downloaded.items():
+                disk.write(series, period)
+            result.update(downloaded)
+
+        return result
+
+    @staticmethod
+    def _refresh_start(series: OHLCVSeries) -> Any:
+        """Refreshes start one complete bar before the last (possibly unfinished) stored bar"""
+        return series.dates[-2] if len(series) > 1 else series.dates[-1]
+
+    @staticmethod
+    def _reaches(stored: OHLCVSeries, delta: OHLCVSeries) -> bool:
+        """
+        True when the delta starts at or before the last stored bar, so the stored
+        history plus the delta has no gap up to now. Providers return nothing (or a
+        later window) for starts beyond their lookback, e.g. yfinance's intraday limit.
+        """
+        return not delta.empty and delta.dates[0] <= stored.dates[-1]
+
+    def _append(self, stored: Any, delta: OHLCVSeries) -> OHLCVSeries:
+        """Append refreshed bars to stored history, dropping bars older than its period"""
+        return self.disk_cache.append(stored, delta, trim=lambda merged: slice_period(merged, stored.period)).series
+
+    @staticmethod
+    def _readjusted(stored: OHLCVSeries, delta: OHLCVSeries) -> bool:
+        """True when the overlapping complete bar changed, i.e. history was split/dividend adjusted again"""
+        if len(stored) < 2 or delta.empty:
+            return False
+        i = int(np.searchsorted(delta.dates, stored.dates[-2]))
+        if i >= len(delta) or delta.dates[i] != stored.dates[-2]:
+            return False
+        return not np.isclose(delta.close[i], stored.close[-2], rtol=1e-4)
+
+    def _download(self, symbol: str, interval: str, period: str) -> OHLCVSeries:
+        """Blocking yfinance download (runs on the market data adapter's pool)"""
+        self.stats['fetches'] += 1
+        logger.info(f"[MarketDataStore] Downloading {symbol} {interval} history ({period})")
+
+        hist = yf.Ticker(symbol).history(period=period, interval=interval)
+        if hist is None or hist.empty:
+            logger.warning(f"[MarketDataStore] No history returned for {symbol}")
+            return OHLCVSeries.empty_series(symbol, interval)
+
+        return OHLCVSeries.from_dataframe(symbol, interval, hist)
+
+    def _download_since(self, symbol: str, interval: str, start: Any) -> OHLCVSeries:
+        """Blocking yfinance download of the bars from `start` (inclusive) to now"""
+        self.stats['fetches'] += 1
+        hist = yf.Ticker(symbol).history(start=_to_naive(start), interval=interval)
+        if hist is None or hist.empty:
+            return OHLCVSeries.empty_series(symbol, interval)
+        return OHLCVSeries.from_dataframe(symbol, interval, hist)
+
+    def _download_many(
+        self,
+        symbols: List[str],
+        interval: str,
+        period: str,
+        start: Any = None
+    ) -> Dict[str, OHLCVSeries]:
+        """Blocking multi-symbol yfinance download split into per-symbol series (from `start` if given)"""
+        self.stats['fetches'] += 1
+        logger.info(f"[MarketDataStore] Downloading {len(symbols)} symbols {interval} history "
+                    f"({'since ' + str(_to_naive(start)) if start is not None else period})")
+
+        frame = yf.download(
+            symbols,
+            **({'start': _to_naive(start)} if start is not None else {'period': period}),
+            interval=interval,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False
+        )
+        if frame is None or frame.empty:
+            return {}
+
+        series = {}
+        for symbol in symbols:
+            if isinstance(frame.columns, pd.MultiIndex):
+                # group_by='ticker' yields (symbol, field); older versions may yield (field, symbol)
+                level = 0 if symbol in frame.columns.get_level_values(0) else 1
+                if symbol not in frame.columns.get_level_values(level):
+                    continue
+                hist = frame.xs(symbol, axis=1, level=level)
+            else:
+                hist = frame
+            hist = hist.dropna(subset=['Close'])
+            if not hist.empty:
+                series[symbol] = OHLCVSeries.from_dataframe(symbol, interval, hist)
+        return series
+
+    def _is_fresh(self, entry: _StoreEntry) -> bool:
+        return time.time() - entry.fetched_at <= self.ttl_seconds
+
+
+# Global market data store
+market_data_store = None
+
+
+def get_market_data_store() -> MarketDataStore:
+    """Get or create the per-process market data store"""
+    global market_data_store
+    if market_data_store is None:
+        from services.ohlcv_disk_cache import get_ohlcv_disk_cache
+        market_data_store = MarketDataStore(disk_cache=get_ohlcv_disk_cache())
+    return market_data_store
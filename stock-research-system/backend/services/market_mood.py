@@ -7,9 +7,11 @@ import asyncio
 from typing import Dict, Any, List
 import numpy as np
 import logging
-import yfinance as yf
 from datetime import datetime, timedelta
 
+from services.market_data_adapter import get_market_data_adapter
+from services.market_data_store import get_market_data_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -98,8 +100,7 @@ class MarketMoodCalculator:
         VIX < 15: Low fear (100), VIX > 30: High fear (0)
         """
         try:
-            vix = yf.Ticker('^VIX')
-            info = vix.info
+            info = await get_market_data_adapter().get_info('^VIX')
             current_vix = info.get('regularMarketPrice', 20)
 
             # Normalize VIX to 0-100 scale (inverted - high VIX = fear)
@@ -121,8 +122,7 @@ class MarketMoodCalculator:
         """
         try:
             # Get S&P 500 components performance
-            spy = yf.Ticker('SPY')
-            hist = spy.history(period='1d')
+            hist = (await get_market_data_store().get_history('SPY', period='1d')).to_dataframe()
 
             if not hist.empty:
                 daily_change = (hist['Close'].iloc[-1] - hist['Open'].iloc[-1]) / hist['Open'].iloc[-1]
@@ -146,8 +146,7 @@ class MarketMoodCalculator:
         Calculate price momentum (SPY vs moving averages)
         """
         try:
-            spy = yf.Ticker('SPY')
-            hist = spy.history(period='3mo')
+            hist = (await get_market_data_store().get_history('SPY', period='3mo')).to_dataframe()
 
             if not hist.empty:
                 current_price = hist['Close'].iloc[-1]
@@ -175,8 +174,7 @@ class MarketMoodCalculator:
         Calculate volume sentiment (above/below average)
         """
         try:
-            spy = yf.Ticker('SPY')
-            hist = spy.history(period='1mo')
+            hist = (await get_market_data_store().get_history('SPY', period='1mo')).to_dataframe()
 
             if not hist.empty:
                 current_volume = hist['Volume'].iloc[-1]
@@ -208,8 +206,7 @@ class MarketMoodCalculator:
         """
         try:
             # Simplified using VIX as proxy for put/call sentiment
-            vix = yf.Ticker('^VIX')
-            info = vix.info
+            info = await get_market_data_adapter().get_info('^VIX')
             current_vix = info.get('regularMarketPrice', 20)
 
             # Lower VIX suggests lower put/call ratio (more calls = greed)
@@ -234,9 +231,10 @@ class MarketMoodCalculator:
             indices = ['SPY', 'QQQ', 'DIA']
             scores = []
 
-            for symbol in indices:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+            adapter = get_market_data_adapter()
+            infos = await asyncio.gather(*[adapter.get_info(symbol) for symbol in indices])
+
+            for info in infos:
                 current = info.get('regularMarketPrice', 0)
                 high_52w = info.get('fiftyTwoWeekHigh', current)
                 low_52w = info.get('fiftyTwoWeekLow', current)
@@ -264,16 +262,16 @@ class MarketMoodCalculator:
             safe_performance = []
             risk_performance = []
 
+            store = get_market_data_store()
+
             for symbol in safe_havens:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='5d')
+                hist = (await store.get_history(symbol, period='5d')).to_dataframe()
                 if not hist.empty:
                     perf = (hist['Close'].iloc[-1] - hist['Close'].iloc[0]) / hist['Close'].iloc[0]
                     safe_performance.append(perf)
 
             for symbol in risk_assets:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='5d')
+                hist = (await store.get_history(symbol, period='5d')).to_dataframe()
                 if not hist.empty:
                     perf = (hist['Close'].iloc[-1] - hist['Close'].iloc[0]) / hist['Close'].iloc[0]
                     risk_performance.append(perf)
@@ -372,10 +370,10 @@ class SectorRotationAnalyzer:
         """
         try:
             sector_data = []
+            store = get_market_data_store()
 
             for symbol, name in self.sectors.items():
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='1mo')
+                hist = (await store.get_history(symbol, period='1mo')).to_dataframe()
 
                 if not hist.empty:
                     # Calculate performance metrics
@@ -0,0 +1,270 @@
+"""
+Model Cache
+Fitted price models for the predictive agent, kept per symbol and last bar in
+memory and on disk, warm-started on one new bar and trained on a process pool
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from utils.process_pool import LazyProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the agent's feature columns, dtype or model settings change
+FEATURE_SET_VERSION = 'price-v2'
+
+FOREST_PARAMS = {'n_estimators': 50, 'max_depth': 10, 'random_state': 42}
+
+
+def fit_price_models(
+    X: np.ndarray,
+    y: np.ndarray,
+    split_idx: int,
+    previous: Optional[Dict[str, Any]] = None,
+    warm_start_trees: int = 10,
+    max_trees: int = 150,
+    n_jobs: int = 1
+) -> Dict[str, Any]:
+    """
+    Fit the linear and random forest price models on X[:split_idx]
+
+    With a previous entry the forest keeps its trees and grows `warm_start_trees`
+    more on the new training rows, until it reaches `max_trees` and is rebuilt.
+
+    Args:
+        X: Feature matrix (rows in time order)
+        y: Target prices
+        split_idx: First held-out row for scoring
+        previous: Cache entry fitted one bar earlier
+        warm_start_trees: Trees added per warm start
+        max_trees: Forest size that forces a full retrain
+        n_jobs: Forest fitting/prediction parallelism
+
+    Returns:
+        Cache entry with models, held-out scores and training arrays
+    """
+    X_train, X_test = X[:split_idx], X[split_idx:]
+    y_train, y_test = y[:split_idx], y[split_idx:]
+
+    lr_model = LinearRegression()
+    lr_model.fit(X_train, y_train)
+
+    warm = previous is not None and previous['rf'].n_estimators + warm_start_trees <= max_trees
+    if warm:
+        rf_model = previous['rf']
+        rf_model.set_params(warm_start=True, n_jobs=n_jobs,
+                            n_estimators=rf_model.n_estimators + warm_start_trees)
+    else:
+        rf_model = RandomForestRegressor(n_jobs=n_jobs, **FOREST_PARAMS)
+    rf_model.fit(X_train, y_train)
+
+    return {
+        'lr': lr_model,
+        'rf': rf_model,
+        'lr_score': lr_model.score(X_test, y_test),
+        'rf_score': rf_model.score(X_test, y_test),
+        'X': np.ascontiguousarray(X),
+        'y': np.ascontiguousarray(y),
+        'warm_started': warm
+    }
+
+
+class ModelCache:
+    """
+    Per-symbol fitted model cache
+
+    Features:
+    - In-memory LRU of the latest fit per symbol
+    - joblib persistence keyed by symbol, last bar date and feature set version
+    - Warm-start retraining when a single new bar has arrived
+    - Process-pool training off the event loop
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_entries: int = 256,
+        max_workers: Optional[int] = None,
+        n_jobs: Optional[int] = None,
+        warm_start_trees: int = 10,
+        max_trees: int = 150
+    ):
+        self.cache_dir = cache_dir or os.getenv(
+            "MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "stock_research_models")
+        )
+        self.max_entries = max_entries
+        self.max_workers = max_workers or int(os.getenv("MODEL_TRAINING_WORKERS", "2"))
+        self.n_jobs = n_jobs or int(os.getenv("MODEL_TRAINING_JOBS", "2"))
+        self.warm_start_trees = warm_start_trees
+        self.max_trees = max_trees
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self._pool = LazyProcessPool(self.max_workers)
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'warm_starts': 0, 'full_trains': 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    async def get_models(
+        self,
+        symbol: str,
+        bar_dates: np.ndarray,
+        X: np.ndarray,
+        y: np.ndarray,
+        split_idx: int
+    ) -> Dict[str, Any]:
+        """
+        Fitted models for the symbol's current history, training only if needed
+
+        Args:
+            symbol: Stock symbol
+            bar_dates: Bar date of each row of X (last one is the cache key)
+            X: Feature matrix
+            y: Target prices
+            split_idx: First held-out row for scoring
+
+        Returns:
+            Cache entry ('lr', 'rf', 'lr_score', 'rf_score', 'source', ...)
+        """
+        symbol = symbol.upper()
+        key = self._key(symbol, bar_dates[-1])
+
+        entry = self._entries.get(symbol)
+        if entry is not None and entry['key'] == key:
+            self._entries.move_to_end(symbol)
+            self.stats['memory_hits'] += 1
+            return {**entry, 'source': 'memory'}
+
+        # Concurrent analyses of the same symbol share one training run
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return {**await asyncio.shield(inflight), 'source': 'shared'}
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The training caller was cancelled (e.g. an agent deadline); train here instead
+                return await self.get_models(symbol, bar_dates, X, y, split_idx)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._load_or_train(symbol, key, bar_dates, X, y, split_idx)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when no other caller was waiting
+            raise
+        finally:
+            # Release waiters even when the training caller is cancelled
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _load_or_train(self, symbol, key, bar_dates, X, y, split_idx) -> Dict[str, Any]:
+        entry = await asyncio.to_thread(self._load, key)
+        if entry is not None:
+            self.stats['disk_hits'] += 1
+            source = 'disk'
+        else:
+            previous = None
+            if len(bar_dates) > 1:
+                previous = self._entries.get(symbol)
+                if previous is None or previous['key'] != self._key(symbol, bar_dates[-2]):
+                    previous = await asyncio.to_thread(self._load, self._key(symbol, bar_dates[-2]))
+                if previous is not None and not self._one_bar_later(previous, X, y):
+                    previous = None
+
+            started = time.time()
+            entry = await asyncio.get_running_loop().run_in_executor(
+                self._pool.get(), fit_price_models, X, y, split_idx, previous,
+                self.warm_start_trees, self.max_trees, self.n_jobs
+            )
+            entry['key'] = key
+            source = 'warm_start' if entry['warm_started'] else 'trained'
+            self.stats['warm_starts' if entry['warm_started'] else 'full_trains'] += 1
+            logger.info(
+                f"[ModelCache] {symbol} {source} ({entry['rf'].n_estimators} trees) "
+                f"in {(time.time() - started) * 1000:.0f}ms"
+            )
+            await asyncio.to_thread(self._save, entry)
+
+        self._entries[symbol] = entry
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return {**entry, 'source': source}
+
+    @staticmethod
+    def _key(symbol: str, bar_date) -> Tuple[str, str, str]:
+        return symbol, str(np.datetime64(bar_date, 'D')), FEATURE_SET_VERSION
+
+    @staticmethod
+    def _one_bar_later(previous: Dict[str, Any], X: np.ndarray, y: np.ndarray) -> bool:
+        """True when X, y extend the previous fit's rows by exactly one bar (growing or rolling window)"""
+        old_X, old_y = previous['X'], previous['y']
+        if old_X.shape[1:] != X.shape[1:]:
+            return False
+        if len(old_X) == len(X) - 1:
+            return np.array_equal(old_X, X[:-1]) and np.array_equal(old_y, y[:-1])
+        if len(old_X) == len(X):
+            return np.array_equal(old_X[1:], X[:-1]) and np.array_equal(old_y[1:], y[:-1])
+        return False
+
+    def _path(self, key: Tuple[str, str, str]) -> str:
+        symbol, bar_date, version = key
+        return os.path.join(self.cache_dir, f"{symbol}_{bar_date}_{version}.joblib")
+
+    def _load(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            # Training arrays stay on disk until a warm start compares them
+            return joblib.load(path, mmap_mode='r')
+        except Exception as e:
+            logger.warning(f"[ModelCache] Discarding unreadable {path}: {e}")
+            return None
+
+    def _save(self, entry: Dict[str, Any]):
+        try:
+            path = self._path(entry['key'])
+            joblib.dump(entry, path + '.tmp')
+            os.replace(path + '.tmp', path)
+            # Older bars of the same symbol are superseded by this fit
+            symbol, _, version = entry['key']
+            for stale in glob.glob(os.path.join(self.cache_dir, f"{symbol}_*_{version}.joblib")):
+                if stale != path:
+                    os.remove(stale)
+        except Exception as e:
+            logger.warning(f"[ModelCache] Failed to persist {entry['key']}: {e}")
+
+    def shutdown(self):
+        """Stop the training pool"""
+        self._pool.shutdown()
+
+
+# Global model cache
+model_cache = None
+
+
+def get_model_cache() -> ModelCache:
+    """Get or create the shared model cache"""
+    global model_cache
+    if model_cache is None:
+        model_cache = ModelCache()
+    return model_cache
@@ -0,0 +1,239 @@
+"""
+OHLCV Disk Cache
+Memory-mapped Arrow IPC history per (symbol, interval), refreshed incrementally
+and shared across process restarts (disabled when pyarrow is not installed)
+"""
+
+import glob
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+from services.market_data_store import OHLCVSeries
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+@dataclass
+class StoredHistory:
+    """History read from disk with the range it was fetched for"""
+    series: OHLCVSeries
+    period: str
+    fetched_at: float
+    source: Optional[str] = None
+    retry_after: float = 0.0  # Until then the history is served without a refresh (see defer)
+
+
+class OHLCVDiskCache:
+    """
+    Arrow IPC history files
+
+    Features:
+    - One file per (symbol, interval): {cache_dir}/{interval}/{SYMBOL}.arrow,
+      or {cache_dir}/{source}/{interval}/{SYMBOL}.arrow for other data sources
+    - Memory-mapped, zero-copy reads
+    - Incremental append of new bars, atomic file replacement
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, enabled: Optional[bool] = None):
+        self.cache_dir = cache_dir or os.getenv(
+            "OHLCV_CACHE_DIR", os.path.join(tempfile.gettempdir(), "stock_research_ohlcv")
+        )
+        if enabled is None:
+            enabled = os.getenv("OHLCV_CACHE_ENABLED", "true").lower() == "true"
+        self.enabled = enabled and pa is not None
+        if enabled and pa is None:
+            logger.warning("[OHLCVDiskCache] pyarrow not installed, disk history cache disabled")
+
+        self.stats = {'reads': 0, 'misses': 0, 'writes': 0, 'appends': 0, 'appended_bars': 0, 'errors': 0}
+
+    def read(self, symbol: str, interval: str, source: Optional[str] = None) -> Optional[StoredHistory]:
+        """
+        Stored history for a symbol and interval
+
+        Args:
+            symbol: Stock symbol
+            interval: Bar interval
+            source: Data source namespace (None for the market data store's history)
+
+        Returns:
+            StoredHistory with read-only arrays backed by the file, or None
+        """
+        path = self._path(symbol, interval, source)
+        if not self.enabled or not os.path.exists(path):
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            with pa.memory_map(path, 'r') as mapped:
+                table = pa.ipc.open_file(mapped).read_all()
+            metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+
+            columns = {'dates': table.column('date').to_numpy()}
+            for field in FIELDS:
+                columns[field] = table.column(field).to_numpy()
+            for values in columns.values():
+                values.setflags(write=False)
+
+            self.stats['reads'] += 1
+            return StoredHistory(
+                series=OHLCVSeries(symbol=symbol.upper(), interval=interval, **columns),
+                period=metadata.get('period', 'max'),
+                fetched_at=float(metadata.get('fetched_at', 0)),
+                source=source,
+                retry_after=float(metadata.get('retry_after', 0))
+            )
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"[OHLCVDiskCache] Discarding unreadable {path}: {e}")
+            return None
+
+    def write(self, series: OHLCVSeries, period: str, source: Optional[str] = None) -> Optional[StoredHistory]:
+        """
+        Replace the stored history with a full download
+
+        Args:
+            series: Complete history for the period
+            period: Range the history was fetched for
+            source: Data source namespace (None for the market data store's history)
+
+        Returns:
+            The history as now stored (memory-mapped), or None if disabled/failed
+        """
+        if not self.enabled or series.empty:
+            return None
+        self._write(series, period, source)
+        self.stats['writes'] += 1
+        return self.read(series.symbol, series.interval, source)
+
+    def append(
+        self,
+        stored: StoredHistory,
+        delta: OHLCVSeries,
+        trim: Optional[Callable[[OHLCVSeries], OHLCVSeries]] = None
+    ) -> StoredHistory:
+        """
+        Append bars fetched since the last stored timestamp
+
+        Stored bars at or after the first delta bar are replaced by the delta.
+        The merged history is written back to the stored history's source.
+
+        Args:
+            stored: History previously returned by read
+            delta: New bars (first bar at or before the last stored one)
+            trim: Applied to the merged history before it is written, e.g. to drop
+                bars older than the stored period
+
+        Returns:
+            The merged history as now stored. An empty delta proves nothing about
+            the bars since the last stored one, so the history is returned as is and
+            keeps its refresh time.
+        """
+        if delta.empty:
+            return stored
+
+        keep = int(np.searchsorted(stored.series.dates, delta.dates[0], side='left'))
+        head = stored.series.slice(0, keep)
+        merged = OHLCVSeries(
+            symbol=stored.series.symbol,
+            interval=stored.series.interval,
+            dates=np.concatenate([head.dates, delta.dates]),
+            **{field: np.concatenate([getattr(head, field), getattr(delta, field)]) for field in FIELDS}
+        )
+        appended = len(merged) - len(stored.series)
+        if trim is not None:
+            merged = trim(merged)
+        self._write(merged, stored.period, stored.source)
+
+        self.stats['appends'] += 1
+        self.stats['appended_bars'] += max(appended, 0)
+        logger.info(f"[OHLCVDiskCache] {merged.symbol} {merged.interval}: {len(delta)} bars fetched, "
+                    f"{appended} new, {len(merged)} stored")
+        return (self.read(merged.symbol, merged.interval, stored.source)
+                or StoredHistory(merged, stored.period, time.time(), stored.source))
+
+    def defer(self, stored: StoredHistory, seconds: float) -> StoredHistory:
+        """
+        Hold off refreshing stored history after a refresh that brought nothing
+
+        The bars and refresh time are kept; retry_after is set `seconds` from
+        now, so rate-limited providers serve the stored range instead of
+        calling again on every request.
+
+        Returns:
+            The history with its new retry_after
+        """
+        retry_after = time.time() + seconds
+        if self.enabled:
+            self._write(stored.series, stored.period, stored.source,
+                        fetched_at=stored.fetched_at, retry_after=retry_after)
+        return StoredHistory(stored.series, stored.period, stored.fetched_at, stored.source, retry_after)
+
+    def invalidate(self, symbol: Optional[str] = None) -> int:
+        """Delete stored history for a symbol (all intervals and sources), or everything"""
+        pattern = f"{symbol.upper()}.arrow" if symbol else "*.arrow"
+        removed = 0
+        paths = glob.glob(os.path.join(self.cache_dir, "*", pattern)) + \
+            glob.glob(os.path.join(self.cache_dir, "*", "*", pattern))
+        for path in paths:
+            os.remove(path)
+            removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters"""
+        return {'enabled': self.enabled, 'cache_dir': self.cache_dir, **self.stats}
+
+    def _path(self, symbol: str, interval: str, source: Optional[str] = None) -> str:
+        return os.path.join(self.cache_dir, *([source] if source else []), interval, f"{symbol.upper()}.arrow")
+
+    def _write(self, series: OHLCVSeries, period: str, source: Optional[str] = None,
+               fetched_at: Optional[float] = None, retry_after: Optional[float] = None):
+        path = self._path(series.symbol, series.interval, source)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        metadata = {'period': period, 'fetched_at': str(time.time() if fetched_at is None else fetched_at)}
+        if retry_after is not None:
+            metadata['retry_after'] = str(retry_after)
+        table = pa.table(
+            {
+                'date': pa.array(np.asarray(series.dates, dtype='datetime64[ns]')),
+                **{field: pa.array(np.asarray(getattr(series, field))) for field in FIELDS}
+            },
+            metadata=metadata
+        )
+        # Unique temp file per writer: threads or processes sharing the cache dir may
+        # write the same symbol at once. Readers keep mapping the old file until they reopen it
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+# Global disk cache
+ohlcv_disk_cache = None
+
+
+def get_ohlcv_disk_cache() -> OHLCVDiskCache:
+    """Get or create the shared OHLCV disk cache"""
+    global ohlcv_disk_cache
+    if ohlcv_disk_cache is None:
+        ohlcv_disk_cache = OHLCVDiskCache()
+    return ohlcv_disk_cache
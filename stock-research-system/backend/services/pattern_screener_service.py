@@ -0,0 +1,233 @@
+"""
+Pattern Screener Service
+Screens a watchlist for chart patterns in one batch over dates x symbols
+matrices on a process pool, yielding matches chunk by chunk
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Any, AsyncGenerator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from calculators.pattern_detector import PatternDetector
+from services.market_data_store import get_market_data_store
+from utils.process_pool import LazyProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Bars a symbol needs before the detectors report anything
+MIN_BARS = 20
+
+
+def screen_chunk(
+    symbols: List[str],
+    dates: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    patterns: Optional[List[str]] = None,
+    min_confidence: float = 0.0
+) -> List[Dict[str, Any]]:
+    """
+    Run the trailing-window pattern detectors over a chunk of symbols
+
+    Args:
+        symbols: Symbol of each column
+        dates: Union of the symbols' bar dates
+        high, low, close: Aligned (bars, symbols) arrays, NaN where a symbol has no bar
+        patterns: Pattern names to keep (None for all)
+        min_confidence: Minimum pattern confidence
+
+    Returns:
+        Matches ({symbol, pattern, type, confidence, start_date, end_date, current_price,
+        price_date, ...}), detected on each symbol's own bars
+    """
+    detector = PatternDetector()
+    labels = np.datetime_as_string(np.asarray(dates, dtype='datetime64[D]'))
+    wanted = set(patterns) if patterns else None
+    matches = []
+
+    for j, symbol in enumerate(symbols):
+        # Only the symbol's real bars: no synthetic bars across halts, other calendars or stale data
+        rows = np.flatnonzero(np.isfinite(close[:, j]))
+        if len(rows) < MIN_BARS:
+            continue
+
+        for pattern in detector.current_patterns(high[rows, j], low[rows, j], close[rows, j]):
+            if pattern['confidence'] < min_confidence or (wanted and pattern['pattern'] not in wanted):
+                continue
+            start, end = rows[pattern.pop('start_index')], rows[pattern.pop('end_index')]
+            matches.append({
+                'symbol': symbol,
+                **pattern,
+                'start_date': str(labels[start]),
+                'end_date': str(labels[end]),
+                'current_price': round(float(close[rows[-1], j]), 4),
+                'price_date': str(labels[rows[-1]])
+            })
+
+    return matches
+
+
+def rank_matches(matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Highest confidence first, then symbol and pattern name"""
+    return sorted(matches, key=lambda m: (-m['confidence'], m['symbol'], m['pattern']))
+
+
+class PatternScreener:
+    """
+    Batch chart pattern screener
+
+    Features:
+    - One aligned OHLC pull for the whole watchlist
+    - Detector runs in symbol chunks on a process pool (in-process for small lists)
+    - Matches streamed per chunk, final results ranked by confidence
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 50,
+        process_pool_threshold: int = 100,
+        max_workers: Optional[int] = None
+    ):
+        self.chunk_size = chunk_size
+        self.process_pool_threshold = process_pool_threshold
+        self.max_workers = max_workers or int(os.getenv("SCREENER_WORKERS", str(min(os.cpu_count() or 1, 4))))
+        self._pool = LazyProcessPool(self.max_workers)
+
+    async def stream(
+        self,
+        symbols: List[str],
+        period: str = '6mo',
+        interval: str = '1d',
+        patterns: Optional[List[str]] = None,
+        min_confidence: float = 0.0
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Screen symbols, yielding events as chunks finish
+
+        Args:
+            symbols: Watchlist tickers
+            period: History period to screen
+            interval: Bar interval
+            patterns: Pattern names to keep (None for all)
+            min_confidence: Minimum pattern confidence
+
+        Yields:
+            {'event': 'match', ...match} for each match, highest confidence first within a chunk
+            {'event': 'progress', 'screened': n, 'total': n} after each chunk
+            {'event': 'complete', 'matches': [...ranked], 'screened', 'missing', 'elapsed_ms'} last
+        """
+        started = time.time()
+        dates, used, high, low, close, missing = await self._aligned_ohlc(symbols, period, interval)
+
+        loop = asyncio.get_running_loop()
+        executor = self._pool.get() if len(used) > self.process_pool_threshold else None
+
+        async def run_chunk(first: int) -> Tuple[int, List[Dict[str, Any]]]:
+            cols = slice(first, first + self.chunk_size)
+            matches = await loop.run_in_executor(
+                executor, screen_chunk, used[cols], dates,
+                np.ascontiguousarray(high[:, cols]), np.ascontiguousarray(low[:, cols]),
+                np.ascontiguousarray(close[:, cols]), patterns, min_confidence
+            )
+            return len(used[cols]), matches
+
+        tasks = [asyncio.ensure_future(run_chunk(first)) for first in range(0, len(used), self.chunk_size)]
+        found, screened = [], 0
+        try:
+            for done in asyncio.as_completed(tasks):
+                count, matches = await done
+                matches = rank_matches(matches)
+                found.extend(matches)
+                for match in matches:
+                    yield {'event': 'match', **match}
+                screened += count
+                yield {'event': 'progress', 'screened': screened, 'total': len(used)}
+        finally:
+            # Client went away mid-screen: drop chunks that have not started
+            for task in tasks:
+                task.cancel()
+
+        elapsed_ms = round((time.time() - started) * 1000, 1)
+        logger.info(f"[PatternScreener] {len(used)} symbols screened, {len(found)} matches in {elapsed_ms}ms")
+        yield {
+            'event': 'complete',
+            'matches': rank_matches(found),
+            'screened': len(used),
+            'missing': missing,
+            'bars': len(dates),
+            'elapsed_ms': elapsed_ms
+        }
+
+    async def screen(self, symbols: List[str], top_n: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Screen symbols and return the ranked summary
+
+        Args:
+            symbols: Watchlist tickers
+            top_n: Number of matches to return (None for all)
+            **kwargs: period, interval, patterns, min_confidence (see stream)
+
+        Returns:
+            {'matches': [...ranked], 'total_matches', 'screened', 'missing', 'bars', 'elapsed_ms'}
+        """
+        summary = {}
+        async for event in self.stream(symbols, **kwargs):
+            if event['event'] == 'complete':
+                summary = event
+        matches = summary.pop('matches', [])
+        summary.pop('event', None)
+        return {'matches': matches[:top_n] if top_n else matches, 'total_matches': len(matches), **summary}
+
+    async def _aligned_ohlc(
+        self,
+        symbols: List[str],
+        period: str,
+        interval: str
+    ) -> Tuple[np.ndarray, List[str], np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """
+        Aligned OHLC matrices for a watchlist
+
+        Returns:
+            (dates, symbols with data, high, low, close as dates x symbols with NaN
+            where a symbol has no bar, symbols without data)
+        """
+        histories = await get_market_data_store().get_many(symbols, period=period, interval=interval)
+        available = {symbol: series for symbol, series in histories.items() if len(series) >= MIN_BARS}
+        missing = [symbol for symbol in histories if symbol not in available]
+        if not available:
+            empty = np.empty((0, 0))
+            return np.array([], dtype='datetime64[ns]'), [], empty, empty, empty, missing
+
+        # Union of trading days; days a symbol did not trade stay NaN rather than repeating its last bar
+        dates = np.unique(np.concatenate([series.dates for series in available.values()]))
+        fields = []
+        for name in ('high', 'low', 'close'):
+            frame = pd.DataFrame(
+                {symbol: pd.Series(getattr(series, name), index=series.dates) for symbol, series in available.items()},
+                index=dates
+            )
+            fields.append(frame.to_numpy(dtype=np.float64))
+
+        return dates, list(available), *fields, missing
+
+    def shutdown(self):
+        """Stop the detector pool"""
+        self._pool.shutdown()
+
+
+# Global pattern screener
+pattern_screener = None
+
+
+def get_pattern_screener() -> PatternScreener:
+    """Get or create the shared pattern screener"""
+    global pattern_screener
+    if pattern_screener is None:
+        pattern_screener = PatternScreener()
+    return pattern_screener
@@ -0,0 +1,192 @@
+"""
+Portfolio Optimization Service
+Builds the return matrix for a set of holdings and runs the covariance-aware optimizer.
+
+Histories come from the shared MarketDataStore (so symbols already analyzed
+cost nothing), are aligned on their common trading days and turned into one
+(days, assets) daily return matrix. Ledoit-Wolf shrinkage keeps the
+covariance usable for 100+ holdings on a single year of data.
+"""
+
+import asyncio
+import logging
+import time
+from functools import reduce
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from calculators.portfolio_optimizer import PortfolioOptimizer, allocation_table
+from services.market_data_store import get_market_data_store
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('max_sharpe', 'min_variance', 'target_return', 'risk_parity')
+
+
+class PortfolioOptimizationService:
+    """
+    Mean-variance and risk-parity allocation from shared return history
+
+    Features:
+    - Batched history fetches through the MarketDataStore
+    - Common-date alignment into one return matrix
+    - Ledoit-Wolf shrunk covariance and batched efficient frontier
+    """
+
+    def __init__(self, period: str = '1y', min_history: int = 60, risk_free_rate: float = 0.02):
+        self.period = period
+        self.min_history = min_history
+        self.risk_free_rate = risk_free_rate
+
+    async def get_return_matrix(self, symbols: List[str],
+                                period: Optional[str] = None) -> Tuple[List[str], np.ndarray, List[str]]:
+        """
+        Daily simple returns aligned on the dates every usable symbol traded
+
+        Returns:
+            (symbols used, (days, assets) returns, symbols excluded for missing history)
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        # One multi-symbol download for the uncached symbols instead of a request each
+        # (failed downloads are logged by the store and come back empty)
+        histories = await get_market_data_store().get_many(symbols, period or self.period)
+
+        usable, no_history, short = [], [], []
+        for symbol in symbols:
+            series = histories[symbol]
+            if series.empty:
+                no_history.append(symbol)
+            elif len(series) < self.min_history:
+                short.append(symbol)
+            else:
+                usable.append((symbol, series))
+        if no_history or short:
+            logger.warning(f"[PortfolioOptimizationService] Excluded {no_history} (no history) and "
+                           f"{short} (fewer than {self.min_history} bars)")
+        excluded = [s for s in symbols if s in no_history or s in short]
+
+        if not usable:
+            return [], np.empty((0, 0)), excluded
+
+        common = reduce(np.intersect1d, (series.dates for _, series in usable))
+        closes = np.column_stack([
+            series.close[np.searchsorted(series.dates, common)] for _, series in usable
+        ])
+        returns = closes[1:] / closes[:-1] - 1
+        return [symbol for symbol, _ in usable], returns, excluded
+
+    async def optimize(
+        self,
+        symbols: List[str],
+        method: str = 'max_sharpe',
+        target_return: Optional[float] = None,
+        long_only: bool = True,
+        frontier_points: int = 25,
+        current_weights: Optional[Dict[str, float]] = None,
+        period: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Optimize allocation across symbols
+
+        Args:
+            symbols: Holdings to allocate across
+            method: One of max_sharpe, min_variance, target_return, risk_parity
+            target_return: Annual return (e.g. 0.12) for the target_return method
+            long_only: Disallow short positions
+            frontier_points: Efficient frontier points to include (0 to skip)
+            current_weights: Current allocation by symbol (fractions) for comparison
+            period: History period (defaults to the service period)
+
+        Returns:
+            Allocation, portfolio statistics, frontier and estimation details
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+        if method == 'target_return' and target_return is None:
+            raise ValueError("target_return is required for the target_return method")
+
+        start = time.time()
+        used, returns, excluded = await self.get_return_matrix(symbols, period)
+        if len(used) < 2 or len(returns) < self.min_history:
+            raise ValueError(
+                f"Need at least 2 symbols with {self.min_history} common trading days "
+                f"(got {len(used)} symbols, {len(returns)} days)"
+            )
+
+        # CPU-bound for large portfolios; keep it off the event loop
+        result = await asyncio.to_thread(
+            self._solve, used, returns, method, target_return, long_only, frontier_points, current_weights
+        )
+        result['excluded'] = excluded
+        result['elapsed_ms'] = round((time.time() - start) * 1000, 1)
+        logger.info(
+            f"[PortfolioOptimization] {method} over {len(used)} symbols x {len(returns)} days "
+            f"in {result['elapsed_ms']}ms"
+        )
+        return result
+
+    def _solve(self, symbols: List[str], returns: np.ndarray, method: str,
+               target_return: Optional[float], long_only: bool, frontier_points: int,
+               current_weights: Optional[Dict[str, float]]) -> Dict[str, Any]:
+        optimizer = PortfolioOptimizer.from_returns(returns, risk_free_rate=self.risk_free_rate)
+
+        if method == 'max_sharpe':
+            weights = optimizer.max_sharpe(long_only=long_only)
+        elif method == 'min_variance':
+            weights = optimizer.min_variance(long_only)
+        elif method == 'target_return':
+            weights = optimizer.target_return(target_return, long_only=long_only)
+        else:
+            weights = optimizer.risk_parity()
+
+        result = {
+            'method': method,
+            'long_only': long_only,
+            'allocations': allocation_table(
+                symbols, weights, optimizer.mu, optimizer.risk_contributions(weights)
+            ),
+            **self._summary(optimizer, weights),
+            'estimation': {
+                'symbols': len(symbols),
+                'days': len(returns),
+                'covariance': 'ledoit_wolf',
+                'shrinkage': round(optimizer.shrinkage, 4)
+            }
+        }
+
+        if current_weights:
+            current = np.array([current_weights.get(s, 0.0) for s in symbols], dtype=np.float64)
+            if current.sum() > 0:
+                result['current'] = self._summary(optimizer, current / current.sum())
+
+        if frontier_points:
+            frontier = optimizer.efficient_frontier(frontier_points, long_only)
+            result['efficient_frontier'] = [
+                {'expected_return': round(float(r) * 100, 2), 'volatility': round(float(v) * 100, 2),
+                 'sharpe_ratio': round(float(sr), 2)}
+                for r, v, sr in zip(frontier['return'], frontier['volatility'], frontier['sharpe'])
+            ]
+
+        return result
+
+    @staticmethod
+    def _summary(optimizer: PortfolioOptimizer, weights: np.ndarray) -> Dict[str, float]:
+        stats = optimizer.portfolio_stats(weights)
+        return {
+            'expected_return': round(float(stats['return'][0]) * 100, 2),
+            'expected_volatility': round(float(stats['volatility'][0]) * 100, 2),
+            'sharpe_ratio': round(float(stats['sharpe'][0]), 2)
+        }
+
+
+# Global portfolio optimization service
+portfolio_optimization_service = None
+
+
+def get_portfolio_optimization_service() -> PortfolioOptimizationService:
+    """Get or create the shared portfolio optimization service"""
+    global portfolio_optimization_service
+    if portfolio_optimization_service is None:
+        portfolio_optimization_service = PortfolioOptimizationService()
+    return portfolio_optimization_service
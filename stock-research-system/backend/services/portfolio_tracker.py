@@ -7,7 +7,8 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-import yfinance as yf
+
+from services.market_data_adapter import get_market_data_adapter
 
 logger = logging.getLogger(__name__)
 
@@ -329,8 +330,7 @@ class PortfolioTracker:
     async def _get_current_price(self, symbol: str) -> Optional[float]:
         """Get current stock price from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period="1d")
+            data = await get_market_data_adapter().get_history(symbol, period="1d")
             if not data.empty:
                 return float(data['Close'].iloc[-1])
             return None
@@ -12,9 +12,10 @@ import logging
 from tavily import TavilyClient
 import aiohttp
 from functools import lru_cache
-import yfinance as yf
 import time
 
+from services.market_data_adapter import get_market_data_adapter
+
 logger = logging.getLogger(__name__)
 
 # Constants for retry logic
@@ -22,6 +23,9 @@ MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 1.0
 MAX_RETRY_DELAY = 10.0
 
+# Quote fields a batched price download provides (it has no market cap)
+BATCH_PRICE_FIELDS = ('price', 'change', 'changePercent', 'volume', 'dayHigh', 'dayLow', 'timestamp')
+
 
 class TavilyMarketService:
     """Service for fetching real-time market data using Tavily API"""
@@ -115,7 +119,29 @@ class TavilyMarketService:
             'timestamp': datetime.utcnow().isoformat()
         }
         logger.debug(f"Cached {cache_key} for {self.cache_ttl} seconds")
-    
+
+    def cache_stock_prices(self, quotes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Refresh cached per-symbol quotes with prices from a batched quote download
+
+        Only price fields are updated, and only for symbols whose full quote is
+        cached: a batch quote lacks fields (market cap) that get_stock_price serves.
+
+        Returns:
+            The batch quotes, each with a marketCap key: the cached full quote's
+            market cap, or None when no full quote is cached
+        """
+        merged = {}
+        for symbol, quote in quotes.items():
+            cached = self._get_from_cache(f"price:{symbol}")
+            if cached:
+                self._set_cache(f"price:{symbol}", {
+                    **cached,
+                    **{field: quote[field] for field in BATCH_PRICE_FIELDS if field in quote}
+                })
+            merged[symbol] = {**quote, 'marketCap': (cached or {}).get('marketCap')}
+        return merged
+
     async def get_stock_price(self, symbol: str) -> Dict[str, Any]:
         """
         Get real-time stock price using Yahoo Finance for accuracy
@@ -133,8 +159,7 @@ class TavilyMarketService:
 
         try:
             # Use Yahoo Finance for accurate real-time data
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = await get_market_data_adapter().get_info(symbol)
 
             # Get current price (with fallbacks and type checking)
             def safe_float(value, default=0):
@@ -2,10 +2,11 @@
 Yahoo Finance Service for fetching stock data
 """
 
-import yfinance as yf
 from typing import Dict, Any, Optional
 import logging
 
+from services.market_data_adapter import get_market_data_adapter
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,8 +19,7 @@ class YahooFinanceService:
     async def get_stock_price(self, symbol: str) -> Dict[str, Any]:
         """Get stock price data for a symbol"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.info
+            data = await get_market_data_adapter().get_info(symbol)
 
             return {
                 "symbol": symbol,
@@ -43,8 +43,7 @@ class YahooFinanceService:
     async def get_historical_data(self, symbol: str, period: str = "1mo") -> Dict[str, Any]:
         """Get historical price data"""
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
+            hist = await get_market_data_adapter().get_history(symbol, period=period)
 
             return {
                 "symbol": symbol,
@@ -62,13 +61,15 @@ class YahooFinanceService:
     async def get_financials(self, symbol: str) -> Dict[str, Any]:
         """Get financial statements"""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = await get_market_data_adapter().get_ticker_fields(
+                symbol, 'income_stmt', 'balance_sheet', 'cash_flow'
+            )
 
             return {
                 "symbol": symbol,
-                "income_statement": ticker.income_stmt.to_dict() if hasattr(ticker, 'income_stmt') else {},
-                "balance_sheet": ticker.balance_sheet.to_dict() if hasattr(ticker, 'balance_sheet') else {},
-                "cash_flow": ticker.cash_flow.to_dict() if hasattr(ticker, 'cash_flow') else {}
+                "income_statement": ticker.income_stmt.to_dict() if ticker.income_stmt is not None else {},
+                "balance_sheet": ticker.balance_sheet.to_dict() if ticker.balance_sheet is not None else {},
+                "cash_flow": ticker.cash_flow.to_dict() if ticker.cash_flow is not None else {}
             }
         except Exception as e:
             logger.error(f"Error fetching financials for {symbol}: {e}")
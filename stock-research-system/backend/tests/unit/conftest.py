@@ -0,0 +1,116 @@
+"""
+Shared Unit Test Fixtures
+Synthetic OHLCV histories and a market data store that serves them without network access
+"""
+
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.market_data_store import MarketDataStore, OHLCVSeries
+
+# Every synthetic walk starts here, so a date keeps its bar whatever the end date
+WALK_ORIGIN = '2015-01-01'
+
+
+def make_ohlcv(
+    days: int = 300,
+    seed: int = 0,
+    end: str = '2025-10-01',
+    volatility: float = 0.02,
+    drift: float = 0.0,
+    scale: float = 1.0,
+    tz: str = None
+) -> pd.DataFrame:
+    """
+    Random-walk daily OHLCV frame shaped like yfinance output
+
+    For a given seed the same date always has the same bar, so a later `end`
+    reads like the same history with new bars appended. `scale` multiplies
+    every price, like a split re-adjustment.
+    """
+    dates = pd.bdate_range(start=WALK_ORIGIN, end=end)
+    rng = np.random.default_rng(seed)
+    close = 100 * scale * np.exp(np.cumsum(rng.normal(drift, volatility, len(dates))))
+    open_ = close * (1 + rng.normal(0, volatility / 4, len(dates)))
+    volume = rng.integers(100_000, 10_000_000, len(dates)).astype(float)
+
+    rows = slice(len(dates) - days, None)
+    index = dates[rows] if tz is None else dates[rows].tz_localize(tz)
+    return pd.DataFrame({
+        'Open': open_[rows],
+        'High': np.maximum(open_, close)[rows] * 1.01,
+        'Low': np.minimum(open_, close)[rows] * 0.99,
+        'Close': close[rows],
+        'Volume': volume[rows]
+    }, index=index)
+
+
+class SyntheticStore(MarketDataStore):
+    """
+    Store whose downloads are served from make_ohlcv frames ending at `end`
+
+    Each download is recorded in `downloads` as ('full', symbol),
+    ('since', symbol, start day) or ('many', symbols, start day or None).
+    Without a seed every symbol gets its own walk. Symbols in `missing` have
+    no data.
+    """
+
+    def __init__(self, days: int = 300, seed: int = None, end: str = '2025-10-01', scale: float = 1.0,
+                 tz: str = None, delay: float = 0.0, missing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.days, self.seed, self.end, self.scale, self.tz = days, seed, end, scale, tz
+        self.delay = delay
+        self.missing = set(missing)
+        self.downloads = []
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """The full history served for a symbol"""
+        seed = self.seed if self.seed is not None else zlib.crc32(symbol.encode())
+        return make_ohlcv(days=self.days, seed=seed, end=self.end, scale=self.scale, tz=self.tz)
+
+    def _series(self, symbol, interval, start=None):
+        if symbol in self.missing:
+            return OHLCVSeries.empty_series(symbol, interval)
+        hist = self.frame(symbol)
+        if start is not None:
+            hist = hist[hist.index >= start]
+        return OHLCVSeries.from_dataframe(symbol, interval, hist)
+
+    def _download(self, symbol, interval, period):
+        self.downloads.append(('full', symbol))
+        time.sleep(self.delay)
+        return self._series(symbol, interval)
+
+    def _download_since(self, symbol, interval, start):
+        self.downloads.append(('since', symbol, str(np.datetime64(start, 'D'))))
+        time.sleep(self.delay)
+        return self._series(symbol, interval, start)
+
+    def _download_many(self, symbols, interval, period, start=None):
+        self.downloads.append(('many', tuple(symbols), None if start is None else str(np.datetime64(start, 'D'))))
+        time.sleep(self.delay)
+        return {s: self._series(s, interval, start) for s in symbols if s not in self.missing}
+
+
+@pytest.fixture
+def ohlcv_frame():
+    """make_ohlcv: random-walk OHLCV frame factory"""
+    return make_ohlcv
+
+
+@pytest.fixture
+def ohlcv_series():
+    """Factory for OHLCVSeries over make_ohlcv frames"""
+    def build(symbol: str = 'AAPL', interval: str = '1d', **kwargs) -> OHLCVSeries:
+        return OHLCVSeries.from_dataframe(symbol, interval, make_ohlcv(**kwargs))
+    return build
+
+
+@pytest.fixture
+def synthetic_store():
+    """SyntheticStore class: call it for a store, subclass it to change a download"""
+    return SyntheticStore
@@ -0,0 +1,149 @@
+"""
+Test Agent DAG
+Validates eager dependency scheduling, per-node timeouts and the critical-path report
+"""
+
+import asyncio
+
+import pytest
+
+from workflow.agent_dag import AgentDAG, DagNode
+
+
+def _sleeper(seconds, value=None):
+    async def run(**inputs):
+        await asyncio.sleep(seconds)
+        return value if value is not None else sorted(inputs)
+    return run
+
+
+def test_nodes_start_when_their_own_inputs_are_ready():
+    dag = AgentDAG([
+        DagNode('d', _sleeper(0.01), inputs=('b', 'c')),
+        DagNode('a', _sleeper(0.05, 'A')),
+        DagNode('b', _sleeper(0.2, 'B')),
+        DagNode('c', _sleeper(0.05), inputs=('a',)),
+    ])
+    assert dag.order.index('a') < dag.order.index('c') < dag.order.index('d')
+
+    result = asyncio.run(dag.execute())
+    outputs, report = result['outputs'], result['report']
+
+    assert outputs['c'] == ['a'] and outputs['d'] == ['b', 'c']
+    # c ran while b was still running (level-by-level execution would wait for b)
+    assert report['nodes']['c']['end'] < report['nodes']['b']['end']
+    assert report['critical_path'] == ['b', 'd']
+    assert report['wall_time'] < 0.3
+
+
+def test_timeouts_and_failures_fall_back_to_defaults():
+    async def broken():
+        raise RuntimeError('boom')
+
+    dag = AgentDAG([
+        DagNode('slow', _sleeper(1.0), timeout=0.05, default={'partial': True}),
+        DagNode('broken', broken),
+        DagNode('sink', _sleeper(0), inputs=('slow', 'broken')),
+    ])
+    result = asyncio.run(dag.execute())
+
+    assert result['outputs']['slow'] == {'partial': True} and result['outputs']['broken'] == {}
+    assert result['outputs']['sink'] == ['broken', 'slow']
+    nodes = result['report']['nodes']
+    assert nodes['slow']['status'] == 'timeout' and nodes['broken']['status'] == 'failed'
+    assert nodes['sink']['status'] == 'completed'
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        AgentDAG([DagNode('a', _sleeper(0), inputs=('missing',))])
+    with pytest.raises(ValueError):
+        AgentDAG([DagNode('a', _sleeper(0), inputs=('b',)), DagNode('b', _sleeper(0), inputs=('a',))])
+
+
+def test_soft_deadline_releases_dependents_and_returns_late_result():
+    async def scenario():
+        dag = AgentDAG([
+            DagNode('slow', _sleeper(0.2, 'SLOW'), soft_deadline=0.05, timeout=1.0, default={'pending': True}),
+            DagNode('fast', _sleeper(0.01, 'FAST'), soft_deadline=0.05),
+            DagNode('sink', _sleeper(0), inputs=('slow', 'fast')),
+        ])
+        result = await dag.execute()
+        report = result['report']
+        assert result['outputs']['slow'] == {'pending': True} and result['outputs']['fast'] == 'FAST'
+        assert report['nodes']['slow']['status'] == 'pending' and report['nodes']['fast']['status'] == 'completed'
+        assert report['wall_time'] < 0.15 and list(result['late']) == ['slow']
+
+        # The late node keeps running and its report entry is completed in place
+        assert await result['late']['slow'] == 'SLOW'
+        assert report['nodes']['slow']['status'] == 'completed'
+
+    asyncio.run(scenario())
+
+
+def test_deadline_caps_a_chain_at_a_shared_budget():
+    dag = AgentDAG([
+        DagNode('first', _sleeper(0.1, 'FIRST'), timeout=1.0),
+        DagNode('second', _sleeper(0.2), inputs=('first',), timeout=1.0, deadline=0.15, default={'late': True}),
+    ])
+    result = asyncio.run(dag.execute())
+
+    assert result['outputs']['second'] == {'late': True}
+    assert result['report']['nodes']['second']['status'] == 'timeout'
+    assert result['report']['wall_time'] < 0.2
+
+
+def test_cancelling_the_run_before_a_soft_deadline_cancels_the_node():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append('slow')
+            raise
+
+    async def scenario():
+        dag = AgentDAG([DagNode('slow', slow, soft_deadline=0.5, timeout=2.0)])
+        run = asyncio.create_task(dag.execute())
+        await asyncio.sleep(0.05)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        await asyncio.sleep(0.01)
+        assert cancelled == ['slow']
+
+    asyncio.run(scenario())
+
+
+def test_waiting_on_a_limiter_does_not_count_against_deadlines():
+    async def scenario():
+        limiter = asyncio.Semaphore(1)
+        dag = AgentDAG([
+            DagNode(name, _sleeper(0.05, name), timeout=0.08, soft_deadline=0.07, limiter=limiter)
+            for name in ('a', 'b', 'c')
+        ])
+        result = await dag.execute()
+        assert result['outputs'] == {'a': 'a', 'b': 'b', 'c': 'c'} and not result['late']
+        assert result['report']['wall_time'] >= 0.15  # Queued one at a time
+        assert not limiter.locked()
+
+    asyncio.run(scenario())
+
+
+def test_limiter_queueing_does_not_count_against_run_deadlines():
+    async def scenario():
+        limiter = asyncio.Semaphore(1)
+        await limiter.acquire()  # Held by another graph sharing the budget
+        asyncio.get_running_loop().call_later(0.3, limiter.release)
+        dag = AgentDAG([
+            DagNode('agent', _sleeper(0.05, 'agent'), limiter=limiter),
+            DagNode('synthesis', _sleeper(0.05, 'synthesis'), inputs=('agent',), deadline=0.2, limiter=limiter),
+            DagNode('enrichment', _sleeper(0.05, 'enrichment'), inputs=('synthesis',), deadline=0.2)
+        ])
+        result = await dag.execute()
+        nodes = result['report']['nodes']
+        assert result['outputs'] == {'agent': 'agent', 'synthesis': 'synthesis', 'enrichment': 'enrichment'}
+        assert nodes['agent']['queued'] >= 0.25 and nodes['enrichment']['start'] > 0.3
+
+    asyncio.run(scenario())
@@ -0,0 +1,117 @@
+"""
+Test Analysis Coalescer
+Validates request keys, attaching to in-flight runs and reuse of completed results
+"""
+
+import asyncio
+
+import services.analysis_coalescer as analysis_coalescer
+import services.cache_service as cache_service
+from services.analysis_coalescer import AnalysisCoalescer
+
+
+def test_key_normalizes_symbols_and_separates_depths():
+    coalescer = AnalysisCoalescer(reuse_minutes=5)
+
+    assert coalescer.analysis_key(['nvda ', 'AMD', 'NVDA']) == coalescer.analysis_key(['NVDA', 'amd'])
+    assert coalescer.analysis_key(['NVDA', 'AMD']) != coalescer.analysis_key(['AMD', 'NVDA'])  # Lead symbol differs
+    assert coalescer.analysis_key(['NVDA'], 'full') != coalescer.analysis_key(['NVDA'], 'technical')
+    assert coalescer.analysis_key([]) is None
+
+
+def test_identical_requests_share_one_run_then_reuse_its_result():
+    coalescer = AnalysisCoalescer(reuse_minutes=5)
+    key = coalescer.analysis_key(['NVDA'])
+    runs = []
+
+    async def analysis(analysis_id, completed=True):
+        runs.append(analysis_id)
+        await asyncio.sleep(0.01)
+        return completed
+
+    async def scenario():
+        coalescer.claim(key, 'a-1')
+        task = coalescer.run(key, 'a-1', analysis('a-1'))
+        assert coalescer.find(key)['analysis_id'] == 'a-1' and coalescer.find(key)['status'] == 'in_flight'
+        await task
+
+        recent = coalescer.find(key)
+        assert recent['analysis_id'] == 'a-1' and recent['status'] == 'completed'
+
+        # A failed run frees the key without leaving a reusable result
+        other = coalescer.analysis_key(['AMD'])
+        coalescer.claim(other, 'b-1')
+        await coalescer.run(other, 'b-1', analysis('b-1', completed=False))
+        assert coalescer.find(other) is None
+
+    asyncio.run(scenario())
+    assert runs == ['a-1', 'b-1']
+
+
+def test_reuse_window_runs_from_completion_and_expired_results_are_evicted(monkeypatch):
+    clock = {'now': 3610.0}
+    for module in (analysis_coalescer, cache_service):
+        monkeypatch.setattr(module.time, 'time', lambda: clock['now'])
+    coalescer = AnalysisCoalescer(reuse_minutes=5, freshness_seconds=3600)
+
+    async def analysis(finish):
+        clock['now'] = finish
+        return True
+
+    async def scenario():
+        key = coalescer.analysis_key(['NVDA'])
+        coalescer.claim(key, 'a-1')
+        await coalescer.run(key, 'a-1', analysis(3620.0))
+
+        clock['now'] = 3910.0
+        assert coalescer.analysis_key(['NVDA']) == key
+        assert coalescer.find(key) == {'analysis_id': 'a-1', 'status': 'completed', 'age_seconds': 290.0}
+
+        clock['now'] = 3922.0
+        assert coalescer.find(key) is None
+
+        # Results nobody asks for again are dropped when later runs complete
+        coalescer.claim(coalescer.analysis_key(['AMD']), 'b-1')
+        coalescer.claim(coalescer.analysis_key(['INTC']), 'c-1')
+        await coalescer.run(coalescer.analysis_key(['AMD']), 'b-1', analysis(3922.0))
+        await coalescer.run(coalescer.analysis_key(['INTC']), 'c-1', analysis(4320.0))
+        return list(coalescer.results.cache)
+
+    assert asyncio.run(scenario()) == [coalescer.analysis_key(['INTC'])]
+
+
+def test_requests_after_a_market_data_refresh_start_a_new_run(monkeypatch):
+    clock = {'now': 290.0}  # Ten seconds before the market data TTL rolls over
+    monkeypatch.setattr(analysis_coalescer.time, 'time', lambda: clock['now'])
+    coalescer = AnalysisCoalescer(reuse_minutes=5, freshness_seconds=300)
+
+    async def scenario():
+        key = coalescer.analysis_key(['NVDA'])
+        coalescer.claim(key, 'a-1')
+        await coalescer.run(key, 'a-1', asyncio.sleep(0, result=True))
+        assert coalescer.find(key)['analysis_id'] == 'a-1'
+
+        clock['now'] = 305.0
+        fresh = coalescer.analysis_key(['NVDA'])
+        assert fresh != key and coalescer.find(fresh) is None
+
+    asyncio.run(scenario())
+
+
+def test_raising_and_cancelled_runs_free_their_keys():
+    coalescer = AnalysisCoalescer(reuse_minutes=5)
+    failing, cancelled = coalescer.analysis_key(['NVDA']), coalescer.analysis_key(['AMD'])
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        raised, dropped = loop.create_future(), loop.create_future()
+        coalescer.claim(failing, 'a-1')
+        coalescer.claim(cancelled, 'b-1')
+        runs = [coalescer.run(failing, 'a-1', raised), coalescer.run(cancelled, 'b-1', dropped)]
+
+        raised.set_exception(RuntimeError('workflow crashed'))
+        dropped.cancel()
+        assert await asyncio.gather(*runs) == [False, False]
+        assert coalescer.find(failing) is None and coalescer.find(cancelled) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+"""
+Test Analysis Job Queue
+Validates the worker limit, priority ordering, queue positions and backpressure
+"""
+
+import asyncio
+
+import pytest
+
+from services.analysis_job_queue import AnalysisJobQueue, QueueFullError
+
+
+def test_workers_bound_concurrency_and_interactive_jobs_run_first():
+    queue = AnalysisJobQueue(max_workers=1, max_queued=10)
+    order = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        def job(name, wait=False):
+            async def run():
+                order.append(name)
+                if wait:
+                    await gate.wait()
+                return name
+            return run
+
+        first = queue.submit('bg-0', job('bg-0', wait=True), priority='low')
+        await asyncio.sleep(0)  # The only worker picks up bg-0
+        later = [
+            queue.submit('bg-1', job('bg-1'), priority='low'),
+            queue.submit('ui-1', job('ui-1'), priority='normal'),
+            queue.submit('ui-2', job('ui-2'), priority='high'),
+        ]
+        assert queue.running_count() == 1
+        assert [queue.position(j) for j in ('ui-2', 'ui-1', 'bg-1')] == [1, 2, 3]
+        assert queue.position('bg-0') is None
+
+        gate.set()
+        results = await asyncio.gather(first, *later)
+        await queue.shutdown()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results == ['bg-0', 'bg-1', 'ui-1', 'ui-2']
+    assert order == ['bg-0', 'ui-2', 'ui-1', 'bg-1']
+
+
+def test_full_queue_rejects_with_retry_after():
+    queue = AnalysisJobQueue(max_workers=2, max_queued=1, default_duration=30)
+
+    async def scenario():
+        async def run():
+            await asyncio.sleep(1)
+
+        queue.submit('a', run)
+        assert queue.is_full()
+        with pytest.raises(QueueFullError) as rejected:
+            queue.submit('b', run)
+        await queue.shutdown()
+        return rejected.value
+
+    error = asyncio.run(scenario())
+    assert error.retry_after == 15  # One of two workers frees a slot after ~30s / 2
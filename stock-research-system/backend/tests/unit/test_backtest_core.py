@@ -0,0 +1,198 @@
+"""
+Test Backtest Core
+Validates the vectorized signals and trade simulation against the row-by-row rules
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculators.backtest_core import crossover_signals, positions_from_signals, simulate_trades, max_drawdown
+from calculators.indicator_library import sma, rsi
+from services.backtesting_engine import BacktestingEngine
+
+
+@pytest.fixture
+def signal_frame(ohlcv_frame):
+    """Factory for closes with the SMA and RSI columns the engine's signals read"""
+    def build(days: int = 1500, seed: int = 0) -> pd.DataFrame:
+        data = ohlcv_frame(days=days, seed=seed, drift=0.0003)[['Close']]
+        close = data['Close'].to_numpy()
+        data['SMA_20'] = sma(close, 20)
+        data['SMA_50'] = sma(close, 50)
+        data['RSI'] = rsi(close, 14)
+        return data
+    return build
+
+
+def _loop_signals(data: pd.DataFrame) -> np.ndarray:
+    """The original per-row rules"""
+    s20, s50, r = data['SMA_20'].to_numpy(), data['SMA_50'].to_numpy(), data['RSI'].to_numpy()
+    signals = np.zeros(len(data), dtype=int)
+    for i in range(1, len(data)):
+        if s20[i] > s50[i] and s20[i - 1] <= s50[i - 1] and r[i] < 70:
+            signals[i] = 1
+        elif s20[i] < s50[i] and s20[i - 1] >= s50[i - 1]:
+            signals[i] = -1
+        elif r[i] > 80:
+            signals[i] = -1
+    return signals
+
+
+def _loop_trades(prices, signals, cash):
+    """The original per-row all-in trade loop"""
+    trades, position = [], 0
+    for i, (signal, price) in enumerate(zip(signals, prices)):
+        if signal == 1 and position == 0:
+            shares = int(cash / price)
+            if shares > 0:
+                position = shares
+                cash -= shares * price
+                trades.append(('BUY', i, shares, cash))
+        elif signal == -1 and position > 0:
+            cash += position * price
+            trades.append(('SELL', i, position, cash))
+            position = 0
+    if position > 0:
+        cash += position * prices[-1]
+        trades.append(('SELL (final)', len(prices) - 1, position, cash))
+    return trades
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2, 3])
+def test_signals_and_trades_match_loop(seed, signal_frame):
+    data = signal_frame(seed=seed)
+    signals = crossover_signals(data['SMA_20'], data['SMA_50'], data['RSI'])
+    assert np.array_equal(signals, _loop_signals(data))
+
+    prices = data['Close'].to_numpy()
+    trades, equity = simulate_trades(prices, signals, 100_000)
+    expected = _loop_trades(prices, signals, 100_000)
+    assert [(t['action'], t['shares']) for t in trades] == [(a, s) for a, _, s, _ in expected]
+    assert [t['cash'] for t in trades] == pytest.approx([c for *_, c in expected])
+
+    # Equity is cash plus marked-to-market shares on every bar
+    assert equity[0] == 100_000
+    assert equity[-1] == pytest.approx(expected[-1][3] if expected else 100_000)
+
+
+def test_unaffordable_buy_is_retried_on_later_buy_bars():
+    prices = np.array([50.0, 150.0, 120.0, 90.0, 95.0, 100.0])
+    signals = np.array([0, 1, 1, 1, -1, 0], dtype=np.int8)
+
+    trades, equity = simulate_trades(prices, signals, 100)
+    assert [(t['action'], t['price']) for t in trades] == [('BUY', 90.0), ('SELL', 95.0)]
+    assert [t['date'] for t in trades] == [3, 4]  # Undated trades carry bar indices
+    assert equity.tolist() == pytest.approx([100, 100, 100, 100, 105, 105])
+
+
+def test_positions_are_column_wise():
+    signals = np.array([[0, 0], [1, -1], [0, 1], [1, 0], [-1, 0]], dtype=np.int8)
+    assert positions_from_signals(signals).tolist() == [[0, 0], [1, 0], [1, 1], [1, 1], [0, 1]]
+    assert max_drawdown([100, 120, 90, 130]) == pytest.approx(25.0)
+
+
+def test_engine_backtests_ten_years_in_milliseconds(signal_frame):
+    engine = BacktestingEngine()
+    data = signal_frame(days=2520, seed=5)
+
+    async def run():
+        started = time.perf_counter()
+        signals = await engine._generate_signals(data, {})
+        trades = await engine._execute_backtest_trades(data, signals, 100_000)
+        result = await engine._calculate_metrics(trades, 100_000)
+        return time.perf_counter() - started, signals, result
+
+    elapsed, signals, result = asyncio.run(run())
+    assert elapsed < 0.05
+    assert result.total_trades > 0
+    assert signals['equity'].iloc[-1] == pytest.approx(100_000 * (1 + result.total_return / 100), rel=1e-4)
+
+
+class _FrameEngine(BacktestingEngine):
+    """Engine whose history comes from a synthetic frame"""
+
+    def __init__(self, data, **kwargs):
+        super().__init__(**kwargs)
+        self.data = data
+        self.loads = 0
+
+    async def _get_historical_data(self, symbol, start_date, end_date):
+        self.loads += 1
+        return self.data
+
+
+GRID = {'fast_period': [10, 20, 30], 'slow_period': [50, 100], 'rsi_sell': [75, 80], 'min_confidence': [0.0, 0.2]}
+
+
+def test_parameter_sweep_matches_individual_backtests(signal_frame):
+    engine = _FrameEngine(signal_frame(days=1500, seed=2))
+    sweep = asyncio.run(engine.parameter_sweep('TEST', GRID, None, None, top_n=None))
+
+    assert engine.loads == 1
+    assert sweep['combinations'] == len(sweep['results']) == 24
+    assert [row['rank'] for row in sweep['results']] == list(range(1, 25))
+    sharpes = [row['sharpe_ratio'] for row in sweep['results']]
+    assert sharpes == sorted(sharpes, reverse=True)
+
+    strategies = [{'name': str(i), 'params': row['params']} for i, row in enumerate(sweep['results'][:5])]
+    compared = asyncio.run(engine.compare_strategies('TEST', strategies, None, None))
+    assert engine.loads == 2
+    for strategy, row in zip(strategies, sweep['results']):
+        assert compared[strategy['name']].total_return == row['total_return']
+        assert compared[strategy['name']].total_trades == row['total_trades']
+
+
+def test_large_sweep_uses_process_pool(signal_frame):
+    engine = _FrameEngine(signal_frame(days=600, seed=4), process_pool_threshold=10, sweep_block_size=8)
+    pooled = asyncio.run(engine.parameter_sweep('TEST', GRID, None, None, top_n=3, workers=2))
+    serial = asyncio.run(_FrameEngine(engine.data).parameter_sweep('TEST', GRID, None, None, top_n=3))
+
+    assert pooled['parallel'] and not serial['parallel']
+    assert pooled['results'] == serial['results']
+
+
+def test_universe_backtest_matches_single_symbol_runs(monkeypatch):
+    from calculators.backtest_core import universe_backtest, trade_metrics
+    from services.market_data_store import OHLCVSeries
+
+    rng = np.random.default_rng(8)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (1000, 40)), axis=0))
+    dates = pd.bdate_range(end='2025-10-01', periods=1000)
+
+    class UniverseStore:
+        period_covering = staticmethod(lambda start: '5y')
+
+        async def get_many(self, symbols, period='1y', interval='1d'):
+            result = {}
+            for j, symbol in enumerate(symbols):
+                # Symbol 3 lists 200 bars late; 'NONE' has no data
+                rows = slice(200 if j == 3 else 0, None) if j < 40 else slice(0, 0)
+                frame = pd.DataFrame({f: closes[rows, j % 40] for f in ('Open', 'High', 'Low', 'Close')},
+                                     index=dates[rows])
+                frame['Volume'] = 1
+                result[symbol] = OHLCVSeries.from_dataframe(symbol, interval, frame)
+            return result
+
+    monkeypatch.setattr('services.backtesting_engine.get_market_data_store', lambda: UniverseStore())
+    symbols = [f'S{j}' for j in range(40)] + ['NONE']
+    report = asyncio.run(BacktestingEngine().backtest_universe(symbols, dates[0], None))
+
+    assert report['symbols'] == 40 and report['missing'] == ['NONE']
+    assert report['aggregate']['total_trades'] == sum(row['total_trades'] for row in report['per_symbol'])
+
+    # Fractional-share sleeves track the whole-share single-symbol engine closely
+    rows = {row['symbol']: row for row in report['per_symbol']}
+    for j in (0, 3):
+        close = closes[200 if j == 3 else 0:, j]
+        signals = crossover_signals(sma(close, 20), sma(close, 50), rsi(close, 14))
+        metrics = trade_metrics(simulate_trades(close, signals, 100_000)[0], 100_000)
+        assert rows[f'S{j}']['total_trades'] == metrics['total_trades']
+        assert rows[f'S{j}']['total_return'] == pytest.approx(metrics['total_return'], abs=0.5)
+
+    started = time.perf_counter()
+    universe_backtest(np.tile(closes, (1, 12)))  # 480 symbols x 4 years
+    assert time.perf_counter() - started < 1.0
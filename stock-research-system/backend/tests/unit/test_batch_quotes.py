@@ -0,0 +1,128 @@
+"""
+Test Batch Quote Service
+Validates splitting of multi-symbol downloads, caching and the latency budget
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.batch_quote_service import BatchQuoteService
+
+
+def _make_download(symbols, days: int = 5) -> pd.DataFrame:
+    """Synthetic multi-symbol frame shaped like yf.download(group_by='ticker')"""
+    index = pd.bdate_range(end='2025-10-01', periods=days)
+    frames = {}
+    for i, symbol in enumerate(symbols):
+        close = np.arange(days, dtype=float) + 100 * (i + 1)
+        frames[symbol] = pd.DataFrame({
+            'Open': close - 0.5,
+            'High': close + 1.0,
+            'Low': close - 1.0,
+            'Close': close,
+            'Adj Close': close,
+            'Volume': np.full(days, 1000 * (i + 1))
+        }, index=index)
+    return pd.concat(frames, axis=1)
+
+
+class FakeBatchService(BatchQuoteService):
+    """Batch service whose download is served from a synthetic frame"""
+
+    def __init__(self, delay: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.downloads = []
+
+    def _download(self, symbols):
+        self.downloads.append(list(symbols))
+        time.sleep(self.delay)
+        return _make_download(symbols)
+
+
+def test_split_download_per_symbol_quotes():
+    """Last and previous valid close are taken per symbol, skipping gaps"""
+    frame = _make_download(['AAPL', 'MSFT'])
+    frame.loc[frame.index[-1], ('MSFT', 'Close')] = np.nan  # MSFT has not printed today
+
+    quotes = BatchQuoteService.split_download(frame, ['AAPL', 'MSFT', 'GONE'])
+
+    assert set(quotes) == {'AAPL', 'MSFT'}
+    assert quotes['AAPL']['price'] == 104.0
+    assert quotes['AAPL']['previousClose'] == 103.0
+    assert quotes['MSFT']['price'] == 203.0
+    assert quotes['MSFT']['previousClose'] == 202.0
+    assert quotes['MSFT']['changePercent'] == round(1 / 202 * 100, 2)
+
+
+def test_single_download_then_cache():
+    """All symbols share one download; repeat requests hit the cache"""
+    service = FakeBatchService()
+
+    async def run():
+        first = await service.get_quotes(['aapl', 'MSFT', 'NVDA'])
+        second = await service.get_quotes(['AAPL', 'NVDA'])
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert service.downloads == [['AAPL', 'MSFT', 'NVDA']]
+    assert not first['partial']
+    assert second['cached'] == 2
+
+
+def test_latency_budget_returns_partial():
+    """Chunks that miss the budget are reported as missing"""
+    service = FakeBatchService(delay=0.3)
+    service._cache['AAPL'] = ({'symbol': 'AAPL', 'price': 1.0}, time.time() + 60)
+
+    async def run():
+        return await service.get_quotes(['AAPL', 'MSFT'], budget_seconds=0.05)
+
+    result = asyncio.run(run())
+
+    assert result['partial']
+    assert result['missing'] == ['MSFT']
+    assert 'AAPL' in result['quotes']
+
+
+def test_batch_prices_always_carry_market_cap():
+    """Batch prices take cached full-quote market caps and report None otherwise"""
+    from services.tavily_service import TavilyMarketService
+
+    service = TavilyMarketService(api_key='test-key')
+    service._set_cache('price:AAPL', {'symbol': 'AAPL', 'price': 100.0, 'marketCap': 3 * 10 ** 12})
+    quotes = BatchQuoteService.split_download(_make_download(['AAPL', 'MSFT']), ['AAPL', 'MSFT'])
+
+    prices = service.cache_stock_prices(quotes)
+
+    assert prices['AAPL']['marketCap'] == 3 * 10 ** 12
+    assert prices['MSFT']['marketCap'] is None
+    assert service._get_from_cache('price:AAPL')['price'] == quotes['AAPL']['price']
+    assert service._get_from_cache('price:MSFT') is None
+
+
+def test_live_prices_bound_indicator_seeding_by_the_quote_budget(monkeypatch):
+    """Portfolio refreshes do not wait on cold history seeding past the budget"""
+    from services import live_price_service
+
+    class RecordingStream:
+        timeouts = []
+
+        async def get_many_indicators(self, ticks, timeout=None):
+            self.timeouts.append(timeout)
+            return {symbol: None for symbol in ticks}
+
+    service = FakeBatchService(budget_seconds=2.0)
+    monkeypatch.setattr(live_price_service, 'get_batch_quote_service', lambda: service)
+    monkeypatch.setattr(live_price_service, 'get_indicator_stream_service', lambda: RecordingStream())
+
+    prices = asyncio.run(live_price_service.LivePriceService.get_multiple_prices(['AAPL', 'MSFT']))
+
+    assert set(prices) == {'AAPL', 'MSFT'}
+    assert prices['AAPL']['current_price'] == 104.0
+    assert 'market_cap' not in prices['AAPL'] and 'name' not in prices['AAPL']
+    assert 0 < RecordingStream.timeouts[0] <= 2.0
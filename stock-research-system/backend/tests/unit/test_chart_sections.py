@@ -0,0 +1,72 @@
+"""
+Test Chart Sections
+Validates the lightweight chart summary and memoized on-demand chart series without network access
+"""
+
+import asyncio
+
+import pytest
+
+import agents.workers.chart_analytics_agent as chart_module
+from agents.workers.chart_analytics_agent import CHART_SECTIONS, SUMMARY_SECTIONS, ChartAnalyticsAgent
+
+
+@pytest.fixture
+def store(synthetic_store):
+    """500 bars ending at store.end"""
+    return synthetic_store(days=500, seed=3)
+
+
+def test_execute_builds_summary_and_sections_on_request(monkeypatch, store):
+    monkeypatch.setattr(chart_module, 'get_market_data_store', lambda: store)
+    ChartAnalyticsAgent._section_cache.clear()
+
+    async def run():
+        summary = await ChartAnalyticsAgent().execute({'symbol': 'AAPL'})
+        charts = await ChartAnalyticsAgent().get_sections('AAPL', ['indicator_charts', 'pattern_history'])
+        again = await ChartAnalyticsAgent().get_sections('AAPL', ['summary', 'indicator_charts'])
+        store.invalidate()
+        store.end = '2025-10-02'
+        next_bar = await ChartAnalyticsAgent().get_sections('AAPL', ['indicator_charts'])
+        return summary, charts, again, next_bar
+
+    hits_before = ChartAnalyticsAgent.section_stats['hits']
+    summary, charts, again, next_bar = asyncio.run(run())
+
+    # The analysis result carries no per-bar series
+    assert set(SUMMARY_SECTIONS) <= set(summary) and 'chart_data' not in summary
+    assert summary['chart_metadata']['available_sections'] == list(CHART_SECTIONS)
+    assert set(charts['chart_data']) == {'indicator_charts', 'pattern_history'}
+    assert len(charts['chart_data']['indicator_charts']['rsi']['data']['values']) == summary['chart_metadata']['data_points']
+
+    # Same bar: summary and charts come from the memo as the same objects
+    assert ChartAnalyticsAgent.section_stats['hits'] - hits_before == 2
+    assert again['chart_data']['indicator_charts'] is charts['chart_data']['indicator_charts']
+    assert again['expert_insights'] == summary['expert_insights']
+
+    # A new bar rebuilds the section
+    assert next_bar['chart_metadata']['last_bar'] == '2025-10-02'
+    assert next_bar['chart_data']['indicator_charts'] is not charts['chart_data']['indicator_charts']
+
+
+def test_chart_sections_are_downsampled_to_max_points(monkeypatch, store):
+    monkeypatch.setattr(chart_module, 'get_market_data_store', lambda: store)
+
+    async def run():
+        agent = ChartAnalyticsAgent()
+        full = await agent.get_sections('MSFT', ['price_charts', 'indicator_charts'], max_points=0)
+        small = await agent.get_sections('MSFT', ['price_charts', 'indicator_charts', 'technical_overlays'], max_points=40)
+        return full['chart_data'], small['chart_data'], small['chart_metadata']
+
+    full, small, metadata = asyncio.run(run())
+    candles, line = small['price_charts']['candlestick']['data'], small['price_charts']['line']['data']
+    rsi = small['indicator_charts']['rsi']['data']
+
+    assert metadata['chart_points'] == 40
+    assert len(candles['dates']) == len(line['dates']) == len(rsi['values']) == len(small['technical_overlays']['sma_20']) == 40
+    assert max(candles['high']) == max(full['price_charts']['candlestick']['data']['high'])
+
+    # Indicators keep their full-resolution values, taken at each candle's last bar
+    full_rsi = dict(zip(full['indicator_charts']['rsi']['data']['dates'], full['indicator_charts']['rsi']['data']['values']))
+    assert rsi['dates'] == candles['dates']
+    assert rsi['values'] == [full_rsi[d] for d in rsi['dates']]
@@ -0,0 +1,87 @@
+"""
+Test Chart Downsampling
+Validates LTTB against the reference algorithm and OHLC bucket aggregation
+"""
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from calculators.downsampling import aggregate_ohlcv, bucket_starts, downsample_candle_records, lttb_indices
+
+
+def _reference_lttb(x, y, threshold):
+    """Point-by-point LTTB as published"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    a, kept = 0, [0]
+    for i in range(threshold - 2):
+        avg_start, avg_end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        if i == threshold - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+            avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    return kept + [n - 1]
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=1000))
+    x = np.arange(1000, dtype=float)
+    for target in (3, 10, 97, 500):
+        assert lttb_indices(x, y, target).tolist() == _reference_lttb(x.tolist(), y.tolist(), target)
+
+
+def test_lttb_keeps_extremes_and_skips_gaps():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[:50] = np.nan  # Indicator warm-up
+    keep = lttb_indices(np.arange(5000), y, 200)
+
+    assert len(keep) == 200 and keep[0] == 50 and keep[-1] == 4999
+    assert np.isclose(y[keep].max(), 1, atol=1e-3) and np.isclose(y[keep].min(), -1, atol=1e-3)
+
+
+def test_ohlc_buckets_aggregate_bars():
+    n = 1003
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    high, low = close + rng.random(n), close - rng.random(n)
+    open_ = close + rng.normal(0, 0.2, n)
+    volume = rng.integers(1, 100, n)
+    dates = pd.date_range('2025-01-01', periods=n, freq='min').values
+
+    starts = bucket_starts(n, 100)
+    candles = aggregate_ohlcv(starts, dates, open_, high, low, close, volume)
+
+    assert len(starts) == 100 and starts[0] == 0
+    assert candles['high'].max() == high.max() and candles['low'].min() == low.min()
+    assert candles['volume'].sum() == volume.sum()
+    assert candles['open'][0] == open_[0] and candles['close'][-1] == close[-1]
+    assert candles['dates'][-1] == dates[-1]
+    # Small inputs pass through untouched
+    assert bucket_starts(50, 100).tolist() == list(range(50))
+
+
+def test_payload_stays_bounded_for_long_ranges():
+    n = 400_000
+    records = [{'timestamp': str(i), 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10}
+               for i in range(n)]
+
+    started = time.perf_counter()
+    reduced = downsample_candle_records(records, 1000)
+    payload = json.dumps(reduced)
+    elapsed = time.perf_counter() - started
+
+    assert len(reduced) == 1000 and reduced[-1]['timestamp'] == str(n - 1)
+    assert sum(r['volume'] for r in reduced) == 10 * n
+    assert len(payload) < 200_000 and elapsed < 2.0
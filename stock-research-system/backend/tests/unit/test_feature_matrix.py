@@ -0,0 +1,52 @@
+"""
+Test Feature Matrix
+Validates the float32 feature matrix against the DataFrame and window-slicing versions
+"""
+
+import numpy as np
+
+from calculators.feature_matrix import FeatureMatrix, PRICE_MODEL_FEATURES, SIGNAL_FEATURES, build_feature_matrix
+from services.market_data_store import OHLCVSeries
+
+
+def test_price_model_features_match_dataframe_columns(ohlcv_frame):
+    df = ohlcv_frame(days=260)
+    features = FeatureMatrix.from_series(OHLCVSeries.from_dataframe('TEST', '1d', df))
+
+    df['MA_5'] = df['Close'].rolling(window=5).mean()
+    df['MA_20'] = df['Close'].rolling(window=20).mean()
+    df['Volume_MA'] = df['Volume'].rolling(window=5).mean()
+    df['High_Low'] = df['High'] - df['Low']
+    df['Price_Change'] = df['Close'] - df['Open']
+    for i in range(1, 6):
+        df[f'Close_Lag_{i}'] = df['Close'].shift(i)
+        df[f'Volume_Lag_{i}'] = df['Volume'].shift(i)
+
+    X = features.select(PRICE_MODEL_FEATURES)
+    assert X.dtype == np.float32 and X.flags.c_contiguous
+    assert np.allclose(X, df[PRICE_MODEL_FEATURES].to_numpy(), rtol=1e-6, equal_nan=True)
+    # Same rows survive as with dropna()
+    assert np.array_equal(features.valid_rows(PRICE_MODEL_FEATURES),
+                          df[PRICE_MODEL_FEATURES].notna().all(axis=1).to_numpy())
+
+
+def test_signal_features_match_window_slicing(ohlcv_frame):
+    df = ohlcv_frame(days=150, seed=1)
+    features = build_feature_matrix(df['Open'], df['High'], df['Low'], df['Close'], df['Volume'])
+    signals = features.select(SIGNAL_FEATURES)
+
+    close, volume = df['Close'], df['Volume']
+    for i in range(20, len(df)):
+        ma_20 = close.iloc[i - 20:i].mean()
+        expected = [
+            (close.iloc[i] - close.iloc[i - 5]) / close.iloc[i - 5],
+            (close.iloc[i] - close.iloc[i - 10]) / close.iloc[i - 10],
+            (close.iloc[i] - ma_20) / ma_20,
+            volume.iloc[i] / volume.iloc[i - 20:i].mean(),
+            close.iloc[i - 10:i].pct_change().std()
+        ]
+        assert np.allclose(signals[i], expected, rtol=1e-5)
+
+    # Nothing is available before its window has filled
+    assert np.isnan(features.column('MA_Signal')[:20]).all()
+    assert np.isnan(features.column('Recent_Volatility')[:10]).all()
@@ -0,0 +1,85 @@
+"""
+Test Indicator Library
+Validates series alignment, cache keys and agreement with TechnicalCalculator
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from calculators.indicator_library import IndicatorLibrary, to_chart_list
+from calculators.technical_calculator import TechnicalCalculator
+from services.market_data_store import OHLCVSeries
+
+
+@pytest.fixture
+def series(ohlcv_series):
+    return ohlcv_series('AAPL', days=300, seed=11)
+
+
+def test_indicators_are_computed_once_per_series(series):
+    library = IndicatorLibrary()
+
+    first = library.compute(series, 'rsi', period=14)
+    second = library.compute(series, 'rsi', period=14)
+    library.compute(series, 'rsi', period=21)
+    library.compute(series.slice(0, len(series) - 1), 'rsi', period=14)
+
+    assert first is second
+    assert not first.flags.writeable
+    assert library.get_stats()['hits'] == 1
+    assert library.get_stats()['misses'] == 3
+
+
+def test_concurrent_lookups_and_evictions_are_safe(series):
+    library = IndicatorLibrary(max_entries=4)
+    periods = [5, 7, 9, 11, 14, 21] * 200
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda p: library.compute(series, 'sma', period=p), periods))
+
+    stats = library.get_stats()
+    assert len(results) == len(periods)
+    assert stats['hits'] + stats['misses'] == len(periods)
+    assert stats['entries'] <= 4
+
+
+def test_refetched_bars_are_not_served_stale_indicators(series):
+    library = IndicatorLibrary()
+    first = library.compute(series, 'rsi', period=14)
+
+    # Intraday refetch: same dates and length, new last close
+    close = series.close.copy()
+    close[-1] -= 20
+    refetched = OHLCVSeries(series.symbol, series.interval, series.dates, series.open,
+                            series.high, series.low, close, series.volume)
+    second = library.compute(refetched, 'rsi', period=14)
+
+    assert second[-1] < first[-1]
+    assert library.get_stats()['hits'] == 0
+
+
+def test_series_are_aligned_with_bars(series):
+    library = IndicatorLibrary()
+
+    rsi = library.compute(series, 'rsi', period=14)
+    macd_line, signal_line, histogram = library.compute(series, 'macd')
+    sma = library.compute(series, 'sma', period=20)
+
+    assert len(rsi) == len(macd_line) == len(signal_line) == len(sma) == len(series)
+    assert np.isnan(rsi[13]) and not np.isnan(rsi[14])
+    assert np.isnan(sma[18]) and not np.isnan(sma[19])
+    assert np.isnan(signal_line[32]) and not np.isnan(signal_line[33])
+    assert to_chart_list(sma)[:19] == [None] * 19
+
+
+def test_technical_calculator_reads_from_library(series):
+    calc = TechnicalCalculator()
+    closes = series.close.tolist()
+
+    assert calc.calculate_rsi(series)['value'] == calc.calculate_rsi(closes)['value']
+    assert calc.calculate_macd(series) == calc.calculate_macd(closes)
+    assert calc.calculate_bollinger_bands(series) == calc.calculate_bollinger_bands(closes)
+    assert calc.calculate_sma(series, 50) == pytest.approx(calc.calculate_sma(closes, 50))
+    assert calc.detect_golden_cross(series) == calc.detect_golden_cross(closes)
@@ -0,0 +1,202 @@
+"""
+Test Market Data Adapter
+Validates off-loop execution, timeouts and event-loop blocking metrics
+"""
+
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from services.market_data_adapter import MarketDataAdapter, MarketDataTimeoutError
+
+
+def test_blocking_calls_run_off_the_event_loop():
+    """Blocking calls on the pool leave the loop free to run other tasks"""
+    adapter = MarketDataAdapter(max_workers=4, probe_interval=0.02, stall_threshold=0.05)
+
+    async def run():
+        adapter.start_loop_monitor()
+        results = await asyncio.gather(*[adapter.run(time.sleep, 0.1) for _ in range(4)])
+        await adapter.stop_loop_monitor()
+        return results
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    metrics = adapter.get_metrics()
+    assert elapsed < 0.35  # Four 100ms calls ran in parallel
+    assert metrics['calls']['total'] == 4
+    assert metrics['event_loop']['samples'] > 0
+    assert metrics['event_loop']['stalls'] == 0
+    adapter.shutdown()
+
+
+def test_timeout_raises_and_is_counted():
+    """Calls exceeding their timeout raise MarketDataTimeoutError"""
+    adapter = MarketDataAdapter(max_workers=1)
+
+    async def run():
+        await adapter.run(time.sleep, 0.5, timeout=0.05)
+
+    with pytest.raises(MarketDataTimeoutError):
+        asyncio.run(run())
+
+    assert adapter.get_metrics()['calls']['timeouts'] == 1
+    adapter.shutdown()
+
+
+def test_loop_blocking_is_reported():
+    """Synchronous work on the loop shows up as blocked time"""
+    adapter = MarketDataAdapter(probe_interval=0.02, stall_threshold=0.05)
+
+    async def run():
+        adapter.start_loop_monitor()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # Deliberately block the loop
+        await asyncio.sleep(0.05)
+        await adapter.stop_loop_monitor()
+
+    asyncio.run(run())
+
+    loop_metrics = adapter.get_metrics()['event_loop']
+    assert loop_metrics['stalls'] >= 1
+    assert loop_metrics['blocked_seconds'] >= 0.15
+    adapter.shutdown()
+
+
+class SlowTicker:
+    """yfinance Ticker stand-in whose lookups block like network calls"""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        time.sleep(0.15)
+        return {'currentPrice': 101.0, 'previousClose': 100.0, 'volume': 1000, 'marketCap': 10 ** 9}
+
+    @property
+    def recommendations(self):
+        time.sleep(0.15)
+        return None
+
+    @property
+    def calendar(self):
+        time.sleep(0.15)
+        return None
+
+    @property
+    def income_stmt(self):
+        time.sleep(0.15)
+        return pd.DataFrame({'2024': [1.0]}, index=['Net Income'])
+
+    balance_sheet = cash_flow = income_stmt
+
+    def history(self, **kwargs):
+        time.sleep(0.15)
+        return pd.DataFrame({'Close': [100.0, 101.0]})
+
+
+def test_service_quote_lookups_do_not_block_the_loop(monkeypatch):
+    """Quote and fundamentals lookups in the services go through the adapter"""
+    import yfinance
+
+    import services.market_data_adapter as adapter_module
+    from services.data_aggregator import DataAggregatorService
+    from services.financial_data_service import FinancialDataService
+    from services.tavily_service import TavilyMarketService
+
+    adapter = MarketDataAdapter(max_workers=4, probe_interval=0.02, stall_threshold=0.05)
+    monkeypatch.setattr(adapter_module, 'market_data_adapter', adapter)
+    monkeypatch.setattr(yfinance, 'Ticker', SlowTicker)
+    financial = FinancialDataService()
+
+    async def no_overview(symbol):
+        return None
+
+    financial.get_alpha_vantage_overview = no_overview
+
+    async def run():
+        adapter.start_loop_monitor()
+        results = await asyncio.gather(
+            TavilyMarketService(api_key='test').get_stock_price('AAPL'),
+            DataAggregatorService()._fetch_yahoo_data('MSFT'),
+            financial.get_fundamental_data('NVDA')
+        )
+        await adapter.stop_loop_monitor()
+        return results
+
+    quote, yahoo, fundamentals = asyncio.run(run())
+
+    assert quote['price'] == 101.0 and yahoo['price']['current'] == 101.0
+    assert fundamentals['symbol'] == 'NVDA'
+    assert adapter.get_metrics()['event_loop']['stalls'] == 0
+    adapter.shutdown()
+
+
+def test_yahoo_finance_service_does_not_block_the_loop(monkeypatch):
+    """YahooFinanceService quote, history and statement lookups use the adapter"""
+    import yfinance
+
+    import services.market_data_adapter as adapter_module
+    from services.yahoo_finance_service import YahooFinanceService
+
+    adapter = MarketDataAdapter(max_workers=4, probe_interval=0.02, stall_threshold=0.05)
+    monkeypatch.setattr(adapter_module, 'market_data_adapter', adapter)
+    monkeypatch.setattr(yfinance, 'Ticker', SlowTicker)
+    service = YahooFinanceService()
+
+    async def run():
+        adapter.start_loop_monitor()
+        results = await asyncio.gather(
+            service.get_stock_price('AAPL'),
+            service.get_historical_data('AAPL'),
+            service.get_financials('AAPL')
+        )
+        await adapter.stop_loop_monitor()
+        return results
+
+    price, history, financials = asyncio.run(run())
+
+    assert price['price'] == 101.0
+    assert history['history']['Close'] and 'error' not in history
+    assert financials['income_statement'] == {'2024': {'Net Income': 1.0}}
+    assert adapter.get_metrics()['calls']['total'] == 3
+    assert adapter.get_metrics()['event_loop']['stalls'] == 0
+    adapter.shutdown()
+
+
+def test_valuation_agent_loads_the_ticker_through_the_adapter(monkeypatch):
+    """ValuationAgent fetches every ticker field in one adapter call"""
+    import yfinance
+
+    import services.market_data_adapter as adapter_module
+    from agents.workers.valuation_agent import ValuationAgent
+
+    class RatedTicker(SlowTicker):
+        financials = cashflow = None
+
+        @property
+        def recommendations(self):
+            time.sleep(0.15)
+            return pd.DataFrame({'To Grade': ['Buy', 'Strong Buy', 'Overweight', 'Hold', 'Sell']})
+
+    adapter = MarketDataAdapter(max_workers=4, probe_interval=0.02, stall_threshold=0.05)
+    monkeypatch.setattr(adapter_module, 'market_data_adapter', adapter)
+    monkeypatch.setattr(yfinance, 'Ticker', RatedTicker)
+
+    async def run():
+        adapter.start_loop_monitor()
+        result = await ValuationAgent().execute('AAPL', {})
+        await adapter.stop_loop_monitor()
+        return result
+
+    result = asyncio.run(run())
+
+    assert result['analyst_targets']['analyst_consensus'] == 'Buy'
+    assert adapter.get_metrics()['calls']['total'] == 1
+    assert adapter.get_metrics()['event_loop']['stalls'] == 0
+    adapter.shutdown()
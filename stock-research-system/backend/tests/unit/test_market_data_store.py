@@ -0,0 +1,116 @@
+"""
+Test Market Data Store
+Validates period slicing, request coalescing and TTL eviction without network access
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def store(synthetic_store):
+    """Store with 600 bars per symbol, downloads slow enough for concurrent callers to coalesce"""
+    return synthetic_store(days=600, seed=7, tz='America/New_York', delay=0.05)
+
+
+def test_sub_periods_are_zero_copy_slices(store):
+    """All periods are served from one download as views of the same buffer"""
+    async def run():
+        full = await store.get_history('AAPL', period='2y')
+        one_year = await store.get_history('AAPL', period='1y')
+        one_month = await store.get_history('AAPL', period='1mo')
+        five_days = await store.get_history('AAPL', period='5d')
+        return full, one_year, one_month, five_days
+
+    full, one_year, one_month, five_days = asyncio.run(run())
+
+    assert len(store.downloads) == 1
+    assert len(five_days) == 5
+    assert 18 <= len(one_month) <= 24
+    assert 250 <= len(one_year) <= 262
+    assert np.shares_memory(one_year.close, full.close)
+    assert one_month.dates[-1] == full.dates[-1]
+    assert not full.close.flags.writeable
+
+
+def test_concurrent_requests_are_coalesced(store):
+    """Concurrent callers for the same symbol share one download"""
+    async def run():
+        return await asyncio.gather(*[
+            store.get_history('MSFT', period=p) for p in ['1mo', '3mo', '6mo', '1y']
+        ])
+
+    results = asyncio.run(run())
+
+    assert len(store.downloads) == 1
+    assert store.get_stats()['coalesced'] == 3
+    assert [len(r) for r in results] == sorted(len(r) for r in results)
+
+
+def test_cancelled_leader_does_not_strand_followers(store):
+    """A follower takes over the fetch when the caller that started it is cancelled"""
+    async def run():
+        leader = asyncio.create_task(store.get_history('AMD', period='1y'))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(store.get_history('AMD', period='1y'))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await asyncio.wait_for(follower, timeout=2)
+        return leader, result
+
+    leader, result = asyncio.run(run())
+
+    assert leader.cancelled()
+    assert len(result) > 0
+    assert store.get_stats()['inflight'] == 0
+
+
+def test_ttl_eviction_triggers_refetch(synthetic_store):
+    """Expired entries are evicted and fetched again"""
+    store = synthetic_store(ttl_seconds=0)
+
+    async def run():
+        await store.get_history('NVDA', period='1y')
+        time.sleep(0.01)
+        await store.get_history('NVDA', period='1y')
+
+    asyncio.run(run())
+
+    assert len(store.downloads) == 2
+    assert store.evict_expired() == 1
+    assert store.get_stats()['entries'] == 0
+
+
+def test_range_and_dataframe_round_trip(store):
+    """Date ranges are end-exclusive and convert back to yfinance-style frames"""
+    async def run():
+        return await store.get_range('TSLA', pd.Timestamp('2025-01-01'), pd.Timestamp('2025-02-01'))
+
+    series = asyncio.run(run())
+    df = series.to_dataframe()
+
+    assert list(df.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert df.index.min() >= pd.Timestamp('2025-01-01')
+    assert df.index.max() < pd.Timestamp('2025-02-01')
+    assert series.to_lists()['dates'][0].startswith('2025-01')
+
+
+def test_get_many_batches_misses_and_reuses_cache(synthetic_store):
+    store = synthetic_store(missing={'GONE'})
+
+    async def run():
+        await store.get_history('AAPL', '1y')
+        return await store.get_many(['aapl', 'MSFT', 'NVDA', 'GONE'], period='6mo', chunk_size=2)
+
+    histories = asyncio.run(run())
+
+    # AAPL came from the cache; the three misses went out in two chunked downloads
+    assert [d[1] for d in store.downloads[1:]] == [('MSFT', 'NVDA'), ('GONE',)]
+    assert list(histories) == ['AAPL', 'MSFT', 'NVDA', 'GONE']
+    assert histories['GONE'].empty
+    assert len(histories['MSFT']) == len(histories['AAPL'])
+    assert store.get_stats()['entries'] == 3
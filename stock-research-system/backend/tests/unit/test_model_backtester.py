@@ -0,0 +1,114 @@
+"""
+Test Model Backtester
+Validates the structured-array scoring and batched per-window metrics
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from calculators.model_backtester import (
+    ModelBacktester, PREDICTION_DTYPE, prediction_records, records_from_columns, score_predictions, window_metrics
+)
+
+
+def _history(n: int = 300, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, n))
+    forecasts = rng.normal(0, 0.02, n)
+    predictions = [
+        {'direction': 'up' if p > 0.015 else 'down' if p < -0.015 else 'neutral',
+         'predicted_return': p, 'confidence': min(abs(p) * 30 + 0.4, 0.75)}
+        for p in forecasts
+    ]
+    timestamps = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(n)]
+    return predictions, prices.tolist(), timestamps
+
+
+def _loop_metrics(returns):
+    """Per-row reference for one window"""
+    returns = np.asarray(returns)
+    values = np.concatenate([[1.0], np.cumprod(1 + returns)])
+    downside = returns[returns < 0]
+    downside_std = np.std(downside) if len(downside) else 1
+    return {
+        'sharpe': returns.mean() / returns.std() * np.sqrt(252) if returns.std() > 0 else 0,
+        'sortino': returns.mean() / downside_std * np.sqrt(252) if downside_std > 0 else 0,
+        'max_drawdown': np.min((values - np.maximum.accumulate(values)) / np.maximum.accumulate(values)),
+        'total_return': values[-1] - 1
+    }
+
+
+def test_scoring_applies_costs_per_direction():
+    records = records_from_columns(['up', 'down', 'neutral', 'up'], [0.5, 1.0, 0.7, 0.5],
+                                   actual_return=[0.02, -0.01, 0.005, np.nan])
+    scored = score_predictions(records)
+
+    assert len(scored) == 3  # Pending outcome dropped
+    assert scored['correct'].tolist() == [True, True, True]
+    assert scored['trade_return'] == pytest.approx([0.02 * 0.5 - 0.0025 * 0.5, 0.01 - 0.0025 - 0.00012, 0.0])
+
+
+def test_array_and_dict_inputs_agree():
+    predictions, prices, timestamps = _history()
+    backtester = ModelBacktester()
+
+    from_dicts = backtester.backtest_predictions(predictions, prices, timestamps)
+    records = prediction_records(predictions, prices, timestamps)
+    from_array = backtester.backtest_predictions(records)
+
+    assert records.dtype == PREDICTION_DTYPE and len(records) == 299
+    assert from_dicts.total_predictions == from_array.total_predictions == 299
+    assert from_dicts.sharpe_ratio == from_array.sharpe_ratio
+    assert from_dicts.performance_by_period == from_array.performance_by_period
+
+    reference = _loop_metrics([row['trade_return'] for row in from_dicts.predictions])
+    for key, attr in [('sharpe', 'sharpe_ratio'), ('sortino', 'sortino_ratio'),
+                      ('max_drawdown', 'max_drawdown'), ('total_return', 'total_return')]:
+        assert getattr(from_array, attr) == pytest.approx(reference[key])
+    assert from_dicts.predictions[-1]['portfolio_value'] == pytest.approx(100000 * (1 + from_dicts.total_return))
+
+    # Scored rows round-trip through walk-forward in either form
+    walk_dicts = backtester.walk_forward_analysis(from_dicts.predictions)
+    walk_array = backtester.walk_forward_analysis(from_array.predictions)
+    assert walk_dicts == walk_array and len(walk_dicts) == 11
+
+    # Same windows as the original range(0, len - window - test, step) loop
+    exact = backtester.walk_forward_analysis(from_array.predictions[:280])
+    assert len(exact) == len(range(0, 280 - 80, 20)) == 10
+    assert backtester.walk_forward_analysis(from_array.predictions[:80]) == []
+
+
+def test_window_metrics_match_per_window_loop():
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.0005, 0.01, 500)
+    correct = rng.random(500) < 0.55
+    starts = np.arange(0, 480, 7)
+
+    metrics = window_metrics(returns, correct, starts, 20)
+    for i, start in enumerate(starts):
+        reference = _loop_metrics(returns[start:start + 20])
+        for key, value in reference.items():
+            assert metrics[key][i] == pytest.approx(value)
+        assert metrics['accuracy'][i] == pytest.approx(correct[start:start + 20].mean())
+
+
+def test_long_history_walk_forward_on_process_pool():
+    rng = np.random.default_rng(5)
+    n = 200_000
+    records = records_from_columns(rng.choice([-1, 0, 1], n), rng.uniform(0.4, 0.75, n),
+                                   actual_return=rng.normal(0, 0.02, n))
+    scored = score_predictions(records)
+
+    started = time.perf_counter()
+    serial = ModelBacktester().walk_forward_analysis(scored, step_size=5)
+    elapsed = time.perf_counter() - started
+
+    pooled = ModelBacktester(process_pool_threshold=1000, window_block_size=10000).walk_forward_analysis(
+        scored, step_size=5, workers=2
+    )
+    assert len(serial) == len(range(0, n - 80, 5)) == (n - 80) // 5  # Baseline window bound
+    assert pooled == serial
+    assert elapsed < 3.0
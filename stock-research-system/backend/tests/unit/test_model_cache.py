@@ -0,0 +1,95 @@
+"""
+Test Model Cache
+Validates fitted-model reuse, disk persistence and one-bar warm starts
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from services.model_cache import ModelCache
+
+
+def _dataset(rows: int = 260, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 15))
+    y = X @ rng.normal(size=15) + rng.normal(0, 0.1, rows)
+    dates = pd.bdate_range(end='2025-10-01', periods=rows).values
+    return dates, X, y
+
+
+def _window(dates, X, y, end, length=200):
+    rows = slice(end - length, end)
+    return dates[rows], X[rows], y[rows], int(length * 0.8)
+
+
+def test_cached_fit_is_reused_from_memory_and_disk(tmp_path):
+    dates, X, y = _dataset()
+    args = _window(dates, X, y, 250)
+
+    async def run():
+        cache = ModelCache(cache_dir=str(tmp_path), max_workers=1, n_jobs=1)
+        # Concurrent requests for the same bar share one training run
+        first, shared = await asyncio.gather(cache.get_models('aapl', *args), cache.get_models('AAPL', *args))
+        again = await cache.get_models('AAPL', *args)
+        cache.shutdown()
+
+        restarted = ModelCache(cache_dir=str(tmp_path), max_workers=1, n_jobs=1)
+        from_disk = await restarted.get_models('AAPL', *args)
+        restarted.shutdown()
+        return cache, first, shared, again, from_disk
+
+    cache, first, shared, again, from_disk = asyncio.run(run())
+
+    assert (first['source'], shared['source'], again['source'], from_disk['source']) == \
+        ('trained', 'shared', 'memory', 'disk')
+    assert cache.stats['full_trains'] == 1
+    assert isinstance(from_disk['X'], np.memmap)
+    assert np.array_equal(from_disk['rf'].predict(X[-3:]), first['rf'].predict(X[-3:]))
+
+    # A cold fit is the agent's original forest
+    _, X_win, y_win, split = args
+    reference = RandomForestRegressor(n_estimators=50, random_state=42, max_depth=10).fit(X_win[:split], y_win[:split])
+    assert np.allclose(first['rf'].predict(X[-3:]), reference.predict(X[-3:]))
+
+
+def test_one_new_bar_warm_starts_the_forest(tmp_path):
+    dates, X, y = _dataset()
+
+    async def run():
+        cache = ModelCache(cache_dir=str(tmp_path), max_workers=1, n_jobs=1, warm_start_trees=10, max_trees=70)
+        results = [await cache.get_models('MSFT', *_window(dates, X, y, end)) for end in (240, 241, 242, 243, 245)]
+        cache.shutdown()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [r['source'] for r in results] == ['trained', 'warm_start', 'warm_start', 'trained', 'trained']
+    assert [r['rf'].n_estimators for r in results] == [50, 60, 70, 50, 50]
+    # Superseded fits are removed; only the latest bar stays on disk
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_cancelled_training_caller_does_not_strand_followers(tmp_path):
+    dates, X, y = _dataset()
+    args = _window(dates, X, y, 250)
+
+    async def run():
+        cache = ModelCache(cache_dir=str(tmp_path), max_workers=1, n_jobs=1)
+        leader = asyncio.create_task(cache.get_models('AAPL', *args))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(cache.get_models('AAPL', *args))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        entry = await asyncio.wait_for(follower, timeout=30)
+        cache.shutdown()
+        return cache, leader, entry
+
+    cache, leader, entry = asyncio.run(run())
+
+    # The follower retrains instead of waiting on the abandoned run
+    assert leader.cancelled()
+    assert entry['source'] == 'trained'
+    assert not cache._inflight
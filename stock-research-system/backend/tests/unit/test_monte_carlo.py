@@ -0,0 +1,119 @@
+"""
+Test Monte Carlo Engine
+Validates the vectorized simulator and its return models
+"""
+
+import math
+import time
+
+import numpy as np
+import pytest
+
+from calculators.monte_carlo import MonteCarloEngine, GaussianReturns, BootstrapReturns, GarchReturns
+from calculators.risk_calculator import RiskCalculator
+
+
+def test_terminal_prices_match_gbm_moments():
+    engine = MonteCarloEngine(seed=7)
+    terminal = engine.simulate_terminal(100, GaussianReturns(0.08, 0.25), days=252, simulations=200_000)
+
+    assert terminal.mean() == pytest.approx(100 * math.exp(0.08), rel=0.01)
+    assert np.median(terminal) == pytest.approx(100 * math.exp(0.08 - 0.5 * 0.25 ** 2), rel=0.01)
+
+
+def test_seeded_runs_are_reproducible_and_antithetic():
+    first = MonteCarloEngine(seed=1).simulate_paths(50, GaussianReturns(0.05, 0.3), days=20, simulations=1000)
+    second = MonteCarloEngine(seed=1).simulate_paths(50, GaussianReturns(0.05, 0.3), days=20, simulations=1000)
+
+    assert np.array_equal(first, second)
+    assert first.shape == (1000, 21)
+    # Antithetic pairs mirror each other's log returns
+    log_returns = np.log(first[:, -1] / 50)
+    assert log_returns[:500] + log_returns[500:] == pytest.approx(2 * log_returns.mean(), abs=1e-4)
+
+
+def test_chunked_bands_are_ordered_and_bounded_in_memory():
+    engine = MonteCarloEngine(seed=3, max_chunk_elements=50_000)
+    bands, terminal = engine.percentile_bands(100, GaussianReturns(0.1, 0.2), days=60, simulations=10_000)
+
+    assert len(bands['p5']) == len(bands['p50']) == len(bands['p95']) == 60
+    assert np.all(bands['p5'] < bands['p50']) and np.all(bands['p50'] < bands['p95'])
+    assert np.all(np.diff(bands['p95'] - bands['p5']) > -1)  # Cone widens with the horizon
+    assert len(terminal) == 10_000
+
+    # Grid bands match the exact per-day percentiles on grid days and stay close in between
+    exact, _ = engine.percentile_bands(100, GaussianReturns(0.1, 0.2), days=60, simulations=10_000, band_points=None)
+    gridded, _ = engine.percentile_bands(100, GaussianReturns(0.1, 0.2), days=60, simulations=10_000, band_points=12)
+    assert gridded['p95'][-1] == exact['p95'][-1] and gridded['p5'][0] == exact['p5'][0]
+    assert np.allclose(gridded['p50'], exact['p50'], rtol=0.01)
+
+    with pytest.raises(ValueError):
+        engine.simulate_paths(100, GaussianReturns(0.1, 0.2), days=60, simulations=10_000)
+
+
+def test_risk_calculator_summary_keys():
+    result = RiskCalculator().monte_carlo_simulation(100, 0.08, 0.25, seed=11, include_bands=True)
+
+    assert result['pessimistic'] < result['expected_price'] < result['optimistic']
+    # Bands and summary share the nearest-rank convention
+    assert result['bands']['p50'][-1] == result['expected_price']
+    assert result['bands']['p5'][-1] == result['pessimistic'] and result['bands']['p95'][-1] == result['optimistic']
+    assert isinstance(result['expected_return'], float)
+
+
+def test_bootstrap_only_uses_historical_returns():
+    history = np.array([-0.02, 0.01, 0.03])
+    paths = MonteCarloEngine(seed=5).simulate_paths(10, BootstrapReturns(history), days=30, simulations=500)
+
+    daily = paths[:, 1:] / paths[:, :-1] - 1
+    nearest = np.abs(daily[..., None] - history).min(axis=-1)
+    assert nearest.max() < 1e-5
+
+
+def test_garch_starts_from_filtered_variance():
+    rng = np.random.default_rng(0)
+    calm, stressed = rng.normal(0, 0.01, 500), rng.normal(0, 0.04, 20)
+    garch = GarchReturns.from_returns(np.concatenate([calm, stressed]))
+
+    # After a volatile stretch the next day's variance sits above the long-run level
+    assert garch.initial_variance > garch.omega / (1 - garch.alpha - garch.beta)
+
+    bands, _ = MonteCarloEngine(seed=2).percentile_bands(100, garch, days=60, simulations=20_000)
+    assert np.all(bands['p5'] < bands['p50']) and np.all(bands['p50'] < bands['p95'])
+
+
+def test_zero_day_horizon_stays_at_current_price():
+    history = np.random.default_rng(5).normal(0.0005, 0.02, 252)
+    engine = MonteCarloEngine(seed=1)
+
+    for generator in (GaussianReturns(0.08, 0.3), BootstrapReturns(history), GarchReturns.from_returns(history)):
+        for days in (0, -5):
+            assert np.array_equal(engine.simulate_terminal(100, generator, days, 10), np.full(10, 100.0))
+            assert np.array_equal(engine.simulate_paths(100, generator, days, 10), np.full((10, 1), 100.0))
+            bands, terminal = engine.percentile_bands(100, generator, days, 10)
+            assert all(len(band) == 0 for band in bands.values())
+            assert np.array_equal(terminal, np.full(10, 100.0))
+
+
+def test_100k_path_bands_for_every_model_are_fast():
+    history = np.random.default_rng(1).normal(0.0005, 0.02, 252)
+    generators = [GaussianReturns(0.08, 0.3), BootstrapReturns(history), GarchReturns.from_returns(history)]
+
+    for generator in generators:
+        started = time.perf_counter()
+        MonteCarloEngine(seed=9).percentile_bands(100, generator, days=252, simulations=100_000)
+        assert time.perf_counter() - started < 1.0, generator.name
+
+
+def test_risk_calculator_models_and_chart_bands():
+    history = list(np.random.default_rng(4).normal(0.0005, 0.02, 252))
+    calculator = RiskCalculator()
+
+    result = calculator.monte_carlo_simulation(100, 0.08, 0.25, days=30, seed=3, include_bands=True,
+                                               model='bootstrap', returns=history)
+    assert result['model']['model'] == 'bootstrap'
+    assert result['bands']['days'] == list(range(1, 31))
+    assert len(result['bands']['p5']) == len(result['bands']['p95']) == 30
+
+    with pytest.raises(ValueError):
+        calculator.monte_carlo_simulation(100, 0.08, 0.25, model='garch')
@@ -0,0 +1,433 @@
+"""
+Test Multi-Symbol Workflow
+Validates batched comparison runs (shared work, concurrency budget, ranking) with stub agents
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('langchain_openai')
+
+from workflow.enhanced_stock_workflow import EnhancedStockWorkflow  # noqa: E402
+
+ACTIONS = {'NVDA': 'BUY', 'AMD': 'HOLD', 'INTC': 'SELL'}
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for progress tracking"""
+
+    def __init__(self):
+        self.docs = {}
+
+    def __getitem__(self, name):
+        return self
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query.get('id') or query.get('analysis_id'), {'agent_executions': []})
+        for key, value in update.get('$push', {}).items():
+            doc.setdefault(key, []).append(dict(value))
+        for key, value in update.get('$pull', {}).items():
+            parent, field = self._resolve(doc, key)
+            parent[field] = [v for v in parent.get(field, []) if v != value]
+        for key, value in update.get('$set', {}).items():
+            if key.startswith('agent_executions.$.'):
+                for execution in doc['agent_executions']:
+                    if execution['agent'] == query['agent_executions.agent']:
+                        execution[key.rsplit('.', 1)[-1]] = value
+            else:
+                parent, field = self._resolve(doc, key)
+                parent[field] = value
+        return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+
+    @staticmethod
+    def _resolve(doc, key):
+        *path, field = key.split('.')
+        for part in path:
+            doc = doc.setdefault(part, {})
+        return doc, field
+
+    async def find_one(self, query):
+        return self.docs.get(query['id'])
+
+
+class StubAgent:
+    """Agent answering every method, recording calls and concurrency"""
+
+    running = peak = 0
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, context):
+        self.calls.append(context)
+        StubAgent.running += 1
+        StubAgent.peak = max(StubAgent.peak, StubAgent.running)
+        await asyncio.sleep(0.01)
+        StubAgent.running -= 1
+        return {'symbol': context.get('symbol') if isinstance(context, dict) else context}
+
+    analyze = track = execute
+
+
+class StubSynthesis(StubAgent):
+    async def synthesize(self, analyses):
+        symbol = analyses['fundamental']['symbol']
+        return {'action': ACTIONS[symbol], 'confidence': 0.8, 'entry_price': 100.0, 'target_price': 110.0, 'summary': symbol}
+
+
+def _workflow():
+    workflow = EnhancedStockWorkflow(llm=None, database=FakeCollection())
+    synthesis = StubSynthesis()
+    synthesis.compare = workflow.synthesis_agent.compare
+    workflow.fundamental_agent, workflow.technical_agent, workflow.risk_agent = StubAgent(), StubAgent(), StubAgent()
+    workflow.synthesis_agent = synthesis
+    workflow.peer_comparison_agent, workflow.predictive_agent = StubAgent(), StubAgent()
+    workflow.insider_activity_agent = workflow.catalyst_tracker_agent = workflow.chart_analytics_agent = None
+    workflow.sentiment_agent = workflow.critique_agent = workflow.hybrid_orchestrator = None
+
+    async def prepare(symbols):
+        return {s: {'symbol': s, 'sector': 'Technology', 'market_data': {'price': 100.0}} for s in symbols}
+
+    async def mood():
+        return {'mood_score': 55}
+
+    workflow.sent = []
+
+    async def record_websocket(analysis_id, message):
+        workflow.sent.append(message)
+
+    workflow._prepare_contexts, workflow._market_mood = prepare, mood
+    workflow._send_websocket_update = record_websocket
+    return workflow
+
+
+def test_batch_shares_symbol_independent_work_and_ranks_symbols():
+    workflow = _workflow()
+    workflow.max_concurrent_agents = 3
+    StubAgent.peak = 0
+
+    result = asyncio.run(workflow.execute('cmp-1', 'NVDA vs AMD vs INTC', ['NVDA', 'amd', 'INTC']))
+
+    # One peer comparison for the whole batch, per-symbol agents for each symbol
+    assert workflow.peer_comparison_agent.calls == [{'stock_symbols': ['NVDA', 'AMD', 'INTC'], 'markets': ['US']}]
+    assert sorted(c['symbol'] for c in workflow.fundamental_agent.calls) == ['AMD', 'INTC', 'NVDA']
+    assert StubAgent.peak <= 3
+
+    assert [r['symbol'] for r in result['comparison']['ranking']] == ['NVDA', 'AMD', 'INTC']
+    assert result['comparison']['preferred'] == 'NVDA'
+    assert result['symbols'] == list(result['symbol_results']) == ['NVDA', 'AMD', 'INTC']
+    assert result['shared_context']['market_mood'] == {'mood_score': 55}
+    assert result['recommendations']['action'] == 'BUY'  # Lead symbol at the root
+
+    # Progress counts every per-symbol run
+    progress = workflow.database.docs['cmp-1']['progress']
+    assert progress['percentage'] == 100 and progress['pending_agents'] == []
+    assert not workflow._run_plans
+
+
+class QueuedAgent(StubAgent):
+    async def execute(self, context):
+        await asyncio.sleep(0.04)
+        return {'symbol': context.get('symbol') if isinstance(context, dict) else context}
+
+    analyze = track = execute
+
+
+def test_agent_deadlines_start_once_the_budget_is_acquired():
+    workflow = _workflow()
+    workflow.max_concurrent_agents = 2
+    workflow.fundamental_agent, workflow.technical_agent, workflow.risk_agent = QueuedAgent(), QueuedAgent(), QueuedAgent()
+    workflow.predictive_agent = QueuedAgent()
+    # Each agent fits its deadlines, the whole batch queued on two slots does not
+    workflow.agent_deadlines = {key: (0.1, 0.2) for key in workflow.agent_deadlines}
+
+    result = asyncio.run(workflow.execute('cmp-4', 'NVDA vs AMD vs INTC', ['NVDA', 'AMD', 'INTC']))
+
+    for symbol, symbol_result in result['symbol_results'].items():
+        assert symbol_result['pending_agents'] == []
+        assert symbol_result['agent_results']['predictive'] == {'symbol': symbol}
+        nodes = symbol_result['execution_report']['nodes']
+        assert all(nodes[key]['status'] == 'completed' for key in ('fundamental', 'technical', 'risk', 'predictive'))
+    assert result['execution_report']['wall_time'] > 0.2  # The budget did queue the agents
+
+
+def test_post_agent_slo_excludes_time_queued_for_the_budget():
+    workflow = _workflow()
+    workflow.max_concurrent_agents = 1
+    workflow.fundamental_agent, workflow.technical_agent, workflow.risk_agent = QueuedAgent(), QueuedAgent(), QueuedAgent()
+    workflow.predictive_agent = QueuedAgent()
+    workflow.hybrid_orchestrator = SectorHybrid()
+    # The batch queues on one slot for far longer than the SLO
+    workflow.analysis_slo = 0.3
+    workflow.agent_deadlines = {key: (0.1, 0.2) for key in workflow.agent_deadlines}
+
+    result = asyncio.run(workflow.execute('cmp-5', 'NVDA vs AMD vs INTC', ['NVDA', 'AMD', 'INTC']))
+
+    assert result['execution_report']['wall_time'] > workflow.analysis_slo
+    for symbol, symbol_result in result['symbol_results'].items():
+        nodes = symbol_result['execution_report']['nodes']
+        assert all(nodes[key]['status'] == 'completed' for key in ('synthesis', 'intelligence', 'enrichment'))
+        assert symbol_result['enrichment_status'] == 'success'
+    # Every symbol is ranked on its enriched synthesis, not an empty fallback
+    assert [r['symbol'] for r in result['comparison']['ranking']] == ['INTC', 'NVDA', 'AMD']
+
+
+def test_single_symbol_keeps_single_result_shape():
+    workflow = _workflow()
+    result = asyncio.run(workflow.execute('one-1', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}}))
+
+    assert 'comparison' not in result and result['recommendations']['action'] == 'BUY'
+    assert workflow.peer_comparison_agent.calls == [{'stock_symbols': ['NVDA'], 'markets': ['US']}]
+
+
+def test_duplicate_symbols_run_a_single_symbol_analysis():
+    workflow = _workflow()
+    result = asyncio.run(workflow.execute('one-3', 'NVDA', ['NVDA', ' nvda'], context={'symbol': 'NVDA', 'market_data': {}}))
+
+    assert 'comparison' not in result and result['symbols'] == ['NVDA']
+    assert workflow.peer_comparison_agent.calls == [{'stock_symbols': ['NVDA'], 'markets': ['US']}]
+
+
+def test_batch_reports_the_deduplicated_symbols():
+    workflow = _workflow()
+    result = asyncio.run(workflow.execute('cmp-6', 'NVDA vs AMD', ['nvda', 'AMD', 'NVDA']))
+
+    assert result['symbols'] == list(result['symbol_results']) == ['NVDA', 'AMD']
+    assert workflow.peer_comparison_agent.calls == [{'stock_symbols': ['NVDA', 'AMD'], 'markets': ['US']}]
+
+
+class StubHybrid:
+    """Tavily enrichment whose intelligence gathering takes as long as the agents"""
+
+    async def gather_intelligence(self, analysis_id, context, macro_result=None):
+        await asyncio.sleep(0.03)
+        return {'news_intelligence': {'status': 'success', 'data': {}}}
+
+    async def apply_intelligence(self, analysis_id, base_result, tavily_results):
+        return {**base_result, 'enrichment_status': 'success', 'tavily_intelligence': {'news': {}}}
+
+
+def test_intelligence_overlaps_base_agents():
+    workflow = _workflow()
+    workflow.hybrid_orchestrator = StubHybrid()
+    result = asyncio.run(workflow.execute('one-2', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}}))
+
+    nodes = result['execution_report']['nodes']
+    assert nodes['intelligence']['start'] < nodes['fundamental']['end']
+    assert nodes['enrichment']['start'] >= max(nodes['synthesis']['end'], nodes['intelligence']['end'])
+    assert result['enrichment_status'] == 'success'
+    assert result['execution_report']['critical_path'][-1] == 'enrichment'
+
+
+class SlowAgent(StubAgent):
+    async def execute(self, context):
+        await asyncio.sleep(0.3)
+        return {'forecast': 'up'}
+
+
+def test_late_agent_is_pending_then_merged():
+    workflow = _workflow()
+    workflow.predictive_agent = SlowAgent()
+    workflow.agent_deadlines['predictive'] = (0.05, 2.0)
+
+    async def scenario():
+        result = await workflow.execute('one-3', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}})
+        # Synthesis did not wait for the predictive agent
+        assert result['pending_agents'] == ['predictive'] and result['agent_results']['predictive'] == {}
+        assert result['execution_report']['wall_time'] < 0.25
+        doc = workflow.database.docs['one-3']
+        assert doc['pending_late_agents'] == ['predictive[NVDA]']
+
+        await asyncio.gather(*workflow._late_merges)
+        return doc
+
+    doc = asyncio.run(scenario())
+    assert doc['agent_results']['predictive'] == {'forecast': 'up'} and doc['analysis']['predictive'] == {'forecast': 'up'}
+    assert doc['pending_agents'] == [] and doc['pending_late_agents'] == []
+    assert doc['late_results'][0]['agent'] == 'predictive' and doc['late_results'][0]['status'] == 'completed'
+    late_update = [m for m in workflow.sent if m['type'] == 'agent_late_result']
+    assert late_update[0]['result'] == {'forecast': 'up'} and late_update[0]['symbol'] == 'NVDA'
+
+
+class SectorHybrid(StubHybrid):
+    """Enrichment that upgrades INTC, with a slow sector-wide macro context"""
+
+    def __init__(self):
+        self.macro_tasks = []
+
+    async def analyze_macro(self, sector, symbols):
+        self.macro_tasks.append(asyncio.current_task())
+        await asyncio.sleep(0.05)
+        return {'data': {'sector': sector}}
+
+    async def apply_intelligence(self, analysis_id, base_result, tavily_results):
+        enriched = await super().apply_intelligence(analysis_id, base_result, tavily_results)
+        if base_result['reasoning'] == 'INTC':
+            enriched.update(recommendation='STRONG_BUY', confidence=0.9)
+        return enriched
+
+
+def test_comparison_ranks_final_enriched_calls():
+    workflow = _workflow()
+    workflow.hybrid_orchestrator = SectorHybrid()
+    result = asyncio.run(workflow.execute('cmp-2', 'NVDA vs INTC', ['NVDA', 'INTC']))
+
+    assert result['comparison']['preferred'] == 'INTC'
+    assert result['comparison']['ranking'][0]['action'] == 'STRONG_BUY'
+
+
+def test_failed_batch_cancels_shared_work():
+    workflow = _workflow()
+    workflow.hybrid_orchestrator = SectorHybrid()
+
+    async def fail(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("symbol analysis down")
+
+    workflow._analyze_symbol = fail
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match='every symbol'):
+            await workflow._execute_batch('cmp-3', 'NVDA vs AMD', ['NVDA', 'AMD'])
+        await asyncio.sleep(0)
+        return workflow.hybrid_orchestrator.macro_tasks
+
+    macro_tasks = asyncio.run(scenario())
+    assert macro_tasks and all(task.cancelled() for task in macro_tasks)
+
+
+def _late_run(workflow, analysis_id):
+    """Single-symbol run whose predictive agent misses its soft deadline"""
+    workflow.predictive_agent = SlowAgent()
+    workflow.agent_deadlines['predictive'] = (0.05, 2.0)
+    return workflow.execute(analysis_id, 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}})
+
+
+def test_failed_late_merge_still_releases_the_agent():
+    workflow = _workflow()
+    update_one = workflow.database.update_one
+
+    async def failing_update(query, update, upsert=False):
+        if 'agent_results.predictive' in update.get('$set', {}):
+            raise RuntimeError("write conflict")
+        return await update_one(query, update, upsert)
+
+    async def scenario():
+        await _late_run(workflow, 'one-4')
+        assert workflow.database.docs['one-4']['late_deadline'] is not None
+        workflow.database.update_one = failing_update
+        await asyncio.gather(*workflow._late_merges)
+        return workflow.database.docs['one-4']
+
+    doc = asyncio.run(scenario())
+    assert doc['pending_late_agents'] == [] and doc['late_results'][0]['status'] == 'failed'
+    assert [m['result'] for m in workflow.sent if m['type'] == 'agent_late_result'] == [None]
+
+
+def test_cancelled_late_merge_releases_pending_agents():
+    workflow = _workflow()
+
+    async def scenario():
+        await _late_run(workflow, 'one-5')
+        await asyncio.sleep(0.01)  # Merge waiting for the predictive agent
+        merges = list(workflow._late_merges)
+        for task in merges:
+            task.cancel()
+        await asyncio.gather(*merges, return_exceptions=True)
+        return workflow.database.docs['one-5']
+
+    doc = asyncio.run(scenario())
+    assert doc['pending_late_agents'] == [] and doc['late_results'][0]['status'] == 'cancelled'
+    execution = next(e for e in doc['agent_executions'] if e['agent'] == 'PredictiveAgent')
+    assert execution['status'] == 'FAILED' and execution['error'] == 'cancelled'
+
+
+class FailingLateAgent(StubAgent):
+    async def execute(self, context):
+        await asyncio.sleep(0.1)
+        raise RuntimeError("model unavailable")
+
+
+def test_late_agent_failure_is_merged_as_failed():
+    workflow = _workflow()
+    workflow.predictive_agent = FailingLateAgent()
+    workflow.agent_deadlines['predictive'] = (0.05, 2.0)
+
+    async def scenario():
+        await workflow.execute('one-6', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}})
+        await asyncio.gather(*workflow._late_merges)
+        return workflow.database.docs['one-6']
+
+    doc = asyncio.run(scenario())
+    assert doc['late_results'][0]['status'] == 'failed'
+    assert doc['agent_results']['predictive'] == {}  # The failure is not merged as a result
+    assert doc['execution_report']['nodes']['predictive']['status'] == 'failed'
+    late_update = [m for m in workflow.sent if m['type'] == 'agent_late_result']
+    assert late_update[0]['status'] == 'failed' and late_update[0]['result'] is None
+
+
+def test_hard_deadline_cancellation_records_the_timeout():
+    workflow = _workflow()
+    workflow.predictive_agent = SlowAgent()
+    workflow.agent_deadlines['predictive'] = (0.05, 0.1)
+
+    async def scenario():
+        await workflow.execute('one-7', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}})
+        await asyncio.gather(*workflow._late_merges)
+        return workflow.database.docs['one-7']
+
+    doc = asyncio.run(scenario())
+    execution = next(e for e in doc['agent_executions'] if e['agent'] == 'PredictiveAgent')
+    assert execution['error'] == 'Timed out after 0.1s'
+    assert doc['late_results'][0]['status'] == 'timeout'
+
+
+class SlowIntelligence(StubHybrid):
+    """Intelligence that arrives after its soft deadline and upgrades the call"""
+
+    async def gather_intelligence(self, analysis_id, context, macro_result=None):
+        await asyncio.sleep(0.3)
+        return {'news_intelligence': {'status': 'success', 'data': {}}}
+
+    async def apply_intelligence(self, analysis_id, base_result, tavily_results):
+        enriched = await super().apply_intelligence(analysis_id, base_result, tavily_results)
+        return {**enriched, 'recommendation': 'STRONG_BUY', 'confidence': 0.9}
+
+
+def test_late_intelligence_keeps_base_call_then_enriches():
+    workflow = _workflow()
+    workflow.hybrid_orchestrator = SlowIntelligence()
+    workflow.agent_deadlines['intelligence'] = (0.05, 2.0)
+
+    async def scenario():
+        result = await workflow.execute('one-6', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}})
+        assert result['enrichment_status'] == 'pending' and result['recommendations']['action'] == 'BUY'
+        assert result['pending_agents'] == ['intelligence'] and result['execution_report']['wall_time'] < 0.25
+
+        await asyncio.gather(*workflow._late_merges)
+        return workflow.database.docs['one-6']
+
+    doc = asyncio.run(scenario())
+    assert doc['recommendations']['action'] == 'STRONG_BUY' and doc['confidence_score'] == 0.9
+    assert doc['enrichment_status'] == 'success' and doc['pending_late_agents'] == []
+    assert doc['late_results'][0]['agent'] == 'intelligence' and doc['late_results'][0]['status'] == 'completed'
+
+
+class SlowEnrichment(StubHybrid):
+    async def apply_intelligence(self, analysis_id, base_result, tavily_results):
+        await asyncio.sleep(1.0)
+        return await super().apply_intelligence(analysis_id, base_result, tavily_results)
+
+
+def test_post_agent_nodes_share_the_analysis_slo():
+    workflow = _workflow()
+    workflow.hybrid_orchestrator = SlowEnrichment()
+    workflow.analysis_slo = 0.2
+
+    result = asyncio.run(workflow.execute('one-7', 'NVDA', ['NVDA'], context={'symbol': 'NVDA', 'market_data': {}}))
+
+    assert result['execution_report']['nodes']['enrichment']['status'] == 'timeout'
+    assert result['enrichment_status'] == 'failed' and result['recommendations']['action'] == 'BUY'
+    assert result['execution_report']['wall_time'] < 0.4
@@ -0,0 +1,218 @@
+"""
+Test OHLCV Disk Cache
+Validates memory-mapped history files and incremental refresh without network access
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from services.market_data_store import OHLCVSeries  # noqa: E402
+from services.ohlcv_disk_cache import OHLCVDiskCache  # noqa: E402
+from services.alphavantage_chart_service import AlphaVantageChartService  # noqa: E402
+
+
+def _get(store, symbol='AAPL', period='1y'):
+    return asyncio.run(store.get_history(symbol, period=period))
+
+
+def test_files_are_memory_mapped_and_appended(tmp_path, ohlcv_frame):
+    cache = OHLCVDiskCache(cache_dir=str(tmp_path))
+    full = OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-09-30'))
+    stored = cache.write(full, '2y')
+
+    assert stored.period == '2y' and np.array_equal(stored.series.close, full.close)
+    assert not stored.series.close.flags.owndata and not stored.series.close.flags.writeable
+
+    # Delta starts at the last stored (unfinished) bar, which is replaced
+    delta = OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-10-02', days=3))
+    merged = cache.append(stored, delta)
+    assert len(merged.series) == len(full) + 2
+    assert merged.series.dates[-1] == np.datetime64('2025-10-02')
+    assert np.array_equal(merged.series.close[-3:], delta.close)
+    assert cache.read('AAPL', '1d').period == '2y'
+
+
+def test_restart_reads_disk_and_fetches_only_new_bars(tmp_path, synthetic_store):
+    first = synthetic_store(end='2025-09-30', seed=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    _get(first)
+    assert first.downloads == [('full', 'AAPL')]
+
+    # Restart within the TTL: no network at all
+    restarted = synthetic_store(end='2025-09-30', seed=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    assert len(_get(restarted)) > 0 and restarted.downloads == []
+
+    # Later restart: one delta from the last complete stored bar
+    later = synthetic_store(end='2025-10-03', seed=0, ttl_seconds=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    series = _get(later)
+    assert later.downloads == [('since', 'AAPL', '2025-09-29')]
+    assert series.dates[-1] == np.datetime64('2025-10-03')
+    assert later.disk_cache.stats['appended_bars'] == 3
+
+
+def test_readjusted_history_is_refetched(tmp_path, ohlcv_frame, synthetic_store):
+    _get(synthetic_store(end='2025-09-30', seed=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path))))
+
+    # A split re-adjusts every past price, so appending would splice two bases
+    split = synthetic_store(end='2025-10-03', seed=0, scale=0.5, ttl_seconds=0,
+                            disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    series = _get(split)
+    assert [c[0] for c in split.downloads] == ['since', 'full']
+    expected = ohlcv_frame(end='2025-10-03', scale=0.5)['Close']
+    assert series.close[-1] == expected.iloc[-1]
+    assert np.array_equal(split.disk_cache.read('AAPL', '1d').series.close, expected.to_numpy())
+
+
+def test_batch_loads_refresh_stale_symbols_in_one_download(tmp_path, synthetic_store):
+    first = synthetic_store(end='2025-09-30', seed=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    asyncio.run(first.get_many(['AAPL', 'MSFT'], period='1y'))
+    assert first.downloads == [('many', ('AAPL', 'MSFT'), None)]
+
+    later = synthetic_store(end='2025-10-03', seed=0, ttl_seconds=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    result = asyncio.run(later.get_many(['AAPL', 'MSFT', 'NVDA'], period='1y'))
+
+    assert later.downloads == [('many', ('AAPL', 'MSFT'), '2025-09-29'), ('many', ('NVDA',), None)]
+    assert all(s.dates[-1] == np.datetime64('2025-10-03') for s in result.values())
+
+
+def test_refresh_that_misses_the_stored_bars_refetches_history(tmp_path, synthetic_store):
+    class LookbackStore(synthetic_store):
+        """Store whose provider returns nothing for refresh starts beyond its lookback"""
+
+        def _download_since(self, symbol, interval, start):
+            self.downloads.append(('since', symbol, str(np.datetime64(start, 'D'))))
+            return OHLCVSeries.empty_series(symbol, interval)
+
+    _get(synthetic_store(end='2025-06-30', seed=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path))))
+
+    # An empty delta must not mark the months-old file fresh
+    stale = LookbackStore(end='2025-10-03', seed=0, ttl_seconds=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    series = _get(stale)
+    assert [c[0] for c in stale.downloads] == ['since', 'full']
+    assert series.dates[-1] == np.datetime64('2025-10-03')
+
+    cache = OHLCVDiskCache(cache_dir=str(tmp_path))
+    stored = cache.read('AAPL', '1d')
+    assert cache.append(stored, OHLCVSeries.empty_series('AAPL', '1d')) is stored
+
+
+def test_refreshed_history_is_trimmed_to_its_period(tmp_path, ohlcv_frame, synthetic_store):
+    cache = OHLCVDiskCache(cache_dir=str(tmp_path))
+    cache.write(OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-09-30', days=700)), '2y')
+
+    later = synthetic_store(end='2025-10-03', seed=0, ttl_seconds=0, disk_cache=OHLCVDiskCache(cache_dir=str(tmp_path)))
+    series = _get(later)
+
+    # Bars older than the stored 2y period are dropped instead of accumulating
+    stored = cache.read('AAPL', '1d').series
+    assert later.downloads == [('since', 'AAPL', '2025-09-29')]
+    assert stored.dates[-1] == np.datetime64('2025-10-03')
+    assert stored.dates[0] >= np.datetime64('2023-10-03') and len(stored) < 700
+    assert series.dates[-1] == stored.dates[-1]
+
+
+def test_concurrent_writers_use_their_own_temp_files(tmp_path, ohlcv_frame):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = OHLCVDiskCache(cache_dir=str(tmp_path))
+    histories = [OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-09-30', scale=s)) for s in (1.0, 2.0)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: cache.write(histories[i % 2], '1y'), range(16)))
+
+    stored = cache.read('AAPL', '1d')
+    assert any(np.array_equal(stored.series.close, h.close) for h in histories)
+    assert cache.stats['errors'] == 0
+    assert [p.name for p in (tmp_path / '1d').iterdir()] == ['AAPL.arrow']
+
+
+def test_sources_keep_separate_files(tmp_path, ohlcv_frame):
+    cache = OHLCVDiskCache(cache_dir=str(tmp_path))
+    cache.write(OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-09-30')), '1y')
+    unadjusted = cache.write(OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-09-30', scale=2.0)),
+                             '1d', source='alphavantage')
+
+    delta = OHLCVSeries.from_dataframe('AAPL', '1d', ohlcv_frame(end='2025-10-03', scale=2.0).tail(4))
+    appended = cache.append(unadjusted, delta)
+
+    assert appended.source == 'alphavantage' and appended.series.dates[-1] == np.datetime64('2025-10-03')
+    adjusted = cache.read('AAPL', '1d')
+    assert adjusted.series.dates[-1] == np.datetime64('2025-09-30')
+    assert np.array_equal(adjusted.series.close, ohlcv_frame(end='2025-09-30')['Close'].to_numpy())
+    assert cache.invalidate('AAPL') == 2
+
+
+class FakeAlphaVantage(AlphaVantageChartService):
+    """Chart service whose daily API calls are served from `frames` ending at `today`"""
+
+    def __init__(self, today: str, cache_dir: str, frames):
+        super().__init__()
+        self.disk_cache = OHLCVDiskCache(cache_dir=cache_dir)
+        self.today, self.frames = today, frames
+        self.downloads = []
+
+    async def _fetch_history(self, symbol, interval, outputsize):
+        self.downloads.append(outputsize)
+        if self.today is None:  # API down or out of calls
+            return {'error': 'rate limited'}
+        frame = self.frames(end=self.today, days=100 if outputsize == 'compact' else 300)
+        return {'data': [
+            {'timestamp': ts.strftime('%Y-%m-%d'), 'open': row.Open, 'high': row.High,
+             'low': row.Low, 'close': row.Close, 'volume': int(row.Volume)}
+            for ts, row in frame.iterrows()
+        ], 'metadata': {}}
+
+
+def test_alphavantage_history_covers_outputsize_and_refreshes_by_delta(tmp_path, ohlcv_frame):
+    service = FakeAlphaVantage('2025-09-30', str(tmp_path), ohlcv_frame)
+    assert len(asyncio.run(service.get_historical_data('AAPL', '1D', 'compact'))['data']) == 100
+
+    # Stored compact bars do not cover a full request
+    full = asyncio.run(service.get_historical_data('AAPL', '1D', 'full'))
+    assert service.downloads == ['compact', 'full']
+    assert len(full['data']) == 300
+
+    # A stale full history is topped up with a compact delta
+    service.today, service.refresh_seconds = '2025-10-03', 0
+    refreshed = asyncio.run(service.get_historical_data('AAPL', '1D', 'full'))
+    assert service.downloads == ['compact', 'full', 'compact']
+    assert len(refreshed['data']) == 303
+    assert refreshed['data'][-1]['timestamp'] == '2025-10-03'
+
+
+def test_alphavantage_refreshes_keep_stored_history_within_its_range(tmp_path, ohlcv_frame):
+    service = FakeAlphaVantage('2025-09-30', str(tmp_path), ohlcv_frame)
+    asyncio.run(service.get_historical_data('AAPL', '1D', 'compact'))
+
+    service.today, service.refresh_seconds = '2025-10-03', 0
+    refreshed = asyncio.run(service.get_historical_data('AAPL', '1D', 'compact'))
+
+    stored = service.disk_cache.read('AAPL', '1d', source='alphavantage').series
+    assert refreshed['data'][-1]['timestamp'] == '2025-10-03'
+    assert len(stored) == 100 and stored.dates[-1] == np.datetime64('2025-10-03')
+
+    # Month-long intraday histories drop bars older than a month
+    trim = service._trim_to('1mo')
+    assert trim(OHLCVSeries.from_dataframe('AAPL', '5m', ohlcv_frame(end='2025-10-03'))).dates[0] >= np.datetime64('2025-09-03')
+
+
+def test_failed_alphavantage_refresh_serves_stored_history_until_retry(tmp_path, ohlcv_frame):
+    service = FakeAlphaVantage('2025-09-30', str(tmp_path), ohlcv_frame)
+    asyncio.run(service.get_historical_data('AAPL', '1D', 'compact'))
+
+    service.today, service.refresh_seconds, service.retry_seconds = None, 0, 600
+    for _ in range(3):
+        served = asyncio.run(service.get_historical_data('AAPL', '1D', 'compact'))
+        assert served['data'][-1]['timestamp'] == '2025-09-30'
+    assert service.downloads == ['compact', 'compact']  # One failed refresh, then the stored range
+
+    # The retry time survives a restart; once it passes the next request refreshes
+    stored = OHLCVDiskCache(cache_dir=str(tmp_path)).read('AAPL', '1d', source='alphavantage')
+    assert stored.retry_after > stored.fetched_at
+    service.today, service.retry_seconds = '2025-10-03', 0
+    service.disk_cache.defer(stored, 0)
+    refreshed = asyncio.run(service.get_historical_data('AAPL', '1D', 'compact'))
+    assert service.downloads == ['compact', 'compact', 'compact']
+    assert refreshed['data'][-1]['timestamp'] == '2025-10-03'
@@ -0,0 +1,91 @@
+"""
+Test Pattern Detector
+Validates the shared extrema, trailing-window detection and full-history scanning
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from calculators.pattern_detector import PatternDetector, find_extrema, rolling_linear_fit
+
+
+def _loop_peaks(values, left, right):
+    """The original nested comparisons"""
+    return [i for i in range(left, len(values) - right)
+            if all(values[i] > values[i - k] for k in range(1, left + 1))
+            and all(values[i] > values[i + k] for k in range(1, right + 1))]
+
+
+def _walk(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.015, n))
+    return close * 1.01, close * 0.99, close
+
+
+@pytest.mark.parametrize('left,right', [(1, 1), (2, 2), (2, 1)])
+def test_extrema_match_nested_comparisons(left, right):
+    values = np.round(_walk(500, seed=left + right)[2], 0)  # Rounded to create ties
+    assert find_extrema(values, left, right).tolist() == _loop_peaks(values, left, right)
+    assert find_extrema(values, left, right, kind='trough').tolist() == _loop_peaks(-values, left, right)
+
+
+def test_rolling_fit_matches_polyfit():
+    values = _walk(60, seed=3)[2]
+    slope, intercept = rolling_linear_fit(values, 20)
+    for j in (0, 17, 40):
+        expected = np.polyfit(np.arange(20), values[j:j + 20], 1)
+        assert (slope[j], intercept[j]) == pytest.approx(tuple(expected))
+
+
+def _head_and_shoulders():
+    """Flat series with a left shoulder, higher head and matching right shoulder"""
+    close = np.full(40, 100.0)
+    for center, height in ((25, 5.0), (30, 9.0), (35, 5.1)):
+        close[center - 2:center + 3] += height * np.array([0.3, 0.7, 1.0, 0.7, 0.3])
+    close[-2:] = 95.0  # Break below the neckline
+    return close + 1, close - 1, close
+
+
+def test_trailing_window_reports_current_formation():
+    highs, lows, closes = _head_and_shoulders()
+    ohlc = [{'open': c, 'high': h, 'low': l, 'close': c, 'volume': 1} for h, l, c in zip(highs, lows, closes)]
+
+    result = PatternDetector().detect_patterns(ohlc)
+    pattern = next(p for p in result['patterns'] if p['pattern'] == 'Head and Shoulders')
+
+    assert pattern['start_index'] == 23 and pattern['end_index'] == 37
+    assert pattern['neckline'] == pytest.approx(104.05)
+    assert pattern['formation_complete']
+
+
+def test_scan_finds_every_occurrence_across_history():
+    highs, lows, closes = _head_and_shoulders()
+    # The same formation three times over a longer history
+    tiled = [np.tile(a, 3) for a in (highs, lows, closes)]
+    detector = PatternDetector()
+
+    scan = detector.scan_patterns(*tiled)
+    found = [o for o in scan['occurrences'] if o['pattern'] == 'Head and Shoulders']
+    assert [(o['start_index'], o['end_index']) for o in found] == [(23, 37), (63, 77), (103, 117)]
+    assert [o['breakout_index'] for o in found] == [38, 78, 118]
+    assert all(isinstance(o['start_index'], int) for o in scan['occurrences'])
+    assert scan['counts']['Head and Shoulders'] == 3
+
+    stats = detector.backtest_patterns(tiled[2], scan['occurrences'], horizon=1)
+    assert stats['Head and Shoulders']['occurrences'] == 3
+    assert stats['Head and Shoulders']['hit_rate'] == 1.0
+
+
+def test_scan_of_long_history_is_fast():
+    highs, lows, closes = _walk(100_000, seed=7)
+
+    started = time.perf_counter()
+    scan = PatternDetector().scan_patterns(highs, lows, closes)
+    elapsed = time.perf_counter() - started
+
+    assert scan['bars'] == 100_000 and len(scan['occurrences']) > 1000
+    ends = [o['end_index'] for o in scan['occurrences']]
+    assert ends == sorted(ends)
+    assert elapsed < 2.0
@@ -0,0 +1,87 @@
+"""
+Test Pattern Screener
+Validates batch screening against per-symbol detection without network access
+"""
+
+import asyncio
+import json
+
+import services.pattern_screener_service as screener_module
+from calculators.pattern_detector import PatternDetector
+from services.pattern_screener_service import PatternScreener
+
+
+def _detect(frame):
+    """Per-symbol detection on a history frame"""
+    ohlc = [{'high': h, 'low': l, 'close': c} for h, l, c in zip(frame['High'], frame['Low'], frame['Close'])]
+    return PatternDetector().detect_patterns(ohlc)['patterns']
+
+
+def _screen(monkeypatch, store, symbols, **kwargs):
+    monkeypatch.setattr(screener_module, 'get_market_data_store', lambda: store)
+
+    async def run():
+        screener = PatternScreener(**kwargs)
+        events = [event async for event in screener.stream(symbols)]
+        screener.shutdown()
+        return events
+
+    return asyncio.run(run())
+
+
+def test_screen_matches_per_symbol_detection(monkeypatch, synthetic_store):
+    store = synthetic_store(days=126, missing={'SYM999'})
+    symbols = [f'SYM{i:03d}' for i in range(12)] + ['SYM999']
+    events = _screen(monkeypatch, store, symbols, chunk_size=5, process_pool_threshold=1000)
+
+    complete = events[-1]
+    assert complete['event'] == 'complete'
+    assert complete['screened'] == 12 and complete['missing'] == ['SYM999']
+    assert [e['screened'] for e in events if e['event'] == 'progress'][-1] == 12
+
+    expected = []
+    for symbol in symbols[:-1]:
+        expected += [(symbol, p['pattern'], p['confidence']) for p in _detect(store.frame(symbol))]
+
+    ranked = [(m['symbol'], m['pattern'], m['confidence']) for m in complete['matches']]
+    assert ranked and sorted(ranked) == sorted(expected)
+    assert [c for _, _, c in ranked] == sorted((c for _, _, c in ranked), reverse=True)
+    # Every match was streamed before the summary, and everything is JSON-ready
+    assert len([e for e in events if e['event'] == 'match']) == len(ranked)
+    json.dumps(events)
+
+
+def test_process_pool_gives_same_ranking(monkeypatch, synthetic_store):
+    store = synthetic_store(days=126)
+    symbols = [f'SYM{i:03d}' for i in range(12)]
+    in_process = _screen(monkeypatch, store, symbols, chunk_size=4, process_pool_threshold=1000)[-1]
+    pooled = _screen(monkeypatch, store, symbols, chunk_size=4, process_pool_threshold=0, max_workers=2)[-1]
+
+    assert pooled['matches'] == in_process['matches']
+
+
+def test_symbols_are_screened_on_their_own_bars(monkeypatch, synthetic_store):
+    class GappedStore(synthetic_store):
+        """SYM001 stopped trading 10 bars before the others"""
+
+        def frame(self, symbol):
+            frame = super().frame(symbol)
+            return frame.iloc[:-10] if symbol == 'SYM001' else frame
+
+    store = GappedStore(days=126)
+    monkeypatch.setattr(screener_module, 'get_market_data_store', lambda: store)
+
+    async def run():
+        return await PatternScreener(process_pool_threshold=1000).screen(['SYM000', 'SYM001'])
+
+    summary = asyncio.run(run())
+
+    frame = store.frame('SYM001')
+    expected = sorted((p['pattern'], p['confidence']) for p in _detect(frame))
+    halted = [m for m in summary['matches'] if m['symbol'] == 'SYM001']
+    assert halted and sorted((m['pattern'], m['confidence']) for m in halted) == expected
+    # The last real close, not a forward-filled one dated today
+    for match in halted:
+        assert match['current_price'] == round(float(frame['Close'].iloc[-1]), 4)
+        assert match['price_date'] == str(frame.index[-1].date())
+        assert match['end_date'] <= match['price_date']
@@ -19,7 +19,7 @@ async def test_peer_benchmarking():
     print("=" * 70)
 
     # Test with AAPL
-    result = calc.get_peer_comparison('AAPL')
+    result = await calc.get_peer_comparison('AAPL')
 
     if 'error' in result:
         print(f"\n❌ Error: {result['error']}")
@@ -0,0 +1,173 @@
+"""
+Test Portfolio Optimizer
+Validates covariance shrinkage, frontier solutions and the optimization service
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculators.portfolio_optimizer import PortfolioOptimizer, ledoit_wolf_covariance, project_to_simplex
+from calculators.risk_calculator import RiskCalculator
+from services.market_data_store import OHLCVSeries
+from services.portfolio_optimization_service import PortfolioOptimizationService
+
+
+def _factor_returns(assets: int, days: int = 252, seed: int = 0) -> np.ndarray:
+    """Correlated daily returns from a three-factor model"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (days, 3))
+    loadings = rng.normal(1, 0.5, (3, assets))
+    drift = rng.normal(0.0004, 0.0004, assets)
+    return factors @ loadings + rng.normal(0, 0.015, (days, assets)) + drift
+
+
+def test_ledoit_wolf_matches_reference():
+    sklearn_covariance = pytest.importorskip('sklearn.covariance')
+    returns = _factor_returns(40, days=120)
+
+    cov, shrinkage = ledoit_wolf_covariance(returns)
+    reference = sklearn_covariance.LedoitWolf().fit(returns)
+
+    assert shrinkage == pytest.approx(reference.shrinkage_)
+    assert np.allclose(cov, reference.covariance_)
+
+
+def test_simplex_projection_rows():
+    projected = project_to_simplex(np.array([[0.5, 0.5, 0.5], [2.0, -1.0, 0.0]]))
+
+    assert np.allclose(projected.sum(axis=1), 1)
+    assert np.allclose(projected, [[1 / 3, 1 / 3, 1 / 3], [1.0, 0.0, 0.0]])
+
+
+def test_long_short_frontier_hits_targets_exactly():
+    optimizer = PortfolioOptimizer.from_returns(_factor_returns(10))
+    targets = np.array([0.1, 0.2, 0.3])
+
+    weights = optimizer._unconstrained_weights(targets)
+    assert np.allclose(weights @ optimizer.mu, targets)
+    assert np.allclose(weights.sum(axis=1), 1)
+
+    # Every target portfolio is at least as volatile as the global minimum
+    min_vol = optimizer.portfolio_stats(optimizer.min_variance(long_only=False))['volatility'][0]
+    assert np.all(optimizer.portfolio_stats(weights)['volatility'] >= min_vol - 1e-12)
+
+
+def test_long_only_frontier_for_150_holdings():
+    optimizer = PortfolioOptimizer.from_returns(_factor_returns(150))
+
+    started = time.perf_counter()
+    frontier = optimizer.efficient_frontier(n_points=40)
+    elapsed = time.perf_counter() - started
+
+    weights = frontier['weights']
+    assert weights.shape == (40, 150)
+    assert np.all(weights >= 0) and np.allclose(weights.sum(axis=1), 1)
+    # Higher return costs volatility along the frontier
+    assert np.all(np.diff(frontier['volatility']) > -1e-6)
+    # Low end is the minimum-variance portfolio, high end the best single asset
+    min_vol = optimizer.portfolio_stats(optimizer.min_variance())['volatility'][0]
+    assert frontier['volatility'][0] == pytest.approx(min_vol, rel=1e-3)
+    assert frontier['return'][-1] == pytest.approx(optimizer.mu.max())
+    assert elapsed < 2.0
+
+
+def test_risk_parity_equalizes_risk_contributions():
+    optimizer = PortfolioOptimizer.from_returns(_factor_returns(25))
+    contributions = optimizer.risk_contributions(optimizer.risk_parity())
+
+    assert np.allclose(contributions, 1 / 25, atol=1e-8)
+
+
+def test_risk_calculator_uses_correlations():
+    returns = _factor_returns(4, seed=3)
+    assets = [
+        {'symbol': f'S{i}', 'expected_return': float(returns[:, i].mean() * 252),
+         'volatility': float(returns[:, i].std() * np.sqrt(252)), 'returns': returns[:, i].tolist()}
+        for i in range(4)
+    ]
+    calculator = RiskCalculator()
+
+    equal = calculator.portfolio_optimization(assets)
+    uncorrelated = calculator.portfolio_optimization([{k: v for k, v in a.items() if k != 'returns'} for a in assets])
+    # Positively correlated holdings diversify less than independent ones
+    assert equal['expected_volatility'] > uncorrelated['expected_volatility']
+
+    min_variance = calculator.portfolio_optimization(assets, method='min_variance', frontier_points=10)
+    assert min_variance['expected_volatility'] <= equal['expected_volatility']
+    assert len(min_variance['efficient_frontier']) == 10
+    assert sum(a['weight'] for a in min_variance['allocations']) == pytest.approx(100, abs=0.05)
+
+
+class _SeriesStore:
+    """Store stand-in serving synthetic closes with different date ranges"""
+
+    def __init__(self, closes):
+        self.closes = closes
+
+    async def get_history(self, symbol, period='1y', interval='1d'):
+        close = self.closes[symbol]
+        index = pd.bdate_range(end='2025-10-01', periods=len(close))
+        frame = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                              'Volume': np.ones(len(close))}, index=index)
+        return OHLCVSeries.from_dataframe(symbol, interval, frame)
+
+    async def get_many(self, symbols, period='1y', interval='1d'):
+        return {s: await self.get_history(s, period, interval) if s in self.closes
+                else OHLCVSeries.empty_series(s, interval) for s in symbols}
+
+
+def test_service_aligns_histories_and_optimizes(monkeypatch):
+    returns = _factor_returns(3, days=300)
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    store = _SeriesStore({
+        'AAA': prices[:, 0],
+        'BBB': prices[50:, 1],  # Shorter history: alignment keeps the common 250 days
+        'CCC': prices[:, 2],
+        'NEW': prices[-10:, 0]  # Too little history to estimate
+    })
+    monkeypatch.setattr('services.portfolio_optimization_service.get_market_data_store', lambda: store)
+    service = PortfolioOptimizationService()
+
+    symbols, matrix, excluded = asyncio.run(service.get_return_matrix(['aaa', 'GONE', 'BBB', 'CCC', 'NEW']))
+    assert symbols == ['AAA', 'BBB', 'CCC'] and excluded == ['GONE', 'NEW']
+    assert matrix.shape == (249, 3)
+    assert np.allclose(matrix, returns[51:])
+
+    result = asyncio.run(service.optimize(['AAA', 'BBB', 'CCC'], method='risk_parity',
+                                          current_weights={'AAA': 1.0}))
+    assert [a['risk_contribution'] for a in result['allocations']] == pytest.approx([33.33] * 3, abs=0.02)
+    assert 'current' in result and len(result['efficient_frontier']) == 25
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.optimize(['AAA', 'BBB'], method='target_return'))
+
+
+def test_risk_parity_gives_riskless_assets_no_weight():
+    cov = np.array([[0.04, 0.006, 0.0], [0.006, 0.09, 0.0], [0.0, 0.0, 0.0]])
+    optimizer = PortfolioOptimizer([0.08, 0.1, 0.04], cov)
+
+    with np.errstate(all='raise'):
+        weights = optimizer.risk_parity()
+
+    assert weights[2] == 0 and weights.sum() == pytest.approx(1)
+    assert np.allclose(optimizer.risk_contributions(weights)[:2], 0.5, atol=1e-8)
+
+
+def test_long_only_target_return_is_met_exactly():
+    optimizer = PortfolioOptimizer.from_returns(_factor_returns(20))
+    floor = optimizer.portfolio_stats(optimizer.min_variance())['return'][0]
+    target = floor + 0.4 * (optimizer.mu.max() - floor)
+
+    weights = optimizer.target_return(target)
+
+    assert np.all(weights >= 0) and weights.sum() == pytest.approx(1)
+    assert weights @ optimizer.mu == pytest.approx(target, abs=1e-6)
+    # No frontier portfolio reaching the target is less volatile
+    frontier = optimizer.efficient_frontier(n_points=200)
+    reaching = frontier['return'] >= target
+    vol = optimizer.portfolio_stats(weights)['volatility'][0]
+    assert vol <= frontier['volatility'][reaching].min() + 1e-6
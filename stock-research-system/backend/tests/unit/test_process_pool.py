@@ -0,0 +1,30 @@
+"""
+Test Process Pools
+Validates that worker pools never fork the API process and restart after shutdown
+"""
+
+import math
+
+from utils.process_pool import LazyProcessPool, new_process_pool, process_pool_context
+
+
+def test_pools_do_not_fork_the_calling_process():
+    assert process_pool_context().get_start_method() in ('forkserver', 'spawn')
+
+    with new_process_pool(2) as pool:
+        assert pool._mp_context.get_start_method() != 'fork'
+        assert list(pool.map(math.sqrt, [4.0, 9.0])) == [2.0, 3.0]
+
+
+def test_lazy_pool_is_reused_until_shutdown():
+    lazy = LazyProcessPool(max_workers=1)
+    first = lazy.get()
+
+    assert lazy.get() is first
+    assert first.submit(math.sqrt, 16.0).result() == 4.0
+
+    lazy.shutdown()
+    second = lazy.get()
+    assert second is not first
+    assert second.submit(math.sqrt, 25.0).result() == 5.0
+    lazy.shutdown()
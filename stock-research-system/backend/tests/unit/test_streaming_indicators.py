@@ -0,0 +1,131 @@
+"""
+Test Streaming Indicators
+Incremental updates must agree with a full recompute by TechnicalCalculator
+"""
+
+import numpy as np
+import pytest
+
+from calculators.streaming_indicators import StreamingIndicators
+from calculators.technical_calculator import TechnicalCalculator
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(3)
+    close = 200 + np.cumsum(rng.normal(0, 2, 400))
+    high = close + rng.uniform(0, 2, 400)
+    low = close - rng.uniform(0, 2, 400)
+    volume = rng.integers(1_000_000, 5_000_000, 400).astype(float)
+    return high, low, close, volume
+
+
+def test_incremental_updates_match_full_recompute(bars):
+    high, low, close, volume = bars
+    state = StreamingIndicators.from_history('AAPL', high[:250], low[:250], close[:250], volume[:250])
+
+    for i in range(250, 400):
+        values = state.update(close[i], high[i], low[i], volume[i])
+
+    calc = TechnicalCalculator()
+    macd = calc.calculate_macd(close)
+    bands = calc.calculate_bollinger_bands(close)
+
+    assert values['rsi'] == pytest.approx(calc.calculate_rsi(close)['value'], abs=0.011)
+    assert values['atr'] == pytest.approx(calc.calculate_atr(high, low, close), abs=0.011)
+    assert values['macd'] == pytest.approx(macd['macd'], abs=0.011)
+    assert values['macd_signal'] == pytest.approx(macd['signal'], abs=0.011)
+    assert values['bollinger_upper'] == pytest.approx(bands['upper'], abs=0.011)
+    assert values['bollinger_middle'] == pytest.approx(bands['middle'], abs=0.011)
+
+    changes = np.sign(np.diff(close))
+    assert values['obv'] == pytest.approx(volume[0] + np.sum(changes * volume[1:]))
+    assert state.bars == 400
+
+
+def test_tick_snapshot_does_not_commit(bars):
+    high, low, close, volume = bars
+    state = StreamingIndicators.from_history('MSFT', high, low, close, volume)
+    before = state.snapshot()
+
+    rallied = state.snapshot(price=close[-1] * 1.05)
+
+    assert rallied['rsi'] > before['rsi']
+    assert state.snapshot() == before
+
+
+def test_seeding_requires_enough_bars(bars):
+    high, low, close, volume = bars
+    with pytest.raises(ValueError):
+        StreamingIndicators.from_history('TSLA', high[:20], low[:20], close[:20], volume[:20])
+
+
+def test_batch_ticks_seed_from_one_history_download(bars, monkeypatch):
+    import asyncio
+    from services import indicator_stream_service as module
+    from services.market_data_store import OHLCVSeries
+
+    high, low, close, volume = bars
+    dates = np.arange(len(close)).astype('datetime64[D]').astype('datetime64[ns]')
+    series = OHLCVSeries('AAPL', '1d', dates, close, high, low, close, volume)
+
+    class FakeStore:
+        many_calls = []
+
+        async def get_many(self, symbols, period, interval):
+            self.many_calls.append(symbols)
+            return {s: series for s in symbols}
+
+        async def get_history(self, symbol, period, interval):
+            return series
+
+    monkeypatch.setattr(module, 'get_market_data_store', lambda: FakeStore())
+    service = module.IndicatorStreamService()
+
+    result = asyncio.run(service.get_many_indicators({'AAPL': (close[-1] * 1.05, 1e6), 'MSFT': (close[-1], 1e6)}))
+
+    assert FakeStore.many_calls == [['AAPL', 'MSFT']]
+    assert result['AAPL']['rsi'] > result['MSFT']['rsi']
+    assert service.get_stats()['ticks'] == 2
+
+
+def test_states_are_bounded_and_reseeded_when_history_changes(bars, monkeypatch):
+    import asyncio
+    from services import indicator_stream_service as module
+    from services.market_data_store import OHLCVSeries
+
+    high, low, close, volume = bars
+    dates = np.arange(len(close)).astype('datetime64[D]').astype('datetime64[ns]')
+
+    class FakeStore:
+        length, scale = 300, 1.0
+
+        async def get_history(self, symbol, period, interval):
+            n, k = self.length, self.scale
+            return OHLCVSeries(symbol, '1d', dates[:n], close[:n] * k, high[:n] * k, low[:n] * k,
+                               close[:n] * k, volume[:n])
+
+    store = FakeStore()
+    monkeypatch.setattr(module, 'get_market_data_store', lambda: store)
+    service = module.IndicatorStreamService(max_entries=2)
+
+    async def run(*symbols):
+        return [await service.sync(s) for s in symbols]
+
+    asyncio.run(run('AAPL', 'MSFT'))
+    store.length = 310
+    asyncio.run(run('AAPL'))
+    assert service.stats['bars_folded'] == 10 and service.stats['reseeded'] == 0
+
+    # A split re-adjusts every bar: the folded state is rebuilt, not extended
+    store.scale = 0.5
+    state, = asyncio.run(run('AAPL'))
+    assert service.stats['reseeded'] == 1
+    assert state.snapshot()['atr'] == pytest.approx(
+        StreamingIndicators.from_history('AAPL', high[:309] / 2, low[:309] / 2, close[:309] / 2,
+                                         volume[:309]).snapshot()['atr'])
+
+    # MSFT was least recently used
+    asyncio.run(run('NVDA'))
+    assert service.get_state('MSFT') is None and service.get_state('AAPL') is state
+    assert service.get_stats()['symbols'] == 2 and service.stats['evictions'] == 1
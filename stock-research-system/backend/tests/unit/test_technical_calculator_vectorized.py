@@ -0,0 +1,175 @@
+"""
+Test Vectorized Technical Calculator
+Compares the NumPy engine against the original loop-based implementation
+"""
+
+import numpy as np
+import pytest
+
+from calculators.technical_calculator import TechnicalCalculator
+
+
+class LoopReference:
+    """Original list/loop implementations of the vectorized kernels"""
+
+    def sma(self, prices, period):
+        if len(prices) < period:
+            return []
+        return [sum(prices[i - period + 1:i + 1]) / period for i in range(period - 1, len(prices))]
+
+    def ema(self, prices, period):
+        if len(prices) < period:
+            return []
+        multiplier = 2 / (period + 1)
+        ema = [sum(prices[:period]) / period]
+        for price in prices[period:]:
+            ema.append((price - ema[-1]) * multiplier + ema[-1])
+        return ema
+
+    def macd(self, prices, fast_period=12, slow_period=26, signal_period=9):
+        ema_fast = self.ema(prices, fast_period)
+        ema_slow = self.ema(prices, slow_period)
+        ema_fast = ema_fast[len(ema_fast) - len(ema_slow):]
+        macd_line = [ema_fast[i] - ema_slow[i] for i in range(len(ema_slow))]
+        signal_line = self.ema(macd_line, signal_period)
+        offset = len(macd_line) - len(signal_line)
+        histogram = [macd_line[i + offset] - signal_line[i] for i in range(len(signal_line))]
+        return (macd_line[-1] if macd_line else 0,
+                signal_line[-1] if signal_line else 0,
+                histogram[-1] if histogram else 0)
+
+    def golden_cross(self, prices):
+        if len(prices) < 200:
+            return None
+        sma_50 = self.sma(prices, 50)
+        sma_200 = self.sma(prices, 200)
+        sma_50 = sma_50[len(sma_50) - len(sma_200):]
+        if len(sma_50) < 2 or len(sma_200) < 2:
+            return None
+        if sma_50[-2] <= sma_200[-2] and sma_50[-1] > sma_200[-1]:
+            return 'golden_cross'
+        if sma_50[-2] >= sma_200[-2] and sma_50[-1] < sma_200[-1]:
+            return 'death_cross'
+        return 'neutral'
+
+    def rsi(self, prices, period=14):
+        changes = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
+        gains = [c if c > 0 else 0 for c in changes]
+        losses = [-c if c < 0 else 0 for c in changes]
+        avg_gain = sum(gains[:period]) / period
+        avg_loss = sum(losses[:period]) / period
+        for i in range(period, len(gains)):
+            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+        return 100 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def bollinger_std(self, prices, period=20):
+        stds = []
+        for i in range(period - 1, len(prices)):
+            window = prices[i - period + 1:i + 1]
+            mean = sum(window) / period
+            stds.append((sum((x - mean) ** 2 for x in window) / period) ** 0.5)
+        return stds
+
+    def atr(self, highs, lows, closes, period=14):
+        true_ranges = []
+        for i in range(1, len(highs)):
+            true_ranges.append(max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1])))
+        atr = sum(true_ranges[:period]) / period
+        for i in range(period, len(true_ranges)):
+            atr = (atr * (period - 1) + true_ranges[i]) / period
+        return round(atr, 2)
+
+    def support_resistance(self, prices, window=20):
+        support, resistance = [], []
+        for i in range(window, len(prices) - window):
+            if prices[i] == min(prices[i - window:i + window + 1]):
+                support.append(prices[i])
+            if prices[i] == max(prices[i - window:i + window + 1]):
+                resistance.append(prices[i])
+        return support, resistance
+
+
+@pytest.fixture
+def ohlc():
+    rng = np.random.default_rng(42)
+    close = 150 + np.cumsum(rng.normal(0, 2, 500))
+    high = close + rng.uniform(0, 3, 500)
+    low = close - rng.uniform(0, 3, 500)
+    return high.tolist(), low.tolist(), close.tolist()
+
+
+def test_moving_averages_match_loop_reference(ohlc):
+    _, _, close = ohlc
+    calc, ref = TechnicalCalculator(), LoopReference()
+
+    for period in (5, 20, 50, 200):
+        assert np.allclose(calc.calculate_sma(close, period), ref.sma(close, period), rtol=0, atol=1e-9)
+        assert np.allclose(calc.calculate_ema(close, period), ref.ema(close, period), rtol=0, atol=1e-9)
+
+    assert calc.calculate_sma(close[:3], 5) == []
+    assert calc.calculate_ema(np.array(close), 20) == pytest.approx(ref.ema(close, 20))
+
+
+def test_indicators_match_loop_reference(ohlc):
+    high, low, close = ohlc
+    calc, ref = TechnicalCalculator(), LoopReference()
+
+    assert calc.calculate_rsi(close)['value'] == round(ref.rsi(close), 2)
+    assert calc.calculate_atr(high, low, close) == ref.atr(high, low, close)
+
+    bands = calc.calculate_bollinger_bands(close)
+    middle = ref.sma(close, 20)[-1]
+    std = ref.bollinger_std(close, 20)[-1]
+    assert bands['middle'] == round(middle, 2)
+    assert bands['upper'] == round(middle + 2 * std, 2)
+    assert bands['lower'] == round(middle - 2 * std, 2)
+
+    support, resistance = ref.support_resistance(close)
+    levels = calc.calculate_support_resistance(close)
+    assert levels['support'] == sorted(calc._cluster_levels(support))[-3:]
+    assert levels['resistance'] == sorted(calc._cluster_levels(resistance))[:3]
+
+
+def test_list_and_array_inputs_agree(ohlc):
+    high, low, close = ohlc
+    calc = TechnicalCalculator()
+    arrays = [np.asarray(x) for x in ohlc]
+
+    assert calc.calculate_macd(close) == calc.calculate_macd(arrays[2])
+    assert calc.detect_golden_cross(close) == calc.detect_golden_cross(arrays[2])
+    assert calc.calculate_atr(high, low, close) == calc.calculate_atr(*arrays)
+    assert calc.calculate_rsi(close)['value'] == calc.calculate_rsi(arrays[2])['value']
+
+
+def test_macd_matches_loop_reference(ohlc):
+    _, _, close = ohlc
+    calc, ref = TechnicalCalculator(), LoopReference()
+
+    # Long history, and short ones where the signal line is still warming up
+    for length in (500, 40, 30, 26):
+        macd, signal, histogram = ref.macd(close[:length])
+        result = calc.calculate_macd(close[:length])
+        assert result['macd'] == (round(macd, 2) if macd else None)
+        assert result['signal'] == (round(signal, 2) if signal else None)
+        assert result['histogram'] == (round(histogram, 2) if histogram else None)
+
+
+def test_golden_cross_matches_loop_reference_at_boundary():
+    calc, ref = TechnicalCalculator(), LoopReference()
+    # SMA50 sits below SMA200 on the 200th bar and a jump on the 201st lifts it above
+    rising = [100.0] * 150 + [90.0] * 50 + [1000.0]
+
+    assert calc.detect_golden_cross(rising[:199]) == {'detected': False, 'signal': None}
+    assert calc.detect_golden_cross(rising[:200]) == {'detected': False, 'signal': None}
+    assert ref.golden_cross(rising[:200]) is None
+
+    result = calc.detect_golden_cross(rising)
+    assert ref.golden_cross(rising) == 'golden_cross'
+    assert result['detected'] and result['type'] == 'golden_cross'
+
+    rng = np.random.default_rng(7)
+    for length in (201, 202, 260, 400):
+        prices = (150 + np.cumsum(rng.normal(0, 2, length))).tolist()
+        result = calc.detect_golden_cross(prices)
+        assert (result['type'] or 'neutral') == ref.golden_cross(prices)
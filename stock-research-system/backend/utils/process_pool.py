@@ -0,0 +1,53 @@
+"""
+Process Pools
+Process pools that are safe to start from the multithreaded API process
+
+The API process runs the event loop, to_thread workers and the motor and
+yfinance threads. Forking it copies locks those threads may be holding, and
+a child that touches one deadlocks. Pools here start their workers with
+forkserver (spawn where unavailable), so children never inherit that state.
+Worker functions must be importable module-level callables.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def process_pool_context() -> multiprocessing.context.BaseContext:
+    """Start method context for worker processes (forkserver, else spawn)"""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def new_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """ProcessPoolExecutor whose workers do not fork the calling process"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context())
+
+
+class LazyProcessPool:
+    """
+    Process pool created on first use and stopped on shutdown
+
+    Shared by the long-lived services (model training, pattern screening)
+    that keep one pool for the process lifetime.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def get(self) -> ProcessPoolExecutor:
+        """Pool, started on first call"""
+        if self._pool is None:
+            self._pool = new_process_pool(self.max_workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping queued work; a later get() starts a new pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
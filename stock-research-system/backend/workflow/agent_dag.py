@@ -0,0 +1,227 @@
+"""
+Agent DAG
+Runs a workflow declared as named nodes with input dependencies
+
+Each node starts as soon as all of its inputs have finished (not level by
+level), receives their outputs as keyword arguments and has its own timeout.
+A failed or timed-out node yields its default output so downstream nodes
+still run. A node may also have a soft deadline: once it passes, downstream
+nodes proceed with the default output while the node keeps running until its
+(hard) timeout, and its eventual output is handed back as a late result.
+A deadline caps a node's timeout at a time measured from the start of the
+run, so a chain of nodes can share one latency budget. A node may name a
+limiter (e.g. a semaphore shared by several graphs): it is acquired before the
+node's clocks start and held until the node finishes, late or not. Time a node
+or any chain of its inputs spent queued for a limiter is not counted against
+its deadline.
+Every run reports per-node timings and the critical path: the chain of nodes
+that determined the total wall-clock time.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DagNode:
+    """One step of the graph"""
+    name: str
+    run: Callable[..., Awaitable[Any]]  # Called with {input name: input output} as kwargs
+    inputs: Sequence[str] = ()
+    timeout: Optional[float] = None  # Hard deadline in seconds, None for no limit
+    default: Any = field(default_factory=dict)  # Output if the node fails, times out or is late
+    soft_deadline: Optional[float] = None  # Seconds after which dependents stop waiting
+    deadline: Optional[float] = None  # Seconds from the start of the run by which the node must finish
+    limiter: Optional[asyncio.Semaphore] = None  # Concurrency budget, acquired before timing starts
+
+
+class AgentDAG:
+    """
+    Dependency-driven executor for workflow nodes
+
+    Features:
+    - Validation of unknown inputs and cycles before anything runs
+    - Eager scheduling: a node waits only for its own inputs
+    - Per-node timeouts and run-relative deadlines with fallback outputs
+    - Soft deadlines: late nodes finish in the background as late results
+    - Shared concurrency limiters whose queueing does not count against deadlines
+    - Critical-path report per run
+    """
+
+    def __init__(self, nodes: List[DagNode]):
+        self.nodes: Dict[str, DagNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node: {node.name}")
+            self.nodes[node.name] = node
+
+        for node in nodes:
+            unknown = [i for i in node.inputs if i not in self.nodes]
+            if unknown:
+                raise ValueError(f"Node {node.name} has unknown inputs: {unknown}")
+
+        self.order = self.topological_order()
+
+    def topological_order(self) -> List[str]:
+        """
+        Nodes ordered so every node comes after its inputs (Kahn's algorithm)
+
+        Raises:
+            ValueError: If the graph has a cycle
+        """
+        remaining = {name: set(node.inputs) for name, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for name, node in self.nodes.items():
+            for dep in node.inputs:
+                dependents[dep].append(name)
+
+        ready = [name for name, deps in remaining.items() if not deps]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                remaining[dependent].discard(name)
+                if not remaining[dependent]:
+                    ready.append(dependent)
+
+        if len(order) != len(self.nodes):
+            raise ValueError(f"Cycle between nodes: {sorted(set(self.nodes) - set(order))}")
+        return order
+
+    async def execute(self) -> Dict[str, Any]:
+        """
+        Run every node
+
+        Returns:
+            {'outputs': {node: output}, 'report': {'wall_time', 'critical_path',
+            'critical_path_time', 'nodes': {node: {'status', 'start', 'queued', 'end', 'duration', 'error'}}},
+            'late': {node: task}} with times in seconds from the start of the run.
+            Nodes that missed their soft deadline have status 'pending', the default
+            as output and a task under 'late' resolving to their final output; their
+            report entry is updated in place when they finish.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, Dict[str, Any]] = {}
+        finished: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        late: Dict[str, asyncio.Future] = {}
+        queued: Dict[str, float] = {}  # Limiter wait along the longest-queued chain ending at each node
+
+        async def run_node(node: DagNode) -> Any:
+            inputs = {name: await tasks[name] for name in node.inputs}
+            waited = 0.0
+            if node.limiter is not None:
+                # Waiting for the budget does not count against the node's deadlines
+                ready = time.perf_counter()
+                await node.limiter.acquire()
+                waited = time.perf_counter() - ready
+            queued[node.name] = max((queued[name] for name in node.inputs), default=0.0) + waited
+            begin = time.perf_counter()
+            entry = timings[node.name] = {'status': 'running', 'start': round(begin - started, 3),
+                                          'queued': round(waited, 3)}
+
+            timeout = node.timeout
+            if node.deadline is not None:
+                remaining = max(node.deadline - (begin - started - queued[node.name]), 0.0)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+
+            async def settle() -> Any:
+                status, error = 'completed', None
+                try:
+                    output = await self._within(asyncio.ensure_future(node.run(**inputs)), timeout)
+                except asyncio.TimeoutError:
+                    status, error, output = 'timeout', f"Timed out after {timeout:.3g}s", node.default
+                    logger.warning(f"[AgentDAG] {node.name} timed out after {timeout:.3g}s")
+                except Exception as e:
+                    status, error, output = 'failed', str(e), node.default
+                    logger.error(f"[AgentDAG] {node.name} failed: {e}", exc_info=True)
+                end = time.perf_counter()
+                # A late node released its dependents at its soft deadline
+                finished.setdefault(node.name, end)
+                entry.update(status=status, end=round(end - started, 3), duration=round(end - begin, 3), error=error)
+                return output
+
+            work = asyncio.ensure_future(settle())
+            if node.limiter is not None:
+                work.add_done_callback(lambda _: node.limiter.release())
+            if node.soft_deadline is None:
+                return await work
+
+            try:
+                # Shielded: passing the soft deadline must not cancel the node
+                return await asyncio.wait_for(asyncio.shield(work), node.soft_deadline)
+            except asyncio.CancelledError as e:
+                # The run was cancelled or a sibling failed before the soft deadline
+                work.cancel(e.args[0] if e.args else None)
+                raise
+            except asyncio.TimeoutError:
+                late[node.name] = work
+                now = finished[node.name] = time.perf_counter()
+                entry.update(status='pending', end=round(now - started, 3), duration=round(now - begin, 3),
+                             error=f"Past soft deadline of {node.soft_deadline}s")
+                logger.warning(f"[AgentDAG] {node.name} missed its {node.soft_deadline}s soft deadline, continuing without it")
+                return node.default
+
+        # Inputs are created first, so every node can await its inputs' tasks
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run_node(self.nodes[name]))
+
+        try:
+            outputs = dict(zip(self.order, await asyncio.gather(*tasks.values())))
+        except BaseException:
+            for work in late.values():
+                work.cancel()
+            raise
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        path = self._critical_path(finished)
+        report = {
+            'wall_time': round(time.perf_counter() - started, 3),
+            'critical_path': path,
+            'critical_path_time': round(sum(timings[n]['duration'] for n in path), 3),
+            'nodes': {name: timings[name] for name in self.order}
+        }
+        logger.info(f"[AgentDAG] {len(self.nodes)} nodes in {report['wall_time']:.2f}s, "
+                    f"critical path: {' -> '.join(path)}"
+                    + (f", late: {', '.join(late)}" if late else ""))
+        return {'outputs': outputs, 'report': report, 'late': late}
+
+    @staticmethod
+    async def _within(call: asyncio.Future, timeout: Optional[float]) -> Any:
+        """
+        Result of call, waiting at most timeout seconds
+
+        Like asyncio.wait_for, but the node sees why it was cancelled: the
+        CancelledError carries "Timed out after ..." on timeout, or the
+        message the run itself was cancelled with ("cancelled" if none).
+        """
+        try:
+            done, _ = await asyncio.wait({call}, timeout=timeout)
+        except asyncio.CancelledError as e:
+            call.cancel(e.args[0] if e.args else 'cancelled')
+            raise
+        if not done:
+            call.cancel(f"Timed out after {timeout:.3g}s")
+            # Let the node record its cancellation before reporting the timeout
+            await asyncio.wait({call})
+            raise asyncio.TimeoutError
+        return call.result()
+
+    def _critical_path(self, finished: Dict[str, float]) -> List[str]:
+        """Walk back from the last node to finish through the input that finished last"""
+        if not finished:
+            return []
+        node = max(finished, key=finished.get)
+        path = [node]
+        while self.nodes[node].inputs:
+            node = max(self.nodes[node].inputs, key=finished.get)
+            path.append(node)
+        return path[::-1]
@@ -4,12 +4,17 @@ Uses expert AI agents with local calculations - no external API dependencies
 Implements DAG-based parallel execution with progress tracking
 """
 
+import functools
+import json
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
+import os
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from datetime import datetime, timedelta
 import asyncio
 from dataclasses import is_dataclass, asdict
 
+import numpy as np
+
 from langchain_openai import ChatOpenAI
 
 from agents.expert_agents.expert_fundamental_agent import ExpertFundamentalAgent
@@ -20,9 +25,51 @@ from agents.workers.peer_comparison_agent import PeerComparisonAgent
 from agents.workers.critique_agent import CritiqueAgent
 from agents.workers.insider_activity_agent import InsiderActivityAgent
 from agents.workers.predictive_agent import PredictiveAnalyticsAgent
+from workflow.agent_dag import AgentDAG, DagNode
 
 logger = logging.getLogger(__name__)
 
+# Analyses handed to the synthesis agent, in result order
+ANALYSIS_KEYS = (
+    'fundamental', 'technical', 'risk', 'sentiment', 'peer_comparison',
+    'insider_activity', 'predictive', 'catalysts', 'chart_analytics'
+)
+
+# Default soft deadline per analysis agent (seconds). Past it synthesis proceeds
+# without the agent and its result is merged in later; the hard deadline
+# (node timeout) still cancels it. Override with WORKFLOW_SOFT_DEADLINE_<KEY>
+# and WORKFLOW_HARD_DEADLINE_<KEY>, e.g. WORKFLOW_SOFT_DEADLINE_PREDICTIVE=20
+AGENT_SOFT_DEADLINES = {
+    'fundamental': 45, 'technical': 45, 'risk': 45,
+    'sentiment': 30, 'peer_comparison': 30, 'catalysts': 30, 'chart_analytics': 30,
+    'insider_activity': 20,  # Several sequential Tavily searches
+    'predictive': 20,  # Trains a forest per run
+    'intelligence': 45  # Tavily news/sentiment/macro gathering (enrichment is redone when it arrives late)
+}
+
+# Root-level result fields that mirror an agent's result (besides agent_results and analysis)
+LATE_RESULT_ALIASES = {
+    'insider_activity': ('insider_analysis',),
+    'catalysts': ('catalyst_calendar',),
+    'chart_analytics': ('chart_analytics',)
+}
+
+
+class AgentRunFailed(Exception):
+    """An agent failed inside _run_agent_with_tracking (already recorded on the analysis)"""
+
+
+def raise_if_failed(result: Any) -> Any:
+    """
+    Pass an agent result through, raising for the tracking wrapper's failure result
+
+    Graph nodes use this so a failed agent is reported as 'failed' (with the
+    node default as output) rather than completing with the failure dict.
+    """
+    if isinstance(result, dict) and result.get('status') == 'failed' and set(result) == {'agent', 'status', 'error'}:
+        raise AgentRunFailed(result['error'])
+    return result
+
 
 def convert_to_serializable(obj):
     """Convert dataclasses and other non-serializable objects to dicts for MongoDB."""
@@ -65,7 +112,6 @@ class EnhancedStockWorkflow:
         self.smart_router = None
         try:
             from services.smart_model_router import get_smart_router
-            import os
             openai_key = os.getenv("OPENAI_API_KEY")
             if openai_key:
                 self.smart_router = get_smart_router(openai_key)
@@ -156,15 +202,41 @@ class EnhancedStockWorkflow:
         self.total_agents = active_agents
         logger.info(f"[EnhancedWorkflow] Total active agents: {self.total_agents}")
 
+        # Per-node timeout of the analysis graph (seconds)
+        self.node_timeout = float(os.getenv("WORKFLOW_NODE_TIMEOUT_SECONDS", "180"))
+        # Analysis latency SLO: agents get at most (SLO - synthesis reserve) before
+        # synthesis proceeds without them, and synthesis, critique and enrichment
+        # must finish within the SLO of the start of the symbol's run
+        self.analysis_slo = float(os.getenv("WORKFLOW_SLO_SECONDS", "90"))
+        self.synthesis_reserve = float(os.getenv("WORKFLOW_SYNTHESIS_RESERVE_SECONDS", "30"))
+        # {analysis key: (soft deadline, hard deadline)} of the analysis agents and intelligence gathering
+        self.agent_deadlines = {
+            key: (
+                min(float(os.getenv(f"WORKFLOW_SOFT_DEADLINE_{key.upper()}", soft)), self.analysis_slo - self.synthesis_reserve),
+                float(os.getenv(f"WORKFLOW_HARD_DEADLINE_{key.upper()}", self.node_timeout))
+            )
+            for key, soft in AGENT_SOFT_DEADLINES.items()
+        }
+        # Background merges of late agent results (kept referenced until done)
+        self._late_merges = set()
+        # Concurrent agent runs allowed across all symbols of a multi-symbol analysis
+        self.max_concurrent_agents = int(os.getenv("WORKFLOW_MAX_CONCURRENT_AGENTS", "8"))
+        # Tracked agent names expected by in-flight multi-symbol analyses
+        self._run_plans: Dict[str, List[str]] = {}
+
     async def execute(self, analysis_id: str, query: str, symbols: List[str], context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Execute complete analysis workflow with parallel agent execution
 
+        Symbols are uppercased and deduplicated; several distinct symbols
+        (comparison queries) run as one batch, see _execute_batch.
+
         Args:
             analysis_id: MongoDB document ID for tracking
             query: User's analysis query
             symbols: List of stock symbols to analyze
-            context: Additional context (market data, historical prices, etc.)
+            context: Additional context (market data, historical prices, etc.);
+                {symbol: context} when several symbols are given
 
         Returns:
             Complete analysis with recommendations
@@ -175,287 +247,505 @@ class EnhancedStockWorkflow:
             # Initialize progress tracking
             await self._update_progress(analysis_id, 0, "Starting analysis...")
 
+            batch = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+            if len(batch) > 1:
+                return await self._execute_batch(analysis_id, query, batch, context)
+
             # Step 1: Parse query and prepare context
-            symbol = symbols[0] if symbols else 'UNKNOWN'
+            symbol = batch[0] if batch else 'UNKNOWN'
             if context is None:
                 context = await self._prepare_context(symbol)
 
-            # Step 2: Execute core analysis agents in parallel (Fundamental, Technical, Risk)
+            # Step 2: Analysis graph - agents and Tavily intelligence in parallel, then
+            # synthesis, critique and enrichment as their inputs become ready
             await self._update_progress(analysis_id, 10, "Running core analysis agents...")
+            run = functools.partial(self._run_agent_with_tracking, analysis_id)
+            symbol_run = await self._analyze_symbol(analysis_id, symbol, context, run, report_progress=True)
 
-            # Build list of agents to run
-            agent_tasks = [
-                self._run_agent_with_tracking(analysis_id, 'ExpertFundamentalAgent', self.fundamental_agent, context),
-                self._run_agent_with_tracking(analysis_id, 'ExpertTechnicalAgent', self.technical_agent, context),
-                self._run_agent_with_tracking(analysis_id, 'ExpertRiskAgent', self.risk_agent, context),
-            ]
+            await self._update_progress(analysis_id, 100, "Analysis complete")
 
-            # Add sentiment agent if available
-            if self.sentiment_agent:
-                sentiment_context = {'symbol': symbol, 'sector': context.get('sector', 'Technology')}
-                agent_tasks.append(
-                    self._run_agent_with_tracking(analysis_id, 'TavilySentimentAgent', self.sentiment_agent, sentiment_context, method='track')
-                )
+            # Step 3: Build final response
+            final_result = self._build_result(
+                analysis_id, query, batch, context, symbol_run['analyses'], symbol_run['outcome'], symbol_run['report']
+            )
 
-            # Add peer comparison agent if available
-            if self.peer_comparison_agent:
-                peer_context = {'stock_symbols': [symbol], 'markets': ['US']}
-                agent_tasks.append(
-                    self._run_agent_with_tracking(analysis_id, 'PeerComparisonAgent', self.peer_comparison_agent, peer_context, method='execute')
-                )
+            # Save to database, agents past their soft deadline are merged in later
+            late_runs = [{'symbol': symbol, 'prefixes': [''], **symbol_run}] if symbol_run['late'] else []
+            await self._publish_results(analysis_id, final_result, late_runs)
 
-            # Add insider activity agent if available
-            if self.insider_activity_agent:
-                insider_context = {'symbol': symbol, 'symbols': [symbol]}
-                agent_tasks.append(
-                    self._run_agent_with_tracking(analysis_id, 'InsiderActivityAgent', self.insider_activity_agent, insider_context, method='execute')
-                )
+            synthesis_result = symbol_run['outcome']['synthesis']
+            logger.info(f"[EnhancedWorkflow] Analysis complete: {synthesis_result.get('action', 'HOLD')} with {synthesis_result.get('confidence', 0)*100}% confidence")
 
-            # Add predictive agent if available
-            if self.predictive_agent:
-                # Predictive agent needs symbol and optional sentiment data
-                agent_tasks.append(
-                    self._run_agent_with_tracking(analysis_id, 'PredictiveAgent', self.predictive_agent, {'symbol': symbol}, method='execute')
-                )
+            return final_result
 
-            # Add catalyst tracker agent if available
-            if self.catalyst_tracker_agent:
-                agent_tasks.append(
-                    self._run_agent_with_tracking(analysis_id, 'CatalystTrackerAgent', self.catalyst_tracker_agent, symbol, method='execute')
-                )
+        except Exception as e:
+            logger.error(f"[EnhancedWorkflow] Fatal error: {e}", exc_info=True)
+            await self._mark_failed(analysis_id, str(e))
+            raise
 
-            # Add chart analytics agent if available
-            if self.chart_analytics_agent:
-                chart_context = {'symbol': symbol}
-                agent_tasks.append(
-                    self._run_agent_with_tracking(analysis_id, 'ChartAnalyticsAgent', self.chart_analytics_agent, chart_context, method='execute')
-                )
+    async def _execute_batch(self, analysis_id: str, query: str, batch: List[str], contexts: Dict[str, Dict] = None) -> Dict[str, Any]:
+        """
+        Analyze several symbols as one comparison
 
-            parallel_results = await asyncio.gather(*agent_tasks, return_exceptions=True)
+        - Contexts for all symbols come from one batched history download
+        - Per-symbol agents share one concurrency budget (max_concurrent_agents)
+        - Symbol-independent work runs once: market mood, macro context per
+          sector, and one peer comparison across the whole batch
+        - Per-symbol syntheses are ranked into a comparative synthesis
 
-            # Unpack results safely
-            fundamental_result = parallel_results[0] if not isinstance(parallel_results[0], Exception) else {}
-            technical_result = parallel_results[1] if not isinstance(parallel_results[1], Exception) else {}
-            risk_result = parallel_results[2] if not isinstance(parallel_results[2], Exception) else {}
+        Args:
+            analysis_id: MongoDB document ID for tracking
+            query: User's analysis query
+            batch: Distinct uppercase stock symbols to compare
+            contexts: Optional prepared {symbol: context}
 
-            # Dynamic unpacking based on active agents
-            result_idx = 3
-            sentiment_result = {}
-            peer_comparison_result = {}
-            insider_activity_result = {}
-            predictive_result = {}
-            catalyst_result = {}
-            chart_analytics_result = {}
+        Returns:
+            Comparison result; root-level fields describe the lead symbol as in a
+            single-symbol analysis, per-symbol results are under 'symbol_results'
+        """
+        budget = asyncio.Semaphore(self.max_concurrent_agents)
 
-            if self.sentiment_agent and result_idx < len(parallel_results):
-                sentiment_result = parallel_results[result_idx] if not isinstance(parallel_results[result_idx], Exception) else {}
-                result_idx += 1
+        # Expected tracked runs, so progress and pending agents cover the whole batch
+        per_symbol_agents = [a for a in self._agent_names() if a != 'PeerComparisonAgent']
+        self._run_plans[analysis_id] = [f"{a}[{s}]" for s in batch for a in per_symbol_agents] + (
+            ['PeerComparisonAgent'] if self.peer_comparison_agent else []
+        )
 
-            if self.peer_comparison_agent and result_idx < len(parallel_results):
-                peer_comparison_result = parallel_results[result_idx] if not isinstance(parallel_results[result_idx], Exception) else {}
-                result_idx += 1
+        def runner(label: Optional[str]) -> Callable[..., Awaitable[Dict]]:
+            async def run(agent_name: str, agent: Any, agent_context: Any, method: str = 'analyze') -> Dict:
+                name = f"{agent_name}[{label}]" if label else agent_name
+                return await self._run_agent_with_tracking(analysis_id, name, agent, agent_context, method=method)
+            return run
 
-            if self.insider_activity_agent and result_idx < len(parallel_results):
-                insider_activity_result = parallel_results[result_idx] if not isinstance(parallel_results[result_idx], Exception) else {}
-                result_idx += 1
+        async def shared_peer_comparison() -> Dict:
+            async with budget:
+                return await runner(None)('PeerComparisonAgent', self.peer_comparison_agent,
+                                          {'stock_symbols': batch, 'markets': ['US']}, method='execute')
 
-            if self.predictive_agent and result_idx < len(parallel_results):
-                predictive_result = parallel_results[result_idx] if not isinstance(parallel_results[result_idx], Exception) else {}
-                result_idx += 1
+        mood_task: Optional[asyncio.Task] = None
+        peer_task: Optional[asyncio.Task] = None
+        macro_tasks: Dict[str, asyncio.Task] = {}
+        try:
+            await self._update_progress(analysis_id, 5, f"Preparing data for {len(batch)} symbols...")
+            if contexts is None:
+                contexts = await self._prepare_contexts(batch)
 
-            if self.catalyst_tracker_agent and result_idx < len(parallel_results):
-                catalyst_result = parallel_results[result_idx] if not isinstance(parallel_results[result_idx], Exception) else {}
-                result_idx += 1
+            # Symbol-independent work, started once and awaited where needed
+            mood_task = asyncio.create_task(self._market_mood())
+            if self.peer_comparison_agent:
+                peer_task = asyncio.create_task(shared_peer_comparison())
+            if self.hybrid_orchestrator:
+                sectors: Dict[str, List[str]] = {}
+                for symbol in batch:
+                    sectors.setdefault(contexts[symbol].get('sector', 'General'), []).append(symbol)
+                macro_tasks = {
+                    sector: asyncio.create_task(self.hybrid_orchestrator.analyze_macro(sector, members))
+                    for sector, members in sectors.items()
+                }
 
-            if self.chart_analytics_agent and result_idx < len(parallel_results):
-                chart_analytics_result = parallel_results[result_idx] if not isinstance(parallel_results[result_idx], Exception) else {}
-                result_idx += 1
+            await self._update_progress(analysis_id, 10, f"Running analysis agents for {', '.join(batch)}...")
 
-            await self._update_progress(analysis_id, 70, "Synthesizing recommendations...")
+            async def analyze(symbol: str) -> Dict[str, Any]:
+                context = contexts[symbol]
+                return await self._analyze_symbol(
+                    analysis_id, symbol, context, runner(symbol),
+                    shared_peers=peer_task, shared_macro=macro_tasks.get(context.get('sector', 'General')), budget=budget
+                )
 
-            # Step 3: Synthesis agent combines all analyses
-            analyses = {
-                'fundamental': fundamental_result,
-                'technical': technical_result,
-                'risk': risk_result,
-                'sentiment': sentiment_result,
-                'peer_comparison': peer_comparison_result,
-                'insider_activity': insider_activity_result,
-                'predictive': predictive_result,
-                'catalysts': catalyst_result,
-                'chart_analytics': chart_analytics_result,
-                'market': context.get('market_data', {})
+            runs = dict(zip(batch, await asyncio.gather(*(analyze(s) for s in batch), return_exceptions=True)))
+            for symbol, outcome in runs.items():
+                if isinstance(outcome, Exception):
+                    logger.error(f"[EnhancedWorkflow] Analysis of {symbol} failed: {outcome}", exc_info=outcome)
+            completed = [s for s in batch if not isinstance(runs[s], Exception)]
+            if not completed:
+                raise RuntimeError(f"Analysis failed for every symbol: {batch}")
+
+            await self._update_progress(analysis_id, 95, "Comparing symbols...")
+            comparison = self.synthesis_agent.compare(
+                {s: runs[s]['outcome']['synthesis'] for s in completed},
+                {s: runs[s]['analyses'] for s in completed},
+                {s: runs[s]['outcome'] for s in completed}
+            )
+            comparison['failed_symbols'] = [s for s in batch if s not in completed]
+
+            symbol_results = {
+                s: self._build_result(analysis_id, query, [s], contexts[s], runs[s]['analyses'], runs[s]['outcome'], runs[s]['report'])
+                for s in completed
             }
+            macro = {sector: (await task).get('data', {}) for sector, task in macro_tasks.items()}
 
-            synthesis_result = await self._run_agent_with_tracking(
-                analysis_id,
-                'ExpertSynthesisAgent',
-                self.synthesis_agent,
-                analyses,
-                method='synthesize'
-            )
+            await self._update_progress(analysis_id, 100, "Analysis complete")
 
-            # Step 3.5: Critique agent validates synthesis (if available)
-            critique_result = {}
-            if self.critique_agent:
-                await self._update_progress(analysis_id, 75, "Validating synthesis quality...")
-                try:
-                    critique_context = {
-                        'synthesis': synthesis_result,
-                        'confidence_score': synthesis_result.get('confidence', 0.5),
-                        'agent_results': analyses
-                    }
-                    critique_result = await self._run_agent_with_tracking(
-                        analysis_id,
-                        'CritiqueAgent',
-                        self.critique_agent,
-                        critique_context,
-                        method='execute'
-                    )
-
-                    # Adjust confidence based on critique
-                    if critique_result and 'confidence_adjustment' in critique_result:
-                        original_confidence = synthesis_result.get('confidence', 0.5)
-                        adjusted_confidence = max(0.0, min(1.0, original_confidence + critique_result['confidence_adjustment']))
-                        synthesis_result['confidence'] = adjusted_confidence
-                        logger.info(f"[EnhancedWorkflow] Critique adjusted confidence: {original_confidence:.2f} → {adjusted_confidence:.2f}")
-
-                except Exception as e:
-                    logger.warning(f"[EnhancedWorkflow] Critique agent failed: {e}")
-                    critique_result = {}
-
-            # Step 4: Optional Tavily enrichment (if enabled)
+            final_result = {
+                # Frontend compatibility: root-level fields describe the lead symbol
+                **symbol_results[completed[0]],
+                'symbols': batch,
+                'mode': 'comparison',
+                'executive_summary': comparison['summary'],
+                'comparison': comparison,
+                'symbol_results': symbol_results,
+                'shared_context': {
+                    'market_mood': await mood_task,
+                    'macro': macro,
+                    'peer_comparison': await peer_task if peer_task is not None else {}
+                },
+                'completed_at': datetime.utcnow().isoformat()
+            }
+
+            # Late agents are merged into the symbol's result (and the root for the lead symbol)
+            late_runs = [
+                {'symbol': s, 'prefixes': [f"symbol_results.{s}."] + ([''] if s == completed[0] else []), **runs[s]}
+                for s in completed if runs[s]['late']
+            ]
+            await self._publish_results(analysis_id, final_result, late_runs)
+
+            logger.info(f"[EnhancedWorkflow] Comparison complete: {comparison['summary']}")
+            return final_result
+
+        finally:
+            self._run_plans.pop(analysis_id, None)
+            # Shared work still running when the batch failed
+            for task in [mood_task, peer_task, *macro_tasks.values()]:
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _analyze_symbol(
+        self,
+        analysis_id: str,
+        symbol: str,
+        context: Dict[str, Any],
+        run: Callable[..., Awaitable[Dict]],
+        shared_peers: Optional[asyncio.Task] = None,
+        shared_macro: Optional[asyncio.Task] = None,
+        budget: Optional[asyncio.Semaphore] = None,
+        report_progress: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run one symbol's analysis graph
+
+        Nodes start as soon as their inputs are ready: the analysis agents and
+        Tavily intelligence gathering start immediately, synthesis waits for the
+        agents, critique for synthesis, and enrichment (the weighted consensus)
+        for the critiqued synthesis and the intelligence. Synthesis waits for an
+        agent only until its soft deadline (agent_deadlines); agents still running
+        then are reported as pending and keep running until their hard deadline.
+        Intelligence has a soft deadline too: past it enrichment keeps the base
+        recommendation (status 'pending') and is redone once the intelligence
+        arrives. The post-agent nodes share the analysis SLO as their deadline.
+
+        Args:
+            analysis_id: Analysis document ID
+            symbol: Stock symbol
+            context: Prepared context for the symbol
+            run: Coroutine function (agent_name, agent, context, method) running one tracked agent
+            shared_peers: Batch-wide peer comparison task (replaces the per-symbol peer agent)
+            shared_macro: Sector-wide macro task from HybridOrchestrator.analyze_macro
+            budget: Concurrency budget the agents, synthesis, critique and intelligence
+                gathering are counted against; time queued for it does not count against
+                agent deadlines or the analysis SLO
+            report_progress: Publish step-level progress (single-symbol runs)
+
+        Returns:
+            {'analyses', 'outcome', 'report', 'late'} where outcome holds 'synthesis', 'critique',
+            'recommendation', 'confidence', 'enrichment', 'enrichment_status', 'pending_agents',
+            report is the AgentDAG timing / critical-path report and late maps pending
+            agents to tasks resolving to their results
+        """
+        timeout = self.node_timeout
+        nodes: List[DagNode] = []
+
+        def agent_node(key: str, agent_name: str, agent: Any, agent_context: Any, method: str = 'analyze'):
+            async def call():
+                return raise_if_failed(await run(agent_name, agent, agent_context, method=method))
+            soft_deadline, hard_deadline = self.agent_deadlines[key]
+            nodes.append(DagNode(key, call, timeout=hard_deadline, soft_deadline=soft_deadline, limiter=budget))
+
+        agent_node('fundamental', 'ExpertFundamentalAgent', self.fundamental_agent, context)
+        agent_node('technical', 'ExpertTechnicalAgent', self.technical_agent, context)
+        agent_node('risk', 'ExpertRiskAgent', self.risk_agent, context)
+
+        if self.sentiment_agent:
+            sentiment_context = {'symbol': symbol, 'sector': context.get('sector', 'Technology')}
+            agent_node('sentiment', 'TavilySentimentAgent', self.sentiment_agent, sentiment_context, method='track')
+
+        if shared_peers is not None:
+            async def shared_peer_comparison():
+                # Shielded: a timeout here must not cancel the batch-wide run
+                return raise_if_failed(await asyncio.shield(shared_peers))
+            soft_deadline, hard_deadline = self.agent_deadlines['peer_comparison']
+            nodes.append(DagNode('peer_comparison', shared_peer_comparison, timeout=hard_deadline, soft_deadline=soft_deadline))
+        elif self.peer_comparison_agent:
+            peer_context = {'stock_symbols': [symbol], 'markets': ['US']}
+            agent_node('peer_comparison', 'PeerComparisonAgent', self.peer_comparison_agent, peer_context, method='execute')
+
+        if self.insider_activity_agent:
+            insider_context = {'symbol': symbol, 'symbols': [symbol]}
+            agent_node('insider_activity', 'InsiderActivityAgent', self.insider_activity_agent, insider_context, method='execute')
+
+        if self.predictive_agent:
+            # Predictive agent needs symbol and optional sentiment data
+            agent_node('predictive', 'PredictiveAgent', self.predictive_agent, {'symbol': symbol}, method='execute')
+
+        if self.catalyst_tracker_agent:
+            agent_node('catalysts', 'CatalystTrackerAgent', self.catalyst_tracker_agent, symbol, method='execute')
+
+        if self.chart_analytics_agent:
+            agent_node('chart_analytics', 'ChartAnalyticsAgent', self.chart_analytics_agent, {'symbol': symbol}, method='execute')
+
+        agent_keys = tuple(node.name for node in nodes)
+
+        async def assemble_analyses(**outputs):
+            analyses = {key: {} for key in ANALYSIS_KEYS}
+            analyses.update(outputs)
+            analyses['market'] = context.get('market_data', {})
+            return analyses
+
+        async def synthesize(analyses):
+            if report_progress:
+                await self._update_progress(analysis_id, 70, "Synthesizing recommendations...")
+            return await run('ExpertSynthesisAgent', self.synthesis_agent, analyses, method='synthesize')
+
+        nodes.append(DagNode('analyses', assemble_analyses, inputs=agent_keys))
+        nodes.append(DagNode('synthesis', synthesize, inputs=('analyses',), timeout=timeout, deadline=self.analysis_slo,
+                             limiter=budget))
+        enrichment_inputs = ['synthesis']
+
+        # Critique agent validates synthesis (if available)
+        if self.critique_agent:
+            async def critique(analyses, synthesis):
+                if report_progress:
+                    await self._update_progress(analysis_id, 75, "Validating synthesis quality...")
+                critique_context = {
+                    'synthesis': synthesis,
+                    'confidence_score': synthesis.get('confidence', 0.5),
+                    'agent_results': analyses
+                }
+                critique_result = await run('CritiqueAgent', self.critique_agent, critique_context, method='execute')
+
+                # Adjust confidence based on critique
+                if critique_result and 'confidence_adjustment' in critique_result:
+                    original_confidence = synthesis.get('confidence', 0.5)
+                    adjusted_confidence = max(0.0, min(1.0, original_confidence + critique_result['confidence_adjustment']))
+                    synthesis['confidence'] = adjusted_confidence
+                    logger.info(f"[EnhancedWorkflow] Critique adjusted confidence: {original_confidence:.2f} → {adjusted_confidence:.2f}")
+                return critique_result
+
+            nodes.append(DagNode('critique', critique, inputs=('analyses', 'synthesis'), timeout=timeout,
+                                 deadline=self.analysis_slo, limiter=budget))
+            enrichment_inputs.append('critique')
+
+        # Tavily intelligence does not depend on the base analysis, only the consensus does
+        if self.hybrid_orchestrator:
+            soft_deadline, hard_deadline = self.agent_deadlines['intelligence']
+            intelligence_inputs = ()
+            if shared_macro is not None:
+                async def macro():
+                    # Shielded: a timeout here must not cancel the sector-wide run
+                    return await asyncio.shield(shared_macro)
+
+                # Waited for outside the budget, and no longer than enrichment waits for intelligence
+                nodes.append(DagNode('macro', macro, timeout=soft_deadline, default=None))
+                intelligence_inputs = ('macro',)
+
+            async def intelligence(macro=None):
+                intelligence_context = {
+                    'symbol': symbol,
+                    'sector': context.get('sector', 'General'),
+                    'market_data': context.get('market_data', {})
+                }
+                return await self.hybrid_orchestrator.gather_intelligence(analysis_id, intelligence_context, macro)
+
+            nodes.append(DagNode('intelligence', intelligence, inputs=intelligence_inputs, timeout=hard_deadline,
+                                 soft_deadline=soft_deadline, limiter=budget))
+            enrichment_inputs.append('intelligence')
+
+        async def apply_enrichment(synthesis, intelligence, progress: bool = False):
             base_result = {
-                'recommendation': synthesis_result.get('action', 'HOLD'),
-                'confidence': synthesis_result.get('confidence', 0.5),
+                'recommendation': synthesis.get('action', 'HOLD'),
+                'confidence': synthesis.get('confidence', 0.5),
                 'sector': context.get('sector', 'General'),
                 'market_data': context.get('market_data', {}),
-                'reasoning': synthesis_result.get('summary', '')
+                'reasoning': synthesis.get('summary', '')
             }
+            if not self.hybrid_orchestrator:
+                return self._base_enrichment(base_result, 'disabled')
 
-            # Enrich with Tavily intelligence if available
-            if self.hybrid_orchestrator:
+            if progress:
                 await self._update_progress(analysis_id, 85, "Enriching with real-time intelligence...")
-                try:
-                    enriched = await self.hybrid_orchestrator.enrich_analysis(
-                        analysis_id, symbol, base_result
-                    )
-                    # Use enriched recommendation if available
-                    final_recommendation = enriched.get('recommendation', base_result['recommendation'])
-                    final_confidence = enriched.get('confidence', base_result['confidence'])
-                    enrichment_data = enriched.get('tavily_intelligence', {})
-                    enrichment_status = enriched.get('enrichment_status', 'success')
-                except Exception as e:
-                    logger.warning(f"[EnhancedWorkflow] Tavily enrichment failed, using base: {e}")
-                    final_recommendation = base_result['recommendation']
-                    final_confidence = base_result['confidence']
-                    enrichment_data = {}
-                    enrichment_status = 'failed'
-            else:
-                final_recommendation = base_result['recommendation']
-                final_confidence = base_result['confidence']
-                enrichment_data = {}
-                enrichment_status = 'disabled'
+            if not intelligence:
+                return self._base_enrichment(base_result, 'failed')
+            enriched = await self.hybrid_orchestrator.apply_intelligence(analysis_id, base_result, intelligence)
+            # Use enriched recommendation if available
+            return {
+                'recommendation': enriched.get('recommendation', base_result['recommendation']),
+                'confidence': enriched.get('confidence', base_result['confidence']),
+                'enrichment': enriched.get('tavily_intelligence', {}),
+                'enrichment_status': enriched.get('enrichment_status', 'success')
+            }
 
-            await self._update_progress(analysis_id, 100, "Analysis complete")
+        async def enrich(synthesis, critique=None, intelligence=None):
+            return await apply_enrichment(synthesis, intelligence, progress=report_progress)
 
-            # Step 5: Build final response
-            final_result = {
-                'analysis_id': analysis_id,
-                'query': query,
-                'symbols': symbols,
-                'status': 'completed',
-                # CRITICAL: agent_results needed for frontend synthesis data access
-                'agent_results': analyses,
-                # Frontend compatibility - add fields at root level
-                'executive_summary': synthesis_result.get('summary', ''),
-                'investment_thesis': fundamental_result.get('insights', {}).get('investment_thesis', '') if fundamental_result else '',
-                'confidence_score': final_confidence,
-                # Frontend expects these at root level
-                'fundamental_analysis': {
-                    'fundamental_data': {symbols[0]: fundamental_result} if fundamental_result and symbols else {},
-                    'key_insights': fundamental_result.get('insights', {}).get('competitive_advantages', []) if fundamental_result else [],
-                    'valuation_summary': fundamental_result.get('insights', {}).get('valuation_assessment', '') if fundamental_result else '',
-                    'risks': fundamental_result.get('insights', {}).get('risks', []) if fundamental_result else []
-                },
-                'technical_analysis': {
-                    'technical_data': {symbols[0]: technical_result} if technical_result and symbols else {},
-                    'trend_analysis': technical_result.get('insights', {}).get('trend_analysis', '') if technical_result else '',
-                    'signals': {
-                        'rsi': technical_result.get('rsi', {}) if technical_result else {},
-                        'macd': technical_result.get('macd', {}) if technical_result else {},
-                        'support_levels': technical_result.get('support_levels', []) if technical_result else [],
-                        'resistance_levels': technical_result.get('resistance_levels', []) if technical_result else []
-                    }
-                },
-                'risk_analysis': {
-                    'risk_data': {symbols[0]: risk_result} if risk_result and symbols else {},
-                    'risk_level': risk_result.get('risk_level', 'MEDIUM') if risk_result else 'MEDIUM',
-                    'risk_score': risk_result.get('risk_score', 50) if risk_result else 50,
-                    'mitigation_strategies': risk_result.get('insights', {}).get('risk_mitigation', '') if risk_result else ''
-                },
-                'market_data': context.get('market_data', {}),
-                'valuation_analysis': {
-                    'intrinsic_value': fundamental_result.get('intrinsic_value') if fundamental_result else None,
-                    'fair_value': fundamental_result.get('metrics', {}).get('graham_number', {}).get('fair_value') if fundamental_result else None,
-                    'price_to_fair_value': None  # Calculate if needed
-                },
-                'macro_analysis': enrichment_data.get('macro', {}),
-                'insider_analysis': insider_activity_result or {},
-                'catalyst_calendar': catalyst_result or {},
-                'chart_analytics': chart_analytics_result or {},  # Expert trader charts
-                # Original nested structure for backward compatibility
-                'analysis': {
-                    'summary': synthesis_result.get('summary', ''),
-                    'market_data': context.get('market_data', {}),
-                    'fundamental': fundamental_result,
-                    'technical': technical_result,
-                    'risk': risk_result,
-                    'sentiment': sentiment_result or enrichment_data.get('sentiment', {}),  # From direct sentiment agent or Tavily
-                    'peer_comparison': peer_comparison_result,  # Phase 3 agents
-                    'insider_activity': insider_activity_result,
-                    'predictive': predictive_result,
-                    'catalysts': catalyst_result,  # Catalyst calendar
-                    'chart_analytics': chart_analytics_result,  # Expert trading charts
-                    'critique': critique_result,
-                    'news': enrichment_data.get('news', {}),  # From Tavily
-                    'macro': enrichment_data.get('macro', {})  # From Tavily
-                },
-                'recommendations': {
-                    'action': final_recommendation,  # Enriched or base
-                    'confidence': final_confidence,  # Enriched or base (potentially adjusted by critique)
-                    'target_price': synthesis_result.get('target_price', 0),
-                    'stop_loss': synthesis_result.get('stop_loss', 0),
-                    'entry_price': synthesis_result.get('entry_price', 0),
-                    'time_horizon': synthesis_result.get('time_horizon', 'medium_term'),
-                    'risk_reward_ratio': synthesis_result.get('risk_reward_ratio', 1.0),
-                    'key_catalysts': synthesis_result.get('key_catalysts', []),
-                    'risks': synthesis_result.get('risks', []),
-                    'strategy': synthesis_result.get('strategy', [])
-                },
-                'consensus_breakdown': synthesis_result.get('consensus_breakdown', {}),
-                'agent_agreement': synthesis_result.get('agent_agreement', ''),
-                'enrichment_status': enrichment_status,
-                'synthesis': synthesis_result,  # CRITICAL FIX: Include full synthesis object for frontend data_quality badge
-                'quality_assurance': {
-                    'critique_passed': critique_result.get('quality_pass', True) if critique_result else True,
-                    'critical_issues': critique_result.get('critical_issues', []) if critique_result else [],
-                    'revision_priority': critique_result.get('revision_priority', 'NONE') if critique_result else 'NONE'
-                },
-                'completed_at': datetime.utcnow().isoformat()
-            }
+        nodes.append(DagNode('enrichment', enrich, inputs=tuple(enrichment_inputs), timeout=timeout,
+                             deadline=self.analysis_slo, default=None))
 
-            # Save to database
-            await self._save_results(analysis_id, final_result)
+        dag_run = await AgentDAG(nodes).execute()
+        outputs, report = dag_run['outputs'], dag_run['report']
 
-            logger.info(f"[EnhancedWorkflow] Analysis complete: {synthesis_result.get('action', 'HOLD')} with {synthesis_result.get('confidence', 0)*100}% confidence")
+        synthesis_result = outputs['synthesis']
+        enrichment = outputs['enrichment']
+        if enrichment is None:
+            logger.warning(f"[EnhancedWorkflow] Tavily enrichment failed for {symbol}, using base")
+            enrichment = self._base_enrichment(
+                {'recommendation': synthesis_result.get('action', 'HOLD'), 'confidence': synthesis_result.get('confidence', 0.5)},
+                'failed'
+            )
 
-            return final_result
+        late = dag_run['late']
+        if 'intelligence' in late:
+            intelligence_task = late['intelligence']
+
+            async def late_enrichment():
+                intelligence_result = await intelligence_task
+                return await asyncio.wait_for(apply_enrichment(synthesis_result, intelligence_result), self.synthesis_reserve)
+
+            # Enrichment ran without the intelligence: redone once it arrives
+            enrichment['enrichment_status'] = 'pending'
+            late['intelligence'] = asyncio.ensure_future(late_enrichment())
+
+        logger.info(f"[EnhancedWorkflow] {symbol} critical path {report['critical_path_time']:.2f}s of "
+                    f"{report['wall_time']:.2f}s: {' -> '.join(report['critical_path'])}"
+                    + (f", pending: {', '.join(late)}" if late else ""))
+        return {
+            'analyses': outputs['analyses'],
+            'outcome': {
+                'synthesis': synthesis_result,
+                'critique': outputs.get('critique', {}),
+                'pending_agents': list(late),
+                **enrichment
+            },
+            'report': report,
+            'late': late
+        }
 
-        except Exception as e:
-            logger.error(f"[EnhancedWorkflow] Fatal error: {e}", exc_info=True)
-            await self._mark_failed(analysis_id, str(e))
-            raise
+    @staticmethod
+    def _base_enrichment(base_result: Dict[str, Any], status: str) -> Dict[str, Any]:
+        """Enrichment outcome that keeps the base recommendation"""
+        return {
+            'recommendation': base_result['recommendation'],
+            'confidence': base_result['confidence'],
+            'enrichment': {},
+            'enrichment_status': status
+        }
+
+    def _build_result(
+        self,
+        analysis_id: str,
+        query: str,
+        symbols: List[str],
+        context: Dict[str, Any],
+        analyses: Dict[str, Any],
+        outcome: Dict[str, Any],
+        report: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Assemble the analysis document for one symbol from its analysis graph run"""
+        fundamental_result = analyses['fundamental']
+        technical_result = analyses['technical']
+        risk_result = analyses['risk']
+        sentiment_result = analyses['sentiment']
+        insider_activity_result = analyses['insider_activity']
+        catalyst_result = analyses['catalysts']
+        chart_analytics_result = analyses['chart_analytics']
+        synthesis_result = outcome['synthesis']
+        critique_result = outcome['critique']
+        enrichment_data = outcome['enrichment']
+
+        return {
+            'analysis_id': analysis_id,
+            'query': query,
+            'symbols': symbols,
+            'status': 'completed',
+            # CRITICAL: agent_results needed for frontend synthesis data access
+            'agent_results': analyses,
+            # Frontend compatibility - add fields at root level
+            'executive_summary': synthesis_result.get('summary', ''),
+            'investment_thesis': fundamental_result.get('insights', {}).get('investment_thesis', '') if fundamental_result else '',
+            'confidence_score': outcome['confidence'],
+            # Frontend expects these at root level
+            'fundamental_analysis': {
+                'fundamental_data': {symbols[0]: fundamental_result} if fundamental_result and symbols else {},
+                'key_insights': fundamental_result.get('insights', {}).get('competitive_advantages', []) if fundamental_result else [],
+                'valuation_summary': fundamental_result.get('insights', {}).get('valuation_assessment', '') if fundamental_result else '',
+                'risks': fundamental_result.get('insights', {}).get('risks', []) if fundamental_result else []
+            },
+            'technical_analysis': {
+                'technical_data': {symbols[0]: technical_result} if technical_result and symbols else {},
+                'trend_analysis': technical_result.get('insights', {}).get('trend_analysis', '') if technical_result else '',
+                'signals': {
+                    'rsi': technical_result.get('rsi', {}) if technical_result else {},
+                    'macd': technical_result.get('macd', {}) if technical_result else {},
+                    'support_levels': technical_result.get('support_levels', []) if technical_result else [],
+                    'resistance_levels': technical_result.get('resistance_levels', []) if technical_result else []
+                }
+            },
+            'risk_analysis': {
+                'risk_data': {symbols[0]: risk_result} if risk_result and symbols else {},
+                'risk_level': risk_result.get('risk_level', 'MEDIUM') if risk_result else 'MEDIUM',
+                'risk_score': risk_result.get('risk_score', 50) if risk_result else 50,
+                'mitigation_strategies': risk_result.get('insights', {}).get('risk_mitigation', '') if risk_result else ''
+            },
+            'market_data': context.get('market_data', {}),
+            'valuation_analysis': {
+                'intrinsic_value': fundamental_result.get('intrinsic_value') if fundamental_result else None,
+                'fair_value': fundamental_result.get('metrics', {}).get('graham_number', {}).get('fair_value') if fundamental_result else None,
+                'price_to_fair_value': None  # Calculate if needed
+            },
+            'macro_analysis': enrichment_data.get('macro', {}),
+            'insider_analysis': insider_activity_result or {},
+            'catalyst_calendar': catalyst_result or {},
+            'chart_analytics': chart_analytics_result or {},  # Expert trader charts
+            # Original nested structure for backward compatibility
+            'analysis': {
+                'summary': synthesis_result.get('summary', ''),
+                'market_data': context.get('market_data', {}),
+                'fundamental': fundamental_result,
+                'technical': technical_result,
+                'risk': risk_result,
+                'sentiment': sentiment_result or enrichment_data.get('sentiment', {}),  # From direct sentiment agent or Tavily
+                'peer_comparison': analyses['peer_comparison'],  # Phase 3 agents
+                'insider_activity': insider_activity_result,
+                'predictive': analyses['predictive'],
+                'catalysts': catalyst_result,  # Catalyst calendar
+                'chart_analytics': chart_analytics_result,  # Expert trading charts
+                'critique': critique_result,
+                'news': enrichment_data.get('news', {}),  # From Tavily
+                'macro': enrichment_data.get('macro', {})  # From Tavily
+            },
+            'recommendations': {
+                'action': outcome['recommendation'],  # Enriched or base
+                'confidence': outcome['confidence'],  # Enriched or base (potentially adjusted by critique)
+                'target_price': synthesis_result.get('target_price', 0),
+                'stop_loss': synthesis_result.get('stop_loss', 0),
+                'entry_price': synthesis_result.get('entry_price', 0),
+                'time_horizon': synthesis_result.get('time_horizon', 'medium_term'),
+                'risk_reward_ratio': synthesis_result.get('risk_reward_ratio', 1.0),
+                'key_catalysts': synthesis_result.get('key_catalysts', []),
+                'risks': synthesis_result.get('risks', []),
+                'strategy': synthesis_result.get('strategy', [])
+            },
+            'consensus_breakdown': synthesis_result.get('consensus_breakdown', {}),
+            'agent_agreement': synthesis_result.get('agent_agreement', ''),
+            'enrichment_status': outcome['enrichment_status'],
+            'synthesis': synthesis_result,  # CRITICAL FIX: Include full synthesis object for frontend data_quality badge
+            'quality_assurance': {
+                'critique_passed': critique_result.get('quality_pass', True) if critique_result else True,
+                'critical_issues': critique_result.get('critical_issues', []) if critique_result else [],
+                'revision_priority': critique_result.get('revision_priority', 'NONE') if critique_result else 'NONE'
+            },
+            'execution_report': report,  # Per-node timings and critical path
+            'pending_agents': outcome.get('pending_agents', []),  # Past their soft deadline, merged in when done
+            'completed_at': datetime.utcnow().isoformat()
+        }
 
     async def _run_agent_with_tracking(self, analysis_id: str, agent_name: str, agent: Any, context: Dict, method: str = 'analyze') -> Dict:
         """
@@ -530,7 +820,8 @@ class EnhancedStockWorkflow:
 
             # Update progress
             completed_count = await self._get_completed_count(analysis_id)
-            progress_percent = int((completed_count / self.total_agents) * 100)
+            total_runs = len(self._run_plans.get(analysis_id, ())) or self.total_agents
+            progress_percent = int((completed_count / total_runs) * 100)
             await self._update_progress(analysis_id, progress_percent, f"{agent_name} completed")
 
             # Send WebSocket update for agent completion
@@ -546,6 +837,23 @@ class EnhancedStockWorkflow:
             logger.info(f"[EnhancedWorkflow] {agent_name} completed successfully")
             return result
 
+        except asyncio.CancelledError as e:
+            # Node timeout, run cancellation or shutdown: record the cause the
+            # analysis graph cancelled with, then let cancellation propagate
+            reason = str(e.args[0]) if e.args and e.args[0] else "cancelled"
+            logger.warning(f"[EnhancedWorkflow] {agent_name} cancelled ({reason})")
+            await self.database['analyses'].update_one(
+                {"id": analysis_id, "agent_executions.agent": agent_name},
+                {
+                    "$set": {
+                        "agent_executions.$.status": "FAILED",
+                        "agent_executions.$.end_time": datetime.utcnow(),
+                        "agent_executions.$.error": reason
+                    }
+                }
+            )
+            raise
+
         except Exception as e:
             logger.error(f"[EnhancedWorkflow] {agent_name} failed: {e}", exc_info=True)
 
@@ -580,6 +888,7 @@ class EnhancedStockWorkflow:
         """
         try:
             from services.financial_data_service import FinancialDataService
+            from services.market_data_store import get_market_data_store, ANALYSIS_PERIOD
             service = FinancialDataService()
 
             logger.info(f"[EnhancedWorkflow] Fetching real data for {symbol}")
@@ -587,60 +896,126 @@ class EnhancedStockWorkflow:
             # Get real-time quote
             quote = await service.get_stock_quote(symbol)
 
-            # Get 1 year of historical data (returns List[Dict] with OHLCV)
-            historical_data = await service.get_historical_data(symbol, period="1y", interval="1d")
-
             # Get fundamental data
             fundamentals = await service.get_fundamental_data(symbol)
 
-            # Extract price arrays from historical data
-            closes = [d['close'] for d in historical_data]
-            volumes = [d['volume'] for d in historical_data]
-            highs = [d['high'] for d in historical_data]
-            lows = [d['low'] for d in historical_data]
-
-            # Prepare context with REAL data
-            context = {
-                'symbol': symbol,
-                'prices': closes,  # Real historical closes (252 days)
-                'volumes': volumes,
-                'highs': highs,
-                'lows': lows,
-                'market_data': quote,  # Real-time quote data
-                'fundamentals': fundamentals,  # Real P/E, EPS, etc.
-                'sector': fundamentals.get('sector', 'Technology'),
-                'historical_prices': closes[-30:] if len(closes) >= 30 else closes,  # Last 30 days
-                'balance_sheet': fundamentals.get('balance_sheet', {}),
-                'income_statement': fundamentals.get('income_statement', {}),
-                'cash_flow': fundamentals.get('cash_flow', {})
-            }
+            # 1 year of daily bars as an OHLCVSeries so indicators hit the shared indicator cache
+            price_series = await get_market_data_store().get_history(symbol, period=ANALYSIS_PERIOD)
 
-            logger.info(f"[EnhancedWorkflow] Fetched {len(closes)} days of price data for {symbol}")
-            return context
+            return self._build_context(symbol, price_series, quote, fundamentals)
 
         except Exception as e:
             logger.error(f"[EnhancedWorkflow] Failed to fetch real data for {symbol}: {e}", exc_info=True)
+            return self._fallback_context(symbol, e)
 
-            # Fallback to minimal context
-            return {
+    async def _prepare_contexts(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Prepare contexts for several symbols at once
+
+        Histories come from one multi-symbol MarketDataStore download; quotes and
+        fundamentals (per-ticker lookups in yfinance) are fetched concurrently.
+
+        Args:
+            symbols: Upper-case stock symbols
+
+        Returns:
+            {symbol: context} with the same fields as _prepare_context
+        """
+        try:
+            from services.financial_data_service import FinancialDataService
+            from services.market_data_store import get_market_data_store, ANALYSIS_PERIOD
+            service = FinancialDataService()
+
+            logger.info(f"[EnhancedWorkflow] Fetching real data for {symbols}")
+
+            histories, quotes, fundamentals = await asyncio.gather(
+                get_market_data_store().get_many(symbols, period=ANALYSIS_PERIOD),
+                asyncio.gather(*(service.get_stock_quote(s) for s in symbols)),
+                asyncio.gather(*(service.get_fundamental_data(s) for s in symbols))
+            )
+
+        except Exception as e:
+            logger.error(f"[EnhancedWorkflow] Failed to fetch real data for {symbols}: {e}", exc_info=True)
+            return {symbol: self._fallback_context(symbol, e) for symbol in symbols}
+
+        return {
+            symbol: self._build_context(symbol, histories[symbol], quote, fundamental)
+            for symbol, quote, fundamental in zip(symbols, quotes, fundamentals)
+        }
+
+    def _build_context(self, symbol: str, price_series, quote: Dict[str, Any], fundamentals: Dict[str, Any]) -> Dict[str, Any]:
+        """Agent context from a symbol's daily OHLCVSeries, quote and fundamentals"""
+        # Extract price arrays (rounded like FinancialDataService.get_historical_data)
+        closes = np.round(price_series.close, 2).tolist()
+        volumes = price_series.volume.tolist()
+        highs = np.round(price_series.high, 2).tolist()
+        lows = np.round(price_series.low, 2).tolist()
+
+        logger.info(f"[EnhancedWorkflow] Fetched {len(closes)} days of price data for {symbol}")
+
+        # Prepare context with REAL data
+        return {
+            'symbol': symbol,
+            'prices': closes,  # Real historical closes (252 days)
+            'price_series': price_series,
+            'volumes': volumes,
+            'highs': highs,
+            'lows': lows,
+            'market_data': quote,  # Real-time quote data
+            'fundamentals': fundamentals,  # Real P/E, EPS, etc.
+            'sector': fundamentals.get('sector', 'Technology'),
+            'historical_prices': closes[-30:] if len(closes) >= 30 else closes,  # Last 30 days
+            'balance_sheet': fundamentals.get('balance_sheet', {}),
+            'income_statement': fundamentals.get('income_statement', {}),
+            'cash_flow': fundamentals.get('cash_flow', {})
+        }
+
+    def _fallback_context(self, symbol: str, error: Exception) -> Dict[str, Any]:
+        """Minimal context when market data could not be fetched"""
+        return {
+            'symbol': symbol,
+            'prices': [],
+            'volumes': [],
+            'highs': [],
+            'lows': [],
+            'market_data': {
                 'symbol': symbol,
-                'prices': [],
-                'volumes': [],
-                'highs': [],
-                'lows': [],
-                'market_data': {
-                    'symbol': symbol,
-                    'price': 0,
-                    'change': 0,
-                    'volume': 0,
-                    'error': f"Data fetch failed: {str(e)}"
-                },
-                'sector': 'Unknown',
-                'historical_prices': [],
-                'balance_sheet': {},
-                'income_statement': {},
-                'cash_flow': {}
-            }
+                'price': 0,
+                'change': 0,
+                'volume': 0,
+                'error': f"Data fetch failed: {str(error)}"
+            },
+            'sector': 'Unknown',
+            'historical_prices': [],
+            'balance_sheet': {},
+            'income_statement': {},
+            'cash_flow': {}
+        }
+
+    async def _market_mood(self) -> Dict[str, Any]:
+        """Market-wide mood index, computed once per multi-symbol analysis"""
+        try:
+            from services.market_mood import MarketMoodCalculator
+            return await MarketMoodCalculator().calculate_market_mood('US')
+        except Exception as e:
+            logger.warning(f"[EnhancedWorkflow] Market mood unavailable: {e}")
+            return {}
+
+    def _agent_names(self) -> List[str]:
+        """Tracking names of all agents that are actually initialized"""
+        all_agents = []
+        if self.fundamental_agent: all_agents.append('ExpertFundamentalAgent')
+        if self.technical_agent: all_agents.append('ExpertTechnicalAgent')
+        if self.risk_agent: all_agents.append('ExpertRiskAgent')
+        if self.sentiment_agent: all_agents.append('TavilySentimentAgent')
+        if self.peer_comparison_agent: all_agents.append('PeerComparisonAgent')
+        if self.insider_activity_agent: all_agents.append('InsiderActivityAgent')
+        if self.predictive_agent: all_agents.append('PredictiveAgent')
+        if self.catalyst_tracker_agent: all_agents.append('CatalystTrackerAgent')
+        if self.chart_analytics_agent: all_agents.append('ChartAnalyticsAgent')
+        if self.synthesis_agent: all_agents.append('ExpertSynthesisAgent')
+        if self.critique_agent: all_agents.append('CritiqueAgent')
+        return all_agents
 
     async def _get_completed_count(self, analysis_id: str) -> int:
         """Count completed agents"""
@@ -661,19 +1036,8 @@ class EnhancedStockWorkflow:
         if completed_agents is None:
             completed_agents = [e['agent'] for e in agent_execs if e.get('status') == 'COMPLETED']
 
-        # Build dynamic list of all possible agents based on what's actually initialized
-        all_agents = []
-        if self.fundamental_agent: all_agents.append('ExpertFundamentalAgent')
-        if self.technical_agent: all_agents.append('ExpertTechnicalAgent')
-        if self.risk_agent: all_agents.append('ExpertRiskAgent')
-        if self.sentiment_agent: all_agents.append('TavilySentimentAgent')
-        if self.peer_comparison_agent: all_agents.append('PeerComparisonAgent')
-        if self.insider_activity_agent: all_agents.append('InsiderActivityAgent')
-        if self.predictive_agent: all_agents.append('PredictiveAgent')
-        if self.catalyst_tracker_agent: all_agents.append('CatalystTrackerAgent')
-        if self.chart_analytics_agent: all_agents.append('ChartAnalyticsAgent')
-        if self.synthesis_agent: all_agents.append('ExpertSynthesisAgent')
-        if self.critique_agent: all_agents.append('CritiqueAgent')
+        # Agents expected for this analysis (per-symbol runs for multi-symbol analyses)
+        all_agents = self._run_plans.get(analysis_id) or self._agent_names()
 
         # Calculate pending agents (not completed and not running)
         pending_agents = [a for a in all_agents if a not in completed_agents and a not in active_agents]
@@ -738,6 +1102,134 @@ class EnhancedStockWorkflow:
         except Exception as e:
             logger.error(f"[EnhancedWorkflow] Failed to save results for {analysis_id}: {e}", exc_info=True)
 
+    async def _publish_results(self, analysis_id: str, result: Dict, late_runs: List[Dict[str, Any]]):
+        """
+        Save final results, then merge late agent results into them in the background
+
+        Late agents are listed on the analysis document (pending_late_agents)
+        before the result is saved, so SSE streams stay open until they are merged
+        or, at the latest, until the largest hard deadline among them plus the
+        synthesis reserve for a late enrichment (late_deadline).
+
+        Args:
+            analysis_id: Analysis document ID
+            result: Final result
+            late_runs: Symbol runs with pending agents: {'symbol', 'late', 'report',
+                'prefixes'} where prefixes are the result paths holding the symbol's result
+        """
+        if late_runs:
+            labels = [f"{key}[{run['symbol']}]" for run in late_runs for key in run['late']]
+            wait = max(self.agent_deadlines[key][1] for run in late_runs for key in run['late']) + self.synthesis_reserve
+            await self.database['analyses'].update_one({"id": analysis_id}, {"$set": {
+                "pending_late_agents": labels,
+                "late_deadline": datetime.utcnow() + timedelta(seconds=wait)
+            }})
+            logger.info(f"[EnhancedWorkflow] Completed {analysis_id} without {labels}, merging them when they finish")
+
+        await self._save_results(analysis_id, result)
+
+        if late_runs:
+            task = asyncio.create_task(self._merge_late_results(analysis_id, late_runs))
+            self._late_merges.add(task)
+            task.add_done_callback(self._late_merges.discard)
+
+    async def _merge_late_results(self, analysis_id: str, late_runs: List[Dict[str, Any]]):
+        """Merge each late agent result into the saved analysis as soon as it finishes"""
+        waiting = {task: (run, key) for run in late_runs for key, task in run['late'].items()}
+        try:
+            while waiting:
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    run, key = waiting.pop(task)
+                    await self._merge_late_result(analysis_id, run, key, task)
+        finally:
+            # Merging itself was cancelled: stop and release the agents still pending
+            for task, (run, key) in waiting.items():
+                task.cancel()
+                await self._release_late_agent(analysis_id, run, key, 'cancelled')
+
+    async def _merge_late_result(self, analysis_id: str, run: Dict[str, Any], key: str, task: asyncio.Future):
+        """
+        Merge one late agent result and push it as an incremental update
+
+        The result replaces the agent's placeholder in agent_results, analysis and
+        root-level aliases (derived root sections such as fundamental_analysis keep
+        the synthesis-time values), or for late intelligence the enrichment outcome
+        replaces the base recommendation, and the agent leaves pending_agents.
+        Whether or not that succeeds, the agent is released (_release_late_agent).
+        """
+        symbol = run['symbol']
+        node = run['report']['nodes'][key]  # Updated in place by the DAG when the agent finished
+        status, result = ('cancelled' if task.cancelled() else node['status']), None
+        try:
+            if status == 'cancelled':
+                return
+            result = convert_to_serializable(task.result())
+
+            updates, pulls = {}, {}
+            for prefix in run['prefixes']:
+                # Late enrichment is an outcome even when the intelligence failed (base recommendation)
+                if status == 'completed' or key == 'intelligence':
+                    for field, value in self._late_fields(key, result).items():
+                        updates[prefix + field] = value
+                updates[f"{prefix}execution_report.nodes.{key}"] = dict(node)
+                pulls[f"{prefix}pending_agents"] = key
+            await self.database['analysis_results'].update_one(
+                {"analysis_id": analysis_id},
+                {"$set": updates, "$pull": pulls}
+            )
+            logger.info(f"[EnhancedWorkflow] Merged late {key} result for {symbol} ({status}, {node['duration']:.2f}s)")
+        except Exception as e:
+            status = 'failed'
+            logger.error(f"[EnhancedWorkflow] Failed to merge late {key} result for {symbol}: {e}", exc_info=True)
+        finally:
+            await self._release_late_agent(analysis_id, run, key, status, result)
+
+    @staticmethod
+    def _late_fields(key: str, result: Any) -> Dict[str, Any]:
+        """Result fields (relative to a symbol's result) set from a late node's result"""
+        if key == 'intelligence':
+            enrichment = result['enrichment']
+            return {
+                'recommendations.action': result['recommendation'],
+                'recommendations.confidence': result['confidence'],
+                'confidence_score': result['confidence'],
+                'enrichment_status': result['enrichment_status'],
+                'macro_analysis': enrichment.get('macro', {}),
+                'analysis.news': enrichment.get('news', {}),
+                'analysis.macro': enrichment.get('macro', {})
+            }
+        return {field: result for field in (f"agent_results.{key}", f"analysis.{key}", *LATE_RESULT_ALIASES.get(key, ()))}
+
+    async def _release_late_agent(self, analysis_id: str, run: Dict[str, Any], key: str, status: str, result: Any = None):
+        """
+        Take a late agent off pending_late_agents and publish its outcome
+
+        The 'agent_late_result' update goes out over WebSocket and, through the
+        analysis document's late_results, SSE; failed or cancelled agents carry
+        no result.
+        """
+        symbol = run['symbol']
+        event = {
+            'agent': key,
+            'symbol': symbol,
+            'status': status,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        try:
+            await self.database['analyses'].update_one(
+                {"id": analysis_id},
+                {"$pull": {"pending_late_agents": f"{key}[{symbol}]"}, "$push": {"late_results": event}}
+            )
+            await self._send_websocket_update(analysis_id, {
+                "type": "agent_late_result",
+                **event,
+                "result": json.loads(json.dumps(result, default=str)) if status == 'completed' else None,
+                "message": f"{key} result for {symbol} merged ({status})"
+            })
+        except Exception as e:
+            logger.error(f"[EnhancedWorkflow] Failed to release late {key} for {symbol}: {e}", exc_info=True)
+
     async def _mark_failed(self, analysis_id: str, error: str):
         """Mark analysis as failed"""
         await self.database['analyses'].update_one(
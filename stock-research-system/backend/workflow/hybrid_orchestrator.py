@@ -16,6 +16,8 @@ from agents.tavily_agents import (
     TavilySentimentTrackerAgent,
     MacroContextAgent
 )
+from agents.tavily_agents.news_intelligence_agent import enrichment_impact
+from agents.tavily_agents.macro_context_agent import macro_impact
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +25,9 @@ logger = logging.getLogger(__name__)
 class HybridOrchestrator:
     """
     Orchestrates hybrid analysis workflow:
-    1. Base analysis runs first (existing 4 expert agents) = 70% weight
-    2. Tavily enrichment agents run after = 30% weight
+    1. Base analysis (existing expert agents) = 70% weight
+    2. Tavily enrichment agents = 30% weight (gather_intelligence does not
+       need the base result, so it can run alongside the base analysis)
     3. Weighted consensus combines both
     4. Graceful degradation if Tavily fails
     """
@@ -46,7 +49,8 @@ class HybridOrchestrator:
         self,
         analysis_id: str,
         symbol: str,
-        base_result: Dict[str, Any]
+        base_result: Dict[str, Any],
+        macro_context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Enrich base analysis with Tavily intelligence
@@ -55,28 +59,53 @@ class HybridOrchestrator:
             analysis_id: MongoDB analysis ID
             symbol: Stock symbol
             base_result: Result from base expert agents
+            macro_context: Macro result from analyze_macro shared by several
+                symbols (the macro agent is not run again)
 
         Returns:
             Enriched analysis with weighted recommendation
         """
         logger.info(f"[HybridOrchestrator] Enriching analysis for {symbol}")
 
+        # Prepare context for Tavily agents
+        context = {
+            'symbol': symbol,
+            'sector': base_result.get('sector', 'General'),
+            'market_data': base_result.get('market_data', {}),
+            'base_recommendation': base_result.get('recommendation', 'HOLD')
+        }
+
+        # Run Tavily agents in parallel (with error handling)
+        tavily_results = await self.gather_intelligence(analysis_id, context, macro_context)
+
+        return await self.apply_intelligence(analysis_id, base_result, tavily_results)
+
+    async def apply_intelligence(
+        self,
+        analysis_id: str,
+        base_result: Dict[str, Any],
+        tavily_results: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Combine a base result with Tavily intelligence gathered by gather_intelligence
+
+        News and macro impact scores are recomputed against the base
+        recommendation, so the intelligence can be gathered before it is known.
+
+        Args:
+            analysis_id: MongoDB analysis ID
+            base_result: Result from base expert agents
+            tavily_results: Output of gather_intelligence
+
+        Returns:
+            Enriched analysis with weighted recommendation
+        """
         try:
             # Extract base recommendation and confidence
             base_recommendation = base_result.get('recommendation', 'HOLD')
             base_confidence = base_result.get('confidence', 0.5)
-            base_reasoning = base_result.get('reasoning', '')
-
-            # Prepare context for Tavily agents
-            context = {
-                'symbol': symbol,
-                'sector': base_result.get('sector', 'General'),
-                'market_data': base_result.get('market_data', {}),
-                'base_recommendation': base_recommendation
-            }
 
-            # Run Tavily agents in parallel (with error handling)
-            tavily_results = await self._run_tavily_agents(analysis_id, context)
+            tavily_results = self._rescore(tavily_results, base_recommendation)
 
             # Calculate weighted consensus
             final_result = self._calculate_weighted_consensus(
@@ -107,40 +136,96 @@ class HybridOrchestrator:
                 'used_base_only': True
             }
 
-    async def _run_tavily_agents(
+    def _rescore(self, tavily_results: Dict[str, Any], base_recommendation: str) -> Dict[str, Any]:
+        """
+        Recompute recommendation-relative news and macro scores
+
+        The macro context may be shared by every symbol of a comparison, so
+        scores are set on copies, never on the gathered results.
+
+        Returns:
+            Copy of tavily_results with the rescored news and macro data
+        """
+        rescored = dict(tavily_results)
+
+        news = tavily_results.get('news_intelligence') or {}
+        news_data = news.get('data') or {}
+        sentiment = news_data.get('sentiment') or {}
+        if sentiment.get('score') is not None:
+            rescored['news_intelligence'] = {**news, 'data': {**news_data, 'enrichment_score': enrichment_impact(
+                sentiment['score'], sentiment.get('confidence', 0.5), base_recommendation
+            )}}
+
+        macro = tavily_results.get('macro_context') or {}
+        macro_data = macro.get('data') or {}
+        regime = macro_data.get('market_regime') or {}
+        if regime.get('score') is not None:
+            rescored['macro_context'] = {**macro, 'data': {**macro_data, 'context_score': macro_impact(
+                regime['score'], macro_data.get('confidence', 0.5), base_recommendation
+            )}}
+
+        return rescored
+
+    async def analyze_macro(self, sector: str, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Macro context for a sector, shared by every symbol of a comparison in it
+
+        Returns:
+            {'status', 'data'[, 'error']} as used by gather_intelligence
+        """
+        context = {'symbol': ' '.join(symbols), 'sector': sector}
+        return await self._safe_agent_run('MacroContext', self.macro_agent.analyze, context)
+
+    async def _safe_agent_run(self, agent_name: str, agent_method, context: Dict) -> Dict:
+        """Wrapper for safe agent execution"""
+        try:
+            logger.info(f"[{agent_name}] Starting...")
+            result = await agent_method(context)
+            logger.info(f"[{agent_name}] Completed successfully")
+            return {'status': 'success', 'data': result}
+        except Exception as e:
+            logger.error(f"[{agent_name}] Failed: {e}")
+            return {'status': 'failed', 'error': str(e), 'data': {}}
+
+    async def gather_intelligence(
         self,
         analysis_id: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        macro_result: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Run Tavily agents in parallel with error handling"""
-
-        async def safe_agent_run(agent_name: str, agent_method, context: Dict) -> Dict:
-            """Wrapper for safe agent execution"""
-            try:
-                logger.info(f"[{agent_name}] Starting...")
-                result = await agent_method(context)
-                logger.info(f"[{agent_name}] Completed successfully")
-                return {'status': 'success', 'data': result}
-            except Exception as e:
-                logger.error(f"[{agent_name}] Failed: {e}")
-                return {'status': 'failed', 'error': str(e), 'data': {}}
-
-        # Run all Tavily agents in parallel
-        results = await asyncio.gather(
-            safe_agent_run('NewsIntelligence', self.news_agent.analyze, context),
-            safe_agent_run('SentimentTracker', self.sentiment_agent.analyze, context),
-            safe_agent_run('MacroContext', self.macro_agent.analyze, context),
-            return_exceptions=True
-        )
+        """
+        Run Tavily agents in parallel with error handling
+
+        Independent of the base analysis, so it can run alongside the expert agents.
+
+        Args:
+            analysis_id: MongoDB analysis ID
+            context: {'symbol', 'sector', 'market_data'[, 'base_recommendation']}
+            macro_result: Shared macro result from analyze_macro (skips the macro agent)
+
+        Returns:
+            {'news_intelligence', 'sentiment_tracker', 'macro_context'}, each {'status', 'data'}
+        """
+
+        # Run all Tavily agents in parallel (macro only when not shared)
+        agent_runs = [
+            self._safe_agent_run('NewsIntelligence', self.news_agent.analyze, context),
+            self._safe_agent_run('SentimentTracker', self.sentiment_agent.analyze, context),
+        ]
+        if macro_result is None:
+            agent_runs.append(self._safe_agent_run('MacroContext', self.macro_agent.analyze, context))
+        results = await asyncio.gather(*agent_runs, return_exceptions=True)
 
         # Unpack results
-        news_result, sentiment_result, macro_result = results
+        news_result, sentiment_result = results[:2]
+        if macro_result is None:
+            macro_result = results[2]
 
         # Pass news sentiment to sentiment agent for divergence calculation
         if news_result['status'] == 'success' and sentiment_result['status'] == 'success':
             context['news_sentiment'] = news_result['data'].get('sentiment', {})
             # Re-run sentiment agent with news context (async)
-            sentiment_result = await safe_agent_run(
+            sentiment_result = await self._safe_agent_run(
                 'SentimentTracker',
                 self.sentiment_agent.analyze,
                 context
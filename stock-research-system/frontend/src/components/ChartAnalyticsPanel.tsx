@@ -59,7 +59,7 @@ const ChartAnalyticsPanel: React.FC<ChartAnalyticsProps> = ({ symbol }) => {
     try {
       setLoading(true);
       setError(null);
-      const response = await axios.get(`http://localhost:8000/api/v1/charts/${symbol}`);
+      const response = await axios.get(`http://localhost:8000/api/v1/charts/${symbol}?sections=summary,price_charts,indicator_charts`);
       setChartData(response.data);
     } catch (err: any) {
       setError(err.message || 'Failed to fetch chart data');
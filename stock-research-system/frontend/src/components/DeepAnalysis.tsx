@@ -318,6 +318,7 @@ const DeepAnalysis: React.FC<DeepAnalysisProps> = ({ symbol, onClose }) => {
   // eslint-disable-next-line @typescript-eslint/no-unused-vars
   const [citations, setCitations] = useState<CitationData[]>([]);
   const [currentStage, setCurrentStage] = useState<string>('');
+  const [chartSeries, setChartSeries] = useState<any>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const { isMobile, isTablet } = useResponsive();
 
@@ -349,6 +350,7 @@ const DeepAnalysis: React.FC<DeepAnalysisProps> = ({ symbol, onClose }) => {
     setLoading(true);
     setError(null);
     setResult(null);
+    setChartSeries(null);
     setProgress(0);
     setAgentProgress([]);
     setCitations([]);
@@ -601,6 +603,18 @@ const DeepAnalysis: React.FC<DeepAnalysisProps> = ({ symbol, onClose }) => {
     }
   };
 
+  // Chart series are not stored with the analysis; load them on demand
+  useEffect(() => {
+    const chartAnalytics = result?.chart_analytics || result?.analysis?.chart_analytics;
+    if (!chartAnalytics || chartAnalytics.chart_data || chartAnalytics.error) return;
+
+    const sections = 'price_charts,technical_overlays,indicator_charts';
+    fetch(`http://localhost:8000/api/v1/charts/${symbol}?sections=${sections}`)
+      .then(response => (response.ok ? response.json() : null))
+      .then(data => setChartSeries(data?.chart_data || null))
+      .catch(err => console.error('Failed to load chart series:', err));
+  }, [result, symbol]);
+
   // Cleanup WebSocket on unmount
   useEffect(() => {
     const ws = wsRef.current;
@@ -3630,13 +3644,14 @@ const DeepAnalysis: React.FC<DeepAnalysisProps> = ({ symbol, onClose }) => {
       );
     }
 
-    // Extract chart data from backend
-    const priceData = chartData?.chart_data?.price_charts?.candlestick?.data;
-    const technicalOverlays = chartData?.chart_data?.technical_overlays;
+    // Extract chart data from backend (older results embed the series)
+    const series = chartData?.chart_data || chartSeries;
+    const priceData = series?.price_charts?.candlestick?.data;
+    const technicalOverlays = series?.technical_overlays;
     const indicatorData = {
-      rsi: chartData?.chart_data?.indicator_charts?.rsi?.data,
-      macd: chartData?.chart_data?.indicator_charts?.macd?.data,
-      bollinger_bands: chartData?.chart_data?.indicator_charts?.bollinger_bands?.data
+      rsi: series?.indicator_charts?.rsi?.data,
+      macd: series?.indicator_charts?.macd?.data,
+      bollinger_bands: series?.indicator_charts?.bollinger_bands?.data
     };
     const supportResistance = chartData?.support_resistance ? {
       support: chartData.support_resistance.support_levels?.map((s: any) => s.level).filter((p: number) => p > 0),